@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Variety Model Footprint
+
+Measures the memory held by a fully materialized GrapeVarietiesModel and the
+time spent serializing it (to_dict, to_jsonl_entry, save_jsonl), on the real
+mapping in data/ and on a synthetic mapping of a given size.
+
+USAGE:
+uv run benchmarks/model_footprint.py
+uv run benchmarks/model_footprint.py --size large --repeat 10
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict
+
+BENCHMARK_DIR = Path(__file__).parent
+sys.path.insert(0, str(BENCHMARK_DIR))
+sys.path.insert(0, str(BENCHMARK_DIR.parent / "src"))
+
+from synthetic import SIZES, write_dataset
+from includes.grape_varieties import GrapeVarietiesModel
+
+DATA_DIR = BENCHMARK_DIR.parent / "data"
+
+
+def median_seconds(run: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def measure(data_dir: Path, repeat: int) -> Dict:
+    """Memory of the parsed model and serialization times for one mapping."""
+    gc.collect()
+    tracemalloc.start()
+    model = GrapeVarietiesModel(data_dir, use_snapshot=False)
+    memory_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    varieties = model.get_all_varieties()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # save_jsonl rewrites the mapping, so time it against a copy
+        copy = GrapeVarietiesModel(data_dir, use_snapshot=False)
+        copy.jsonl_file = Path(temp_dir) / model.jsonl_file.name
+        shutil.copy(model.jsonl_file, copy.jsonl_file)
+        with contextlib.redirect_stdout(io.StringIO()):
+            save_seconds = median_seconds(copy.save_jsonl, repeat)
+
+    return {
+        "varieties": len(varieties),
+        "memory_kib": round(memory_bytes / 1024, 1),
+        "to_dict_ms": round(median_seconds(lambda: [v.to_dict() for v in varieties], repeat) * 1000, 3),
+        "to_jsonl_entry_ms": round(median_seconds(lambda: [v.to_jsonl_entry() for v in varieties], repeat) * 1000, 3),
+        "save_jsonl_ms": round(save_seconds * 1000, 3)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure variety model memory and serialization time")
+    parser.add_argument("--size", choices=sorted(SIZES), default="medium", help="Synthetic mapping size")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed repetitions (median is reported)")
+    args = parser.parse_args()
+
+    reports = {}
+    if (DATA_DIR / "grape_variety_mapping.jsonl").exists():
+        reports["data/grape_variety_mapping.jsonl"] = measure(DATA_DIR, args.repeat)
+    with tempfile.TemporaryDirectory(prefix="grapegeek-footprint-") as temp_dir:
+        write_dataset(Path(temp_dir), SIZES[args.size], seed=0)
+        reports[f"synthetic ({args.size})"] = measure(Path(temp_dir), args.repeat)
+
+    print("📏 Variety model footprint")
+    print("=" * 60)
+    for label, report in reports.items():
+        print(f"{label}: {report['varieties']} varieties")
+        print(f"   memory          {report['memory_kib']:10.1f} KiB")
+        print(f"   to_dict         {report['to_dict_ms']:10.2f} ms")
+        print(f"   to_jsonl_entry  {report['to_jsonl_entry_ms']:10.2f} ms")
+        print(f"   save_jsonl      {report['save_jsonl_ms']:10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Benchmark Runner
+
+Times the hot paths of the variety model, TTB filtering, tree generation and
+the stats / output stages against deterministic synthetic datasets, then
+compares the results with a stored JSON baseline to flag regressions.
+Timings only compare on the machine that recorded them, so baselines are
+generated locally (the first run records one) and are not committed.
+
+PURPOSE: Performance regression checks for pipeline hot paths
+
+INPUTS:
+- Synthetic datasets generated on the fly (benchmarks/synthetic.py)
+- benchmarks/baselines/<size>.json (previous local results, gitignored)
+
+OUTPUTS:
+- benchmarks/results/<size>-latest.json (results of this run)
+- benchmarks/baselines/<size>.json (with --save-baseline, or when none exists yet)
+
+USAGE:
+# Run all benchmarks on the small dataset and compare with its baseline
+uv run benchmarks/run_benchmarks.py
+
+# Record a new baseline for the medium dataset
+uv run benchmarks/run_benchmarks.py --size medium --save-baseline
+
+# Run a subset, failing on slowdowns over 50%
+uv run benchmarks/run_benchmarks.py --only variety_model --threshold 0.5
+
+FUNCTIONALITY:
+- Each benchmark runs one warm-up call, then --repeat timed calls
+- Reports min / median / mean seconds; the median is compared with the baseline
+- Exits with status 1 when any benchmark is slower than baseline × (1 + threshold)
+- Stage output is suppressed while timing
+"""
+
+import argparse
+import contextlib
+import csv
+import importlib.util
+import io
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+BENCHMARK_DIR = Path(__file__).parent
+SRC_DIR = BENCHMARK_DIR.parent / "src"
+sys.path.insert(0, str(BENCHMARK_DIR))
+sys.path.insert(0, str(SRC_DIR))
+
+from synthetic import SIZES, DatasetSize, generate_province_stats, write_dataset, write_ttb_csv
+from includes.grape_varieties import GrapeVarietiesModel
+
+BASELINE_DIR = BENCHMARK_DIR / "baselines"
+RESULTS_DIR = BENCHMARK_DIR / "results"
+DEFAULT_THRESHOLD = 0.25
+TTB_ROWS = 100_000  # national TTB permit file, independent of --size
+RENDER_WORKERS = 4
+
+
+def load_stage(filename: str):
+    """Import a numbered pipeline script (e.g. 05_data_final_normalized.py) as a module."""
+    module_name = "stage_" + Path(filename).stem
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    spec = importlib.util.spec_from_file_location(module_name, SRC_DIR / filename)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+@dataclass
+class BenchmarkContext:
+    """Synthetic dataset shared by all benchmarks of a run."""
+    size_name: str
+    size: DatasetSize
+    seed: int
+    data_dir: Path
+    work_dir: Path
+    records: Dict
+
+
+# Registry of benchmark name -> setup function. A setup function receives the
+# context and returns the zero-argument callable that is timed.
+BENCHMARKS: Dict[str, Callable[[BenchmarkContext], Callable[[], object]]] = {}
+
+
+def benchmark(name: str):
+    """Register a benchmark setup function under `name`."""
+    def decorator(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return decorator
+
+
+def _lookup_queries(context: BenchmarkContext, count: int = 2000) -> List[str]:
+    """Canonical names, aliases and misses, in a fixed order."""
+    queries = []
+    for row in context.records["varieties"]:
+        queries.append(row["name"].upper())
+        queries.extend(row["aliases"][:2])
+        queries.append(f"{row['name']} unknown")
+    return (queries * (count // max(1, len(queries)) + 1))[:count]
+
+
+@benchmark("variety_model.load_jsonl")
+def bench_load_jsonl(context: BenchmarkContext):
+    return lambda: GrapeVarietiesModel(context.data_dir, use_snapshot=False)
+
+
+@benchmark("variety_model.load_snapshot")
+def bench_load_snapshot(context: BenchmarkContext):
+    GrapeVarietiesModel(context.data_dir)
+    return lambda: GrapeVarietiesModel(context.data_dir)
+
+
+@benchmark("variety_model.to_jsonl_entry")
+def bench_to_jsonl_entry(context: BenchmarkContext):
+    varieties = GrapeVarietiesModel(context.data_dir).get_all_varieties()
+    return lambda: [variety.to_jsonl_entry() for variety in varieties]
+
+
+@benchmark("variety_model.normalize_variety_name")
+def bench_normalize_variety_name(context: BenchmarkContext):
+    model = GrapeVarietiesModel(context.data_dir)
+    queries = _lookup_queries(context)
+    return lambda: [model.normalize_variety_name(query) for query in queries]
+
+
+@benchmark("variety_model.search_varieties")
+def bench_search_varieties(context: BenchmarkContext):
+    model = GrapeVarietiesModel(context.data_dir)
+    # Misspelled names exercise the fuzzy matcher
+    queries = [row["aliases"][-1][:-1] + "x" for row in context.records["varieties"][:20]]
+    return lambda: [model.search_varieties(query) for query in queries]
+
+
+@benchmark("ttb.is_excluded_business")
+def bench_is_excluded_business(context: BenchmarkContext):
+    from includes.ttb_fetcher import is_excluded_business
+    ttb_file = write_ttb_csv(context.work_dir / "ttb_national.csv", TTB_ROWS, context.seed)
+    with open(ttb_file, 'r', newline='', encoding='latin1') as f:
+        names = [f"{row[1]} {row[2]}".strip() for row in csv.reader(f)]
+    return lambda: [is_excluded_business(name) for name in names]
+
+
+@benchmark("ttb.iter_ttb_producers")
+def bench_iter_ttb_producers(context: BenchmarkContext):
+    from includes.ttb_fetcher import iter_ttb_producers
+    ttb_file = write_ttb_csv(context.work_dir / "ttb_national.csv", TTB_ROWS, context.seed)
+    return lambda: sum(1 for _ in iter_ttb_producers(ttb_file, {}, states=None))
+
+
+@benchmark("tree.generate_tree_data")
+def bench_generate_tree_data(context: BenchmarkContext):
+    tree_module = load_stage("18_generate_tree_data.py")
+    generator = tree_module.TreeDataGenerator(str(context.data_dir))
+    return generator.generate_tree_data
+
+
+@benchmark("final.normalize_producer_wines")
+def bench_normalize_producer_wines(context: BenchmarkContext):
+    final_module = load_stage("05_data_final_normalized.py")
+    model = GrapeVarietiesModel(context.data_dir)
+    mapping = context.records["wine_type_mapping"]
+    producers = context.records["raw_producers"]
+    return lambda: [final_module.normalize_producer_wines(producer, model, mapping) for producer in producers]
+
+
+@benchmark("province_stats.analyze_province_data")
+def bench_analyze_province_data(context: BenchmarkContext):
+    stats_module = load_stage("09_province_stats_generator.py")
+    generator = stats_module.ProvinceStatsGenerator(
+        input_file=context.data_dir / "05_wine_producers_final_normalized.jsonl",
+        data_dir=str(context.data_dir))
+    producers = context.records["normalized_producers"]
+    return lambda: generator.analyze_province_data(producers)
+
+
+def _render_province_pages(context: BenchmarkContext, regions: int, workers: int = 1):
+    from includes.province_pages import province_page_snapshot, render_province_pages
+    province_stats = generate_province_stats(regions, seed=context.seed)
+
+    def run():
+        snapshots = {province: province_page_snapshot(stats) for province, stats in province_stats.items()}
+        return render_province_pages(snapshots, workers)
+    return run
+
+
+@benchmark("province_pages.render_30")
+def bench_render_30_regions(context: BenchmarkContext):
+    return _render_province_pages(context, 30)
+
+
+@benchmark("province_pages.render_300")
+def bench_render_300_regions(context: BenchmarkContext):
+    return _render_province_pages(context, 300)
+
+
+@benchmark("province_pages.render_300_parallel")
+def bench_render_300_regions_parallel(context: BenchmarkContext):
+    return _render_province_pages(context, 300, RENDER_WORKERS)
+
+
+@benchmark("geojson.create_final_geojson")
+def bench_create_final_geojson(context: BenchmarkContext):
+    geojson_module = load_stage("06_output_geojson.py")
+    input_file = context.data_dir / "05_wine_producers_final_normalized.jsonl"
+    output_file = context.work_dir / "wine-producers-final.geojson"
+    return lambda: geojson_module.create_final_geojson(input_file, output_file)
+
+
+def time_benchmark(run: Callable[[], object], repeat: int) -> Dict:
+    """Warm up once, then time `repeat` calls with stdout suppressed."""
+    timings = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        run()
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+    return {
+        "repeat": repeat,
+        "min": round(min(timings), 6),
+        "median": round(statistics.median(timings), 6),
+        "mean": round(statistics.fmean(timings), 6)
+    }
+
+
+def run_benchmarks(size_name: str = "small", seed: int = 0, repeat: int = 5,
+                   only: Optional[List[str]] = None) -> Dict:
+    """Run the selected benchmarks on a fresh synthetic dataset."""
+    size = SIZES[size_name]
+    selected = [name for name in BENCHMARKS if not only or any(name.startswith(prefix) for prefix in only)]
+
+    with tempfile.TemporaryDirectory(prefix="grapegeek-bench-") as temp_dir:
+        data_dir = Path(temp_dir) / "data"
+        work_dir = Path(temp_dir) / "work"
+        work_dir.mkdir(parents=True)
+        records = write_dataset(data_dir, size, seed)
+        context = BenchmarkContext(size_name, size, seed, data_dir, work_dir, records)
+
+        results = {}
+        for name in selected:
+            with contextlib.redirect_stdout(io.StringIO()):
+                run = BENCHMARKS[name](context)
+            results[name] = time_benchmark(run, repeat)
+            print(f"   {name:<45} median {results[name]['median'] * 1000:10.2f} ms")
+
+    return {
+        "size": size_name,
+        "dataset": vars(size),
+        "seed": seed,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()} {platform.processor()}".strip(),
+        "benchmarks": results
+    }
+
+
+def compare_with_baseline(results: Dict, baseline: Dict, threshold: float = DEFAULT_THRESHOLD) -> List[Dict]:
+    """Compare medians with the baseline; returns one row per shared benchmark."""
+    rows = []
+    for name, current in results["benchmarks"].items():
+        previous = baseline.get("benchmarks", {}).get(name)
+        if not previous or not previous.get("median"):
+            continue
+        ratio = current["median"] / previous["median"]
+        rows.append({
+            "name": name,
+            "baseline": previous["median"],
+            "current": current["median"],
+            "ratio": round(ratio, 3),
+            "regression": ratio > 1 + threshold
+        })
+    return rows
+
+
+def main():
+    """Run benchmarks and compare against (or record) the baseline."""
+    parser = argparse.ArgumentParser(description="Benchmark pipeline hot paths on synthetic data")
+    parser.add_argument("--size", choices=sorted(SIZES), default="small", help="Synthetic dataset size")
+    parser.add_argument("--seed", type=int, default=0, help="Dataset seed")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed repetitions per benchmark")
+    parser.add_argument("--only", help="Comma-separated benchmark name prefixes to run")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed slowdown before flagging a regression (0.25 = 25%%)")
+    parser.add_argument("--baseline", type=Path, help="Baseline file (default: benchmarks/baselines/<size>.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--list", action="store_true", help="List benchmarks and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        for name in BENCHMARKS:
+            print(name)
+        return
+
+    only = [prefix.strip() for prefix in args.only.split(',')] if args.only else None
+    size = SIZES[args.size]
+    print(f"⏱️  Running benchmarks on '{args.size}' dataset: {size.producers} producers × "
+          f"{size.wines_per_producer} wines, {size.varieties} varieties × {size.aliases_per_variety} aliases, "
+          f"pedigree depth {size.pedigree_depth}")
+    results = run_benchmarks(args.size, args.seed, args.repeat, only)
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    results_file = RESULTS_DIR / f"{args.size}-latest.json"
+    with open(results_file, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"💾 Results saved to: {results_file}")
+
+    baseline_file = args.baseline or BASELINE_DIR / f"{args.size}.json"
+    if args.save_baseline or not baseline_file.exists():
+        # Baselines are machine-specific and gitignored; the first local run records one
+        baseline_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(baseline_file, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"✅ Baseline saved to: {baseline_file}")
+        return
+
+    with open(baseline_file, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline.get("machine") != results["machine"]:
+        print(f"⚠️  Baseline was recorded on a different machine ({baseline.get('machine')})")
+
+    rows = compare_with_baseline(results, baseline, args.threshold)
+    print(f"\n📊 Comparison with baseline ({baseline.get('created_at')}):")
+    for row in rows:
+        marker = "❌" if row["regression"] else ("🚀" if row["ratio"] < 1 - args.threshold else "✅")
+        print(f"   {marker} {row['name']:<45} {row['baseline'] * 1000:10.2f} → "
+              f"{row['current'] * 1000:10.2f} ms  (×{row['ratio']:.2f})")
+
+    regressions = [row for row in rows if row["regression"]]
+    if regressions:
+        print(f"\n❌ {len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+        sys.exit(1)
+    print(f"\n✅ No regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Stage Cold-Start Timer
+
+Imports each pipeline stage in a fresh interpreter with `-X importtime`
+(module top level only, main() is not run) and reports the wall time plus
+the heaviest top-level imports, so import-time regressions are visible.
+
+USAGE:
+uv run benchmarks/startup_times.py
+uv run benchmarks/startup_times.py --stages 05,09 --top 8 --output benchmarks/results/startup.json
+"""
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+SRC_DIR = Path(__file__).parent.parent / "src"
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+LOADER = (
+    "import importlib.util, sys; sys.path.insert(0, {src!r}); "
+    "spec = importlib.util.spec_from_file_location('stage', {path!r}); "
+    "module = importlib.util.module_from_spec(spec); spec.loader.exec_module(module)"
+)
+
+
+def stage_files(selected: List[str] = None) -> List[Path]:
+    files = sorted(SRC_DIR.glob("[0-9][0-9]*.py"))
+    if selected:
+        files = [f for f in files if any(f.name.startswith(prefix) for prefix in selected)]
+    return files
+
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    """Top-level imports (indent level 1) with cumulative microseconds."""
+    imports = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        if len(indent) <= 1:
+            imports.append({"module": name, "self_us": int(self_us), "cumulative_us": int(cumulative_us)})
+    return imports
+
+
+def measure_stage(path: Path, repeat: int = 3) -> Dict:
+    """Best-of-N wall time for importing a stage, plus its import breakdown."""
+    code = LOADER.format(src=str(SRC_DIR), path=str(path))
+    best = None
+    imports = []
+    error = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                                capture_output=True, text=True, cwd=SRC_DIR.parent)
+        elapsed = time.perf_counter() - start
+        if result.returncode != 0:
+            error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "failed"
+            break
+        if best is None or elapsed < best:
+            best = elapsed
+            imports = parse_importtime(result.stderr)
+    return {
+        "stage": path.name,
+        "wall_seconds": round(best, 4) if best is not None else None,
+        "import_seconds": round(sum(i["cumulative_us"] for i in imports) / 1e6, 4),
+        "heaviest": sorted(imports, key=lambda i: i["cumulative_us"], reverse=True),
+        "error": error
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start import time per pipeline stage")
+    parser.add_argument("--stages", help="Comma-separated stage prefixes (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage (best is kept)")
+    parser.add_argument("--top", type=int, default=5, help="Heaviest imports to show per stage")
+    parser.add_argument("--output", type=Path, help="Write the measurements as JSON")
+    args = parser.parse_args()
+
+    selected = [s.strip() for s in args.stages.split(',')] if args.stages else None
+    reports = []
+    print(f"⏱️  Cold-start import time per stage (best of {args.repeat})")
+    print("=" * 60)
+    for path in stage_files(selected):
+        report = measure_stage(path, args.repeat)
+        reports.append(report)
+        if report["error"]:
+            print(f"❌ {path.name}: {report['error']}")
+            continue
+        print(f"{path.name:<45} {report['wall_seconds'] * 1000:8.0f} ms")
+        for item in report["heaviest"][:args.top]:
+            print(f"   {item['module']:<40} {item['cumulative_us'] / 1000:8.1f} ms")
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        for report in reports:
+            report["heaviest"] = report["heaviest"][:args.top]
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(reports, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
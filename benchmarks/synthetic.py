@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Synthetic Dataset Generators
+
+Deterministic generators for benchmark datasets shaped like the real
+pipeline files: N producers with M wines each, a grape variety mapping
+with K aliases per variety, and a VIVC pedigree DAG of depth D.
+The same seed and size always produce byte-identical files.
+"""
+
+import csv
+import json
+import random
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+
+@dataclass
+class DatasetSize:
+    """Shape of a synthetic dataset."""
+    producers: int
+    wines_per_producer: int
+    varieties: int
+    aliases_per_variety: int
+    pedigree_depth: int
+
+
+SIZES = {
+    "small": DatasetSize(producers=300, wines_per_producer=4, varieties=150,
+                         aliases_per_variety=4, pedigree_depth=4),
+    "medium": DatasetSize(producers=2000, wines_per_producer=6, varieties=600,
+                          aliases_per_variety=6, pedigree_depth=6),
+    "large": DatasetSize(producers=8000, wines_per_producer=8, varieties=1500,
+                         aliases_per_variety=8, pedigree_depth=8),
+}
+
+SYLLABLES = ["mar", "quet", "fron", "te", "nac", "vi", "dal", "se", "val", "blanc",
+             "pi", "not", "char", "don", "lu", "cie", "kuhl", "mann", "le", "on",
+             "mil", "lot", "ca", "ber", "net", "ri", "es", "ling", "cha", "bour"]
+
+PROVINCES = [
+    ("Quebec", "CA", 46.0, -72.5), ("Ontario", "CA", 43.5, -79.5),
+    ("Nova Scotia", "CA", 45.0, -64.0), ("New Brunswick", "CA", 46.0, -66.0),
+    ("Vermont", "US", 44.0, -72.7), ("New York", "US", 42.5, -76.5),
+    ("Michigan", "US", 44.5, -85.5), ("Minnesota", "US", 45.5, -94.0),
+    ("Wisconsin", "US", 44.5, -89.5), ("Iowa", "US", 42.0, -93.5),
+]
+
+WINE_TYPE_ALIASES = {
+    "Red": ["red", "red blend", "semi sweet red"],
+    "White": ["white", "white blend", "White (off-dry)"],
+    "Rosé": ["rosé", "rosé/apéritif", "rose"],
+    "Sparkling": ["sparkling", "mousseux"],
+    "Dessert": ["ice wine", "late harvest", "vin de glace"],
+}
+
+COLORS = ["NOIR", "BLANC", "ROUGE", "GRIS", "ROSE"]
+SPECIES = ["VITIS VINIFERA LINNÉ SUBSP. VINIFERA", "INTERSPECIFIC CROSSING", "VITIS RIPARIA MICHAUX"]
+COUNTRIES = ["FRANCE", "UNITED STATES OF AMERICA", "CANADA", "GERMANY", "ITALY"]
+
+
+def wine_type_mapping() -> Dict[str, Dict]:
+    """Wine type mapping in the shape of data/wine_type_mapping.yaml."""
+    return {name: {"aliases": list(aliases)} for name, aliases in WINE_TYPE_ALIASES.items()}
+
+
+def _variety_names(count: int, rng: random.Random) -> List[str]:
+    names = []
+    seen = set()
+    while len(names) < count:
+        name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+        if name.lower() not in seen:
+            seen.add(name.lower())
+            names.append(name)
+    return names
+
+
+def _alias_variants(name: str, count: int, rng: random.Random) -> List[str]:
+    """Lowercase spellings, noisy suffixes and single-character typos of a name."""
+    base = name.lower()
+    candidates = [base, f"{base} (grape)", f"{base} blend", base.replace("e", "é", 1),
+                  f"cépage {base}", f"{base} noir", f"{base} (estate)"]
+    while len(candidates) < count + 4:
+        i = rng.randrange(1, len(base))
+        candidates.append(base[:i - 1] + base[i] + base[i - 1] + base[i + 1:])
+    aliases = []
+    for alias in candidates:
+        if alias not in aliases:
+            aliases.append(alias)
+        if len(aliases) == count:
+            break
+    return aliases
+
+
+def generate_variety_mapping(size: DatasetSize, seed: int = 0) -> List[Dict]:
+    """Grape variety mapping rows with aliases and a layered pedigree DAG.
+
+    Varieties are split into `pedigree_depth + 1` generations; every variety
+    after the first generation has two VIVC parents drawn from the previous
+    generation, so the longest ancestry chain has exactly `pedigree_depth` edges.
+    A non-grape "Fruit" row is appended like in the real mapping.
+    """
+    rng = random.Random(seed)
+    names = _variety_names(size.varieties, rng)
+    generations = size.pedigree_depth + 1
+    per_generation = max(1, len(names) // generations)
+
+    rows = []
+    previous: List[Tuple[str, str]] = []
+    for index, name in enumerate(names):
+        generation = min(index // per_generation, generations - 1)
+        vivc_number = str(10000 + index)
+        parents = [None, None]
+        if generation > 0 and previous:
+            first, second = rng.sample(previous, 2) if len(previous) > 1 else (previous[0], previous[0])
+            parents = [{"name": first[0].upper(), "vivc_number": first[1]},
+                       {"name": second[0].upper(), "vivc_number": second[1]}]
+        rows.append({
+            "name": name,
+            "aliases": _alias_variants(name, size.aliases_per_variety, rng),
+            "grape": True,
+            "portfolio": {
+                "grape": {"name": name.upper(), "vivc_number": vivc_number},
+                "berry_skin_color": rng.choice(COLORS),
+                "country_of_origin": rng.choice(COUNTRIES),
+                "species": rng.choice(SPECIES),
+                "parent1": parents[0],
+                "parent2": parents[1],
+                "sex_of_flower": "HERMAPHRODITE",
+                "number_of_photos": None,
+                "year_of_crossing": str(rng.randint(1850, 2010)) if generation > 0 else None,
+                "synonyms": []
+            },
+            "vivc_assignment_status": "found",
+        })
+        next_generation = min((index + 1) // per_generation, generations - 1)
+        if next_generation != generation or index == len(names) - 1:
+            previous = [(row["name"], row["portfolio"]["grape"]["vivc_number"])
+                        for row in rows[-per_generation:]]
+
+    rows.append({"name": "Fruit", "aliases": ["apple", "apples", "pear", "haskap"], "grape": False,
+                 "portfolio": None, "vivc_assignment_status": None})
+    return rows
+
+
+def generate_producers(size: DatasetSize, varieties: List[Dict], seed: int = 0) -> Tuple[List[Dict], List[Dict]]:
+    """Producers with wines, as raw (pre-normalization) and normalized records.
+
+    Raw cépages mix canonical names, aliases, unknown names and the odd fruit
+    alias; wine types use the raw aliases of WINE_TYPE_ALIASES. The normalized
+    records carry the canonical names and types, with fruit wines dropped.
+    """
+    rng = random.Random(seed + 1)
+    grape_rows = [row for row in varieties if row["grape"]]
+    # Skewed popularity, like the real data where a few hybrids dominate
+    weights = [1.0 / (rank + 1) for rank in range(len(grape_rows))]
+
+    raw_producers = []
+    normalized_producers = []
+    for index in range(size.producers):
+        province, country, lat, lon = PROVINCES[index % len(PROVINCES)]
+        producer = {
+            "permit_id": f"SYN-{index:06d}",
+            "business_name": f"Vignoble Synthétique {index}",
+            "address": f"{rng.randint(1, 9999)} Chemin des Vignes",
+            "city": f"Ville {index % 97}",
+            "state_province": province,
+            "country": country,
+            "postal_code": f"{rng.randint(10000, 99999)}",
+            "latitude": round(lat + rng.uniform(-1.5, 1.5), 5) if rng.random() > 0.05 else None,
+            "longitude": round(lon + rng.uniform(-2.0, 2.0), 5) if rng.random() > 0.05 else None,
+            "website": f"https://vignoble{index}.example" if rng.random() > 0.3 else None,
+            "social_media": [f"https://facebook.com/vignoble{index}"] if rng.random() > 0.5 else [],
+            "activities": ["Tastings", "Tours"] if rng.random() > 0.6 else [],
+            "wine_label": f"Domaine {index}",
+            "classification": "winemaker",
+            "verified_wine_producer": True,
+        }
+        raw_wines = []
+        normalized_wines = []
+        for wine_index in range(rng.randint(max(1, size.wines_per_producer // 2), size.wines_per_producer)):
+            official_type = rng.choice(list(WINE_TYPE_ALIASES))
+            raw_type = rng.choice(WINE_TYPE_ALIASES[official_type])
+            chosen = rng.choices(grape_rows, weights=weights, k=rng.randint(1, 3))
+            raw_cepages = []
+            canonical = []
+            for row in chosen:
+                roll = rng.random()
+                if roll < 0.4:
+                    raw_cepages.append(row["name"])
+                elif roll < 0.9:
+                    raw_cepages.append(rng.choice(row["aliases"]))
+                else:
+                    raw_cepages.append(f"{row['name']} X{rng.randint(1, 9)}")
+                canonical.append(row["name"])
+            is_fruit = rng.random() < 0.03
+            if is_fruit:
+                raw_cepages.append("apple")
+            wine = {"name": f"Cuvée {wine_index}", "type": raw_type, "cepages": raw_cepages}
+            raw_wines.append(wine)
+            if not is_fruit:
+                normalized_wines.append({"name": wine["name"], "type": official_type, "cepages": canonical})
+
+        raw_producers.append({**producer, "wines": raw_wines})
+        normalized_producers.append({**producer, "wines": normalized_wines})
+    return raw_producers, normalized_producers
+
+
+TTB_STATES = ["CA", "WA", "TX", "OR", "NY", "VA", "MI", "PA", "OH", "NC", "VT", "MN", "WI", "NH", "ME"]
+TTB_NAME_WORDS = ["VALLEY", "RIDGE", "CREEK", "OAK", "STONE", "HILL", "RIVER", "FAMILY", "ESTATE",
+                  "CELLARS", "VINEYARDS", "WINERY", "WINES", "FARM", "ORCHARD", "LAKE", "NORTH", "OLD"]
+TTB_OTHER_WORDS = ["BREWING", "DISTILLING", "SPIRITS", "CIDERY", "MEADERY", "MARKET", "IMPORTS", "WHOLESALE"]
+
+
+def generate_ttb_rows(count: int, seed: int = 0) -> List[List[str]]:
+    """Rows shaped like the national TTB wine permit CSV (all states, header first).
+
+    About one business in eight carries a non-wine word (brewery, distillery,
+    retail) in its owner or operating name, like the real file.
+    """
+    rng = random.Random(seed + 2)
+    rows = [["Permit_Number", "Owner_Name", "Operating_Name", "Street", "City",
+             "Prem_Zip", "Prem_County", "New_Permit_Flag"]]
+    for index in range(count):
+        words = rng.sample(TTB_NAME_WORDS, rng.randint(1, 3))
+        owner = f"{' '.join(words)} {rng.choice(['LLC', 'INC', 'CORP'])}"
+        operating = " ".join(words) if rng.random() < 0.6 else ""
+        if rng.random() < 0.125:
+            operating = f"{' '.join(words)} {rng.choice(TTB_OTHER_WORDS)}"
+        rows.append([
+            f"{rng.choice(TTB_STATES)}-W-{index:05d}",
+            f"{owner} {index}",
+            operating,
+            f"{rng.randint(1, 99999)} {rng.choice(TTB_NAME_WORDS)} RD",
+            f"CITY {index % 500}",
+            f"{rng.randint(10000, 99999)}",
+            f"COUNTY {index % 90}",
+            "0"
+        ])
+    return rows
+
+
+def write_ttb_csv(path: Path, count: int, seed: int = 0) -> Path:
+    """Write a synthetic national TTB CSV with count permits."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', newline='', encoding='latin1') as f:
+        csv.writer(f).writerows(generate_ttb_rows(count, seed))
+    return path
+
+
+REGION_WINE_TYPES = ["Rouge", "Blanc", "Rosé", "Mousseux", "Orange", "Vin de glace", "Fortifié"]
+
+
+def generate_province_stats(regions: int, varieties_per_region: int = 120, seed: int = 0) -> Dict[str, Dict]:
+    """Per-region statistics shaped like ProvinceStatsGenerator.analyze_province_data output.
+
+    Region sizes follow a long tail (a few large regions, many small ones).
+    """
+    rng = random.Random(seed + 3)
+    variety_pool = _variety_names(varieties_per_region * 3, rng) + ["Unknown"]
+    stats = {}
+    for index in range(regions):
+        scale = 1.0 / (1 + index % 30)
+        producer_count = max(1, int(400 * scale))
+        variety_count = max(5, int(varieties_per_region * scale ** 0.5))
+        appearances = Counter({variety: rng.randint(1, 200) for variety in rng.sample(variety_pool, variety_count)})
+        buckets = {"vinifera_varieties": Counter(), "non_vinifera_varieties": Counter(), "unknown_varieties": Counter()}
+        for variety, count in appearances.items():
+            buckets[rng.choice(list(buckets))][variety] = count
+        stats[f"Region {index:03d}"] = {
+            "producer_count": producer_count,
+            "total_wines": sum(appearances.values()),
+            "producers_with_wines": max(1, producer_count // 2),
+            "grape_varieties": Counter(appearances),
+            "wine_types": Counter({wine_type: rng.randint(1, 500) for wine_type in REGION_WINE_TYPES}),
+            "variety_wine_appearances": appearances,
+            "modern_grapes": {},
+            "producers": [],
+            "producer_data": [],
+            **buckets,
+        }
+    return stats
+
+
+def write_jsonl(path: Path, rows: List[Dict]):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        for row in rows:
+            json.dump(row, f, ensure_ascii=False)
+            f.write('\n')
+
+
+def write_dataset(data_dir: Path, size: DatasetSize, seed: int = 0) -> Dict:
+    """Write a synthetic data/ directory and return the in-memory records.
+
+    Files written: grape_variety_mapping.jsonl and
+    05_wine_producers_final_normalized.jsonl (the layout the stages expect).
+    """
+    data_dir = Path(data_dir)
+    varieties = generate_variety_mapping(size, seed)
+    raw_producers, normalized_producers = generate_producers(size, varieties, seed)
+    write_jsonl(data_dir / "grape_variety_mapping.jsonl", varieties)
+    write_jsonl(data_dir / "05_wine_producers_final_normalized.jsonl", normalized_producers)
+    return {
+        "varieties": varieties,
+        "raw_producers": raw_producers,
+        "normalized_producers": normalized_producers,
+        "wine_type_mapping": wine_type_mapping(),
+    }
@@ -4,6 +4,27 @@
  * Version: 2025-12-20-v3 (enhanced with normalization)
  */
 
+const ASSET_MANIFEST_URL = '/assets/data/asset-manifest.json';
+
+/**
+ * Hashed, minified URL of a generated data file from the asset manifest
+ * (src/19_precompress_assets.py), or the plain file when it is not published.
+ */
+async function resolveAssetUrl(fallbackUrl) {
+    const name = fallbackUrl.split('/').pop();
+    try {
+        const response = await fetch(ASSET_MANIFEST_URL, { cache: 'no-cache' });
+        if (response.ok) {
+            const manifest = await response.json();
+            const entry = manifest.assets && manifest.assets[name];
+            if (entry && entry.url) return entry.url;
+        }
+    } catch (error) {
+        console.warn('Asset manifest not available, using', fallbackUrl);
+    }
+    return fallbackUrl;
+}
+
 class WineMap {
     constructor(mapId, dataUrl) {
         this.mapId = mapId;
@@ -66,8 +87,9 @@ class WineMap {
     
     async loadData() {
         try {
-            console.log('Loading wine producer data from:', this.dataUrl);
-            const response = await fetch(this.dataUrl);
+            const dataUrl = await resolveAssetUrl(this.dataUrl);
+            console.log('Loading wine producer data from:', dataUrl);
+            const response = await fetch(dataUrl);
             console.log('Fetch response status:', response.status);
             console.log('Fetch response ok:', response.ok);
             
@@ -2,6 +2,7 @@ import { useState, useEffect, useRef } from 'react'
 import { MapContainer, TileLayer, Marker, Popup, useMap } from 'react-leaflet'
 import L from 'leaflet'
 import 'leaflet/dist/leaflet.css'
+import { selectProducers } from '../hooks/useMapData'
 
 // Custom marker icons
 const createCustomIcon = (color) => {
@@ -68,8 +69,8 @@ const FullScreenMap = ({ initialVariety = null, onClose }) => {
         setFilterOptions(data.full_map.filter_options)
         
         // Apply initial filters if variety is specified
-        if (initialVariety && data.varieties[initialVariety]) {
-          setFilteredProducers(data.varieties[initialVariety].producers)
+        if (initialVariety && data.indexes.variety[initialVariety]) {
+          setFilteredProducers(selectProducers(data, data.full_map.producers, { grape_variety: initialVariety }))
         } else {
           setFilteredProducers(data.full_map.producers)
         }
@@ -91,37 +92,7 @@ const FullScreenMap = ({ initialVariety = null, onClose }) => {
   const applyFilters = () => {
     if (!allProducers.length) return
 
-    let filtered = [...allProducers]
-
-    // Grape variety filter
-    if (filters.grape_variety) {
-      filtered = filtered.filter(producer => 
-        producer.grape_varieties.includes(filters.grape_variety)
-      )
-    }
-
-    // Wine type filter
-    if (filters.wine_type) {
-      filtered = filtered.filter(producer => 
-        producer.wine_types.includes(filters.wine_type)
-      )
-    }
-
-    // State/province filter
-    if (filters.state) {
-      filtered = filtered.filter(producer => 
-        producer.state_province === filters.state
-      )
-    }
-
-    // Open for visits filter
-    if (filters.open_for_visits) {
-      if (filters.open_for_visits === 'yes') {
-        filtered = filtered.filter(producer => producer.open_for_visits)
-      } else if (filters.open_for_visits === 'no') {
-        filtered = filtered.filter(producer => !producer.open_for_visits)
-      }
-    }
+    const filtered = selectProducers(mapData, allProducers, filters)
 
     setFilteredProducers(filtered)
   }
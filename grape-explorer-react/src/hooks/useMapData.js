@@ -14,6 +14,38 @@ const createCustomIcon = (color) => {
 export const greenIcon = createCustomIcon('#2E7D32')
 export const yellowIcon = createCustomIcon('#FFC107')
 
+// Resolve filters through the inverted indexes in map-data.json.
+// Index entries are producer ids (positions in full_map.producers), so the
+// cost is proportional to the number of matches, not the number of producers.
+export const selectProducers = (mapData, allProducers, filters) => {
+  const indexes = mapData?.indexes
+  if (!indexes) return allProducers
+
+  let ids = null
+  const narrow = (matches = []) => {
+    if (ids === null) {
+      ids = matches
+    } else {
+      const allowed = new Set(matches)
+      ids = ids.filter(id => allowed.has(id))
+    }
+  }
+
+  if (filters.grape_variety) narrow(indexes.variety[filters.grape_variety])
+  if (filters.wine_type) narrow(indexes.wine_type[filters.wine_type])
+  if (filters.state) narrow(indexes.state_province[filters.state])
+
+  let selected = ids === null ? allProducers : ids.map(id => allProducers[id])
+
+  if (filters.open_for_visits === 'yes') {
+    selected = selected.filter(producer => producer.open_for_visits)
+  } else if (filters.open_for_visits === 'no') {
+    selected = selected.filter(producer => !producer.open_for_visits)
+  }
+
+  return selected
+}
+
 export const useMapData = (initialVariety = '') => {
   const [mapData, setMapData] = useState(null)
   const [allProducers, setAllProducers] = useState([])
@@ -41,36 +73,10 @@ export const useMapData = (initialVariety = '') => {
   const applyFilters = useCallback(() => {
     if (!allProducers.length) return
 
-    let filtered = [...allProducers]
-
-    if (filters.grape_variety) {
-      filtered = filtered.filter(producer => 
-        producer.grape_varieties.includes(filters.grape_variety)
-      )
-    }
-
-    if (filters.wine_type) {
-      filtered = filtered.filter(producer => 
-        producer.wine_types.includes(filters.wine_type)
-      )
-    }
-
-    if (filters.state) {
-      filtered = filtered.filter(producer => 
-        producer.state_province === filters.state
-      )
-    }
-
-    if (filters.open_for_visits) {
-      if (filters.open_for_visits === 'yes') {
-        filtered = filtered.filter(producer => producer.open_for_visits)
-      } else if (filters.open_for_visits === 'no') {
-        filtered = filtered.filter(producer => !producer.open_for_visits)
-      }
-    }
+    const filtered = selectProducers(mapData, allProducers, filters)
 
     setFilteredProducers(filtered)
-  }, [allProducers, filters])
+  }, [mapData, allProducers, filters])
 
   // Update filters
   const updateFilter = useCallback((filterType, value) => {
@@ -94,10 +100,8 @@ export const useMapData = (initialVariety = '') => {
   const getVarietyProducers = useCallback((varietyName) => {
     if (!varietyName || !allProducers.length) return []
     
-    return allProducers.filter(producer => 
-      producer.grape_varieties.includes(varietyName)
-    )
-  }, [allProducers])
+    return selectProducers(mapData, allProducers, { grape_variety: varietyName })
+  }, [mapData, allProducers])
 
   // Load map data
   useEffect(() => {
@@ -114,8 +118,8 @@ export const useMapData = (initialVariety = '') => {
         setFilterOptions(data.full_map.filter_options)
         
         // Apply initial variety filter if provided
-        if (initialVariety && data.varieties[initialVariety]) {
-          setFilteredProducers(data.varieties[initialVariety].producers)
+        if (initialVariety && data.indexes.variety[initialVariety]) {
+          setFilteredProducers(selectProducers(data, data.full_map.producers, { grape_variety: initialVariety }))
         } else {
           setFilteredProducers(data.full_map.producers)
         }
@@ -6,6 +6,7 @@ import L from 'leaflet'
 import Header from '../components/Header'
 import WinegrowerCard from '../components/WinegrowerCard'
 import 'leaflet/dist/leaflet.css'
+import { selectProducers } from '../hooks/useMapData'
 
 // Custom marker icons
 const createCustomIcon = (color) => {
@@ -78,8 +79,8 @@ const MapPage = () => {
         setFilterOptions(data.full_map.filter_options)
         
         // Apply initial filters
-        if (currentVariety && data.varieties[currentVariety]) {
-          setFilteredProducers(data.varieties[currentVariety].producers)
+        if (currentVariety && data.indexes.variety[currentVariety]) {
+          setFilteredProducers(selectProducers(data, data.full_map.producers, { grape_variety: currentVariety }))
         } else {
           setFilteredProducers(data.full_map.producers)
         }
@@ -102,33 +103,7 @@ const MapPage = () => {
   const applyFilters = () => {
     if (!allProducers.length) return
 
-    let filtered = [...allProducers]
-
-    if (filters.grape_variety) {
-      filtered = filtered.filter(producer => 
-        producer.grape_varieties.includes(filters.grape_variety)
-      )
-    }
-
-    if (filters.wine_type) {
-      filtered = filtered.filter(producer => 
-        producer.wine_types.includes(filters.wine_type)
-      )
-    }
-
-    if (filters.state) {
-      filtered = filtered.filter(producer => 
-        producer.state_province === filters.state
-      )
-    }
-
-    if (filters.open_for_visits) {
-      if (filters.open_for_visits === 'yes') {
-        filtered = filtered.filter(producer => producer.open_for_visits)
-      } else if (filters.open_for_visits === 'no') {
-        filtered = filtered.filter(producer => !producer.open_for_visits)
-      }
-    }
+    const filtered = selectProducers(mapData, allProducers, filters)
 
     setFilteredProducers(filtered)
   }
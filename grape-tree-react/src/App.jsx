@@ -65,7 +65,18 @@ const App = () => {
     const loadTreeData = async () => {
       try {
         setIsLoading(true);
-        const response = await fetch('./tree-data.json');
+        // Minified, hashed copy from the asset manifest (src/19_precompress_assets.py) when published
+        let dataUrl = './tree-data.json';
+        try {
+          const manifestResponse = await fetch('/assets/data/asset-manifest.json', { cache: 'no-cache' });
+          if (manifestResponse.ok) {
+            const manifest = await manifestResponse.json();
+            dataUrl = manifest.assets?.['tree-data.json']?.url ?? dataUrl;
+          }
+        } catch (manifestError) {
+          console.warn('Asset manifest not available, loading', dataUrl);
+        }
+        const response = await fetch(dataUrl);
         if (!response.ok) {
           throw new Error(`Failed to load tree data: ${response.status} ${response.statusText}`);
         }
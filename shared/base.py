@@ -1,10 +1,13 @@
 import os
+import sys
 import yaml
 from pathlib import Path
 from typing import Dict, Any, Optional
-from openai import OpenAI
 from dotenv import load_dotenv
 
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+from includes.llm_gateway import get_gateway
+
 load_dotenv()
 
 
@@ -14,7 +17,7 @@ class BaseGenerator:
     def __init__(self, base_path: str = None, dry_run: bool = False):
         self.dry_run = dry_run
         if not dry_run:
-            self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+            self.client = get_gateway(os.getenv("OPENAI_API_KEY"))
         else:
             self.client = None
             
@@ -107,7 +110,8 @@ class BaseGenerator:
             return '\n'.join(debug_info)
         
         try:
-            response = self.client.responses.create(
+            response = self.client.create(
+                "generator",
                 model="gpt-5",
                 tools=[{"type": "web_search"}],
                 input=full_prompt
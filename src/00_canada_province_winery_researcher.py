@@ -43,13 +43,18 @@ FUNCTIONALITY:
 
 import json
 import os
+import sys
 import threading
 import time
+from pathlib import Path
 from typing import Dict, List
 from concurrent.futures import ThreadPoolExecutor, as_completed
-import openai
 from dotenv import load_dotenv
 
+sys.path.insert(0, str(Path(__file__).parent))
+from includes.llm_gateway import get_gateway
+from includes.producer_dedup import name_key
+
 load_dotenv()
 
 CANADIAN_PROVINCES = {
@@ -135,7 +140,7 @@ Be thorough and find as many {"additional" if existing_wineries else ""} legitim
     return prompt
 
 
-def research_province_wineries(province_name: str, api_key: str, request_delay: float = 2.0, existing_wineries: List[Dict] = None) -> Dict:
+def research_province_wineries(province_name: str, api_key: str, request_delay: float = 0.0, existing_wineries: List[Dict] = None) -> Dict:
     """Research wineries in a specific Canadian province."""
     
     print(f"🔍 {'Supplemental' if existing_wineries else 'Initial'} research for wineries in {province_name}...")
@@ -145,25 +150,24 @@ def research_province_wineries(province_name: str, api_key: str, request_delay:
     try:
         prompt = create_province_winery_research_prompt(province_name, existing_wineries)
         
-        # Rate limiting
+        # Optional extra delay; the shared LLM gateway already paces requests
         if request_delay > 0:
             time.sleep(request_delay)
         
-        # Create OpenAI client
-        client = openai.OpenAI(api_key=api_key, timeout=60*60)
-        
-        response = client.responses.create(
-            model="gpt-5.2",
-            tools=[{"type": "web_search"}],
-            input=prompt,
-            reasoning={
-                "effort": "medium"  # Use high effort for comprehensive research
-            }
-        )
-        
-        # Parse JSON response
+        # Parse JSON response; the gateway only caches answers that parse
         try:
-            research_data = json.loads(response.output_text)
+            response = get_gateway(api_key).create(
+                "province_research",
+                model="gpt-5.2",
+                tools=[{"type": "web_search"}],
+                input=prompt,
+                reasoning={
+                    "effort": "medium"  # Use high effort for comprehensive research
+                },
+                timeout=60*60,
+                validate=json.loads
+            )
+            research_data = response.output_parsed
             
             # Add metadata
             research_data.update({
@@ -321,7 +325,7 @@ def save_wineries_to_file(research_entry: Dict, output_file: str, file_lock: thr
 
 
 def process_province_research(province_requests: List[Dict], api_key: str, output_file: str,
-                            request_delay: float = 3.0, max_threads: int = 3, 
+                            request_delay: float = 0.0, max_threads: int = 3, 
                             previous_wineries: Dict[str, List[Dict]] = None) -> Dict:
     """Process multiple province research requests with threading."""
     
@@ -358,7 +362,6 @@ def process_province_research(province_requests: List[Dict], api_key: str, outpu
     
     print(f"\n🔍 Starting Canadian winery research with {max_threads} threads...")
     print(f"📊 Estimated cost: ${len(requests_to_process) * 0.15:.2f} (${0.15:.2f} per province)")
-    print(f"⏱️  Estimated time: {len(requests_to_process) * request_delay / max_threads / 60:.1f} minutes")
     
     start_time = time.time()
     research_results = []
@@ -380,13 +383,15 @@ def process_province_research(province_requests: List[Dict], api_key: str, outpu
                 # For supplemental research, filter out duplicates but just save new ones
                 if existing_wineries:
                     new_wineries = result.get('wineries', [])
-                    existing_names = {w.get('business_name', '').lower() for w in existing_wineries}
+                    # Compare distinctive names so "X Winery" and "X Vineyards Inc." count as the same
+                    existing_names = {name_key(w.get('business_name')) for w in existing_wineries}
                     
                     # Filter to only truly new wineries
                     unique_new_wineries = []
                     for new_winery in new_wineries:
-                        new_name = new_winery.get('business_name', '').lower()
+                        new_name = name_key(new_winery.get('business_name'))
                         if new_name and new_name not in existing_names:
+                            existing_names.add(new_name)
                             unique_new_wineries.append(new_winery)
                     
                     # Update result to only contain new wineries
@@ -495,8 +500,8 @@ def main():
                        help='Research all Canadian provinces')
     parser.add_argument('--output', default='data/can/canada_province_wineries.jsonl',
                        help='Output file for research results')
-    parser.add_argument('--delay', type=float, default=3.0,
-                       help='Delay between API requests (seconds)')
+    parser.add_argument('--delay', type=float, default=0.0,
+                       help='Extra delay before each API request in seconds (default 0: the shared rate limiter paces requests)')
     parser.add_argument('--threads', type=int, default=3,
                        help='Number of concurrent threads (default: 3)')
     parser.add_argument('--previous-list', help='Previous winery list file to build upon (supplemental research)')
@@ -563,7 +568,6 @@ def main():
             requests_to_process.append(req)
     
     estimated_cost = len(requests_to_process) * 0.15
-    estimated_time = len(requests_to_process) * args.delay / args.threads / 60
     
     print(f"\n🍷 Canadian Province Winery Research Plan:")
     print(f"🎯 Total requests: {len(province_requests)}")
@@ -574,7 +578,6 @@ def main():
         print(f"📚 Previous wineries loaded: {total_previous} (supplemental research mode)")
     print(f"🧵 Threads: {args.threads}")
     print(f"💰 Estimated cost: ${estimated_cost:.2f}")
-    print(f"⏱️  Estimated time: {estimated_time:.1f} minutes")
     print(f"📁 Output file: {args.output}")
     
     if len(requests_to_process) == 0:
@@ -593,6 +596,7 @@ def main():
     )
     
     print(f"\n🎉 Research completed! Results: {results}")
+    get_gateway().print_summary()
 
 
 if __name__ == "__main__":
@@ -25,161 +25,233 @@ DEPENDENCIES:
 
 USAGE:
 uv run src/01_producer_fetch.py
+uv run src/01_producer_fetch.py --force   # rebuild even if no source file changed
 
 FUNCTIONALITY:
-- Downloads Quebec and US data live during execution
+- Downloads Quebec and US data live during execution, with conditional
+  (ETag/Last-Modified) and resumable requests via includes.download_manager
+- Skips rebuilding when every source file, the fetch code and the state filter
+  hash the same as last run
 - Fetches existing Canadian province research data
 - Normalizes all sources to common schema
+- Streams rows from each fetcher through an external sort into the JSONL writer,
+  so memory stays flat regardless of source file size
 - Provides detailed statistics on data quality and coverage
 """
 
+import argparse
 import json
 import sys
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Iterable, Iterator, Dict, Any
 from datetime import datetime
 
 # Add src directory to path for imports
 sys.path.append(str(Path(__file__).parent))
-from includes.racj_fetcher import fetch_quebec_producers
-from includes.ttb_fetcher import fetch_us_producers
-from includes.canada_province_fetcher import fetch_canada_province_producers
+from includes import (canada_province_fetcher, external_sort as external_sort_module, instrumentation, json_stream,
+                      name_filters, racj_fetcher, ttb_fetcher)
+from includes.content_hash import file_sha256, text_sha256
+from includes.external_sort import external_sort
+from includes.racj_fetcher import QuebecWineProducersFetcher, stream_quebec_producers
+from includes.ttb_fetcher import NORTHEASTERN_STATES, download_ttb_file, stream_us_producers, ttb_file_path
+from includes.canada_province_fetcher import CANADA_PROVINCE_FILE, stream_canada_province_producers
 
+OUTPUT_FILE = Path("data/01_unified_producers.jsonl")
+METADATA_FILE = Path("data/01_unified_producers_metadata.json")
 
-def save_unified_data(unified_data: List[Dict], metadata: Dict[str, Any]) -> Path:
-    """Save unified data to JSONL file."""
-    output_file = Path("data/01_unified_producers.jsonl")
+
+def unified_sort_key(producer: Dict) -> tuple:
+    """Sort by source then by business name for consistent ordering."""
+    return (
+        producer.get('source', ''),
+        producer.get('business_name', '').lower()
+    )
+
+
+def stream_source(name: str, label: str, producers: Iterable[Dict], source_entry: Dict,
+                  summary: Dict) -> Iterator[Dict]:
+    """Pass one source's producers through, counting them into its metadata entry."""
+    print(f"📥 Fetching {label} wine producer data...")
+    count = 0
+    with instrumentation.timer(f"fetch.{name}"):
+        for producer in producers:
+            count += 1
+            yield producer
+    source_entry['count'] = count
+    summary['sources'][name] = count
+    
+    if source_entry['metadata'].get('error'):
+        print(f"   ❌ {label} fetch failed: {source_entry['metadata']['error']}")
+    else:
+        print(f"   Loaded {count} {label} producers")
+
+
+def tally_producers(producers: Iterable[Dict], summary: Dict) -> Iterator[Dict]:
+    """Pass producers through, counting locations and data quality for the summary."""
+    locations = summary['locations']
+    for producer in producers:
+        summary['total'] += 1
+        location = producer.get('state_province', 'Unknown')
+        locations[location] = locations.get(location, 0) + 1
+        if producer.get('address'):
+            summary['with_address'] += 1
+        if producer.get('city'):
+            summary['with_city'] += 1
+        yield producer
+
+
+@instrumentation.timed("write.unified_producers")
+def save_unified_data(producers: Iterable[Dict], metadata: Dict[str, Any]) -> Path:
+    """Stream producers to the unified JSONL file, then save the metadata."""
+    output_file = OUTPUT_FILE
     
     # Ensure directory exists
     output_file.parent.mkdir(parents=True, exist_ok=True)
     
     # Save producers as JSONL (one JSON object per line)
+    count = 0
     with open(output_file, 'w', encoding='utf-8') as f:
-        for producer in unified_data:
+        for producer in producers:
             json.dump(producer, f, ensure_ascii=False)
             f.write('\n')
+            count += 1
+    metadata['total_producers'] = count
     
     # Save metadata separately for reference
-    metadata_file = output_file.parent / "01_unified_producers_metadata.json"
+    metadata_file = METADATA_FILE
     with open(metadata_file, 'w', encoding='utf-8') as f:
         json.dump(metadata, f, ensure_ascii=False, indent=2)
     
-    print(f"💾 Saved {len(unified_data)} unified producer records")
+    print(f"💾 Saved {count} unified producer records")
     print(f"📊 Metadata saved to {metadata_file}")
     
     return output_file
 
 
-def analyze_unified_dataset(quebec_data: Dict, us_data: Dict, canada_data: Dict, unified_producers: List[Dict]):
-    """Print analysis of the unified dataset."""
+def analyze_unified_dataset(summary: Dict):
+    """Print analysis of the unified dataset from the counters collected while streaming."""
     print(f"\n📊 Unified Dataset Summary")
     print("=" * 50)
     
     # By source
-    quebec_count = len(quebec_data['producers'])
-    us_count = len(us_data['producers'])
-    canada_count = len(canada_data['producers'])
-    
+    total = summary['total']
     print(f"By Source:")
-    print(f"   Quebec (RACJ): {quebec_count:,}")
-    print(f"   US (TTB): {us_count:,}")
-    print(f"   Canada Provinces: {canada_count:,}")
-    print(f"   Total: {len(unified_producers):,}")
+    print(f"   Quebec (RACJ): {summary['sources'].get('quebec', 0):,}")
+    print(f"   US (TTB): {summary['sources'].get('us', 0):,}")
+    print(f"   Canada Provinces: {summary['sources'].get('canada_provinces', 0):,}")
+    print(f"   Total: {total:,}")
     
     # By state/province
-    location_counts = {}
-    for producer in unified_producers:
-        location = producer.get('state_province', 'Unknown')
-        location_counts[location] = location_counts.get(location, 0) + 1
-    
     print(f"\nBy State/Province:")
-    for location, count in sorted(location_counts.items(), key=lambda x: x[1], reverse=True):
+    for location, count in sorted(summary['locations'].items(), key=lambda x: x[1], reverse=True):
         print(f"   {location}: {count:,}")
     
     # Data quality
-    with_address = sum(1 for p in unified_producers if p.get('address'))
-    with_city = sum(1 for p in unified_producers if p.get('city'))
-    
-    print(f"\nData Quality:")
-    print(f"   With address: {with_address:,} ({with_address/len(unified_producers)*100:.1f}%)")
-    print(f"   With city: {with_city:,} ({with_city/len(unified_producers)*100:.1f}%)")
+    if total:
+        print(f"\nData Quality:")
+        print(f"   With address: {summary['with_address']:,} ({summary['with_address']/total*100:.1f}%)")
+        print(f"   With city: {summary['with_city']:,} ({summary['with_city']/total*100:.1f}%)")
+
+
+def build_config_hashes() -> Dict[str, str]:
+    """Hash the code and filters that shape the unified file.
+
+    A changed fetcher or state list changes the output even when the source
+    files do not, so these hashes are recorded next to the source hashes.
+    """
+    code_files = [Path(__file__), Path(racj_fetcher.__file__), Path(ttb_fetcher.__file__),
+                  Path(canada_province_fetcher.__file__), Path(name_filters.__file__), Path(json_stream.__file__),
+                  Path(external_sort_module.__file__)]
+    return {
+        'code': text_sha256("".join(f"{path.name}:{file_sha256(path)}\n" for path in code_files)),
+        'filters': text_sha256(json.dumps({'us_states': NORTHEASTERN_STATES}, sort_keys=True))
+    }
 
 
+def refresh_sources() -> Dict[str, Any]:
+    """Conditionally download the RACJ and TTB files; returns the content hash of every
+    source file, plus the fetch code and filter hashes from build_config_hashes()."""
+    print("📥 Checking Quebec (RACJ) source file...")
+    racj = QuebecWineProducersFetcher().download_raw_data()
+    print("📥 Checking US (TTB) source file...")
+    ttb = download_ttb_file(ttb_file_path())
+    return {
+        'quebec': racj.sha256,
+        'us': ttb.sha256,
+        'canada_provinces': file_sha256(CANADA_PROVINCE_FILE) if CANADA_PROVINCE_FILE.exists() else None,
+        **build_config_hashes()
+    }
+
+
+def sources_unchanged(source_hashes: Dict[str, Any]) -> bool:
+    """True if the unified output was built from exactly these source files, code and filters."""
+    if not OUTPUT_FILE.exists() or not METADATA_FILE.exists() or None in source_hashes.values():
+        return False
+    try:
+        with open(METADATA_FILE, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return False
+    return previous.get('source_hashes') == source_hashes
+
+
+@instrumentation.profiled_stage("01_producer_fetch")
 def main():
     """Main function to fetch and unify producer data."""
+    parser = argparse.ArgumentParser(description="Fetch and unify RACJ, TTB and Canada province producer data")
+    parser.add_argument("--force", action="store_true",
+                        help="Rebuild the unified file even if no source file changed")
+    args = parser.parse_args()
+    
     print("🍷 Unified Producer Data Fetch")
     print("=" * 50)
     
-    # Fetch Quebec data
-    print("📥 Fetching Quebec (RACJ) wine producer data...")
-    quebec_data = fetch_quebec_producers()
-    quebec_producers = quebec_data['producers']
-    print(f"   Loaded {len(quebec_producers)} Quebec wine producers")
-    
-    if quebec_data.get('metadata', {}).get('error'):
-        print(f"   ⚠️  Quebec fetch issue: {quebec_data['metadata']['error']}")
-    else:
-        print(f"   Normalized {len(quebec_producers)} Quebec producers")
-    
-    # Fetch US data  
-    print("📥 Fetching US (TTB) wine producer data...")
-    us_data = fetch_us_producers()
-    us_producers = us_data['producers']
+    source_hashes = refresh_sources()
+    if not args.force and sources_unchanged(source_hashes):
+        instrumentation.count("fetch.sources_unchanged")
+        print(f"\n✅ Sources, fetch code and filters unchanged since the last fetch; keeping {OUTPUT_FILE} "
+              f"(use --force to rebuild)")
+        return
     
-    if us_data.get('metadata', {}).get('error'):
-        print(f"   ❌ US fetch failed: {us_data['metadata']['error']}")
-        us_producers = []
-    else:
-        print(f"   Loaded {len(us_producers)} US producers")
-    
-    # Fetch Canada province data
-    print("📥 Fetching Canada Province winery data...")
-    canada_data = fetch_canada_province_producers()
-    canada_producers = canada_data['producers']
-    
-    if canada_data.get('metadata', {}).get('error'):
-        print(f"   ❌ Canada fetch failed: {canada_data['metadata']['error']}")
-        canada_producers = []
-    else:
-        print(f"   Loaded {len(canada_producers)} Canada producers")
-    
-    # Combine datasets
-    print("🔄 Combining and sorting datasets...")
-    unified_producers = quebec_producers + us_producers + canada_producers
+    summary = {'sources': {}, 'locations': {}, 'total': 0, 'with_address': 0, 'with_city': 0}
     
-    # Sort by source then by business name for consistent ordering
-    unified_producers.sort(key=lambda x: (
-        x.get('source', ''),
-        x.get('business_name', '').lower()
-    ))
-    
-    print(f"   Combined {len(quebec_producers)} Quebec + {len(us_producers)} US + {len(canada_producers)} Canada = {len(unified_producers)} total producers")
-    
-    # Create combined metadata
+    # Create combined metadata; counts and source metadata are filled in while streaming
     combined_metadata = {
         'fetch_date': datetime.now().isoformat(),
-        'total_producers': len(unified_producers),
+        'total_producers': 0,
         'sources': {
-            'quebec': {
-                'count': len(quebec_producers),
-                'metadata': quebec_data.get('metadata', {})
-            },
-            'us': {
-                'count': len(us_producers), 
-                'metadata': us_data.get('metadata', {})
-            },
-            'canada_provinces': {
-                'count': len(canada_producers),
-                'metadata': canada_data.get('metadata', {})
-            }
-        }
+            'quebec': {'count': 0, 'metadata': {}},
+            'us': {'count': 0, 'metadata': {}},
+            'canada_provinces': {'count': 0, 'metadata': {}}
+        },
+        'source_hashes': source_hashes
     }
+    sources = combined_metadata['sources']
+    
+    # Each fetcher is a generator: rows flow through the sort straight into the writer
+    def all_producers() -> Iterator[Dict]:
+        yield from stream_source('quebec', 'Quebec (RACJ)',
+                                 stream_quebec_producers(sources['quebec']['metadata'], download=False),
+                                 sources['quebec'], summary)
+        yield from stream_source('us', 'US (TTB)',
+                                 stream_us_producers(sources['us']['metadata'], download=False),
+                                 sources['us'], summary)
+        yield from stream_source('canada_provinces', 'Canada Province',
+                                 stream_canada_province_producers(sources['canada_provinces']['metadata']),
+                                 sources['canada_provinces'], summary)
+        print("🔄 Combining and sorting datasets...")
     
     # Save unified dataset
-    output_file = save_unified_data(unified_producers, combined_metadata)
+    output_file = save_unified_data(
+        tally_producers(external_sort(all_producers(), key=unified_sort_key), summary),
+        combined_metadata
+    )
+    
+    print(f"   Combined {summary['sources'].get('quebec', 0)} Quebec + {summary['sources'].get('us', 0)} US + "
+          f"{summary['sources'].get('canada_provinces', 0)} Canada = {summary['total']} total producers")
     
     # Print analysis
-    analyze_unified_dataset(quebec_data, us_data, canada_data, unified_producers)
+    analyze_unified_dataset(summary)
     
     print(f"\n✅ Unified producer data saved to: {output_file}")
     print(f"📄 Ready for pipeline processing with scripts 02-12")
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Producer Deduplication (Entity Resolution)
+
+Merges producers that appear more than once in the unified list - several
+TTB permits of the same winery, RACJ artisanal + industrial permits, or a
+province research entry duplicating an official one - before any paid
+classification or enrichment call is made in stage 02.
+
+PURPOSE: Entity Resolution - Merge duplicate producers across and within sources
+
+INPUTS:
+- data/01_unified_producers.jsonl (unified producer records)
+
+OUTPUTS:
+- data/01b_deduplicated_producers.jsonl (one record per producer, read by 02 and 05)
+- data/01b_deduplicated_producers_metadata.json (SHA-256 of the unified file it was built from)
+- data/01b_merge_report.jsonl (one line per scored candidate pair: merged or separate, with scores)
+
+DEPENDENCIES:
+- includes.producer_dedup (blocking, trigram/geo similarity, union-find)
+- numpy, scipy
+
+USAGE:
+# Deduplicate the unified producers
+uv run src/01b_producer_dedup.py
+
+# Preview merges without writing the deduplicated file
+uv run src/01b_producer_dedup.py --dry-run
+
+FUNCTIONALITY:
+- Blocks producers by postal prefix, city and name trigrams within each state/province
+- Scores candidate pairs with TF-IDF trigram cosine (names, addresses), postal/city equality and distance
+- Merges pairs with a near-identical name in the same area, or a similar name at the same address
+- Keeps the record of the most authoritative source (RACJ, TTB, research) and fills gaps from the others
+- Lists absorbed ids in merged_permit_ids so existing caches keyed by them are reused
+- Records the source hash so 02 and 05 fall back to the unified file when it is newer
+"""
+
+import argparse
+import json
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent))
+from includes import instrumentation
+from includes.content_hash import file_sha256
+from includes.producer_dedup import MAX_BLOCK_SIZE, deduplicate_producers
+from includes.producer_sources import dedup_metadata_file
+
+INPUT_FILE = Path("data/01_unified_producers.jsonl")
+OUTPUT_FILE = Path("data/01b_deduplicated_producers.jsonl")
+REPORT_FILE = Path("data/01b_merge_report.jsonl")
+
+
+@instrumentation.timed("load.unified_producers")
+def load_producers(input_file: Path) -> List[Dict]:
+    """Load the unified producer records."""
+    with open(input_file, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def write_jsonl(path: Path, rows: List[Dict]):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        for row in rows:
+            json.dump(row, f, ensure_ascii=False)
+            f.write('\n')
+
+
+@instrumentation.profiled_stage("01b_producer_dedup")
+def main():
+    """Main function to deduplicate unified producers."""
+    parser = argparse.ArgumentParser(description="Merge duplicate producers before research and enrichment")
+    parser.add_argument("--input", type=Path, default=INPUT_FILE, help="Unified producers JSONL")
+    parser.add_argument("--output", type=Path, default=OUTPUT_FILE, help="Deduplicated producers JSONL")
+    parser.add_argument("--report", type=Path, default=REPORT_FILE, help="Merge decision report JSONL")
+    parser.add_argument("--max-block-size", type=int, default=MAX_BLOCK_SIZE,
+                        help="Skip blocking keys shared by more producers than this")
+    parser.add_argument("--dry-run", action="store_true", help="Print merges without writing the output")
+    args = parser.parse_args()
+
+    if not args.input.exists():
+        print(f"❌ Input file not found: {args.input}")
+        return
+
+    print("🔗 Deduplicating producers")
+    print("=" * 60)
+    producers = load_producers(args.input)
+    print(f"📥 Loaded {len(producers)} unified producers")
+
+    with instrumentation.timer("dedup.resolve"):
+        merged, decisions, stats = deduplicate_producers(producers, args.max_block_size)
+    instrumentation.observe("dedup.candidate_pairs", stats['candidate_pairs'])
+
+    print(f"🧱 {stats['blocks']} blocks ({stats['skipped_blocks']} oversized skipped), "
+          f"{stats['candidate_pairs']} candidate pairs")
+    rules = Counter(decision.rule for decision in decisions if decision.decision == "merged")
+    print(f"🔀 {stats['merged_pairs']} merged pairs in {stats['clusters_merged']} clusters: "
+          + (", ".join(f"{rule} {count}" for rule, count in rules.most_common()) or "none"))
+    print(f"📊 {stats['input_producers']} → {stats['output_producers']} producers")
+
+    if args.dry_run:
+        for decision in decisions:
+            if decision.decision == "merged":
+                print(f"   {decision.rule:<17} {decision.business_name} ({decision.permit_id}) "
+                      f"= {decision.other_business_name} ({decision.other_permit_id})")
+        return
+
+    write_jsonl(args.report, [decision.to_dict() for decision in decisions])
+    write_jsonl(args.output, merged)
+    with open(dedup_metadata_file(args.output), 'w', encoding='utf-8') as f:
+        json.dump({'source_file': str(args.input), 'source_sha256': file_sha256(args.input),
+                   'input_producers': stats['input_producers'], 'output_producers': stats['output_producers']},
+                  f, ensure_ascii=False, indent=2)
+    print(f"✅ Deduplicated producers saved to: {args.output}")
+    print(f"📝 Merge report ({len(decisions)} decisions) saved to: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,8 @@ and enrichment with early exit logic to minimize API costs.
 PURPOSE: Producer Research & Enrichment - Classify, validate, and enrich producer data
 
 INPUTS:
-- data/01_unified_producers.jsonl (unified producer records)
+- data/01b_deduplicated_producers.jsonl (deduplicated producers; falls back to
+  data/01_unified_producers.jsonl when stage 01b has not run)
 - data/enriched_producers_cache.jsonl (existing cache, if any)
 - data/producer_geolocations_cache.jsonl (existing geolocation cache, if any)
 
@@ -29,8 +30,8 @@ uv run src/02_producer_research.py --limit 10
 # Full processing with confirmation
 uv run src/02_producer_research.py --yes
 
-# Custom threading and delay
-uv run src/02_producer_research.py --threads 5 --delay 0.5 --yes
+# Custom threading (requests are paced by the shared rate limiter)
+uv run src/02_producer_research.py --threads 5 --yes
 
 FUNCTIONALITY:
 1. Check enrichment cache → Skip if exists  
@@ -51,17 +52,19 @@ from pathlib import Path
 from typing import Dict, List, Optional
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from openai import OpenAI
 from dotenv import load_dotenv
 
 # Add src directory to path for imports
 sys.path.append(str(Path(__file__).parent))
+from includes import instrumentation
+from includes.llm_gateway import LLMGateway, get_gateway
 from includes.producer_classifier import classify_producer
 from includes.producer_enricher import enrich_producer, calculate_enrichment_cost
 from includes.producer_geolocator import (
     load_geolocation_cache, save_geolocation_to_cache, 
     geolocate_producer, initialize_geo_cache_file
 )
+from includes.producer_sources import cache_lookup, producer_input_file
 
 load_dotenv()
 
@@ -76,9 +79,10 @@ def is_wine_producer(producer_data: Dict) -> bool:
     return classification in wine_classifications
 
 
+@instrumentation.timed("load.unified_producers")
 def load_unified_producers() -> List[Dict]:
-    """Load unified producer data."""
-    unified_file = Path("data/01_unified_producers.jsonl")
+    """Load unified producer data (deduplicated by stage 01b when available)."""
+    unified_file = producer_input_file()
     
     if not unified_file.exists():
         raise FileNotFoundError(f"Unified producers file not found: {unified_file}")
@@ -93,6 +97,7 @@ def load_unified_producers() -> List[Dict]:
     return producers
 
 
+@instrumentation.timed("load.enrichment_cache")
 def load_enrichment_cache() -> Dict[str, Dict]:
     """Load existing enrichment cache."""
     cache_file = Path("data/enriched_producers_cache.jsonl")
@@ -121,18 +126,19 @@ def save_to_cache(cache_entry: Dict, cache_file: Path, file_lock: threading.Lock
             f.write('\n')
 
 
+@instrumentation.timed("process_producer")
 def process_producer(producer: Dict, enrichment_cache: Dict, geolocation_cache: Dict,
-                    geocode_cache: Dict, client: OpenAI, cache_file: Path, 
+                    geocode_cache: Dict, gateway: LLMGateway, cache_file: Path, 
                     geo_cache_file: Path, file_lock: threading.Lock, 
                     geo_file_lock: threading.Lock, print_lock: threading.Lock, 
-                    cost_tracker: Dict) -> Optional[Dict]:
+                    cost_tracker: Dict, request_delay: float = 0.0) -> Optional[Dict]:
     """Process a single producer through the research pipeline."""
     permit_id = producer.get('permit_id')
     business_name = producer.get('business_name', 'Unknown')
     
-    # Step 1: Check cache
-    if permit_id in enrichment_cache:
-        cached_entry = enrichment_cache[permit_id]
+    # Step 1: Check cache (also under the ids of merged duplicates)
+    cached_entry = cache_lookup(enrichment_cache, producer)
+    if cached_entry is not None:
         if cached_entry.get('skip_reason'):
             reason = f"skipped: {cached_entry['skip_reason']}"
         elif cached_entry.get('wines'):
@@ -151,7 +157,7 @@ def process_producer(producer: Dict, enrichment_cache: Dict, geolocation_cache:
         with print_lock:
             print(f"🔍 Classifying {business_name}...")
         
-        classification_result = classify_producer(producer, client)
+        classification_result = classify_producer(producer, gateway)
         
         # Track classification cost
         with cost_tracker['lock']:
@@ -178,8 +184,8 @@ def process_producer(producer: Dict, enrichment_cache: Dict, geolocation_cache:
             return cache_entry
         
         # Step 4: Geolocate wine producer (after early exit check)
-        geolocation_data = None
-        if permit_id not in geolocation_cache:
+        geolocation_data = cache_lookup(geolocation_cache, producer)
+        if geolocation_data is None:
             with print_lock:
                 print(f"📍 Geolocating wine producer {business_name}...")
             
@@ -190,7 +196,6 @@ def process_producer(producer: Dict, enrichment_cache: Dict, geolocation_cache:
                 # Update local cache to prevent duplicate processing
                 geolocation_cache[permit_id] = geolocation_result
         else:
-            geolocation_data = geolocation_cache[permit_id]
             with print_lock:
                 print(f"📍 {business_name} - already geolocated")
         
@@ -199,7 +204,7 @@ def process_producer(producer: Dict, enrichment_cache: Dict, geolocation_cache:
             print(f"🍇 Enriching wine producer {business_name}...")
         
         _, enrichment_data = enrich_producer(producer, os.getenv('OPENAI_API_KEY'), 
-                                           request_delay=1.0, print_lock=print_lock)
+                                           request_delay=request_delay, print_lock=print_lock)
         
         # Track enrichment cost
         with cost_tracker['lock']:
@@ -234,12 +239,15 @@ def process_producer(producer: Dict, enrichment_cache: Dict, geolocation_cache:
         return cache_entry
 
 
+@instrumentation.profiled_stage("02_producer_research")
 def main():
     """Main function to run the unified producer research pipeline."""
     parser = argparse.ArgumentParser(description="Unified producer research pipeline")
     parser.add_argument("--limit", type=int, help="Limit number of producers to process (for testing)")
     parser.add_argument("--threads", type=int, default=10, help="Number of threads to use")
-    parser.add_argument("--delay", type=float, default=1.0, help="Delay between requests in seconds")
+    parser.add_argument("--delay", type=float, default=0.0,
+                        help="Extra fixed delay before each enrichment in seconds (default 0: the shared "
+                             "rate limiter paces requests)")
     parser.add_argument("--yes", "-y", action="store_true", help="Skip confirmation prompt")
     
     args = parser.parse_args()
@@ -264,7 +272,7 @@ def main():
     # Filter out already processed producers
     unprocessed_producers = [
         p for p in all_producers 
-        if p.get('permit_id') not in enrichment_cache
+        if cache_lookup(enrichment_cache, p) is None
     ]
     
     print(f"📊 Found {len(unprocessed_producers)} unprocessed producers (out of {len(all_producers)} total)")
@@ -292,7 +300,7 @@ def main():
             return
     
     # Setup for processing
-    client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+    gateway = get_gateway(os.getenv('OPENAI_API_KEY'))
     cache_file = Path("data/enriched_producers_cache.jsonl")
     
     # Create shared geocoding cache for API efficiency
@@ -327,8 +335,8 @@ def main():
         future_to_producer = {
             executor.submit(
                 process_producer, producer, enrichment_cache, geolocation_cache,
-                geocode_cache, client, cache_file, geo_cache_file, file_lock, 
-                geo_file_lock, print_lock, cost_tracker
+                geocode_cache, gateway, cache_file, geo_cache_file, file_lock, 
+                geo_file_lock, print_lock, cost_tracker, args.delay
             ): producer
             for producer in unprocessed_producers
         }
@@ -365,6 +373,7 @@ def main():
     
     print(f"   Enrichment results saved to: {cache_file}")
     print(f"   Geolocation results saved to: {geo_cache_file}")
+    gateway.print_summary()
 
 
 if __name__ == "__main__":
@@ -40,11 +40,9 @@ FUNCTIONALITY:
 """
 
 import json
-import yaml
 import argparse
 from pathlib import Path
 from collections import Counter, defaultdict
-from openai import OpenAI
 import os
 from typing import Dict, List, Set, Tuple
 import sys
@@ -55,11 +53,12 @@ load_dotenv()
 # Import the grape varieties model
 sys.path.insert(0, str(Path(__file__).parent))
 from includes.grape_varieties import GrapeVarietiesModel, GrapeVariety
+from includes.llm_gateway import get_gateway
 
 class VarietyNormalizer:
     def __init__(self, dry_run=False):
         self.dry_run = dry_run
-        self.client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        self.gateway = get_gateway(os.getenv('OPENAI_API_KEY'))
         self.mapping_file = Path("data/grape_variety_mapping.jsonl")
         self.input_file = Path("data/enriched_producers_cache.jsonl")
         
@@ -192,7 +191,8 @@ Return ONLY the additions in the exact same JSON format. For example:
             return {}
         
         try:
-            response = self.client.responses.create(
+            response = self.gateway.create(
+                "variety_normalize",
                 model="gpt-5.2",
                 tools=[{"type": "web_search"}],
                 input=prompt,
@@ -389,6 +389,7 @@ def main():
     print(f"\n=== FINAL SUMMARY ===")
     print(f"Total varieties processed: {total_processed}")
     print(f"Iterations completed: {min(iteration + 1, args.iterations)}")
+    normalizer.gateway.print_summary()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
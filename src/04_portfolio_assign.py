@@ -18,6 +18,7 @@ DEPENDENCIES:
 - OPENAI_API_KEY environment variable
 - OpenAI API (gpt-5 model)
 - includes.vivc_client for VIVC database search
+  (passports from the offline mirror, includes/vivc_mirror.py, when built)
 - includes.grape_varieties.GrapeVarietiesModel
 
 USAGE:
@@ -44,7 +45,6 @@ import json
 import os
 from pathlib import Path
 from typing import Optional, List, Dict
-from openai import OpenAI
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -52,6 +52,8 @@ load_dotenv()
 # Import our modules
 from includes.grape_varieties import GrapeVarietiesModel, GrapeVariety
 from includes.vivc_client import search_cultivar, get_passport_data, VarietySearchResult, PassportData
+from includes import instrumentation
+from includes.llm_gateway import get_gateway
 
 
 class VIVCAssigner:
@@ -61,7 +63,7 @@ class VIVCAssigner:
         self.data_dir = Path(data_dir)
         self.portfolio_dir = Path(data_dir) / "portfolio"
         self.varieties_model = GrapeVarietiesModel(data_dir)
-        self.client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        self.gateway = get_gateway(os.getenv('OPENAI_API_KEY'))
         self.reprocess_not_found = reprocess_not_found
     
     def update_variety_in_model(self, variety_name: str, portfolio_data: dict, status: str):
@@ -189,7 +191,8 @@ If you cannot find it after reasonable attempts, respond with "NOT_FOUND"."""
             """
 
             try:
-                response = self.client.chat.completions.create(
+                response = self.gateway.chat(
+                    "vivc_assign",
                     model="gpt-5",
                     messages=messages,
                     tools=[{
@@ -212,7 +215,7 @@ If you cannot find it after reasonable attempts, respond with "NOT_FOUND"."""
                     #temperature=0
                 )
                 
-                message = response.choices[0].message
+                message = response.message
                 
                 # Check if GPT wants to call a tool
                 if message.tool_calls:
@@ -349,6 +352,7 @@ If you cannot find it after reasonable attempts, respond with "NOT_FOUND"."""
         return stats
 
 
+@instrumentation.profiled_stage("04_portfolio_assign")
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(
@@ -395,6 +399,7 @@ Examples:
         print(f"  Skipped: {stats['skipped']}")
         print(f"  Unprocessed: {stats['unprocessed']}")
         
+        assigner.gateway.print_summary()
         success_rate = stats['found'] / (stats['total'] - stats['skipped'] - stats['unprocessed']) * 100 if (stats['total'] - stats['skipped'] - stats['unprocessed']) > 0 else 0
         print(f"  Success rate: {success_rate:.1f}%")
         
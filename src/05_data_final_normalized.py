@@ -9,7 +9,8 @@ used by all output generation scripts.
 PURPOSE: Final Dataset Creation - Merge, filter, and normalize wine producer data
 
 INPUTS:
-- data/01_unified_producers.jsonl (base producer data)
+- data/01b_deduplicated_producers.jsonl (base producer data; falls back to
+  data/01_unified_producers.jsonl when stage 01b has not run)
 - data/enriched_producers_cache.jsonl (classification + web presence + verification + wines)
 - data/producer_geolocations_cache.jsonl (latitude/longitude)
 - data/grape_variety_mapping.jsonl (via GrapeVarietiesModel - grape variety aliases)
@@ -35,7 +36,6 @@ FUNCTIONALITY:
 """
 
 import json
-import yaml
 import re
 import sys
 from pathlib import Path
@@ -44,11 +44,14 @@ from typing import Dict, List, Optional
 # Import the grape varieties model
 sys.path.insert(0, str(Path(__file__).parent))
 from includes.grape_varieties import GrapeVarietiesModel
+from includes import instrumentation
+from includes.producer_sources import cache_lookup, producer_input_file
 
 
+@instrumentation.timed("load.unified_producers")
 def load_unified_producers() -> List[Dict]:
-    """Load the base unified producer dataset."""
-    unified_file = Path("data/01_unified_producers.jsonl")
+    """Load the base unified producer dataset (deduplicated by stage 01b when available)."""
+    unified_file = producer_input_file()
     
     if not unified_file.exists():
         print(f"❌ Base file not found: {unified_file}")
@@ -63,6 +66,7 @@ def load_unified_producers() -> List[Dict]:
     return producers
 
 
+@instrumentation.timed("load.search_cache")
 def load_search_cache() -> Dict[str, Dict]:
     """Load search cache data indexed by permit_id."""
     search_file = Path("data/enriched_producers_cache.jsonl")
@@ -83,6 +87,7 @@ def load_search_cache() -> Dict[str, Dict]:
     return search_cache
 
 
+@instrumentation.timed("load.geo_cache")
 def load_geo_cache() -> Dict[str, Dict]:
     """Load geolocation cache data indexed by permit_id."""
     geo_file = Path("data/producer_geolocations_cache.jsonl")
@@ -103,6 +108,7 @@ def load_geo_cache() -> Dict[str, Dict]:
     return geo_cache
 
 
+@instrumentation.timed("load.wine_type_mapping")
 def load_wine_type_mapping() -> Dict[str, Dict]:
     """Load wine type normalization mapping."""
     mapping_file = Path("data/wine_type_mapping.yaml")
@@ -111,6 +117,8 @@ def load_wine_type_mapping() -> Dict[str, Dict]:
         print(f"⚠️  Wine type mapping not found: {mapping_file}")
         return {}
     
+    import yaml
+    
     with open(mapping_file, 'r', encoding='utf-8') as f:
         data = yaml.safe_load(f)
         return data.get('wine_type_mapping', {})
@@ -231,6 +239,7 @@ def has_fruit_cepage(cepages: List) -> bool:
     return False
 
 
+@instrumentation.timed("normalize.producer_wines")
 def normalize_producer_wines(producer: Dict, grape_model: GrapeVarietiesModel, wine_type_mapping: Dict[str, Dict]) -> tuple[Dict, int]:
     """Normalize both grape varieties and wine types for a producer's wines, excluding non-grape wines."""
     normalized_producer = producer.copy()
@@ -291,9 +300,8 @@ def analyze_coverage(producers: List[Dict], search_cache: Dict, geo_cache: Dict)
     both_coverage = 0
     
     for producer in producers:
-        permit_id = producer.get('permit_id')
-        has_search = permit_id in search_cache
-        has_geo = permit_id in geo_cache
+        has_search = cache_lookup(search_cache, producer) is not None
+        has_geo = cache_lookup(geo_cache, producer) is not None
         
         if has_search:
             search_coverage += 1
@@ -309,6 +317,7 @@ def analyze_coverage(producers: List[Dict], search_cache: Dict, geo_cache: Dict)
     print(f"  With both:              {both_coverage} ({both_coverage/total*100:.1f}%)")
 
 
+@instrumentation.profiled_stage("05_data_final_normalized")
 def create_final_normalized_dataset():
     """Create the final normalized wine producer dataset."""
     print("🍷 Creating Final Normalized Wine Producers Dataset")
@@ -338,9 +347,8 @@ def create_final_normalized_dataset():
     merged_producers = []
     
     for producer in producers:
-        permit_id = producer.get('permit_id')
-        search_data = search_cache.get(permit_id)
-        geo_data = geo_cache.get(permit_id)
+        search_data = cache_lookup(search_cache, producer)
+        geo_data = cache_lookup(geo_cache, producer)
         
         merged = merge_producer_data(producer, search_data, geo_data)
         merged_producers.append(merged)
@@ -483,10 +491,12 @@ def create_final_normalized_dataset():
     output_file = Path("data/05_wine_producers_final_normalized.jsonl")
     print(f"\n💾 Saving to {output_file}...")
     
-    with open(output_file, 'w', encoding='utf-8') as f:
+    with instrumentation.timer("write.final_dataset"), open(output_file, 'w', encoding='utf-8') as f:
         for producer in normalized_producers:
             json.dump(producer, f, ensure_ascii=False)
             f.write('\n')
+    instrumentation.count("producers.input", len(producers))
+    instrumentation.count("producers.output", len(normalized_producers))
     
     print(f"✅ Final normalized dataset created!")
     print(f"   Input:  {len(producers)} total producers")
@@ -500,6 +510,7 @@ def create_final_normalized_dataset():
     return output_file
 
 
+@instrumentation.timed("flag_unreferenced_varieties")
 def flag_unreferenced_varieties(producers: List[Dict], grape_model: GrapeVarietiesModel):
     """Flag grape varieties that are not referenced by any wine producers with no_wine=1."""
     # Collect all referenced grape varieties from wine producers
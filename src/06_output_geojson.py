@@ -11,15 +11,27 @@ INPUTS:
 - data/05_wine_producers_final_normalized.jsonl (final production dataset)
 
 OUTPUTS:
-- docs/assets/data/wine-producers-final.geojson (interactive map data)
+- docs/assets/data/wine-producers-final.geojson (interactive map data, compact)
+- docs/assets/data/wine-producers-final-tiles/{z}/{x}/{y}.geojson + index.json (with --tiles)
+- docs/assets/data/wine-producers-final-provinces/{slug}.geojson + index.json (with --province-shards)
+- docs/assets/data/wine-producers-final-clusters.json (precomputed per-zoom clusters, with --cluster-zooms)
 
 DEPENDENCIES:
-- None (uses normalized data from final dataset)
+- includes.wine_facts for vectorized producer/variety/type counts
+- includes.geojson_writer for streaming, tiled and sharded output
+- includes.map_clusters for grid clustering per zoom level
 
 USAGE:
 # Generate GeoJSON for interactive map
 uv run src/06_output_geojson.py
 
+# Also write z/x/y tiles at zoom 6 and per-province shards
+uv run src/06_output_geojson.py --tiles 6 --province-shards
+
+# Also precompute clusters (default zooms 2-11, or e.g. only 3-8)
+uv run src/06_output_geojson.py --cluster-zooms
+uv run src/06_output_geojson.py --cluster-zooms 3-8
+
 FUNCTIONALITY:
 - Converts normalized wine producer data to GeoJSON format
 - Includes wine data with pre-normalized grape varieties and wine types
@@ -27,23 +39,167 @@ FUNCTIONALITY:
 - Creates feature properties for interactive map filtering
 - Provides location coverage analysis and variety statistics
 - Outputs ready-to-use map data for MkDocs site
+- Optionally precomputes hierarchical clusters with counts and top varieties per zoom level
 """
 
+import argparse
+import contextlib
 import json
-import yaml
+import os
+import sys
+import tempfile
 from pathlib import Path
-from collections import defaultdict
-from typing import Dict, List, Set
+from typing import Dict, Optional
 
+sys.path.insert(0, str(Path(__file__).parent))
+from includes import instrumentation
+from includes.geojson_writer import (
+    GeoJSONStreamWriter, PartitionedGeoJSONWriter, format_bytes,
+    province_partitioner, tile_partitioner
+)
+from includes.map_clusters import DEFAULT_ZOOM_LEVELS, build_clusters
+from includes.wine_facts import WineFactTable, iter_jsonl_records, load_wine_facts
 
+DEFAULT_INPUT_FILE = Path("data/05_wine_producers_final_normalized.jsonl")
+DEFAULT_OUTPUT_FILE = Path("docs/assets/data/wine-producers-final.geojson")
 
 
+def summarize_facts(facts: WineFactTable) -> Dict:
+    """Compute the map metadata and console statistics from the fact table."""
+    province_counts = facts.producers_per_province()
+    states = facts.counter(facts.provinces, province_counts)
+    unknown_state = facts.producer_count - int(province_counts.sum())
+    if unknown_state:
+        states['Unknown'] += unknown_state
+    
+    variety_producers = facts.variety_producer_counts()
+    
+    return {
+        'total': facts.producer_count,
+        'with_location': int(facts.producer_has_location.sum()),
+        'with_wines': int((facts.producer_wine_count > 0).sum()),
+        'open_for_visits': int(facts.producer_open_for_visits.sum()),
+        'states': dict(states),
+        'grape_varieties': dict(facts.counter(facts.varieties, variety_producers)),
+        'wine_types': dict(facts.counter(facts.wine_types, facts.wine_type_counts())),
+        'total_wines': facts.wine_count,
+        'total_wines_with_cepages': facts.wines_with_cepages(),
+        'total_cepages': len(facts.cepage_variety),
+        'producers_with_cepages': facts.producers_with_cepages(),
+        'unique_varieties': int((variety_producers > 0).sum())
+    }
 
 
-def create_final_geojson():
-    """Convert final3 wine producers dataset to GeoJSON."""
-    input_file = Path("data/05_wine_producers_final_normalized.jsonl")
-    output_file = Path("docs/assets/data/wine-producers-final.geojson")
+def build_feature(producer: Dict) -> Optional[Dict]:
+    """Create the GeoJSON feature for a producer, or None without coordinates."""
+    lat = producer.get('latitude')
+    lon = producer.get('longitude')
+    
+    if lat is None or lon is None:
+        return None
+    
+    # Extract wine data (grape varieties and wine types are already normalized in final3 data)
+    wines = producer.get('wines', []) or []
+    grape_varieties = set()
+    wine_types = set()
+    for wine in wines:
+        if not isinstance(wine, dict):
+            continue
+        for cepage in wine.get('cepages', []) or []:
+            if cepage and isinstance(cepage, str):
+                grape_varieties.add(cepage)
+        wine_type = wine.get('type')
+        if wine_type and isinstance(wine_type, str):
+            wine_types.add(wine_type)
+    
+    # Visiting information
+    activities = producer.get('activities', []) or []
+    open_for_visits = bool(activities)
+    
+    return {
+        "type": "Feature",
+        "geometry": {
+            "type": "Point",
+            "coordinates": [lon, lat]
+        },
+        "properties": {
+            "permit_id": producer.get('permit_id'),
+            "name": producer.get('business_name', producer.get('name', 'Unknown')),
+            "address": producer.get('address'),
+            "city": producer.get('city'),
+            "state_province": producer.get('state_province'),
+            "country": producer.get('country'),
+            "postal_code": producer.get('postal_code'),
+            "classification": producer.get('classification'),
+            "website": producer.get('website'),
+            "social_media": producer.get('social_media'),
+            "wine_label": producer.get('wine_label'),
+            "activities": activities,
+            "open_for_visits": open_for_visits,
+            "verified_wine_producer": producer.get('verified_wine_producer'),
+            "geocoding_method": producer.get('geocoding_method'),
+            "source": producer.get('source'),
+            "enriched_at": producer.get('enriched_at'),
+            "grape_varieties": sorted(list(grape_varieties)),
+            "wine_types": sorted(list(wine_types)),
+            "wines": wines
+        }
+    }
+
+
+def build_metadata(stats: Dict) -> Dict:
+    """Create the FeatureCollection metadata block."""
+    return {
+        "generated_at": "2025-12-20",
+        "total_producers": stats['total'],
+        "mapped_producers": stats['with_location'],
+        "producers_with_wines": stats['with_wines'],
+        "open_for_visits": stats['open_for_visits'],
+        "coverage": f"{stats['with_location']/stats['total']*100:.1f}%",
+        "states": dict(sorted(stats['states'].items())),
+        "grape_varieties": {variety: count for variety, count in sorted(stats['grape_varieties'].items())},
+        "grape_varieties_with_counts": {variety: f"{variety} ({count})" for variety, count in sorted(stats['grape_varieties'].items())},
+        "wine_types": dict(sorted(stats['wine_types'].items()))
+    }
+
+
+@instrumentation.timed("write.clusters")
+def write_cluster_file(facts: WineFactTable, output_file: Path, zoom_levels=DEFAULT_ZOOM_LEVELS) -> Path:
+    """Precompute per-zoom producer clusters and write them as a compact side file."""
+    clusters = build_clusters(facts, zoom_levels)
+    cluster_file = output_file.parent / f"{output_file.stem}-clusters.json"
+    cluster_file.parent.mkdir(parents=True, exist_ok=True)
+    # Temp file + replace, like the GeoJSON writers, so an interrupted run never leaves a truncated file
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=cluster_file.parent,
+                                     prefix=f".{cluster_file.name}.", suffix='.tmp', delete=False) as f:
+        tmp_file = Path(f.name)
+        try:
+            json.dump(clusters, f, ensure_ascii=False, separators=(',', ':'))
+        except BaseException:
+            f.close()
+            tmp_file.unlink(missing_ok=True)
+            raise
+    os.replace(tmp_file, cluster_file)
+    
+    print(f"✅ Clusters created: {cluster_file} ({format_bytes(cluster_file.stat().st_size)})")
+    for zoom, rows in clusters['zooms'].items():
+        print(f"   z{zoom}: {len(rows)} clusters")
+    return cluster_file
+
+
+def create_final_geojson(input_file: Path = DEFAULT_INPUT_FILE, output_file: Path = DEFAULT_OUTPUT_FILE,
+                         tile_zoom: Optional[int] = None, province_shards: bool = False,
+                         cluster_zooms=None):
+    """Convert final3 wine producers dataset to GeoJSON.
+    
+    Features are streamed to disk one producer at a time in compact form.
+    Optionally, the same features are partitioned into z/x/y tiles at
+    `tile_zoom` and/or per-province shards, each with an index.json.
+    Per-zoom clusters are written to a side file when `cluster_zooms` is given;
+    the map does not read them yet, so they are opt-in.
+    """
+    input_file = Path(input_file)
+    output_file = Path(output_file)
     
     if not input_file.exists():
         print(f"❌ Input file not found: {input_file}")
@@ -52,161 +208,56 @@ def create_final_geojson():
     print("🗺️  Converting final3 wine producers to GeoJSON...")
     print("   (Grape varieties and wine types are already normalized in final3 data)")
     
-    features = []
-    stats = {
-        'total': 0,
-        'with_location': 0,
-        'with_wines': 0,
-        'open_for_visits': 0,
-        'states': {},
-        'grape_varieties': defaultdict(int),
-        'wine_types': defaultdict(int),
-        'total_wines': 0,
-        'total_wines_with_cepages': 0,
-        'total_cepages': 0,
-        'producers_with_cepages': 0,
-        'unique_varieties_global': set()
-    }
+    # Metadata comes from the fact table, so it is known before streaming features
+    facts = load_wine_facts(input_file)
+    with instrumentation.timer("summarize_facts"):
+        stats = summarize_facts(facts)
+    previous_size = output_file.stat().st_size if output_file.exists() else None
+    
+    partitions = []
+    if tile_zoom is not None:
+        tiles_dir = output_file.parent / f"{output_file.stem}-tiles"
+        partitions.append(PartitionedGeoJSONWriter(
+            tiles_dir, tile_partitioner(tile_zoom), {"scheme": "xyz", "zoom": tile_zoom}))
+    if province_shards:
+        shards_dir = output_file.parent / f"{output_file.stem}-provinces"
+        partitions.append(PartitionedGeoJSONWriter(
+            shards_dir, province_partitioner, {"scheme": "province"}))
     
-    # Process each producer
-    with open(input_file, 'r', encoding='utf-8') as f:
-        for line in f:
-            if not line.strip():
-                continue
-                
-            try:
-                producer = json.loads(line.strip())
-                stats['total'] += 1
-                
-                # Extract basic info
-                state = producer.get('state_province', 'Unknown')
-                stats['states'][state] = stats['states'].get(state, 0) + 1
-                
-                # Extract wine data (grape varieties and wine types are already normalized in final3 data)
-                wines = producer.get('wines', []) or []
-                grape_varieties = set()
-                wine_types = set()
-                producer_cepage_count = 0
-                producer_unique_varieties = set()
-                wines_with_cepages_count = 0
-                
-                # Count wines
-                if wines:
-                    stats['with_wines'] += 1
-                    stats['total_wines'] += len(wines)
-                
-                for wine in wines:
-                    wine_has_cepages = False
-                    
-                    # Extract already-normalized grape varieties (cépages)
-                    cepages = wine.get('cepages', []) or []
-                    for cepage in cepages:
-                        if cepage and isinstance(cepage, str):
-                            grape_varieties.add(cepage)
-                            producer_unique_varieties.add(cepage)
-                            stats['unique_varieties_global'].add(cepage)
-                            producer_cepage_count += 1
-                            wine_has_cepages = True
-                    
-                    if wine_has_cepages:
-                        wines_with_cepages_count += 1
-                    
-                    # Extract already-normalized wine type
-                    wine_type = wine.get('type')
-                    if wine_type and isinstance(wine_type, str):
-                        wine_types.add(wine_type)
-                        stats['wine_types'][wine_type] += 1
-                
-                # Update producer-level stats
-                if producer_unique_varieties:
-                    stats['producers_with_cepages'] += 1
-                
-                # Count grape varieties for this producer
-                for variety in producer_unique_varieties:
-                    stats['grape_varieties'][variety] += 1
-                    
-                # Update global stats
-                stats['total_cepages'] += producer_cepage_count
-                stats['total_wines_with_cepages'] += wines_with_cepages_count
-                
-                # Visiting information
-                activities = producer.get('activities', []) or []
-                open_for_visits = bool(activities)
-                if open_for_visits:
-                    stats['open_for_visits'] += 1
-                
-                # Skip if no coordinates
-                lat = producer.get('latitude')
-                lon = producer.get('longitude')
-                
-                if lat is None or lon is None:
+    # Stream features: only one producer record is held at a time. Partition
+    # writers are entered first so a failure mid-stream removes their temp files.
+    with contextlib.ExitStack() as stack:
+        for partition in partitions:
+            stack.enter_context(partition)
+        with instrumentation.timer("write.geojson"), GeoJSONStreamWriter(output_file) as writer:
+            for producer in iter_jsonl_records(input_file):
+                feature = build_feature(producer)
+                if feature is None:
+                    instrumentation.count("features.skipped")
                     continue
-                    
-                stats['with_location'] += 1
-                
-                # Create GeoJSON feature
-                feature = {
-                    "type": "Feature",
-                    "geometry": {
-                        "type": "Point",
-                        "coordinates": [lon, lat]
-                    },
-                    "properties": {
-                        "permit_id": producer.get('permit_id'),
-                        "name": producer.get('business_name', producer.get('name', 'Unknown')),
-                        "address": producer.get('address'),
-                        "city": producer.get('city'),
-                        "state_province": producer.get('state_province'),
-                        "country": producer.get('country'),
-                        "postal_code": producer.get('postal_code'),
-                        "classification": producer.get('classification'),
-                        "website": producer.get('website'),
-                        "social_media": producer.get('social_media'),
-                        "wine_label": producer.get('wine_label'),
-                        "activities": activities,
-                        "open_for_visits": open_for_visits,
-                        "verified_wine_producer": producer.get('verified_wine_producer'),
-                        "geocoding_method": producer.get('geocoding_method'),
-                        "source": producer.get('source'),
-                        "enriched_at": producer.get('enriched_at'),
-                        "grape_varieties": sorted(list(grape_varieties)),
-                        "wine_types": sorted(list(wine_types)),
-                        "wines": wines
-                    }
-                }
-                
-                features.append(feature)
-                
-            except json.JSONDecodeError as e:
-                print(f"⚠️  Error parsing line: {e}")
-                continue
-    
-    # Create GeoJSON structure
-    geojson = {
-        "type": "FeatureCollection",
-        "features": features,
-        "metadata": {
-            "generated_at": "2025-12-20",
-            "total_producers": stats['total'],
-            "mapped_producers": stats['with_location'],
-            "producers_with_wines": stats['with_wines'],
-            "open_for_visits": stats['open_for_visits'],
-            "coverage": f"{stats['with_location']/stats['total']*100:.1f}%",
-            "states": dict(sorted(stats['states'].items())),
-            "grape_varieties": {variety: count for variety, count in sorted(stats['grape_varieties'].items())},
-            "grape_varieties_with_counts": {variety: f"{variety} ({count})" for variety, count in sorted(stats['grape_varieties'].items())},
-            "wine_types": dict(sorted(stats['wine_types'].items()))
-        }
-    }
+                writer.write_feature(feature)
+                instrumentation.count("features.written")
+                for partition in partitions:
+                    partition.write_feature(feature)
+        
+            writer.close(build_metadata(stats))
+        instrumentation.observe("output.bytes", writer.bytes_written)
     
-    # Ensure output directory exists
-    output_file.parent.mkdir(parents=True, exist_ok=True)
+        print(f"✅ GeoJSON created: {output_file}")
+        if previous_size is not None:
+            change = (writer.bytes_written - previous_size) / previous_size * 100 if previous_size else 0
+            print(f"   Size: {format_bytes(previous_size)} → {format_bytes(writer.bytes_written)} ({change:+.1f}%)")
+        else:
+            print(f"   Size: {format_bytes(writer.bytes_written)}")
     
-    # Save GeoJSON
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(geojson, f, indent=2, ensure_ascii=False)
+        for partition in partitions:
+            with instrumentation.timer("write.partitions"):
+                index_file = partition.close()
+            print(f"✅ {len(partition.writers)} partitions written: {index_file} "
+                  f"({format_bytes(partition.bytes_written)} total)")
     
-    print(f"✅ GeoJSON created: {output_file}")
+    if cluster_zooms:
+        write_cluster_file(facts, output_file, cluster_zooms)
     print(f"   Total producers: {stats['total']}")
     print(f"   Mapped producers: {stats['with_location']}")
     print(f"   With wine data: {stats['with_wines']}")
@@ -221,7 +272,7 @@ def create_final_geojson():
     print(f"   Wines with cépages: {stats['total_wines_with_cepages']}")
     print(f"   Producers with cépages: {stats['producers_with_cepages']}")
     print(f"   Total cépages mentions: {stats['total_cepages']}")
-    print(f"   Unique grape varieties: {len(stats['unique_varieties_global'])}")
+    print(f"   Unique grape varieties: {stats['unique_varieties']}")
     print(f"   Unique wine types: {len(stats['wine_types'])}")
     
     # Safe division for averages
@@ -247,5 +298,28 @@ def create_final_geojson():
     for state, count in sorted(stats['states'].items(), key=lambda x: x[1], reverse=True):
         print(f"   {state}: {count}")
 
+@instrumentation.profiled_stage("06_output_geojson")
+def main():
+    """Main function to generate the map GeoJSON."""
+    parser = argparse.ArgumentParser(description="Generate wine producer GeoJSON for the interactive map")
+    parser.add_argument("--input", type=Path, default=DEFAULT_INPUT_FILE, help="Normalized producers JSONL")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT_FILE, help="Output GeoJSON file")
+    parser.add_argument("--tiles", type=int, metavar="ZOOM", help="Also write z/x/y tiles at this zoom level")
+    parser.add_argument("--province-shards", action="store_true", help="Also write one GeoJSON shard per province")
+    parser.add_argument("--cluster-zooms", nargs="?", metavar="RANGE",
+                        const=f"{DEFAULT_ZOOM_LEVELS.start}-{DEFAULT_ZOOM_LEVELS.stop - 1}",
+                        help="Also write precomputed clusters for this zoom range, e.g. 3-8 "
+                             "(default range when given without a value)")
+    args = parser.parse_args()
+    
+    cluster_zooms = None
+    if args.cluster_zooms:
+        first, _, last = args.cluster_zooms.partition('-')
+        cluster_zooms = range(int(first), int(last or first) + 1)
+    
+    create_final_geojson(args.input, args.output, tile_zoom=args.tiles, province_shards=args.province_shards,
+                         cluster_zooms=cluster_zooms)
+
+
 if __name__ == "__main__":
-    create_final_geojson()
\ No newline at end of file
+    main()
\ No newline at end of file
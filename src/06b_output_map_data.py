@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Map Data Generator for the Grape Explorer React App
+
+Builds the map-data.json file consumed by grape-explorer-react (MapPage,
+FullScreenMap and useMapData). Producers are written once, and filters are
+served by precomputed inverted indexes so the browser never scans or joins
+the full producer list.
+
+PURPOSE: Map Data Export - Producer list plus inverted filter indexes for the React map
+
+INPUTS:
+- data/05_wine_producers_final_normalized.jsonl (final production dataset)
+
+OUTPUTS:
+- grape-explorer-react/public/data/map-data.json (producers, filter options, indexes)
+
+DEPENDENCIES:
+- includes.wine_facts for the producer/variety/type fact table
+
+USAGE:
+# Generate map data for the React app
+uv run src/06b_output_map_data.py
+
+# Write to a custom location
+uv run src/06b_output_map_data.py --output custom/map-data.json
+
+FUNCTIONALITY:
+- Exports every geocoded producer with the fields the map popups display
+- Producer "id" is its position in full_map.producers
+- Builds variety → ids, wine type → ids and province → ids indexes as sorted integer arrays
+- Builds filter options (varieties, wine types, provinces) from the same indexes
+- Writes compact JSON (no indentation)
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+from includes import instrumentation
+from includes.wine_facts import NO_ID, WineFactTable, count_pairs, iter_jsonl_records, load_wine_facts
+
+DEFAULT_INPUT_FILE = Path("data/05_wine_producers_final_normalized.jsonl")
+DEFAULT_OUTPUT_FILE = Path("grape-explorer-react/public/data/map-data.json")
+
+
+def build_map_producer(producer: Dict, producer_id: int) -> Dict:
+    """Create the map entry for a geocoded producer."""
+    wines = producer.get('wines', []) or []
+    grape_varieties = set()
+    wine_types = set()
+    for wine in wines:
+        if not isinstance(wine, dict):
+            continue
+        for cepage in wine.get('cepages', []) or []:
+            if isinstance(cepage, str) and cepage.strip():
+                grape_varieties.add(cepage.strip())
+        wine_type = wine.get('type')
+        if isinstance(wine_type, str) and wine_type.strip():
+            wine_types.add(wine_type.strip())
+
+    activities = producer.get('activities', []) or []
+
+    return {
+        "id": producer_id,
+        "permit_id": producer.get('permit_id'),
+        "name": producer.get('business_name', producer.get('name', 'Unknown')),
+        "coordinates": [producer.get('longitude'), producer.get('latitude')],
+        "city": producer.get('city'),
+        "state_province": (producer.get('state_province') or '').strip(),
+        "website": producer.get('website'),
+        "social_media": producer.get('social_media') or [],
+        "wine_label": producer.get('wine_label'),
+        "activities": activities,
+        "open_for_visits": bool(activities),
+        "grape_varieties": sorted(grape_varieties),
+        "wine_types": sorted(wine_types),
+        "wines": wines
+    }
+
+
+def build_inverted_index(keys: np.ndarray, ids: np.ndarray, vocabulary: List[str]) -> Dict[str, List[int]]:
+    """Map each vocabulary entry to the sorted, distinct map ids it occurs with."""
+    valid = (keys != NO_ID) & (ids >= 0)
+    key_ids, map_ids, _ = count_pairs(keys[valid], ids[valid], int(ids.max()) + 1 if ids.size else 1)
+
+    index = {}
+    if key_ids.size == 0:
+        return index
+    # count_pairs returns pairs sorted by key then id, so each key's ids are a sorted run
+    starts = np.flatnonzero(np.r_[True, key_ids[1:] != key_ids[:-1]])
+    ends = np.r_[starts[1:], key_ids.size]
+    for start, end in zip(starts, ends):
+        index[vocabulary[int(key_ids[start])]] = map_ids[start:end].astype(int).tolist()
+    return dict(sorted(index.items()))
+
+
+@instrumentation.timed("build_map_data")
+def build_map_data(input_file: Path, facts: WineFactTable) -> Dict:
+    """Build the producers list, inverted indexes and filter options."""
+    # Map ids are assigned to geocoded producers in dataset order
+    has_location = facts.producer_has_location
+    map_id_of_producer = np.full(facts.producer_count, -1, dtype=np.int64)
+    map_id_of_producer[has_location] = np.arange(int(has_location.sum()))
+
+    producers = []
+    for producer_row, producer in enumerate(iter_jsonl_records(input_file)):
+        map_id = int(map_id_of_producer[producer_row])
+        if map_id >= 0:
+            producers.append(build_map_producer(producer, map_id))
+
+    indexes = {
+        "variety": build_inverted_index(facts.cepage_variety, map_id_of_producer[facts.cepage_producer],
+                                        facts.varieties),
+        "wine_type": build_inverted_index(facts.wine_type, map_id_of_producer[facts.wine_producer],
+                                          facts.wine_types),
+        "state_province": build_inverted_index(facts.producer_province, map_id_of_producer,
+                                               facts.provinces),
+        "open_for_visits": np.flatnonzero(facts.producer_open_for_visits[has_location]).tolist()
+    }
+
+    return {
+        "full_map": {
+            "producers": producers,
+            "filter_options": {
+                "grape_varieties": list(indexes["variety"]),
+                "wine_types": list(indexes["wine_type"]),
+                "states_provinces": list(indexes["state_province"])
+            }
+        },
+        "indexes": indexes,
+        "metadata": {
+            "total_producers": facts.producer_count,
+            "mapped_producers": len(producers),
+            "varieties": len(indexes["variety"]),
+            "wine_types": len(indexes["wine_type"]),
+            "states_provinces": len(indexes["state_province"])
+        }
+    }
+
+
+def create_map_data(input_file: Path = DEFAULT_INPUT_FILE, output_file: Path = DEFAULT_OUTPUT_FILE):
+    """Generate map-data.json for the React map."""
+    input_file = Path(input_file)
+    output_file = Path(output_file)
+
+    if not input_file.exists():
+        print(f"❌ Input file not found: {input_file}")
+        return
+
+    print("🗺️  Generating React map data...")
+    facts = load_wine_facts(input_file)
+    map_data = build_map_data(input_file, facts)
+
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with instrumentation.timer("write.map_data"), open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(map_data, f, ensure_ascii=False, separators=(',', ':'))
+
+    metadata = map_data['metadata']
+    print(f"✅ Map data created: {output_file} ({output_file.stat().st_size / 1024:,.1f} KB)")
+    print(f"   Mapped producers: {metadata['mapped_producers']} of {metadata['total_producers']}")
+    print(f"   Variety index: {metadata['varieties']} varieties")
+    print(f"   Wine type index: {metadata['wine_types']} types")
+    print(f"   Province index: {metadata['states_provinces']} states/provinces")
+
+
+@instrumentation.profiled_stage("06b_output_map_data")
+def main():
+    """Main function to generate map data."""
+    parser = argparse.ArgumentParser(description="Generate map-data.json for the React map")
+    parser.add_argument("--input", type=Path, default=DEFAULT_INPUT_FILE, help="Normalized producers JSONL")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT_FILE, help="Output JSON file")
+    args = parser.parse_args()
+
+    create_map_data(args.input, args.output)
+
+
+if __name__ == "__main__":
+    main()
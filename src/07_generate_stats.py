@@ -15,7 +15,7 @@ OUTPUTS:
 - Console output with comprehensive analysis and social media posts
 
 DEPENDENCIES:
-- None (analyzes final normalized dataset)
+- includes.wine_facts for vectorized wine, variety and type counts
 
 USAGE:
 # Generate comprehensive statistics
@@ -35,10 +35,18 @@ FUNCTIONALITY:
 """
 
 import json
+import sys
 from pathlib import Path
 from collections import defaultdict, Counter
-from typing import Dict, List, Set
+from typing import Dict, List, Optional, Set
 
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+from includes import instrumentation
+from includes.wine_facts import WineFactTable
+
+@instrumentation.timed("load.producers")
 def load_producer_data() -> List[Dict]:
     """Load the final wine producer dataset."""
     input_file = Path("data/05_wine_producers_final_normalized.jsonl")
@@ -63,19 +71,29 @@ def load_producer_data() -> List[Dict]:
     
     return producers
 
-def analyze_dataset(producers: List[Dict]) -> Dict:
+@instrumentation.timed("analyze_dataset")
+def analyze_dataset(producers: List[Dict], facts: Optional[WineFactTable] = None) -> Dict:
     """Analyze the dataset and generate comprehensive statistics."""
+    if facts is None:
+        facts = WineFactTable.from_producers(producers)
+    
+    # Wine analysis comes from the flattened fact table
+    producers_with_wines = int((facts.producer_wine_count > 0).sum())
+    variety_counts = facts.variety_occurrences()
+    type_counts = facts.wine_type_counts()
+    
     stats = {
         'total_producers': len(producers),
         'states_provinces': set(),
         'us_states': set(),
         'canadian_provinces': set(),
         'countries': Counter(),
-        'total_wines': 0,
-        'producers_with_wines': 0,
-        'total_wine_bottles': 0,
-        'grape_varieties': set(),
-        'wine_types': set(),
+        'total_wines': facts.wine_count,
+        'producers_with_wines': producers_with_wines,
+        # Estimate bottles (very rough estimate: assume 100-500 bottles per wine)
+        'total_wine_bottles': facts.wine_count * 250,  # Average estimate
+        'grape_varieties': {facts.varieties[i] for i in np.flatnonzero(variety_counts)},
+        'wine_types': {facts.wine_types[i] for i in np.flatnonzero(type_counts)},
         'websites_found': 0,
         'social_accounts': 0,
         'producers_with_location': 0,
@@ -107,28 +125,6 @@ def analyze_dataset(producers: List[Dict]) -> Dict:
         if producer.get('latitude') and producer.get('longitude'):
             stats['producers_with_location'] += 1
         
-        # Wine analysis
-        wines = producer.get('wines', []) or []
-        if wines:
-            stats['producers_with_wines'] += 1
-            stats['total_wines'] += len(wines)
-            
-            # Estimate bottles (very rough estimate: assume 100-500 bottles per wine)
-            stats['total_wine_bottles'] += len(wines) * 250  # Average estimate
-            
-            for wine in wines:
-                if isinstance(wine, dict):
-                    # Grape varieties
-                    cepages = wine.get('cepages', []) or []
-                    for cepage in cepages:
-                        if isinstance(cepage, str) and cepage.strip():
-                            stats['grape_varieties'].add(cepage.strip())
-                    
-                    # Wine types
-                    wine_type = wine.get('type')
-                    if wine_type and isinstance(wine_type, str):
-                        stats['wine_types'].add(wine_type.strip())
-        
         # Digital presence
         if producer.get('website'):
             stats['websites_found'] += 1
@@ -262,6 +258,7 @@ def print_detailed_stats(stats: Dict, show_varieties: bool = False):
     
     print(f"\n* Estimated bottles assume ~250 bottles per wine (rough approximation)")
 
+@instrumentation.profiled_stage("07_generate_stats")
 def main():
     """Main function to generate and display statistics."""
     import argparse
@@ -14,6 +14,7 @@ INPUTS:
 OUTPUTS:
 - docs/en/varieties/index.md (English VIVC index)
 - docs/fr/varieties/index.md (French VIVC index) 
+- data/manifests/08_build_vivc_index.json (generated files and their hashes)
 
 DEPENDENCIES:
 - includes.grape_varieties.GrapeVarietiesModel for variety data access
@@ -25,6 +26,9 @@ uv run src/08_build_vivc_index.py
 # Custom output location
 uv run src/08_build_vivc_index.py --output docs/en/varieties/custom-index.md
 
+# Delete indices generated by earlier runs but not by this one
+uv run src/08_build_vivc_index.py --prune
+
 FUNCTIONALITY:
 - Loads grape variety data from GrapeVarietiesModel
 - Organizes varieties by species (Vinifera vs Non-vinifera) and berry color
@@ -33,6 +37,7 @@ FUNCTIONALITY:
 - Includes research article links when available
 - Produces bilingual indices with localized content
 - Provides comprehensive statistics and VIVC match rates
+- Rewrites an index only when its content changed, so unchanged pages keep their mtime
 """
 
 import argparse
@@ -45,6 +50,8 @@ from typing import Dict, List
 # Import the grape varieties model
 sys.path.insert(0, str(Path(__file__).parent))
 from includes.grape_varieties import GrapeVarietiesModel
+from includes.generated_files import GeneratedFiles
+from includes import instrumentation
 
 
 def load_varieties_from_model(data_dir: str = "data") -> List[Dict]:
@@ -352,6 +359,7 @@ def get_stats(organized: Dict) -> Dict:
     }
 
 
+@instrumentation.profiled_stage("08_build_vivc_index")
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(
@@ -362,6 +370,7 @@ Examples:
   python src/08_build_vivc_index.py
   python src/08_build_vivc_index.py --output docs/en/varieties/custom-index.md
   python src/08_build_vivc_index.py --data-dir data
+  python src/08_build_vivc_index.py --prune
         """
     )
     
@@ -377,6 +386,12 @@ Examples:
         help="Output markdown file (default: docs/en/varieties/index.md)"
     )
     
+    parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="Delete indices generated by earlier runs but not by this one"
+    )
+    
     args = parser.parse_args()
     
     output_file = Path(args.output)
@@ -390,28 +405,26 @@ Examples:
     
     # Organize data
     print("🗂️  Organizing varieties into categories...")
-    organized = organize_varieties_by_category(varieties)
+    with instrumentation.timer("organize_varieties"):
+        organized = organize_varieties_by_category(varieties)
     
     # Generate English markdown
     print("📝 Generating English markdown index...")
-    english_content = generate_markdown_index(organized, "en")
+    with instrumentation.timer("render.markdown"):
+        english_content = generate_markdown_index(organized, "en")
     
     # Generate French markdown
     print("📝 Generating French markdown index...")
-    french_content = generate_markdown_index(organized, "fr")
-    
-    # Save English output
-    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with instrumentation.timer("render.markdown"):
+        french_content = generate_markdown_index(organized, "fr")
     
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(english_content)
+    # Save outputs (only if changed)
+    output = GeneratedFiles("08_build_vivc_index")
+    output.write_text(output_file, english_content)
     
-    # Save French output
     french_output_file = Path(str(output_file).replace("/en/", "/fr/"))
-    french_output_file.parent.mkdir(parents=True, exist_ok=True)
-    
-    with open(french_output_file, 'w', encoding='utf-8') as f:
-        f.write(french_content)
+    output.write_text(french_output_file, french_content)
+    write_report = output.finish(prune=args.prune)
     
     # Show statistics
     stats = get_stats(organized)
@@ -429,6 +442,7 @@ Examples:
     print(f"\n✅ Indices saved to:")
     print(f"   English: {output_file}")
     print(f"   French:  {french_output_file}")
+    output.print_report(write_report)
 
 
 if __name__ == "__main__":
@@ -15,9 +15,13 @@ INPUTS:
 OUTPUTS:
 - docs/en/regions/{province_slug}.md (English province statistics pages)
 - docs/fr/regions/{province_slug}.md (French province statistics pages)
+- docs/cards/regions_data.json (Instagram cards data)
+- data/manifests/09_province_stats_generator.json (generated files and their hashes)
 
 DEPENDENCIES:
 - includes.grape_varieties.GrapeVarietiesModel for vinifera classification
+- includes.wine_facts for vectorized per-province counts
+- includes.province_pages for compiled page templates
 
 USAGE:
 # Generate statistics for all provinces
@@ -29,6 +33,12 @@ uv run src/09_province_stats_generator.py --provinces "Quebec,Ontario,New York"
 # Generate with minimum producer threshold
 uv run src/09_province_stats_generator.py --min-producers 5
 
+# Split analysis and page rendering across worker processes (full North-American dataset)
+uv run src/09_province_stats_generator.py --workers 4
+
+# Delete pages of provinces that are no longer generated
+uv run src/09_province_stats_generator.py --prune
+
 FUNCTIONALITY:
 - Analyzes wine production data by province/state
 - Calculates producer counts, wines, and varieties per producer
@@ -36,31 +46,80 @@ FUNCTIONALITY:
 - Generates grape variety popularity rankings by wine appearance
 - Creates wine type distribution analysis with percentages
 - Produces bilingual markdown pages with comprehensive regional insights
+- Rewrites a page only when its content changed, so unchanged pages keep their mtime
 """
 
 import json
 import sys
 from pathlib import Path
-from collections import defaultdict, Counter
-from typing import Dict, List, Set, Tuple
+from collections import Counter
+from typing import Dict, List, Optional, Set, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 import re
 import argparse
 
+import numpy as np
+
 # Import the grape varieties model
 sys.path.insert(0, str(Path(__file__).parent))
+from includes import instrumentation
+from includes.generated_files import GeneratedFiles
 from includes.grape_varieties import GrapeVarietiesModel
+from includes.province_pages import province_page_snapshot, render_province_page, render_province_pages
+from includes.wine_facts import WineFactTable, load_wine_facts
+
+
+# Species classes used by the per-variety attribute table
+SPECIES_VINIFERA = 0
+SPECIES_NON_VINIFERA = 1
+SPECIES_UNKNOWN = 2
+SPECIES_BUCKETS = ('vinifera_varieties', 'non_vinifera_varieties', 'unknown_varieties')
+
+MODERN_GRAPE_YEAR = 1980
+
+
+@dataclass
+class VarietyAttributes:
+    """Portfolio attributes needed for regional statistics."""
+    species_class: int
+    crossing_year: Optional[int] = None
+    berry_color: Optional[str] = None
+
+
+def parse_crossing_year(year_of_crossing) -> Optional[int]:
+    """Parse a VIVC crossing year like "1980", "1980s" or "1980-1985"."""
+    if not year_of_crossing:
+        return None
+    try:
+        year_str = str(year_of_crossing).strip()
+        if not year_str or year_str == '0':
+            return None
+        if 's' in year_str:
+            year_str = year_str.replace('s', '')
+        if '-' in year_str:
+            year_str = year_str.split('-')[0]
+        return int(float(year_str))
+    except (ValueError, TypeError):
+        return None  # Skip invalid year data
 
 
 class ProvinceStatsGenerator:
     """Generates detailed wine statistics for each province/region."""
     
-    def __init__(self, min_producers: int = 1):
+    def __init__(self, min_producers: int = 1,
+                 input_file: Path = Path("data/05_wine_producers_final_normalized.jsonl"),
+                 data_dir: str = "data"):
         self.min_producers = min_producers
-        self.grape_model = GrapeVarietiesModel()
+        self.input_file = Path(input_file)
+        self.grape_model = GrapeVarietiesModel(data_dir)
+        self._variety_attributes: Dict[str, VarietyAttributes] = {}
+        self.output = GeneratedFiles("09_province_stats_generator")
         
+    @instrumentation.timed("load.producers")
     def load_producer_data(self) -> List[Dict]:
         """Load the final wine producer dataset."""
-        input_file = Path("data/05_wine_producers_final_normalized.jsonl")
+        input_file = self.input_file
         
         if not input_file.exists():
             print(f"❌ Input file not found: {input_file}")
@@ -79,118 +138,162 @@ class ProvinceStatsGenerator:
         
         return producers
     
-    def is_vinifera(self, variety_name: str) -> bool:
-        """Check if a grape variety is vinifera using portfolio data."""
+    def get_variety_attributes(self, variety_name: str) -> VarietyAttributes:
+        """Look up species class, crossing year and berry colour, memoized per run."""
+        attributes = self._variety_attributes.get(variety_name)
+        if attributes is not None:
+            return attributes
+        
         variety = self.grape_model.get_variety(variety_name)
         if not variety or not variety.portfolio:
-            return None  # Unknown
+            attributes = VarietyAttributes(species_class=SPECIES_UNKNOWN)
+        else:
+            portfolio_data = variety.portfolio
+            species = (portfolio_data.get('species') or '').upper()
+            attributes = VarietyAttributes(
+                species_class=SPECIES_VINIFERA if 'VITIS VINIFERA' in species else SPECIES_NON_VINIFERA,
+                crossing_year=parse_crossing_year(portfolio_data.get('year_of_crossing')),
+                berry_color=portfolio_data.get('berry_skin_color')
+            )
         
-        portfolio_data = variety.portfolio
-        species = portfolio_data.get('species', '').upper()
-        return 'VITIS VINIFERA' in species
+        self._variety_attributes[variety_name] = attributes
+        return attributes
+    
+    def build_variety_attribute_table(self, varieties: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Build species class and crossing year arrays aligned with a variety vocabulary."""
+        species_class = np.full(len(varieties), SPECIES_UNKNOWN, dtype=np.int8)
+        crossing_year = np.zeros(len(varieties), dtype=np.int32)
+        for i, variety_name in enumerate(varieties):
+            attributes = self.get_variety_attributes(variety_name)
+            species_class[i] = attributes.species_class
+            crossing_year[i] = attributes.crossing_year or 0
+        return species_class, crossing_year
+    
+    def is_vinifera(self, variety_name: str) -> bool:
+        """Check if a grape variety is vinifera using portfolio data."""
+        species_class = self.get_variety_attributes(variety_name).species_class
+        if species_class == SPECIES_UNKNOWN:
+            return None  # Unknown
+        return species_class == SPECIES_VINIFERA
     
     def check_modern_grape(self, variety_name: str, stats: dict):
         """Check if a grape variety is modern (crossed after 1980) and add to stats."""
-        variety = self.grape_model.get_variety(variety_name)
-        if not variety or not variety.portfolio:
-            return
-        
-        portfolio_data = variety.portfolio
-        year_of_crossing = portfolio_data.get('year_of_crossing')
-        
-        # Handle various year formats
-        if year_of_crossing:
-            try:
-                # Extract year if it's a string like "1980" or "1980s"
-                year_str = str(year_of_crossing).strip()
-                if year_str and year_str != '0':
-                    # Handle cases like "1980s", "1980-1985", etc.
-                    if 's' in year_str:
-                        year_str = year_str.replace('s', '')
-                    if '-' in year_str:
-                        year_str = year_str.split('-')[0]
-                    
-                    year = int(float(year_str))
-                    if year > 1980:
-                        stats['modern_grapes'][variety_name] = year
-            except (ValueError, TypeError):
-                pass  # Skip invalid year data
+        year = self.get_variety_attributes(variety_name).crossing_year
+        if year and year > MODERN_GRAPE_YEAR:
+            stats['modern_grapes'][variety_name] = year
     
-    def analyze_province_data(self, producers: List[Dict], target_provinces: Set[str] = None) -> Dict[str, Dict]:
-        """Analyze wine data by province."""
-        province_stats = defaultdict(lambda: {
-            'producer_count': 0,
-            'total_wines': 0,
-            'producers_with_wines': 0,
-            'grape_varieties': Counter(),
-            'wine_types': Counter(),
-            'vinifera_varieties': Counter(),
-            'non_vinifera_varieties': Counter(),
-            'unknown_varieties': Counter(),
-            'variety_wine_appearances': Counter(),
-            'modern_grapes': {},  # grape_name: crossing_year for varieties crossed after 1980
-            'producers': [],
-            'producer_data': []  # Full producer data for detailed listings
-        })
-        
-        for producer in producers:
-            state_province = producer.get('state_province', '').strip()
-            if not state_province:
+    @instrumentation.timed("analyze_province_data")
+    def analyze_province_data(self, producers: Optional[List[Dict]], target_provinces: Set[str] = None,
+                              facts: Optional[WineFactTable] = None) -> Dict[str, Dict]:
+        """Analyze wine data by province.
+        
+        When only the fact table is given (worker processes), producer names
+        come from the table and `producer_data` is left empty.
+        """
+        if facts is None:
+            facts = WineFactTable.from_producers(producers)
+        
+        producer_counts = facts.producers_per_province()
+        wine_counts = facts.wines_per_province()
+        producers_with_wines = facts.producers_with_wines_per_province()
+        producer_ids = facts.producer_ids_by_province()
+        
+        province_stats = {}
+        for province_id, province in enumerate(facts.provinces):
+            # Filter by target provinces if specified
+            if target_provinces and province not in target_provinces:
                 continue
             
-            # Filter by target provinces if specified
-            if target_provinces and state_province not in target_provinces:
+            # Filter provinces by minimum producer count
+            if producer_counts[province_id] < self.min_producers:
                 continue
             
-            stats = province_stats[state_province]
-            stats['producer_count'] += 1
-            stats['producers'].append(producer.get('business_name', 'Unknown'))
-            stats['producer_data'].append(producer)  # Store full producer data
+            members = producer_ids.get(province_id, [])
+            if producers is not None:
+                names = [producers[i].get('business_name', 'Unknown') for i in members]
+                producer_data = [producers[i] for i in members]  # Full producer data for detailed listings
+            else:
+                names = [facts.producer_names[i] for i in members]
+                producer_data = []
             
-            # Wine analysis
-            wines = producer.get('wines', []) or []
-            if wines:
-                stats['producers_with_wines'] += 1
-                stats['total_wines'] += len(wines)
-                
-                for wine in wines:
-                    if isinstance(wine, dict):
-                        # Wine types
-                        wine_type = wine.get('type')
-                        if wine_type and isinstance(wine_type, str):
-                            stats['wine_types'][wine_type.strip()] += 1
-                        
-                        # Grape varieties analysis
-                        cepages = wine.get('cepages', []) or []
-                        wine_has_varieties = False
-                        
-                        for cepage in cepages:
-                            if isinstance(cepage, str) and cepage.strip():
-                                variety = cepage.strip()
-                                stats['grape_varieties'][variety] += 1
-                                stats['variety_wine_appearances'][variety] += 1
-                                wine_has_varieties = True
-                                
-                                # Classify as vinifera/non-vinifera
-                                is_vinifera = self.is_vinifera(variety)
-                                if is_vinifera is True:
-                                    stats['vinifera_varieties'][variety] += 1
-                                elif is_vinifera is False:
-                                    stats['non_vinifera_varieties'][variety] += 1
-                                else:
-                                    stats['unknown_varieties'][variety] += 1
-                                
-                                # Check for modern grapes (crossed after 1980)
-                                self.check_modern_grape(variety, stats)
-                        
-        
-        # Filter provinces by minimum producer count
-        filtered_stats = {
-            province: stats for province, stats in province_stats.items() 
-            if stats['producer_count'] >= self.min_producers
-        }
+            province_stats[province] = {
+                'producer_count': int(producer_counts[province_id]),
+                'total_wines': int(wine_counts[province_id]),
+                'producers_with_wines': int(producers_with_wines[province_id]),
+                'grape_varieties': Counter(),
+                'wine_types': Counter(),
+                'vinifera_varieties': Counter(),
+                'non_vinifera_varieties': Counter(),
+                'unknown_varieties': Counter(),
+                'variety_wine_appearances': Counter(),
+                'modern_grapes': {},  # grape_name: crossing_year for varieties crossed after 1980
+                'producers': names,
+                'producer_data': producer_data
+            }
         
-        return dict(filtered_stats)
+        # Wine types per province
+        for province_id, type_id, count in zip(*facts.province_wine_type_counts()):
+            stats = province_stats.get(facts.provinces[province_id])
+            if stats is not None:
+                stats['wine_types'][facts.wine_types[type_id]] = int(count)
+        
+        # Grape varieties per province, classified through the per-variety attribute table
+        pair_provinces, pair_varieties, pair_counts = facts.province_variety_counts()
+        species_class, crossing_year = self.build_variety_attribute_table(facts.varieties)
+        pair_species = species_class[pair_varieties]
+        pair_years = crossing_year[pair_varieties]
+        pair_modern = pair_years > MODERN_GRAPE_YEAR
+        
+        for province_id, variety_id, count, species, year, modern in zip(
+                pair_provinces.tolist(), pair_varieties.tolist(), pair_counts.tolist(),
+                pair_species.tolist(), pair_years.tolist(), pair_modern.tolist()):
+            stats = province_stats.get(facts.provinces[province_id])
+            if stats is None:
+                continue
+            
+            variety = facts.varieties[variety_id]
+            stats['grape_varieties'][variety] = count
+            stats['variety_wine_appearances'][variety] = count
+            stats[SPECIES_BUCKETS[species]][variety] = count
+            if modern:
+                stats['modern_grapes'][variety] = year
+        
+        return province_stats
+    
+    @instrumentation.timed("analyze_province_data_parallel")
+    def analyze_province_data_parallel(self, target_provinces: Set[str] = None,
+                                       workers: int = 2) -> Dict[str, Dict]:
+        """Analyze provinces in worker processes, each handling a subset of provinces.
+        
+        Workers load the fact table from its on-disk cache, so producer
+        records are never pickled between processes.
+        """
+        facts = load_wine_facts(self.input_file)
+        producer_counts = facts.producers_per_province()
+        
+        provinces = [
+            province for province_id, province in enumerate(facts.provinces)
+            if (not target_provinces or province in target_provinces)
+            and producer_counts[province_id] >= self.min_producers
+        ]
+        
+        # Deal provinces out largest first so workers get similar amounts of data
+        by_size = sorted(provinces, key=lambda p: producer_counts[facts.province_id(p)], reverse=True)
+        chunks = [set(by_size[i::workers]) for i in range(workers)]
+        chunks = [chunk for chunk in chunks if chunk]
+        
+        merged = {}
+        with ProcessPoolExecutor(max_workers=len(chunks) or 1) as executor:
+            futures = [
+                executor.submit(_analyze_provinces_worker, str(self.input_file),
+                                chunk, self.min_producers, str(self.grape_model.data_dir))
+                for chunk in chunks
+            ]
+            for future in futures:
+                merged.update(future.result())
+        
+        # Keep the dataset's province order, as in the single-process path
+        return {province: merged[province] for province in provinces if province in merged}
     
     def create_province_slug(self, province_name: str) -> str:
         """Create URL-friendly slug from province name."""
@@ -201,169 +304,15 @@ class ProvinceStatsGenerator:
     
     def generate_markdown_content(self, province: str, stats: Dict, language: str = "en") -> str:
         """Generate markdown content for a province."""
-        slug = self.create_province_slug(province)
-        
-        # Language-specific text
-        if language == "fr":
-            texts = {
-                'title': f"Statistiques vinicoles - {province}",
-                'overview': "Vue d'ensemble",
-                'producers': "Vignobles",
-                'wines_varieties': "Vins et Cépages", 
-                'wine_types': "Types de vins",
-                'variety_classification': "Classification des cépages (par apparitions dans les vins)",
-                'popular_varieties': "Cépages populaires",
-                'total_producers': "Total des vignobles",
-                'producers_with_wines': "Vignobles avec vins catalogués", 
-                'total_wines': "Total des vins",
-                'unique_varieties': "Cépages uniques",
-                'vinifera_count': "Cépages vinifera utilisés",
-                'non_vinifera_count': "Cépages non-vinifera utilisés",
-                'unique_wine_types': "Types de vins uniques",
-                'avg_wines_producer': "Vins par vignoble (moyenne)",
-                'avg_varieties_producer': "Cépages par vignoble (moyenne)",
-                'vinifera_percent': "Vinifera (%)",
-                'non_vinifera_percent': "Non-vinifera (%)",
-                'unknown_percent': "Classification inconnue (%)",
-                'variety': "Cépage",
-                'wine_appearances': "Apparitions dans les vins",
-                'percentage': "Pourcentage",
-                'wine_type': "Type de vin",
-                'count': "Nombre",
-                'non_vinifera_varieties': "Cépages non-vinifera",
-            }
-        else:
-            texts = {
-                'title': f"Wine Statistics - {province}",
-                'overview': "Overview",
-                'producers': "Producers", 
-                'wines_varieties': "Wines & Varieties",
-                'wine_types': "Wine Types",
-                'variety_classification': "Grape Variety Classification (by wine appearances)",
-                'popular_varieties': "Popular Grape Varieties",
-                'total_producers': "Total Producers",
-                'producers_with_wines': "Producers with catalogued wines",
-                'total_wines': "Total Wines",
-                'unique_varieties': "Unique Grape Varieties",
-                'vinifera_count': "Vinifera varieties used",
-                'non_vinifera_count': "Non-vinifera varieties used",
-                'unique_wine_types': "Unique Wine Types", 
-                'avg_wines_producer': "Wines per Producer (avg)",
-                'avg_varieties_producer': "Varieties per Producer (avg)",
-                'vinifera_percent': "Vinifera (%)",
-                'non_vinifera_percent': "Non-vinifera (%)", 
-                'unknown_percent': "Unknown classification (%)",
-                'variety': "Grape Variety",
-                'wine_appearances': "Wine Appearances",
-                'percentage': "Percentage",
-                'wine_type': "Wine Type",
-                'count': "Count",
-                'non_vinifera_varieties': "Non-vinifera Grape Varieties",
-            }
-        
-        # Calculate averages and percentages
-        avg_wines = stats['total_wines'] / stats['producers_with_wines'] if stats['producers_with_wines'] > 0 else 0
-        
-        total_variety_mentions = sum(stats['grape_varieties'].values())
-        avg_varieties = total_variety_mentions / stats['producers_with_wines'] if stats['producers_with_wines'] > 0 else 0
-        
-        # Vinifera classification percentages
-        total_variety_classifications = sum(stats['vinifera_varieties'].values()) + sum(stats['non_vinifera_varieties'].values()) + sum(stats['unknown_varieties'].values())
-        vinifera_percent = (sum(stats['vinifera_varieties'].values()) / total_variety_classifications * 100) if total_variety_classifications > 0 else 0
-        non_vinifera_percent = (sum(stats['non_vinifera_varieties'].values()) / total_variety_classifications * 100) if total_variety_classifications > 0 else 0
-        unknown_percent = (sum(stats['unknown_varieties'].values()) / total_variety_classifications * 100) if total_variety_classifications > 0 else 0
-        
-        # Generate map link
-        import urllib.parse
-        encoded_province = urllib.parse.quote_plus(province)
-        map_link = f"[🗺️ View producers on interactive map](/producer-map/?state={encoded_province})"
-        
-        # Generate markdown
-        lines = [
-            f"# {texts['title']}",
-            "",
-            map_link,
-            "",
-            f"## {texts['overview']}",
-            "",
-            f"| Metric | Value |",
-            f"|--------|-------|",
-            f"| {texts['total_producers']} | {stats['producer_count']:,} |",
-            f"| {texts['producers_with_wines']} | {stats['producers_with_wines']:,} |",
-            f"| {texts['total_wines']} | {stats['total_wines']:,} |",
-            f"| {texts['unique_varieties']} | {len(stats['grape_varieties'])} |",
-            f"| {texts['vinifera_count']} | {len(stats['vinifera_varieties'])} |",
-            f"| {texts['non_vinifera_count']} | {len(stats['non_vinifera_varieties'])} |",
-            f"| {texts['unique_wine_types']} | {len(stats['wine_types'])} |",
-            f"| {texts['avg_wines_producer']} | {avg_wines:.1f} |",
-            f"| {texts['avg_varieties_producer']} | {avg_varieties:.1f} |",
-            "",
-        ]
-        
-        # Variety classification section
-        if total_variety_classifications > 0:
-            lines.extend([
-                f"## {texts['variety_classification']}",
-                "",
-                f"| Classification | Percentage |",
-                f"|---------------|------------|",
-                f"| {texts['vinifera_percent']} | {vinifera_percent:.1f}% |",
-                f"| {texts['non_vinifera_percent']} | {non_vinifera_percent:.1f}% |",
-                f"| {texts['unknown_percent']} | {unknown_percent:.1f}% |",
-                "",
-            ])
-        
-        # Popular varieties section
-        if stats['variety_wine_appearances']:
-            # Add classification text based on language
-            classification_text = "Classification" if language == "en" else "Classification"
-            
-            lines.extend([
-                f"## {texts['popular_varieties']}",
-                "",
-                f"| {texts['variety']} | {texts['wine_appearances']} | {texts['percentage']} | {classification_text} |",
-                f"|-------------|----------|------------|------------|",
-            ])
-            
-            total_wine_appearances = sum(stats['variety_wine_appearances'].values())
-            for variety, appearances in stats['variety_wine_appearances'].most_common():
-                percentage = (appearances / total_wine_appearances * 100) if total_wine_appearances > 0 else 0
-                
-                # Determine classification
-                classification = "Unknown"
-                if variety in stats['vinifera_varieties']:
-                    classification = "Vinifera"
-                elif variety in stats['non_vinifera_varieties']:
-                    classification = "Resistant" if language == "en" else "Résistant"
-                elif variety == "Unknown":
-                    classification = "Unknown" if language == "en" else "Inconnu"
-                
-                lines.append(f"| {variety} | {appearances} | {percentage:.1f}% | {classification} |")
-            
-            lines.append("")
-        
-        
-        # Wine types section
-        if stats['wine_types']:
-            lines.extend([
-                f"## {texts['wine_types']}",
-                "",
-                f"| {texts['wine_type']} | {texts['count']} | {texts['percentage']} |",
-                f"|-----------|-------|------------|",
-            ])
-            
-            total_wines_with_types = sum(stats['wine_types'].values())
-            for wine_type, count in stats['wine_types'].most_common():
-                percentage = (count / total_wines_with_types * 100) if total_wines_with_types > 0 else 0
-                lines.append(f"| {wine_type} | {count} | {percentage:.1f}% |")
-            
-            lines.append("")
-        
-        
-        return "\n".join(lines)
+        return render_province_page(province, province_page_snapshot(stats), language)
     
-    def generate_all_province_pages(self, province_stats: Dict[str, Dict]):
-        """Generate markdown pages for all provinces in both languages."""
+    @instrumentation.timed("write.province_pages")
+    def generate_all_province_pages(self, province_stats: Dict[str, Dict], workers: int = 1):
+        """Generate markdown pages for all provinces in both languages.
+        
+        Pages are rendered from compact stats snapshots (in worker processes
+        if workers > 1) and written here.
+        """
         print(f"📝 Generating province statistics pages...")
         
         # Ensure output directories exist
@@ -374,28 +323,24 @@ class ProvinceStatsGenerator:
         
         generated_pages = []
         
+        with instrumentation.timer("render.province_pages"):
+            snapshots = {province: province_page_snapshot(stats) for province, stats in province_stats.items()}
+            rendered = render_province_pages(snapshots, workers)
+        
         for province, stats in province_stats.items():
             slug = self.create_province_slug(province)
             
-            # Generate English page
-            en_content = self.generate_markdown_content(province, stats, "en")
-            en_file = en_dir / f"{slug}.md"
-            
-            with open(en_file, 'w', encoding='utf-8') as f:
-                f.write(en_content)
-            
-            # Generate French page  
-            fr_content = self.generate_markdown_content(province, stats, "fr")
-            fr_file = fr_dir / f"{slug}.md"
-            
-            with open(fr_file, 'w', encoding='utf-8') as f:
-                f.write(fr_content)
+            # English and French pages
+            en_changed = self.output.write_text(en_dir / f"{slug}.md", rendered[province]["en"])
+            fr_changed = self.output.write_text(fr_dir / f"{slug}.md", rendered[province]["fr"])
             
             generated_pages.append((province, slug, stats['producer_count'], stats['total_wines']))
-            print(f"   ✅ {province}: {stats['producer_count']} producers, {stats['total_wines']} wines")
+            status = "✅" if en_changed or fr_changed else "⏭️ "
+            print(f"   {status} {province}: {stats['producer_count']} producers, {stats['total_wines']} wines")
         
         return generated_pages
 
+    @instrumentation.timed("write.regions_index")
     def generate_regions_index(self, province_stats: Dict[str, Dict]):
         """Generate index pages for all regions in both languages."""
         print(f"📝 Generating regions index pages...")
@@ -409,16 +354,12 @@ class ProvinceStatsGenerator:
         # Generate English index
         en_content = self.generate_index_markdown(province_stats, "en")
         en_file = en_dir / "index.md"
-        
-        with open(en_file, 'w', encoding='utf-8') as f:
-            f.write(en_content)
+        self.output.write_text(en_file, en_content)
         
         # Generate French index  
         fr_content = self.generate_index_markdown(province_stats, "fr")
         fr_file = fr_dir / "index.md"
-        
-        with open(fr_file, 'w', encoding='utf-8') as f:
-            f.write(fr_content)
+        self.output.write_text(fr_file, fr_content)
         
         print(f"   ✅ Index pages generated: English + French")
         
@@ -484,6 +425,7 @@ class ProvinceStatsGenerator:
         
         return "\n".join(lines)
 
+    @instrumentation.timed("write.cards_data")
     def generate_cards_data(self, province_stats: Dict[str, Dict]):
         """Generate JSON data file for Instagram cards."""
         print(f"📊 Generating cards data file...")
@@ -553,18 +495,31 @@ class ProvinceStatsGenerator:
         
         # Write JSON file
         output_file = cards_dir / "regions_data.json"
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(cards_data, f, indent=2, ensure_ascii=False)
+        self.output.write_json(output_file, cards_data, indent=2, ensure_ascii=False)
         
         print(f"   ✅ Cards data file generated: {output_file}")
         return output_file
 
 
+def _analyze_provinces_worker(input_file: str, provinces: Set[str], min_producers: int,
+                              data_dir: str) -> Dict[str, Dict]:
+    """Process-pool entry point: analyze a subset of provinces."""
+    generator = ProvinceStatsGenerator(min_producers=min_producers, input_file=Path(input_file),
+                                       data_dir=data_dir)
+    facts = load_wine_facts(generator.input_file)
+    return generator.analyze_province_data(None, provinces, facts)
+
+
+@instrumentation.profiled_stage("09_province_stats_generator")
 def main():
     """Main function to generate per-province statistics."""
     parser = argparse.ArgumentParser(description="Generate per-province wine statistics")
     parser.add_argument("--provinces", help="Comma-separated list of specific provinces to generate (optional)")
     parser.add_argument("--min-producers", type=int, default=1, help="Minimum number of producers required for a province page")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Split province analysis and page rendering across this many worker processes")
+    parser.add_argument("--prune", action="store_true",
+                        help="Delete pages generated by earlier runs but not by this one (ignored with --provinces)")
     
     args = parser.parse_args()
     
@@ -580,19 +535,28 @@ def main():
     # Initialize generator
     generator = ProvinceStatsGenerator(min_producers=args.min_producers)
     
-    # Load data
-    print("📥 Loading wine producer dataset...")
-    producers = generator.load_producer_data()
-    
-    if not producers:
-        print("❌ No producer data found")
-        return
-    
-    print(f"   Loaded {len(producers):,} producers")
-    
-    # Analyze by province
-    print("📊 Analyzing data by province...")
-    province_stats = generator.analyze_province_data(producers, target_provinces)
+    if args.workers > 1:
+        if not generator.input_file.exists():
+            print(f"❌ Input file not found: {generator.input_file}")
+            print("❌ No producer data found")
+            return
+        
+        print(f"📊 Analyzing data by province with {args.workers} worker processes...")
+        province_stats = generator.analyze_province_data_parallel(target_provinces, args.workers)
+    else:
+        # Load data
+        print("📥 Loading wine producer dataset...")
+        producers = generator.load_producer_data()
+        
+        if not producers:
+            print("❌ No producer data found")
+            return
+        
+        print(f"   Loaded {len(producers):,} producers")
+        
+        # Analyze by province
+        print("📊 Analyzing data by province...")
+        province_stats = generator.analyze_province_data(producers, target_provinces)
     
     if not province_stats:
         print("❌ No provinces meet the minimum producer threshold")
@@ -601,7 +565,7 @@ def main():
     print(f"   Found {len(province_stats)} provinces with ≥{args.min_producers} producers")
     
     # Generate pages
-    generated_pages = generator.generate_all_province_pages(province_stats)
+    generated_pages = generator.generate_all_province_pages(province_stats, args.workers)
     
     # Generate index pages
     generator.generate_regions_index(province_stats)
@@ -609,6 +573,9 @@ def main():
     # Generate cards data file
     generator.generate_cards_data(province_stats)
     
+    # A --provinces run only regenerates some pages: keep the others in the manifest
+    write_report = generator.output.finish(prune=args.prune, complete=target_provinces is None)
+    
     # Summary
     total_producers = sum(stats['producer_count'] for stats in province_stats.values())
     total_wines = sum(stats['total_wines'] for stats in province_stats.values())
@@ -618,6 +585,7 @@ def main():
     print(f"   Total producers: {total_producers:,}")
     print(f"   Total wines: {total_wines:,}")
     print(f"   Pages generated: {len(generated_pages) * 2} (English + French)")
+    generator.output.print_report(write_report)
     
     print(f"\n📁 Generated pages:")
     for province, slug, producer_count, wine_count in sorted(generated_pages, key=lambda x: x[2], reverse=True):
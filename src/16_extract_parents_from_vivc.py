@@ -15,6 +15,7 @@ OUTPUTS:
 
 DEPENDENCIES:
 - includes.vivc_client for direct VIVC passport fetching
+  (served from the offline mirror, includes/vivc_mirror.py, when built)
 - includes.grape_varieties.GrapeVarietiesModel
 
 USAGE:
@@ -37,6 +38,7 @@ from collections import deque
 # Import our modules
 from includes.grape_varieties import GrapeVarietiesModel, GrapeVariety
 from includes.vivc_client import get_passport_data
+from includes import instrumentation
 
 
 class ParentExtractor:
@@ -128,7 +130,8 @@ class ParentExtractor:
         try:
             # Fetch passport data directly from VIVC
             print(f"    📋 Fetching passport data for {name} (VIVC: {vivc_number})...")
-            passport_data = get_passport_data(vivc_number)
+            with instrumentation.timer("vivc.passport"):
+                passport_data = get_passport_data(vivc_number)
             
             # Create lowercase alias
             alias = name.lower()
@@ -156,11 +159,13 @@ class ParentExtractor:
             self.varieties_model.save_jsonl()
             
             print(f"    ✅ Added parent variety: {name}")
+            instrumentation.count("parents.added")
             self.new_varieties_added += 1
             return True
             
         except Exception as e:
             print(f"    ⚠️  Error fetching {name} (VIVC: {vivc_number}): {e}")
+            instrumentation.count("parents.errors")
             self.errors_encountered += 1
             return False
     
@@ -272,6 +277,7 @@ class ParentExtractor:
         print(f"  Errors encountered: {stats['errors_encountered']}")
 
 
+@instrumentation.profiled_stage("16_extract_parents_from_vivc")
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(
@@ -30,9 +30,10 @@ from dataclasses import dataclass
 
 # Import our modules
 from includes.grape_varieties import GrapeVarietiesModel
+from includes import instrumentation
 
 
-@dataclass
+@dataclass(slots=True)
 class TreeNode:
     """Represents a node in the grape variety tree."""
     name: str
@@ -192,16 +193,7 @@ class TreeViewerGenerator:
     
     def _find_variety_by_vivc_id(self, vivc_id: str) -> Optional[str]:
         """Find variety name by VIVC ID from portfolio data."""
-        if not vivc_id:
-            return None
-        
-        all_varieties = self.varieties_model.get_all_varieties()
-        for variety in all_varieties:
-            if variety.portfolio and isinstance(variety.portfolio, dict):
-                grape_info = variety.portfolio.get('grape', {})
-                if isinstance(grape_info, dict) and grape_info.get('vivc_number') == vivc_id:
-                    return variety.name
-        return None
+        return self.varieties_model.find_variety_by_vivc_number(vivc_id)
     
     def build_tree_for_variety(self, variety_name: str, max_depth: int = 10) -> Optional[TreeNode]:
         """Build a complete tree for a specific variety."""
@@ -596,6 +588,7 @@ class TreeViewerGenerator:
         else:
             return '❓'
     
+    @instrumentation.timed("build.tree_data")
     def generate_tree_data(self) -> Dict[str, Any]:
         """Generate tree data for all grape varieties."""
         print("🌳 Building tree data for all grape varieties...")
@@ -625,6 +618,7 @@ class TreeViewerGenerator:
         import json
         return json.dumps(self.COUNTRY_FLAGS, indent=20, ensure_ascii=False)
 
+    @instrumentation.timed("render.html")
     def generate_html_template(self, tree_data: Dict[str, Any]) -> str:
         """Generate the complete HTML template with embedded data."""
         return f'''<!DOCTYPE html>
@@ -1514,7 +1508,7 @@ class TreeViewerGenerator:
         output_file.parent.mkdir(parents=True, exist_ok=True)
         
         print(f"💾 Writing HTML file to {output_file}...")
-        with open(output_file, 'w', encoding='utf-8') as f:
+        with instrumentation.timer("write.html"), open(output_file, 'w', encoding='utf-8') as f:
             f.write(html_content)
         
         print(f"✅ Tree viewer generated: {output_file}")
@@ -1523,6 +1517,7 @@ class TreeViewerGenerator:
         return output_file
 
 
+@instrumentation.profiled_stage("17_generate_tree_viewer")
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(
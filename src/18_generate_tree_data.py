@@ -29,10 +29,12 @@ from typing import Dict, List, Set, Optional, Any
 from dataclasses import dataclass
 
 # Import our modules
+from includes import instrumentation
 from includes.grape_varieties import GrapeVarietiesModel
+from includes.wine_facts import load_wine_facts
 
 
-@dataclass
+@dataclass(slots=True)
 class TreeNode:
     """Represents a node in the grape variety tree."""
     name: str
@@ -151,21 +153,9 @@ class TreeDataGenerator:
         
         print("🍷 Loading producer varieties...")
         
-        with open(producer_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                try:
-                    producer = json.loads(line.strip())
-                    wines = producer.get('wines', [])
-                    
-                    for wine in wines:
-                        cepages = wine.get('cepages', [])
-                        if cepages:  # Only include wines with specified grape varieties
-                            for cepage in cepages:
-                                if cepage:  # Skip empty/null cepages
-                                    self.producer_varieties.add(cepage)
-                
-                except json.JSONDecodeError:
-                    continue
+        # Only wines with specified grape varieties contribute cépage rows
+        facts = load_wine_facts(producer_file)
+        self.producer_varieties.update(facts.varieties)
         
         print(f"📊 Found {len(self.producer_varieties)} unique varieties from producers")
     
@@ -209,16 +199,7 @@ class TreeDataGenerator:
     
     def _find_variety_by_vivc_id(self, vivc_id: str) -> Optional[str]:
         """Find variety name by VIVC ID from portfolio data."""
-        if not vivc_id:
-            return None
-        
-        all_varieties = self.varieties_model.get_all_varieties()
-        for variety in all_varieties:
-            if variety.portfolio and isinstance(variety.portfolio, dict):
-                grape_info = variety.portfolio.get('grape', {})
-                if isinstance(grape_info, dict) and grape_info.get('vivc_number') == vivc_id:
-                    return variety.name
-        return None
+        return self.varieties_model.find_variety_by_vivc_number(vivc_id)
     
     def build_tree_for_variety(self, variety_name: str, max_depth: int = 10) -> Optional[TreeNode]:
         """Build a complete tree for a specific variety."""
@@ -567,6 +548,7 @@ class TreeDataGenerator:
         
         return levels
     
+    @instrumentation.timed("build.tree_data")
     def generate_tree_data(self) -> Dict[str, Any]:
         """Generate unified tree data for all grape varieties."""
         print("🌳 Building unified tree data for all grape varieties...")
@@ -666,7 +648,7 @@ class TreeDataGenerator:
         output_file.parent.mkdir(parents=True, exist_ok=True)
         
         print(f"💾 Writing JSON data to {output_file}...")
-        with open(output_file, 'w', encoding='utf-8') as f:
+        with instrumentation.timer("write.tree_data"), open(output_file, 'w', encoding='utf-8') as f:
             json.dump(tree_data, f, indent=2, ensure_ascii=False)
         
         print(f"✅ Tree data generated: {output_file}")
@@ -675,6 +657,7 @@ class TreeDataGenerator:
         return output_file
 
 
+@instrumentation.profiled_stage("18_generate_tree_data")
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Precompressed Static Asset Publisher
+
+Minifies the large generated data files and publishes them under
+content-hashed names with gzip and brotli variants, so the site can cache
+them forever and servers that support precompressed files (and the local
+test-server.py) never compress them per request.
+
+PURPOSE: Asset Publishing - Minified, hashed and precompressed data files for the site
+
+INPUTS:
+- docs/assets/data/wine-producers-final.geojson (stage 06)
+- docs/assets/data/quebec-wineries.geojson
+- docs/cards/regions_data.json (stage 09)
+- grape-tree-react/src/data/tree-data.json (stage 18)
+
+OUTPUTS:
+- {name}.{hash}.{ext} plus .gz / .br variants next to each published asset
+  (tree data goes to grape-tree-react/public/, copied into the site by `npm run build`)
+- docs/assets/data/asset-manifest.json (asset name → hashed URL, encodings, byte sizes)
+- data/manifests/19_precompress_assets.json (files written, for pruning old versions)
+
+DEPENDENCIES:
+- includes.static_assets for minification, hashing and compression
+- includes.generated_files for write-if-changed output and pruning
+- brotli (optional) for .br variants: uv run --with brotli src/19_precompress_assets.py
+
+USAGE:
+# Publish every asset (run after stages 06, 09 and 18, before `npm run build`)
+uv run src/19_precompress_assets.py
+
+# Only the family tree data, gzip only
+uv run src/19_precompress_assets.py --assets tree-data.json --no-brotli
+
+FUNCTIONALITY:
+- Minifies JSON (compact separators, UTF-8) without changing the data
+- Names each minified file after its SHA-256 so URLs change with the content
+- Writes gzip (level 9) and brotli (quality 11) variants of the minified file
+- Merges the hashed URLs into the asset manifest read by wine-map.js and the tree app
+- Only rewrites files whose content changed; removes superseded hashed versions
+- Reports the bytes saved for each asset
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from includes.generated_files import GeneratedFiles
+from includes.static_assets import (
+    ASSETS, DEFAULT_MANIFEST_FILE, brotli, load_asset_manifest, publish_asset, published_files,
+    savings_line, write_asset_manifest
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish minified, hashed and precompressed data assets")
+    parser.add_argument("--assets", nargs="+", choices=[asset.name for asset in ASSETS],
+                        help="Only publish these assets (default: all)")
+    parser.add_argument("--manifest", type=Path, default=DEFAULT_MANIFEST_FILE,
+                        help=f"Asset manifest file (default: {DEFAULT_MANIFEST_FILE})")
+    parser.add_argument("--no-brotli", action="store_true", help="Only write gzip variants")
+    parser.add_argument("--keep-old", action="store_true",
+                        help="Keep superseded hashed files instead of deleting them")
+    args = parser.parse_args()
+
+    selected = [asset for asset in ASSETS if not args.assets or asset.name in args.assets]
+    use_brotli = not args.no_brotli
+    if use_brotli and brotli is None:
+        print("⚠️  brotli not installed, writing gzip variants only (uv run --with brotli ...)")
+
+    print(f"📦 Publishing {len(selected)} static assets")
+    output = GeneratedFiles("19_precompress_assets")
+    previous = load_asset_manifest(args.manifest)
+    entries = {}
+    for asset in selected:
+        if not asset.source.exists():
+            print(f"   ⚠️  {asset.source} not found, skipping")
+            if asset.name in previous:
+                # Keep what an earlier run published for it
+                for path in published_files(asset, previous[asset.name]):
+                    output.keep(path)
+            continue
+        entry = publish_asset(asset, output, use_brotli)
+        entries[asset.name] = entry
+        print(f"   ✅ {savings_line(asset.name, entry['bytes'])}")
+        print(f"      → {entry['url']}")
+
+    write_asset_manifest(output, args.manifest, entries)
+
+    total_source = sum(entry['bytes']['source'] for entry in entries.values())
+    total_served = sum(min(size for key, size in entry['bytes'].items() if key != 'source')
+                       for entry in entries.values())
+    print(f"💾 Total: {total_source:,} B → {total_served:,} B over the wire "
+          f"(saved {total_source - total_served:,} B)")
+
+    # Superseded hashed versions are stale; a subset run leaves the other assets alone
+    report = output.finish(prune=not args.keep_old, complete=not args.assets)
+    output.print_report(report, "files")
+    print(f"🗂️  Manifest: {args.manifest}")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,9 +12,11 @@ OUTPUT: List of normalized producer records in unified format
 import json
 import re
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Any, Dict, Iterator, List
 from datetime import datetime
 
+CANADA_PROVINCE_FILE = Path("data/can/canada_province_wineries.jsonl")
+
 
 def get_full_province_name(province_code: str) -> str:
     """Convert 2-letter province code to full province name."""
@@ -79,37 +81,39 @@ def normalize_canada_province_producer(winery_data: Dict, index: int) -> Dict[st
     }
 
 
-def fetch_canada_province_producers() -> Dict[str, Any]:
+def stream_canada_province_producers(metadata: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
     """
-    Load Canada province winery data from research file.
+    Stream Canada province winery data from the research file.
     
-    Returns:
-        Dict with 'producers' list and 'metadata' dict
+    Args:
+        metadata: Dict filled in place with load metadata (an 'error' key on failure)
     """
-    data_file = Path("data/can/canada_province_wineries.jsonl")
+    data_file = CANADA_PROVINCE_FILE
     
-    metadata = {
+    metadata.update({
         'source_file': str(data_file),
         'fetch_date': datetime.now().isoformat(),
         'method': 'file_load'
-    }
+    })
     
     if not data_file.exists():
         print(f"⚠️ Canada province data file not found: {data_file}")
-        return {
-            'producers': [],
-            'metadata': {**metadata, 'error': f'File not found: {data_file}'}
-        }
+        metadata['error'] = f'File not found: {data_file}'
+        return
     
-    producers = []
-    line_count = 0
-    error_count = 0
-    province_counter = {}  # Track index per province for permit_id generation
+    metadata.update({
+        'lines_processed': 0,
+        'producers_loaded': 0,
+        'parsing_errors': 0,
+        'provinces_found': 0,
+        'province_breakdown': {}
+    })
+    province_counter = metadata['province_breakdown']  # Track index per province for permit_id generation
     
     try:
         with open(data_file, 'r', encoding='utf-8') as f:
             for line_num, line in enumerate(f, 1):
-                line_count += 1
+                metadata['lines_processed'] += 1
                 if line.strip():
                     try:
                         winery_data = json.loads(line.strip())
@@ -118,6 +122,7 @@ def fetch_canada_province_producers() -> Dict[str, Any]:
                         # Increment counter for this province
                         if province_code not in province_counter:
                             province_counter[province_code] = 0
+                            metadata['provinces_found'] += 1
                         province_counter[province_code] += 1
                         
                         # Generate producer record
@@ -125,30 +130,31 @@ def fetch_canada_province_producers() -> Dict[str, Any]:
                             winery_data, 
                             province_counter[province_code]
                         )
-                        producers.append(producer)
+                        metadata['producers_loaded'] += 1
+                        yield producer
                         
                     except json.JSONDecodeError as e:
-                        error_count += 1
+                        metadata['parsing_errors'] += 1
                         print(f"⚠️ Error parsing Canada province data line {line_num}: {str(e)[:100]}")
                         continue
     
     except Exception as e:
         error_msg = f"Failed to load Canada province data: {e}"
         print(f"❌ {error_msg}")
-        return {
-            'producers': [],
-            'metadata': {**metadata, 'error': error_msg}
-        }
-    
-    # Update metadata with results
-    metadata.update({
-        'lines_processed': line_count,
-        'producers_loaded': len(producers), 
-        'parsing_errors': error_count,
-        'provinces_found': len(province_counter),
-        'province_breakdown': dict(province_counter)
-    })
+        metadata['error'] = error_msg
+
+
+def fetch_canada_province_producers() -> Dict[str, Any]:
+    """
+    Load Canada province winery data from research file.
     
+    Returns:
+        Dict with 'producers' list and 'metadata' dict
+    """
+    metadata = {}
+    producers = list(stream_canada_province_producers(metadata))
+    if metadata.get('error'):
+        producers = []
     return {
         'producers': producers,
         'metadata': metadata
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Content Hash Module
+
+SHA-256 helpers for files and file sets, used to decide whether cached or
+generated artifacts are still up to date.
+"""
+
+import glob
+import hashlib
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+
+def file_sha256(path: Path) -> str:
+    """Return the SHA-256 hex digest of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def text_sha256(text: str) -> str:
+    """Return the SHA-256 hex digest of a UTF-8 string."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def expand_paths(patterns: Iterable[str], root: Path = Path(".")) -> Dict[str, Path]:
+    """Expand file names and glob patterns relative to root, sorted by name."""
+    files = {}
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            for match in sorted(root.glob(pattern)):
+                if match.is_file():
+                    files[str(match.relative_to(root))] = match
+        else:
+            files[pattern] = root / pattern
+    return files
+
+
+def path_set_hashes(patterns: Iterable[str], root: Path = Path(".")) -> Dict[str, Optional[str]]:
+    """Hash every file matched by the patterns; missing files map to None."""
+    return {
+        name: file_sha256(path) if path.is_file() else None
+        for name, path in expand_paths(patterns, root).items()
+    }
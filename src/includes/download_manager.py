@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Download Manager
+
+Conditional, resumable downloads for raw source files (TTB CSV, RACJ JSON).
+
+Next to each downloaded file a sidecar `<file>.meta.json` records the URL,
+the ETag / Last-Modified validators, the content SHA-256 and size:
+- Repeat downloads send If-None-Match / If-Modified-Since; a 304 keeps the file
+- Interrupted downloads leave `<file>.part`; the next attempt sends
+  Range + If-Range and appends if the server answers 206 (restarts on 200)
+- The content hash tells callers whether the file really changed, so
+  unchanged sources can skip reprocessing even when the server ignores
+  validators
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from includes import instrumentation
+from includes.content_hash import file_sha256
+
+DEFAULT_TIMEOUT: Tuple[float, float] = (10, 60)  # (connect, read) seconds
+CHUNK_SIZE = 1 << 16
+
+
+@dataclass
+class DownloadResult:
+    """Outcome of a (conditional) download."""
+    path: Path
+    status: str                 # downloaded, resumed, not_modified or failed
+    changed: bool               # content differs from the previously recorded hash
+    sha256: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def available(self) -> bool:
+        """True if a usable copy of the file is on disk."""
+        return self.sha256 is not None
+
+
+def sidecar_path(path: Path) -> Path:
+    return path.with_name(path.name + ".meta.json")
+
+
+def partial_path(path: Path) -> Path:
+    return path.with_name(path.name + ".part")
+
+
+def read_sidecar(path: Path) -> Dict:
+    """Recorded download metadata for a file ({} if none)."""
+    try:
+        with open(sidecar_path(path), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _write_sidecar(path: Path, data: Dict):
+    sidecar = sidecar_path(path)
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=sidecar.parent, prefix=f".{sidecar.name}.",
+                                     suffix=".tmp", delete=False) as f:
+        temp_file = Path(f.name)
+        try:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        except BaseException:
+            f.close()
+            temp_file.unlink(missing_ok=True)
+            raise
+    os.replace(temp_file, sidecar)
+
+
+def recorded_sha256(path: Path) -> Optional[str]:
+    """Content hash from the sidecar, or computed if the sidecar is missing."""
+    if not path.exists():
+        return None
+    sidecar = read_sidecar(path)
+    if sidecar.get('sha256') and sidecar.get('size') == path.stat().st_size:
+        return sidecar['sha256']
+    return file_sha256(path)
+
+
+def download(url: str, dest: Path, timeout=DEFAULT_TIMEOUT,
+             validate: Optional[Callable[[Path], None]] = None) -> DownloadResult:
+    """Download url to dest, conditionally and resuming a previous partial download.
+
+    Args:
+        url: Source URL
+        dest: Destination file; its sidecar and .part file live next to it
+        timeout: requests timeout (connect, read)
+        validate: Called with the completed .part file before it replaces dest;
+                  raising discards the download
+
+    Raises:
+        requests.RequestException / OSError on network or disk errors (the
+        .part file is kept for resuming)
+    """
+    import requests
+
+    dest = Path(dest)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    part = partial_path(dest)
+    sidecar = read_sidecar(dest)
+    if sidecar.get('url') not in (None, url):
+        sidecar = {}
+    partial = sidecar.get('partial') or {}
+
+    headers = {}
+    resume_from = 0
+    if part.exists() and partial.get('url') == url and (partial.get('etag') or partial.get('last_modified')):
+        resume_from = part.stat().st_size
+        headers['Range'] = f"bytes={resume_from}-"
+        headers['If-Range'] = partial.get('etag') or partial['last_modified']
+        # Byte ranges only line up with the stored bytes for an unencoded transfer
+        headers['Accept-Encoding'] = 'identity'
+    elif dest.exists() and sidecar.get('sha256'):
+        if sidecar.get('etag'):
+            headers['If-None-Match'] = sidecar['etag']
+        if sidecar.get('last_modified'):
+            headers['If-Modified-Since'] = sidecar['last_modified']
+
+    with instrumentation.timer("download.request"):
+        response = requests.get(url, headers=headers, stream=True, timeout=timeout)
+    with response:
+        if response.status_code == 304 and dest.exists():
+            instrumentation.count("download.not_modified")
+            return DownloadResult(dest, "not_modified", False, recorded_sha256(dest))
+        if response.status_code == 416 and resume_from:
+            # The partial file no longer fits the remote one: start over
+            part.unlink()
+            _write_sidecar(dest, {key: value for key, value in sidecar.items() if key != 'partial'})
+            return download(url, dest, timeout=timeout, validate=validate)
+        response.raise_for_status()
+
+        digest = hashlib.sha256()
+        if response.status_code == 206 and resume_from:
+            status, mode = "resumed", 'ab'
+            with open(part, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(chunk)
+            expected_size = _content_range_total(response.headers.get('Content-Range'))
+        else:
+            status, mode, resume_from = "downloaded", 'wb', 0
+            length = response.headers.get('Content-Length')
+            expected_size = int(length) if length and length.isdigit() else None
+        if response.headers.get('Content-Encoding', 'identity') != 'identity':
+            # requests decodes gzip/deflate bodies, so the on-disk size differs from the header
+            expected_size = None
+
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        # Remember the validators of this transfer so an interruption can resume with If-Range
+        _write_sidecar(dest, {**sidecar, 'url': url,
+                              'partial': {'url': url, 'etag': etag, 'last_modified': last_modified}})
+
+        received = 0
+        with open(part, mode) as f:
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                f.write(chunk)
+                digest.update(chunk)
+                received += len(chunk)
+
+    size = part.stat().st_size
+    if expected_size is not None and size != expected_size:
+        raise OSError(f"Incomplete download of {url}: {size} of {expected_size} bytes")
+
+    if validate:
+        try:
+            validate(part)
+        except Exception:
+            part.unlink(missing_ok=True)
+            _write_sidecar(dest, {key: value for key, value in sidecar.items() if key != 'partial'})
+            raise
+
+    sha256 = digest.hexdigest()
+    changed = sha256 != sidecar.get('sha256')
+    os.replace(part, dest)
+    _write_sidecar(dest, {
+        'url': url,
+        'etag': etag,
+        'last_modified': last_modified,
+        'sha256': sha256,
+        'size': size,
+        'downloaded_at': datetime.now().isoformat()
+    })
+    instrumentation.count(f"download.{status}")
+    instrumentation.observe("download.bytes", received)
+    return DownloadResult(dest, status, changed, sha256)
+
+
+def _content_range_total(content_range: Optional[str]) -> Optional[int]:
+    """Total size from a 'bytes start-end/total' header."""
+    if content_range and '/' in content_range:
+        total = content_range.rsplit('/', 1)[1].strip()
+        if total.isdigit():
+            return int(total)
+    return None
+
+
+def download_with_fallback(url: str, dest: Path, label: str, timeout=DEFAULT_TIMEOUT,
+                           validate: Optional[Callable[[Path], None]] = None) -> DownloadResult:
+    """download(), falling back to the existing file (status 'failed') on any error."""
+    print(f"   Downloading {label}...")
+    try:
+        result = download(url, dest, timeout=timeout, validate=validate)
+    except Exception as e:
+        print(f"   Error downloading {label}: {e}")
+        if dest.exists():
+            print(f"   Using existing file: {dest}")
+            return DownloadResult(dest, "failed", False, recorded_sha256(dest), error=str(e))
+        return DownloadResult(dest, "failed", False, error=f"Failed to download {label}: {e}")
+
+    if result.status == "not_modified":
+        print(f"   {label} not modified upstream, keeping {dest}")
+    else:
+        print(f"   {'Resumed' if result.status == 'resumed' else 'Downloaded'} {label} to {dest}"
+              f"{'' if result.changed else ' (content unchanged)'}")
+    return result
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+External Sort for JSON Records
+
+Sorts a stream of JSON-serializable records with bounded memory: records are
+buffered in runs of `chunk_size`, each full run is sorted and spilled to a
+temporary JSONL file, and the runs are merged back with heapq.merge. The sort
+is stable, so it gives the same order as list.sort(key=...).
+"""
+
+import heapq
+import json
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+
+DEFAULT_CHUNK_SIZE = 20000
+
+
+def _spill(records: List[Dict], path: Path) -> Path:
+    with open(path, 'w', encoding='utf-8') as f:
+        for record in records:
+            json.dump(record, f, ensure_ascii=False)
+            f.write('\n')
+    return path
+
+
+def _read_run(f) -> Iterator[Dict]:
+    for line in f:
+        yield json.loads(line)
+
+
+def external_sort(records: Iterable[Dict], key: Callable[[Dict], Any],
+                  chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Dict]:
+    """Yield records ordered by key, holding at most chunk_size records in memory while reading."""
+    with tempfile.TemporaryDirectory(prefix="grapegeek-sort-") as temp_dir:
+        runs = []
+        chunk = []
+        for record in records:
+            chunk.append(record)
+            if len(chunk) >= chunk_size:
+                chunk.sort(key=key)
+                runs.append(_spill(chunk, Path(temp_dir) / f"run-{len(runs):05d}.jsonl"))
+                chunk = []
+        chunk.sort(key=key)
+
+        if not runs:
+            yield from chunk
+            return
+
+        files = [open(path, 'r', encoding='utf-8') for path in runs]
+        try:
+            # Ties resolve to the earlier run, which keeps the merge stable
+            yield from heapq.merge(*[_read_run(f) for f in files], iter(chunk), key=key)
+        finally:
+            for f in files:
+                f.close()
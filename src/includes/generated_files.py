@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Generated Files Module
+
+Write-if-changed output for the stages that generate site pages (08, 09).
+A page is only rewritten when its content hash differs from the file on
+disk, so unchanged pages keep their mtime and `mkdocs build` (and its
+git-revision plugin) skip them. Every run records the files it generated
+in a per-stage manifest; files generated by an earlier run but not by this
+one are reported as stale and can be pruned.
+
+Example:
+    output = GeneratedFiles("09_province_stats_generator")
+    output.write_text(Path("docs/en/regions/quebec.md"), content)
+    report = output.finish(prune=args.prune)
+    output.print_report(report)
+"""
+
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from includes import instrumentation
+from includes.content_hash import file_sha256
+
+MANIFEST_DIR = Path("data/manifests")
+
+
+class GeneratedFiles:
+    """Track and write the files generated by one stage."""
+
+    def __init__(self, stage: str, manifest_dir: Path = MANIFEST_DIR):
+        self.stage = stage
+        self.manifest_file = Path(manifest_dir) / f"{stage}.json"
+        self.previous = self._load_manifest()
+        self.files: Dict[str, str] = {}
+        self.written: List[str] = []
+        self.unchanged: List[str] = []
+
+    def write_text(self, path: Path, content: str) -> bool:
+        """Write content unless the file already holds exactly it; returns True if the file changed."""
+        return self.write_bytes(path, content.encode('utf-8'))
+
+    def write_bytes(self, path: Path, data: bytes) -> bool:
+        """Binary equivalent of write_text (compressed assets)."""
+        path = Path(path)
+        digest = hashlib.sha256(data).hexdigest()
+        self.files[path.as_posix()] = digest
+        if path.is_file() and file_sha256(path) == digest:
+            self.unchanged.append(path.as_posix())
+            instrumentation.count("write.unchanged")
+            return False
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(temp_file, 'wb') as f:
+            f.write(data)
+        os.replace(temp_file, path)
+        self.written.append(path.as_posix())
+        instrumentation.count("write.changed")
+        return True
+
+    def write_json(self, path: Path, data, **dump_kwargs) -> bool:
+        """json.dump equivalent of write_text."""
+        return self.write_text(path, json.dumps(data, **dump_kwargs))
+
+    def keep(self, path: Path):
+        """Carry a file generated by an earlier run over without regenerating it."""
+        name = Path(path).as_posix()
+        if name in self.previous:
+            self.files[name] = self.previous[name]
+
+    def finish(self, prune: bool = False, complete: bool = True) -> Dict:
+        """Save the manifest and report stale files (generated before, not in this run).
+
+        Args:
+            prune: Delete stale files
+            complete: False for partial runs (e.g. a --provinces subset): earlier
+                entries are kept and nothing is considered stale
+        """
+        stale = []
+        if complete:
+            stale = sorted(name for name in set(self.previous) - set(self.files) if Path(name).is_file())
+        pruned = []
+        if prune:
+            for name in stale:
+                Path(name).unlink()
+                pruned.append(name)
+            stale = []
+
+        files = dict(self.files) if complete else {**self.previous, **self.files}
+        # Unpruned stale files stay listed so a later --prune still finds them
+        files.update({name: self.previous[name] for name in stale})
+        self._save_manifest(files)
+
+        return {
+            'written': len(self.written),
+            'unchanged': len(self.unchanged),
+            'stale': stale,
+            'pruned': pruned,
+        }
+
+    @staticmethod
+    def print_report(report: Dict, noun: str = "pages"):
+        print(f"📝 {noun.capitalize()}: {report['written']} written, {report['unchanged']} unchanged (skipped)")
+        for name in report['pruned']:
+            print(f"   🗑️  Pruned stale {noun[:-1]}: {name}")
+        if report['stale']:
+            print(f"   ⚠️  {len(report['stale'])} stale {noun} no longer generated (rerun with --prune to delete):")
+            for name in report['stale']:
+                print(f"      {name}")
+
+    def _load_manifest(self) -> Dict[str, str]:
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                return json.load(f).get('files', {})
+        except (OSError, ValueError):
+            return {}
+
+    def _save_manifest(self, files: Dict[str, str]):
+        if files == self.previous and self.manifest_file.exists():
+            return  # keep the manifest byte-identical when nothing changed
+        self.manifest_file.parent.mkdir(parents=True, exist_ok=True)
+        manifest = {
+            'stage': self.stage,
+            'updated_at': datetime.now().isoformat(),
+            'files': dict(sorted(files.items())),
+        }
+        with open(self.manifest_file, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+            f.write('\n')
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+GeoJSON Writer Module
+
+Streams GeoJSON FeatureCollections to disk one feature at a time in compact
+form (no indentation), and partitions features into slippy-map z/x/y tiles
+or per-province shards with a small index so the map can fetch only what
+it needs.
+"""
+
+import json
+import math
+import re
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+
+COMPACT_SEPARATORS = (',', ':')
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=COMPACT_SEPARATORS)
+
+
+class GeoJSONStreamWriter:
+    """Write a FeatureCollection incrementally.
+
+    Features are written as they arrive; the optional metadata object is
+    written after the feature array when the writer is closed. Output goes
+    to a uniquely named temp file that replaces the target only on a clean
+    close; `finish` and `commit` split the close for writers that must all
+    succeed before any of them is renamed.
+    """
+
+    def __init__(self, output_file: Path):
+        self.output_file = Path(output_file)
+        self.tmp_file: Optional[Path] = None
+        self.feature_count = 0
+        self.bytes_written = 0
+        self._file = None
+
+    def __enter__(self) -> 'GeoJSONStreamWriter':
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def open(self):
+        self.output_file.parent.mkdir(parents=True, exist_ok=True)
+        self._file = tempfile.NamedTemporaryFile(
+            'w', encoding='utf-8', dir=self.output_file.parent,
+            prefix=f".{self.output_file.name}.", suffix='.tmp', delete=False)
+        self.tmp_file = Path(self._file.name)
+        self._write('{"type":"FeatureCollection","features":[')
+
+    def _write(self, text: str):
+        self._file.write(text)
+        self.bytes_written += len(text.encode('utf-8'))
+
+    def write_feature(self, feature: Dict):
+        if self.feature_count:
+            self._write(',')
+        self._write(_dumps(feature))
+        self.feature_count += 1
+
+    def finish(self, metadata: Optional[Dict] = None):
+        """Complete the temp file without moving it into place."""
+        if self._file is None:
+            return
+        self._write(']')
+        if metadata is not None:
+            self._write(',"metadata":' + _dumps(metadata))
+        self._write('}')
+        self._file.close()
+        self._file = None
+
+    def commit(self):
+        """Move a finished temp file over the target."""
+        if self._file is None and self.tmp_file is not None:
+            self.tmp_file.replace(self.output_file)
+            self.tmp_file = None
+
+    def close(self, metadata: Optional[Dict] = None):
+        self.finish(metadata)
+        self.commit()
+
+    def abort(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.tmp_file is not None:
+            self.tmp_file.unlink(missing_ok=True)
+            self.tmp_file = None
+
+
+class PartitionedGeoJSONWriter:
+    """Route features to one GeoJSONStreamWriter per partition key.
+
+    `partition_for` maps a feature to a relative path (without extension),
+    e.g. "6/18/22" for a tile or "quebec" for a province shard. Writers are
+    opened lazily; an index with counts and bounding boxes is written on close.
+    Nothing is renamed into `output_dir` until every partition and the index
+    are complete, and an exception inside the `with` block removes them all.
+    """
+
+    def __init__(self, output_dir: Path, partition_for: Callable[[Dict], Optional[str]],
+                 index_info: Optional[Dict] = None):
+        self.output_dir = Path(output_dir)
+        self.partition_for = partition_for
+        self.index_info = index_info or {}
+        self.writers: Dict[str, GeoJSONStreamWriter] = {}
+        self.bounds: Dict[str, list] = {}
+        self.index_file: Optional[Path] = None
+
+    def __enter__(self) -> 'PartitionedGeoJSONWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write_feature(self, feature: Dict):
+        key = self.partition_for(feature)
+        if key is None:
+            return
+
+        writer = self.writers.get(key)
+        if writer is None:
+            writer = GeoJSONStreamWriter(self.output_dir / f"{key}.geojson")
+            writer.open()
+            self.writers[key] = writer
+            self.bounds[key] = [math.inf, math.inf, -math.inf, -math.inf]
+
+        lon, lat = feature['geometry']['coordinates'][:2]
+        bbox = self.bounds[key]
+        bbox[0], bbox[1] = min(bbox[0], lon), min(bbox[1], lat)
+        bbox[2], bbox[3] = max(bbox[2], lon), max(bbox[3], lat)
+        writer.write_feature(feature)
+
+    @property
+    def bytes_written(self) -> int:
+        return sum(writer.bytes_written for writer in self.writers.values())
+
+    def close(self) -> Path:
+        """Close every partition and write index.json; return the index path."""
+        if self.index_file is not None:
+            return self.index_file
+
+        index_file = self.output_dir / 'index.json'
+        tmp_index = None
+        try:
+            partitions = {}
+            for key in sorted(self.writers):
+                writer = self.writers[key]
+                writer.finish()
+                partitions[key] = {
+                    'url': f"{key}.geojson",
+                    'count': writer.feature_count,
+                    'bytes': writer.bytes_written,
+                    'bbox': [round(v, 6) for v in self.bounds[key]]
+                }
+
+            index = dict(self.index_info)
+            index['partitions'] = partitions
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=self.output_dir,
+                                             prefix='.index.json.', suffix='.tmp', delete=False) as f:
+                tmp_index = Path(f.name)
+                f.write(_dumps(index))
+
+            for writer in self.writers.values():
+                writer.commit()
+            tmp_index.replace(index_file)
+        except BaseException:
+            self.abort()
+            if tmp_index is not None:
+                tmp_index.unlink(missing_ok=True)
+            raise
+
+        self.index_file = index_file
+        return index_file
+
+    def abort(self):
+        """Remove the temp files of every partition that was not committed."""
+        for writer in self.writers.values():
+            writer.abort()
+
+
+def lonlat_to_tile(lon: float, lat: float, zoom: int) -> Tuple[int, int]:
+    """Slippy-map (Web Mercator) tile coordinates containing a point."""
+    lat = max(min(lat, 85.05112878), -85.05112878)
+    n = 2 ** zoom
+    x = int((lon + 180.0) / 360.0 * n)
+    lat_rad = math.radians(lat)
+    y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def tile_partitioner(zoom: int) -> Callable[[Dict], str]:
+    """Partition features into z/x/y tiles at a fixed zoom level."""
+    def partition_for(feature: Dict) -> str:
+        lon, lat = feature['geometry']['coordinates'][:2]
+        x, y = lonlat_to_tile(lon, lat, zoom)
+        return f"{zoom}/{x}/{y}"
+    return partition_for
+
+
+def province_slug(province_name: str) -> str:
+    """Create URL-friendly slug from province name."""
+    slug = re.sub(r'[^\w\s-]', '', province_name.lower())
+    slug = re.sub(r'[\s_]+', '-', slug)
+    return slug.strip('-')
+
+
+def province_partitioner(feature: Dict) -> str:
+    """Partition features by their state/province."""
+    province = (feature['properties'].get('state_province') or '').strip()
+    return province_slug(province) if province else 'unknown'
+
+
+def format_bytes(size: int) -> str:
+    """Human-readable byte count."""
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024 or unit == 'MB':
+            return f"{size:,.0f} {unit}" if unit == 'B' else f"{size:,.1f} {unit}"
+        size /= 1024
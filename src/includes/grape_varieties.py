@@ -3,15 +3,36 @@
 Grape Varieties Model
 
 Manages grape variety mappings and aliases with VIVC enrichment data.
+A binary snapshot of the model (see variety_snapshot.py) is kept under
+data/cache/ and memory-mapped while the JSONL's mtime (or, failing that, its
+content hash) matches; varieties are then built on first access.
 """
 
 import json
+import sys
+from collections.abc import MutableMapping
 from pathlib import Path
-from typing import Dict, List, Optional, Set
-from dataclasses import dataclass, asdict
+from typing import Dict, Iterator, List, Optional, Set
+from dataclasses import dataclass
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from includes import instrumentation
+from includes.content_hash import file_sha256
+from includes.variety_snapshot import (
+    SourceStamp, VarietySnapshot, restamp_snapshot, snapshot_supported, write_snapshot
+)
 
-@dataclass
+
+def _copy_json(value):
+    """Deep copy of JSON-shaped data (dicts, lists and scalars)."""
+    if isinstance(value, dict):
+        return {key: _copy_json(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy_json(item) for item in value]
+    return value
+
+
+@dataclass(slots=True)
 class GrapeId:
     """Grape identifier with name and VIVC number."""
     name: Optional[str] = None
@@ -26,9 +47,13 @@ class GrapeId:
             return f"VIVC {self.vivc_number}"
         else:
             return "Unknown"
+    
+    def to_dict(self) -> dict:
+        """Convert to dictionary format."""
+        return {'name': self.name, 'vivc_number': self.vivc_number}
 
 
-@dataclass
+@dataclass(slots=True)
 class PassportData:
     """Structured passport data for a grape variety."""
     grape: GrapeId
@@ -44,14 +69,25 @@ class PassportData:
     
     def to_dict(self) -> dict:
         """Convert to dictionary format."""
-        return asdict(self)
+        return {
+            'grape': self.grape.to_dict(),
+            'berry_skin_color': self.berry_skin_color,
+            'country_of_origin': self.country_of_origin,
+            'species': self.species,
+            'parent1': self.parent1.to_dict() if self.parent1 else None,
+            'parent2': self.parent2.to_dict() if self.parent2 else None,
+            'sex_of_flower': self.sex_of_flower,
+            'number_of_photos': self.number_of_photos,
+            'year_of_crossing': self.year_of_crossing,
+            'synonyms': list(self.synonyms) if self.synonyms is not None else None
+        }
     
     def to_json(self, indent: int = 2) -> str:
         """Convert to JSON format."""
         return json.dumps(self.to_dict(), indent=indent)
 
 
-@dataclass
+@dataclass(slots=True)
 class GrapeVariety:
     """Model for a grape variety with its aliases and portfolio data."""
     name: str
@@ -63,41 +99,154 @@ class GrapeVariety:
     no_wine: Optional[int] = None  # 1 if variety not referenced by any wine producers
     
     def to_dict(self) -> Dict:
-        """Convert to dictionary format."""
-        return asdict(self)
+        """Convert to dictionary format (aliases and portfolio are copied)."""
+        return {
+            'name': self.name,
+            'aliases': list(self.aliases),
+            'grape': self.grape,
+            'portfolio': _copy_json(self.portfolio),
+            'vivc_assignment_status': self.vivc_assignment_status,
+            'notes': self.notes,
+            'no_wine': self.no_wine
+        }
+    
+    def to_record(self) -> Dict:
+        """Field dict sharing this variety's aliases and portfolio, for read-only serialization."""
+        return {
+            'name': self.name,
+            'aliases': self.aliases,
+            'grape': self.grape,
+            'portfolio': self.portfolio,
+            'vivc_assignment_status': self.vivc_assignment_status,
+            'notes': self.notes,
+            'no_wine': self.no_wine
+        }
     
     def to_jsonl_entry(self) -> str:
         """Convert to JSONL format, excluding null fields."""
-        data = self.to_dict()
+        data = self.to_record()
         # Remove notes field if it's None
-        if 'notes' in data and data['notes'] is None:
+        if data['notes'] is None:
             del data['notes']
         # Remove no_wine field if it's None
-        if 'no_wine' in data and data['no_wine'] is None:
+        if data['no_wine'] is None:
             del data['no_wine']
         return json.dumps(data, ensure_ascii=False)
 
 
+def _portfolio_vivc_number(variety: GrapeVariety) -> Optional[str]:
+    if variety.portfolio and isinstance(variety.portfolio, dict):
+        grape_info = variety.portfolio.get('grape', {})
+        if isinstance(grape_info, dict):
+            return grape_info.get('vivc_number')
+    return None
+
+
+class LazyVarieties(MutableMapping):
+    """Name -> GrapeVariety mapping backed by a snapshot.
+    
+    Keys are known up front in file order; each GrapeVariety (and its
+    portfolio JSON) is only built the first time it is looked up.
+    """
+    
+    def __init__(self, snapshot: VarietySnapshot):
+        self._snapshot = snapshot
+        self._rows = {name: row for row, name in enumerate(snapshot.names())}
+        self._data: Dict[str, Optional[GrapeVariety]] = dict.fromkeys(self._rows)
+        self._vivc_numbers: Optional[Dict[str, Optional[str]]] = None
+    
+    def __getitem__(self, name: str) -> GrapeVariety:
+        variety = self._data[name]
+        if variety is None:
+            variety = GrapeVariety(**self._snapshot.record(self._rows[name]))
+            self._data[name] = variety
+        return variety
+    
+    def __setitem__(self, name: str, variety: GrapeVariety):
+        self._data[name] = variety
+    
+    def __delitem__(self, name: str):
+        del self._data[name]
+        self._rows.pop(name, None)
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+    
+    def __len__(self) -> int:
+        return len(self._data)
+    
+    def __contains__(self, name) -> bool:
+        return name in self._data
+    
+    def values(self):
+        self._materialize_all()
+        return self._data.values()
+    
+    def items(self):
+        self._materialize_all()
+        return self._data.items()
+    
+    def _materialize_all(self):
+        for name, variety in self._data.items():
+            if variety is None:
+                self._data[name] = GrapeVariety(**self._snapshot.record(self._rows[name]))
+    
+    def is_materialized(self, name: str) -> bool:
+        """True once the variety has been built (or was assigned directly)."""
+        return self._data.get(name) is not None
+    
+    def find_by_vivc_number(self, vivc_number: str) -> Optional[str]:
+        """First variety with this VIVC number, using the snapshot column for unbuilt varieties."""
+        if self._vivc_numbers is None:
+            self._vivc_numbers = {name: self._snapshot.vivc_number(row) for name, row in self._rows.items()}
+        for name, variety in self._data.items():
+            found = self._vivc_numbers.get(name) if variety is None else _portfolio_vivc_number(variety)
+            if found == vivc_number:
+                return name
+        return None
+    
+    def __repr__(self) -> str:
+        return f"LazyVarieties({len(self._data)} varieties)"
+
+
 class GrapeVarietiesModel:
     """Model for managing grape variety data."""
     
-    def __init__(self, data_dir: str = "data"):
+    def __init__(self, data_dir: str = "data", use_snapshot: bool = True):
         self.data_dir = Path(data_dir)
         self.jsonl_file = self.data_dir / "grape_variety_mapping.jsonl"
+        self.use_snapshot = use_snapshot
         self.varieties: Dict[str, GrapeVariety] = {}
         self._alias_to_variety: Dict[str, str] = {}
         
         # Load data
         self._load_jsonl()
     
+    @property
+    def snapshot_file(self) -> Path:
+        """Binary snapshot compiled from the JSONL."""
+        return self.data_dir / "cache" / f"{self.jsonl_file.stem}.model.bin"
+    
+    @instrumentation.timed("load.grape_model")
     def _load_jsonl(self):
-        """Load grape varieties from JSONL file."""
+        """Load grape varieties from the snapshot if current, else from the JSONL file."""
         self.varieties = {}
         self._alias_to_variety = {}
         
         if not self.jsonl_file.exists():
             return
         
+        if self.use_snapshot and self._load_snapshot():
+            instrumentation.count("grape_model.snapshot_hit")
+            return
+        
+        self._parse_jsonl()
+        if self.use_snapshot:
+            instrumentation.count("grape_model.snapshot_miss")
+            self._save_snapshot()
+    
+    def _parse_jsonl(self):
+        """Parse grape varieties from the JSONL file."""
         with open(self.jsonl_file, 'r', encoding='utf-8') as f:
             for line_num, line in enumerate(f, 1):
                 line = line.strip()
@@ -153,6 +302,17 @@ class GrapeVarietiesModel:
         """Get a variety by name."""
         return self.varieties.get(name)
     
+    def find_variety_by_vivc_number(self, vivc_number: str) -> Optional[str]:
+        """Name of the first variety whose portfolio grape has this VIVC number."""
+        if not vivc_number:
+            return None
+        if isinstance(self.varieties, LazyVarieties):
+            return self.varieties.find_by_vivc_number(vivc_number)
+        for variety in self.varieties.values():
+            if _portfolio_vivc_number(variety) == vivc_number:
+                return variety.name
+        return None
+    
     def get_all_varieties(self) -> List[GrapeVariety]:
         """Get all varieties."""
         return list(self.varieties.values())
@@ -271,11 +431,55 @@ class GrapeVarietiesModel:
             if alias_lower:
                 self._alias_to_variety[alias_lower] = name
     
+    @instrumentation.timed("write.grape_model")
     def save_jsonl(self):
         """Save current varieties to JSONL file."""
         with open(self.jsonl_file, 'w', encoding='utf-8') as f:
             for variety in self.varieties.values():
                 f.write(variety.to_jsonl_entry() + '\n')
+        if self.use_snapshot:
+            self._save_snapshot()
+    
+    def _source_stamp(self, with_hash: bool = True) -> SourceStamp:
+        stat = self.jsonl_file.stat()
+        return SourceStamp(stat.st_mtime_ns, stat.st_size,
+                           file_sha256(self.jsonl_file) if with_hash else "")
+    
+    def _load_snapshot(self) -> bool:
+        """Map the binary snapshot and index its varieties lazily; False if missing or stale."""
+        if not snapshot_supported():
+            return False
+        try:
+            snapshot = VarietySnapshot(self.snapshot_file)
+        except (OSError, ValueError):
+            # Missing, truncated or old-format snapshot: rebuild from the JSONL
+            return False
+        
+        current = self._source_stamp(with_hash=False)
+        if (snapshot.stamp.mtime_ns, snapshot.stamp.size) != (current.mtime_ns, current.size):
+            # Touched but possibly unchanged (checkout, copy): fall back to the content hash
+            if snapshot.stamp.size != current.size or snapshot.stamp.sha256 != file_sha256(self.jsonl_file):
+                return False
+            try:
+                # Same content: record the new mtime so the next load skips hashing
+                restamp_snapshot(self.snapshot_file, current)
+            except OSError:
+                pass
+        
+        self.varieties = LazyVarieties(snapshot)
+        names = snapshot.names()
+        self._alias_to_variety = {alias: names[row] for alias, row in snapshot.alias_keys()}
+        return True
+    
+    def _save_snapshot(self):
+        """Compile the current varieties into the binary snapshot."""
+        if not snapshot_supported():
+            return
+        try:
+            write_snapshot(self.snapshot_file, (variety.to_record() for variety in self.varieties.values()),
+                           self._source_stamp())
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not write grape model snapshot {self.snapshot_file}: {e}")
     
     def get_stats(self) -> Dict[str, int]:
         """Get statistics about the variety data."""
@@ -371,6 +575,7 @@ class GrapeVarietiesModel:
         consolidated_model = GrapeVarietiesModel.__new__(GrapeVarietiesModel)
         consolidated_model.data_dir = self.data_dir
         consolidated_model.jsonl_file = self.data_dir / (self.jsonl_file.stem + "_consolidated.jsonl")
+        consolidated_model.use_snapshot = False
         consolidated_model.varieties = consolidated_varieties
         consolidated_model._alias_to_variety = {}
         
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Instrumentation Module
+
+Lightweight, thread-safe timers, counters and histograms for the pipeline.
+Timers and histograms work as context managers and decorators; a stage's
+main function decorated with @profiled_stage writes a JSON profile report
+to data/profiles/<stage>.json when it finishes (successfully or not).
+"""
+
+import functools
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+PROFILE_DIR = Path(os.environ.get("GRAPEGEEK_PROFILE_DIR", "data/profiles"))
+MAX_SAMPLES = 10000   # reservoir size per histogram, used for percentiles
+
+
+@dataclass
+class Histogram:
+    """Running count/total/min/max plus a bounded reservoir for percentiles."""
+    count: int = 0
+    total: float = 0.0
+    minimum: float = float("inf")
+    maximum: float = float("-inf")
+    samples: List[float] = field(default_factory=list)
+
+    def observe(self, value: float, rng: random.Random):
+        self.count += 1
+        self.total += value
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+        if len(self.samples) < MAX_SAMPLES:
+            self.samples.append(value)
+        else:
+            slot = rng.randrange(self.count)
+            if slot < MAX_SAMPLES:
+                self.samples[slot] = value
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def to_dict(self, digits: int = 6) -> Dict:
+        if self.count == 0:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "total": round(self.total, digits),
+            "mean": round(self.total / self.count, digits),
+            "min": round(self.minimum, digits),
+            "p50": round(self.percentile(0.50), digits),
+            "p95": round(self.percentile(0.95), digits),
+            "max": round(self.maximum, digits)
+        }
+
+
+class Instrumentation:
+    """Registry of timers (seconds), counters and value histograms."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rng = random.Random(0)
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.timers: Dict[str, Histogram] = {}
+            self.counters: Dict[str, int] = {}
+            self.histograms: Dict[str, Histogram] = {}
+
+    def count(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, name: str, value: float):
+        with self._lock:
+            self.histograms.setdefault(name, Histogram()).observe(value, self._rng)
+
+    def record_time(self, name: str, seconds: float):
+        with self._lock:
+            self.timers.setdefault(name, Histogram()).observe(seconds, self._rng)
+
+    @contextmanager
+    def timer(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_time(name, time.perf_counter() - start)
+
+    def timed(self, name: Optional[str] = None):
+        """Decorator timing every call of the wrapped function."""
+        def decorator(func):
+            timer_name = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(timer_name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def sleep(self, seconds: float, name: str = "sleep"):
+        """time.sleep that records the time spent waiting."""
+        if seconds > 0:
+            with self.timer(name):
+                time.sleep(seconds)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "timers": {k: v.to_dict() for k, v in sorted(self.timers.items())},
+                "counters": dict(sorted(self.counters.items())),
+                "histograms": {k: v.to_dict() for k, v in sorted(self.histograms.items())}
+            }
+
+
+# Process-wide registry used by the module-level helpers below
+metrics = Instrumentation()
+
+count = metrics.count
+observe = metrics.observe
+timer = metrics.timer
+timed = metrics.timed
+sleep = metrics.sleep
+
+
+def write_profile(stage: str, wall_seconds: float, status: str = "ok",
+                  started_at: Optional[str] = None, profile_dir: Optional[Path] = None) -> Path:
+    """Write the current registry as a JSON profile report for a stage."""
+    profile_dir = Path(profile_dir) if profile_dir else PROFILE_DIR
+    profile_dir.mkdir(parents=True, exist_ok=True)
+    report = {
+        "stage": stage,
+        "status": status,
+        "started_at": started_at,
+        "wall_seconds": round(wall_seconds, 6),
+        **metrics.snapshot()
+    }
+    profile_file = profile_dir / f"{stage}.json"
+    temp_file = profile_file.with_suffix(".json.tmp")
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    temp_file.replace(profile_file)
+    return profile_file
+
+
+def profiled_stage(stage: str, profile_dir: Optional[Path] = None):
+    """Decorator for a stage's main(): resets metrics and writes a profile report on exit."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            metrics.reset()
+            started_at = datetime.now().isoformat(timespec="seconds")
+            start = time.perf_counter()
+            status = "ok"
+            try:
+                return func(*args, **kwargs)
+            except SystemExit as e:
+                status = "ok" if e.code in (None, 0) else "failed"
+                raise
+            except BaseException:
+                status = "failed"
+                raise
+            finally:
+                try:
+                    profile_file = write_profile(stage, time.perf_counter() - start, status,
+                                                 started_at, profile_dir)
+                    print(f"⏱️  Profile written: {profile_file}")
+                except OSError as e:
+                    print(f"⚠️  Could not write profile for {stage}: {e}")
+        return wrapper
+    return decorator
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Incremental JSON Reader
+
+Walks a large JSON document from a text file without loading it whole:
+callers step through objects and arrays key by key / item by item and
+decode only the values they need, so memory is bounded by the largest
+single value rather than the file size.
+
+Example (RACJ layout):
+    stream = JsonStream(f)
+    for key in stream.iter_object():
+        if key == "AlcoolFabricants":
+            for _ in stream.iter_array():
+                group = ...   # nested iter_object() / read_value()
+        else:
+            stream.read_value()
+"""
+
+import json
+from typing import Any, Iterator, TextIO
+
+CHUNK_SIZE = 1 << 16
+WHITESPACE = " \t\n\r"
+NUMBER_TERMINATORS = ",]}" + WHITESPACE
+
+_decoder = json.JSONDecoder()
+
+
+class JsonStream:
+    """Pull-style reader over a JSON text stream."""
+
+    def __init__(self, f: TextIO, chunk_size: int = CHUNK_SIZE):
+        self._file = f
+        self._chunk_size = chunk_size
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Append the next chunk (dropping consumed text); False at end of file."""
+        if self._eof:
+            return False
+        chunk = self._file.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _peek(self) -> str:
+        """Next non-whitespace character, without consuming it ('' at end of file)."""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, char: str):
+        found = self._peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in JSON stream, found {found or 'end of file'!r}")
+        self._pos += 1
+
+    def _terminated(self, end: int) -> bool:
+        """True if the character at end (within the buffer) closes a number."""
+        return end < len(self._buffer) and self._buffer[end] in NUMBER_TERMINATORS
+    
+    def read_value(self) -> Any:
+        """Decode the next complete JSON value."""
+        self._peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number cut at the buffer edge ("7" of "7.25") decodes early: wait for its terminator
+            if isinstance(value, (int, float)) and not self._eof and not self._terminated(end) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def iter_object(self) -> Iterator[str]:
+        """Yield the keys of the next object; the caller must consume each value before resuming."""
+        self._expect("{")
+        if self._peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.read_value()
+            if not isinstance(key, str):
+                raise ValueError("Expected an object key in JSON stream")
+            self._expect(":")
+            yield key
+            if self._peek() == ",":
+                self._pos += 1
+                continue
+            self._expect("}")
+            return
+
+    def iter_array(self) -> Iterator[None]:
+        """Step through the items of the next array; the caller consumes each item."""
+        self._expect("[")
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield None
+            if self._peek() == ",":
+                self._pos += 1
+                continue
+            self._expect("]")
+            return
@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+"""
+LLM Gateway
+
+Single entry point for every OpenAI call in the project (producer
+classification and enrichment, province research, variety normalization,
+VIVC assignment, article generation and translation).
+
+- Content-addressed cache: each response is stored under
+  data/cache/llm/<endpoint>/<model>/<sha256 of the canonical request>.json,
+  keyed on endpoint, model, tools and the full prompt, so a crash or a rerun
+  never pays twice for an identical request; structured answers (parse())
+  are validated before they are stored, and a cached one that no longer
+  validates is dropped and requested again
+- One OpenAI client per process, whose keep-alive connection pool is
+  shared by all threads
+- Requests/tokens per minute pacing per model through
+  includes.rate_limiter, coordinated across threads and processes and
+  adapted from 429s and x-ratelimit-* headers (no fixed sleeps needed)
+- Retries with exponential backoff and full jitter on timeouts, connection
+  errors and 5xx responses; a 429 pauses every caller until retry-after
+- Token, web search and cost accounting per call label (also reported
+  through includes.instrumentation)
+- Cache modes (GRAPEGEEK_LLM_CACHE_MODE or the mode argument):
+    use      read the cache, call the API on a miss and store the answer (default)
+    refresh  always call the API and overwrite the cached answer
+    replay   cache only; a miss raises LLMCacheMiss (tests, offline reruns)
+    off      no caching
+
+Example:
+    gateway = get_gateway()
+    result = gateway.create("enrich", model="gpt-5-mini", tools=[{"type": "web_search"}], input=prompt)
+    result.output_text, result.cost_usd, result.cached
+"""
+
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from includes import instrumentation
+from includes.rate_limiter import RateLimiter, retry_after_seconds
+
+DEFAULT_CACHE_DIR = Path(os.environ.get("GRAPEGEEK_LLM_CACHE_DIR", "data/cache/llm"))
+CACHE_MODES = ("use", "refresh", "replay", "off")
+DEFAULT_CONCURRENCY = int(os.environ.get("GRAPEGEEK_LLM_CONCURRENCY", "8"))
+DEFAULT_MAX_RETRIES = 4
+BASE_RETRY_DELAY = 1.0
+MAX_RETRY_DELAY = 60.0
+RATE_LIMIT = os.environ.get("GRAPEGEEK_LLM_RATE_LIMIT", "1") != "0"
+DEFAULT_OUTPUT_TOKENS_ESTIMATE = 2000  # reserved per call until the real usage is known
+
+# Request arguments that change how a call is made, not what it answers
+TRANSPORT_PARAMS = {"timeout", "extra_headers", "extra_query", "extra_body"}
+
+# USD per 1M tokens (input, output); update when pricing changes
+MODEL_PRICES = {
+    "gpt-4o-2024-08-06": (2.50, 10.00),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-5": (1.25, 10.00),
+    "gpt-5-mini": (0.25, 2.00),
+    "gpt-5.2": (1.75, 14.00),
+}
+WEB_SEARCH_CALL_USD = 0.01
+
+
+class LLMCacheMiss(LookupError):
+    """Raised in replay mode when a request has no cached response."""
+
+
+@dataclass
+class LLMResult:
+    """A (possibly cached) model response."""
+    output_text: str
+    data: Dict[str, Any]                 # full response as JSON
+    usage: Dict[str, int]
+    cost_usd: float
+    cached: bool
+    key: str
+    output_parsed: Any = None            # structured output (parse())
+
+    @property
+    def message(self):
+        """First chat completion choice as an SDK ChatCompletionMessage (chat())."""
+        from openai.types.chat import ChatCompletionMessage
+        return ChatCompletionMessage.model_validate(self.data["choices"][0]["message"])
+
+
+@dataclass
+class LLMStats:
+    """Accounting for one call label."""
+    calls: int = 0
+    cache_hits: int = 0
+    retries: int = 0
+    errors: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    web_searches: int = 0
+    cost_usd: float = 0.0
+    saved_usd: float = 0.0
+
+    def to_dict(self) -> Dict:
+        return {**self.__dict__, "cost_usd": round(self.cost_usd, 4), "saved_usd": round(self.saved_usd, 4)}
+
+
+def to_jsonable(value: Any) -> Any:
+    """Plain JSON data for requests and responses holding SDK / pydantic objects."""
+    if isinstance(value, type) and hasattr(value, "model_json_schema"):
+        return {"schema": value.__name__, "json_schema": value.model_json_schema()}
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json", exclude_none=True)
+    if isinstance(value, dict):
+        return {str(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(v) for v in value]
+    return value
+
+
+def request_key(endpoint: str, request: Dict[str, Any]) -> str:
+    """SHA-256 of the canonical request (endpoint, model, tools, prompt and options)."""
+    canonical = {"endpoint": endpoint,
+                 **{k: to_jsonable(v) for k, v in request.items() if k not in TRANSPORT_PARAMS}}
+    encoded = json.dumps(canonical, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def extract_usage(data: Dict[str, Any]) -> Dict[str, int]:
+    """Input/output tokens and web search calls from a Responses or Chat Completions payload."""
+    usage = data.get("usage") or {}
+    web_searches = sum(1 for item in data.get("output") or [] if item.get("type") == "web_search_call")
+    return {
+        "input_tokens": int(usage.get("input_tokens", usage.get("prompt_tokens")) or 0),
+        "output_tokens": int(usage.get("output_tokens", usage.get("completion_tokens")) or 0),
+        "web_searches": web_searches,
+    }
+
+
+def estimate_cost(model: str, usage: Dict[str, int]) -> float:
+    """USD cost of a call; dated model snapshots fall back to their base model's price."""
+    prices = MODEL_PRICES.get(model)
+    if prices is None:
+        base = max((name for name in MODEL_PRICES if model.startswith(name + "-")), key=len, default=None)
+        prices = MODEL_PRICES.get(base, (0.0, 0.0))
+    return (usage["input_tokens"] * prices[0] + usage["output_tokens"] * prices[1]) / 1_000_000 \
+        + usage.get("web_searches", 0) * WEB_SEARCH_CALL_USD
+
+
+def estimate_tokens(request: Dict[str, Any]) -> int:
+    """Rough token reservation for a request: ~4 characters per prompt token plus the output budget."""
+    prompt = request.get("input", request.get("messages", ""))
+    text = prompt if isinstance(prompt, str) else json.dumps(to_jsonable(prompt), ensure_ascii=False, default=str)
+    output = request.get("max_output_tokens") or request.get("max_completion_tokens") \
+        or DEFAULT_OUTPUT_TOKENS_ESTIMATE
+    return len(text) // 4 + int(output)
+
+
+def is_retryable(error: Exception) -> bool:
+    """Rate limits, timeouts, connection drops and server errors are worth retrying."""
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status in (408, 409, 429) or status >= 500
+    return type(error).__name__ in ("APIConnectionError", "APITimeoutError", "TimeoutError", "ConnectionError")
+
+
+def backoff_delay(attempt: int, base: float = BASE_RETRY_DELAY, cap: float = MAX_RETRY_DELAY) -> float:
+    """Exponential backoff with full jitter: uniform(0, min(cap, base * 2**attempt))."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class LLMGateway:
+    """Cached, rate-limited, accounted access to the OpenAI API."""
+
+    def __init__(self, client: Any = None, cache_dir: Path = DEFAULT_CACHE_DIR, mode: Optional[str] = None,
+                 max_concurrency: int = DEFAULT_CONCURRENCY, max_retries: int = DEFAULT_MAX_RETRIES,
+                 api_key: Optional[str] = None, rate_limit: bool = RATE_LIMIT):
+        """
+        Args:
+            client: OpenAI client (created from api_key / OPENAI_API_KEY on the first live call if None)
+            cache_dir: Root of the response cache
+            mode: use, refresh, replay or off (default: GRAPEGEEK_LLM_CACHE_MODE or use)
+            max_concurrency: Maximum simultaneous API calls
+            max_retries: Retries after the first attempt for retryable errors
+            rate_limit: Pace calls with a per-model RateLimiter (state in cache_dir/_ratelimit)
+        """
+        mode = mode or os.environ.get("GRAPEGEEK_LLM_CACHE_MODE", "use")
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown LLM cache mode {mode!r} (expected one of {', '.join(CACHE_MODES)})")
+        self.mode = mode
+        self.cache_dir = Path(cache_dir)
+        self.max_retries = max_retries
+        self.rate_limit = rate_limit
+        self._client = client
+        self._api_key = api_key
+        self._client_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._stats_lock = threading.Lock()
+        self._inflight_lock = threading.Lock()
+        self._inflight: Dict[str, threading.Lock] = {}
+        self._limiters: Dict[str, RateLimiter] = {}
+        self.stats: Dict[str, LLMStats] = {}
+
+    @property
+    def client(self):
+        with self._client_lock:
+            if self._client is None:
+                from openai import OpenAI
+                # Retries are done here, so that 429s reach the shared rate limiter
+                self._client = OpenAI(api_key=self._api_key or os.getenv("OPENAI_API_KEY"), max_retries=0)
+            return self._client
+
+    def limiter(self, model: str) -> Optional[RateLimiter]:
+        """Shared rate limiter of a model (None when rate limiting is off)."""
+        if not self.rate_limit:
+            return None
+        with self._client_lock:
+            if model not in self._limiters:
+                self._limiters[model] = RateLimiter(model, self.cache_dir / "_ratelimit")
+            return self._limiters[model]
+
+    # Endpoints
+
+    def create(self, label: str, validate: Optional[Callable[[str], Any]] = None, **request) -> LLMResult:
+        """client.responses.create(**request), cached.
+
+        Free-text answers are cached as they come unless `validate` is given: it
+        turns the output text into result.output_parsed and raises on answers
+        that must not be cached (see parse()).
+        """
+        return self._call(label, "responses.create", request, lambda: self._send("responses", "create", **request),
+                          validate=validate)
+
+    def parse(self, label: str, text_format, **request) -> LLMResult:
+        """client.responses.parse(text_format=..., **request), cached; result.output_parsed is a text_format.
+
+        Only answers that validate against text_format are cached.
+        """
+        return self._call(label, "responses.parse", {**request, "text_format": text_format},
+                          lambda: self._send("responses", "parse", text_format=text_format, **request),
+                          validate=text_format.model_validate_json)
+
+    def chat(self, label: str, validate: Optional[Callable[[str], Any]] = None, **request) -> LLMResult:
+        """client.chat.completions.create(**request), cached; see result.message and create() for `validate`."""
+        return self._call(label, "chat.completions", request,
+                          lambda: self._send("chat.completions", "create", **request), validate=validate)
+
+    def is_cached(self, endpoint: str, **request) -> bool:
+        """True if the request would be answered from the cache."""
+        return self.mode in ("use", "replay") and self._cache_path(endpoint, request,
+                                                                    request_key(endpoint, request)).exists()
+
+    # Internals
+
+    def _send(self, resource_path: str, method: str, **kwargs):
+        """Call client.<resource_path>.<method>; returns (response, headers), headers empty if unavailable."""
+        resource = self.client
+        for name in resource_path.split("."):
+            resource = getattr(resource, name)
+        raw_method = getattr(getattr(resource, "with_raw_response", None), method, None)
+        if raw_method is None:
+            return getattr(resource, method)(**kwargs), {}
+        raw = raw_method(**kwargs)
+        return raw.parse(), raw.headers
+
+    def _cache_path(self, endpoint: str, request: Dict[str, Any], key: str) -> Path:
+        model = str(request.get("model", "unknown")).replace("/", "_")
+        return self.cache_dir / endpoint / model / key[:2] / f"{key}.json"
+
+    def _call(self, label: str, endpoint: str, request: Dict[str, Any], send: Callable[[], Any],
+              validate: Optional[Callable[[str], Any]] = None) -> LLMResult:
+        """Answer a request from the cache or the API.
+
+        `validate` turns the output text into result.output_parsed and raises
+        if it is unusable: such answers are never written to the cache, and
+        cached ones are deleted and requested again.
+        """
+        key = request_key(endpoint, request)
+        path = self._cache_path(endpoint, request, key)
+
+        if self.mode == "off":
+            return self._call_api(label, endpoint, request, send, key, path, validate)
+
+        # One caller per distinct request; concurrent duplicates wait and read its cache entry
+        with self._inflight_lock:
+            lock = self._inflight.setdefault(key, threading.Lock())
+        with lock:
+            try:
+                if self.mode in ("use", "replay"):
+                    entry = self._read_entry(path)
+                    if entry is not None:
+                        try:
+                            parsed = validate(entry.get("output_text") or "") if validate else None
+                        except Exception:
+                            instrumentation.count(f"llm.{label}.cache_invalid")
+                            path.unlink(missing_ok=True)
+                        else:
+                            return self._cache_hit(label, entry, key, parsed)
+                    if self.mode == "replay":
+                        instrumentation.count(f"llm.{label}.cache_miss")
+                        raise LLMCacheMiss(f"No cached {endpoint} response for {label} ({key[:12]}) in {self.cache_dir}")
+                return self._call_api(label, endpoint, request, send, key, path, validate)
+            finally:
+                with self._inflight_lock:
+                    self._inflight.pop(key, None)
+
+    def _call_api(self, label: str, endpoint: str, request: Dict[str, Any], send: Callable[[], Any],
+                  key: str, path: Path, validate: Optional[Callable[[str], Any]] = None) -> LLMResult:
+        stats = self._stats(label)
+        limiter = self.limiter(str(request.get("model", "unknown")))
+        reserved_tokens = estimate_tokens(request)
+        attempt = 0
+        while True:
+            if limiter:
+                # Tokens are reserved once per call and settled by record() or release();
+                # a retry only needs another request
+                limiter.acquire(0 if attempt else reserved_tokens)
+            try:
+                with self._slots, instrumentation.timer(f"llm.{label}"):
+                    response, headers = send()
+                break
+            except Exception as error:
+                if attempt >= self.max_retries or not is_retryable(error):
+                    if limiter:
+                        limiter.release(reserved_tokens)
+                    with self._stats_lock:
+                        stats.errors += 1
+                    instrumentation.count(f"llm.{label}.error")
+                    raise
+                delay = retry_after_seconds(error)
+                if delay is None:
+                    delay = backoff_delay(attempt)
+                attempt += 1
+                with self._stats_lock:
+                    stats.retries += 1
+                instrumentation.count(f"llm.{label}.retry")
+                if limiter and getattr(error, "status_code", None) == 429:
+                    # Every thread and process waits in acquire(), not just this one
+                    limiter.penalize(delay)
+                else:
+                    instrumentation.sleep(delay, f"llm.{label}.retry_sleep")
+
+        data = to_jsonable(response)
+        output_text = getattr(response, "output_text", None)
+        if output_text is None and data.get("choices"):
+            output_text = data["choices"][0].get("message", {}).get("content")
+        usage = extract_usage(data)
+        if limiter:
+            limiter.update_from_headers(headers)
+            limiter.record(reserved_tokens, usage["input_tokens"] + usage["output_tokens"])
+        model = str(data.get("model") or request.get("model", ""))
+        cost = estimate_cost(str(request.get("model", model)), usage)
+
+        with self._stats_lock:
+            stats.calls += 1
+            stats.input_tokens += usage["input_tokens"]
+            stats.output_tokens += usage["output_tokens"]
+            stats.web_searches += usage["web_searches"]
+            stats.cost_usd += cost
+        instrumentation.observe(f"llm.{label}.input_tokens", usage["input_tokens"])
+        instrumentation.observe(f"llm.{label}.output_tokens", usage["output_tokens"])
+
+        parsed = None
+        if validate:
+            try:
+                parsed = validate(output_text or "")
+            except Exception:
+                # Paid for, but not cached: the next run asks again instead of replaying a bad answer
+                with self._stats_lock:
+                    stats.errors += 1
+                instrumentation.count(f"llm.{label}.invalid_output")
+                raise
+
+        if self.mode != "off":
+            self._write_entry(path, {
+                "key": key,
+                "endpoint": endpoint,
+                "model": request.get("model"),
+                "label": label,
+                "created_at": datetime.now().isoformat(),
+                "usage": usage,
+                "cost_usd": cost,
+                "output_text": output_text,
+                "response": data,
+            })
+        return LLMResult(output_text or "", data, usage, cost, False, key, parsed)
+
+    def _cache_hit(self, label: str, entry: Dict[str, Any], key: str, parsed: Any = None) -> LLMResult:
+        stats = self._stats(label)
+        with self._stats_lock:
+            stats.cache_hits += 1
+            stats.saved_usd += entry.get("cost_usd") or 0.0
+        instrumentation.count(f"llm.{label}.cache_hit")
+        return LLMResult(entry.get("output_text") or "", entry.get("response") or {}, entry.get("usage") or {},
+                         entry.get("cost_usd") or 0.0, True, key, parsed)
+
+    def _stats(self, label: str) -> LLMStats:
+        with self._stats_lock:
+            return self.stats.setdefault(label, LLMStats())
+
+    @staticmethod
+    def _read_entry(path: Path) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError):
+            return None  # torn or unreadable entry: treat as a miss and rewrite it
+
+    @staticmethod
+    def _write_entry(path: Path, entry: Dict[str, Any]):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(temp_file, path)
+
+    # Reporting
+
+    def summary(self) -> Dict[str, Dict]:
+        """Accounting per label plus a total."""
+        with self._stats_lock:
+            report = {label: stats.to_dict() for label, stats in sorted(self.stats.items())}
+        total = LLMStats()
+        for stats in report.values():
+            for name, value in stats.items():
+                setattr(total, name, getattr(total, name) + value)
+        report["total"] = total.to_dict()
+        return report
+
+    def print_summary(self):
+        """Print calls, cache hits, tokens and cost per label."""
+        report = self.summary()
+        if report["total"]["calls"] == 0 and report["total"]["cache_hits"] == 0:
+            return
+        print("\n💸 LLM usage:")
+        for label, stats in report.items():
+            print(f"   {label:<20} {stats['calls']:>5} calls  {stats['cache_hits']:>5} cached  "
+                  f"{stats['input_tokens']:>9,} in / {stats['output_tokens']:>8,} out tokens  "
+                  f"${stats['cost_usd']:.2f} (saved ${stats['saved_usd']:.2f})")
+
+
+_default_gateway: Optional[LLMGateway] = None
+_default_lock = threading.Lock()
+
+
+def get_gateway(api_key: Optional[str] = None) -> LLMGateway:
+    """Process-wide gateway shared by all call sites (created on first use)."""
+    global _default_gateway
+    with _default_lock:
+        if _default_gateway is None:
+            _default_gateway = LLMGateway(api_key=api_key)
+        return _default_gateway
+
+
+def set_gateway(gateway: Optional[LLMGateway]):
+    """Replace the process-wide gateway (tests, replay runs)."""
+    global _default_gateway
+    with _default_lock:
+        _default_gateway = gateway
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Map Clusters Module
+
+Precomputes hierarchical producer clusters for every map zoom level using
+grid aggregation in Web Mercator pixel space. Grid cells at zoom z nest
+exactly inside the cells at zoom z-1, so each cluster records its parent.
+Clusters carry member counts, bounding boxes and their top grape varieties.
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from includes.wine_facts import WineFactTable, count_pairs
+
+
+TILE_SIZE = 256
+DEFAULT_CELL_SIZE = 64     # pixels per cluster cell, a power of two keeps zoom levels nested
+DEFAULT_ZOOM_LEVELS = range(2, 12)
+DEFAULT_TOP_VARIETIES = 5
+
+CLUSTER_FIELDS = ["lon", "lat", "count", "bbox", "top_varieties", "parent", "permit_id"]
+
+
+def project_to_world(lon: np.ndarray, lat: np.ndarray):
+    """Project lon/lat to Web Mercator world coordinates in [0, 1)."""
+    lat = np.clip(lat, -85.05112878, 85.05112878)
+    x = (lon + 180.0) / 360.0
+    y = (1.0 - np.arcsinh(np.tan(np.radians(lat))) / np.pi) / 2.0
+    return np.clip(x, 0.0, 1.0 - 1e-12), np.clip(y, 0.0, 1.0 - 1e-12)
+
+
+def build_clusters(facts: WineFactTable, zoom_levels=DEFAULT_ZOOM_LEVELS,
+                   cell_size: int = DEFAULT_CELL_SIZE,
+                   top_n: int = DEFAULT_TOP_VARIETIES) -> Dict:
+    """Aggregate located producers into grid clusters for each zoom level.
+
+    Returns a compact structure: a variety vocabulary plus, per zoom level,
+    a list of rows laid out as CLUSTER_FIELDS. Top varieties are
+    [variety index, producer count] pairs; `parent` is the row index of the
+    enclosing cluster at the previous zoom level (None at the first level).
+    Singleton clusters carry the producer's permit_id.
+    """
+    located = np.flatnonzero(facts.producer_has_location)
+    lon = facts.producer_longitude[located]
+    lat = facts.producer_latitude[located]
+    world_x, world_y = project_to_world(lon, lat)
+
+    # Distinct (producer, variety) pairs restricted to located producers
+    row_of_producer = np.full(facts.producer_count, -1, dtype=np.int64)
+    row_of_producer[located] = np.arange(located.size)
+    pair_producers, pair_varieties, _ = count_pairs(
+        facts.cepage_producer, facts.cepage_variety, len(facts.varieties))
+    pair_rows = row_of_producer[pair_producers]
+    keep = pair_rows >= 0
+    pair_rows, pair_varieties = pair_rows[keep], pair_varieties[keep]
+
+    zooms = {}
+    previous_cells: Optional[Dict[int, int]] = None
+    previous_zoom = None
+    for zoom in zoom_levels:
+        if previous_zoom is not None and zoom != previous_zoom + 1:
+            previous_cells = None  # parents are only defined between consecutive zooms
+        cells_per_axis = (TILE_SIZE << zoom) // cell_size
+        cell_x = (world_x * cells_per_axis).astype(np.int64)
+        cell_y = (world_y * cells_per_axis).astype(np.int64)
+        cell_keys = cell_x * cells_per_axis + cell_y
+
+        unique_cells, member_cluster = np.unique(cell_keys, return_inverse=True)
+        cluster_count = unique_cells.size
+        counts = np.bincount(member_cluster, minlength=cluster_count)
+        centroid_lon = np.bincount(member_cluster, weights=lon, minlength=cluster_count) / counts
+        centroid_lat = np.bincount(member_cluster, weights=lat, minlength=cluster_count) / counts
+
+        min_lon = np.full(cluster_count, np.inf)
+        min_lat = np.full(cluster_count, np.inf)
+        max_lon = np.full(cluster_count, -np.inf)
+        max_lat = np.full(cluster_count, -np.inf)
+        np.minimum.at(min_lon, member_cluster, lon)
+        np.minimum.at(min_lat, member_cluster, lat)
+        np.maximum.at(max_lon, member_cluster, lon)
+        np.maximum.at(max_lat, member_cluster, lat)
+
+        top_varieties = _top_varieties(member_cluster[pair_rows], pair_varieties,
+                                       cluster_count, len(facts.varieties), top_n)
+
+        # Parent cell at zoom - 1 is the same cell with both coordinates halved
+        parent_keys = (unique_cells // cells_per_axis // 2) * (cells_per_axis // 2) + \
+                      (unique_cells % cells_per_axis // 2)
+
+        # Any member identifies a singleton cluster
+        member_of = np.zeros(cluster_count, dtype=np.int64)
+        member_of[member_cluster] = np.arange(located.size)
+
+        rows = []
+        for i in range(cluster_count):
+            parent = previous_cells.get(int(parent_keys[i])) if previous_cells is not None else None
+            permit_id = None
+            if counts[i] == 1:
+                permit_id = facts.producer_permit_ids[located[member_of[i]]] or None
+            rows.append([
+                round(float(centroid_lon[i]), 5),
+                round(float(centroid_lat[i]), 5),
+                int(counts[i]),
+                [round(float(min_lon[i]), 5), round(float(min_lat[i]), 5),
+                 round(float(max_lon[i]), 5), round(float(max_lat[i]), 5)],
+                top_varieties[i],
+                parent,
+                permit_id
+            ])
+
+        zooms[str(zoom)] = rows
+        previous_cells = {int(key): i for i, key in enumerate(unique_cells)}
+        previous_zoom = zoom
+
+    return {
+        "fields": CLUSTER_FIELDS,
+        "cell_size": cell_size,
+        "varieties": facts.varieties,
+        "mapped_producers": int(located.size),
+        "zooms": zooms
+    }
+
+
+def _top_varieties(pair_clusters: np.ndarray, pair_varieties: np.ndarray,
+                   cluster_count: int, variety_count: int, top_n: int) -> List[List[List[int]]]:
+    """Top-N varieties per cluster by number of member producers growing them."""
+    top = [[] for _ in range(cluster_count)]
+    if pair_clusters.size == 0:
+        return top
+
+    clusters, varieties, counts = count_pairs(pair_clusters, pair_varieties, variety_count)
+    # Sort by cluster, then by descending count, then by variety id for stable output
+    order = np.lexsort((varieties, -counts, clusters))
+    clusters, varieties, counts = clusters[order], varieties[order], counts[order]
+
+    starts = np.flatnonzero(np.r_[True, clusters[1:] != clusters[:-1]])
+    ends = np.r_[starts[1:], clusters.size]
+    for start, end in zip(starts, ends):
+        end = min(end, start + top_n)
+        top[int(clusters[start])] = [[int(v), int(c)] for v, c in zip(varieties[start:end], counts[start:end])]
+    return top
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Keyword Filters
+
+Case-insensitive keyword matching compiled once per keyword list, for the
+per-row checks of the producer fetchers:
+- Substring mode (default): one regex alternation, factored into a prefix
+  trie ("B(?:EER|OURBON|REW)") so each position of the text is tested
+  against a single branch per leading character instead of every keyword.
+  Keywords that contain a shorter keyword ("BREWING" contains "BREW") are
+  dropped since they can never change the outcome.
+- Whole mode: the text must equal one of the keywords (set lookup).
+
+Example:
+    EXCLUDED = KeywordFilter(['BREW', 'DISTILL', 'MARKET'])
+    EXCLUDED.matches("Finger Lakes Brewing Co")   # True
+    WINE = KeywordFilter(['VIN'], whole=True)
+    WINE.matches_any(['CIDRE', 'vin'])            # True
+"""
+
+import re
+from typing import Dict, Iterable, Optional, Tuple
+
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """Regex alternation over keywords, factored by common prefixes."""
+    trie: Dict = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node: Dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        pattern = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{pattern})?" if '' in node else pattern
+
+    return build(trie)
+
+
+class KeywordFilter:
+    """Case-insensitive keyword matcher built once from a keyword list."""
+
+    def __init__(self, keywords: Iterable[str], whole: bool = False):
+        """
+        Args:
+            keywords: Keywords to look for (compared uppercased)
+            whole: Match the whole text against the keywords instead of substrings
+        """
+        self.keywords: Tuple[str, ...] = tuple(dict.fromkeys(keyword.upper() for keyword in keywords if keyword))
+        self.whole = whole
+        self._keyword_set = frozenset(self.keywords)
+        # Only the shortest keyword of a containment chain can decide a substring match
+        minimal = [keyword for keyword in self.keywords
+                   if not any(other != keyword and other in keyword for other in self.keywords)]
+        self._search = re.compile(_trie_pattern(minimal)).search if minimal else None
+
+    def find(self, text: str) -> Optional[str]:
+        """The first keyword match in text (uppercased), or None."""
+        if not text:
+            return None
+        text = text.upper()
+        if self.whole:
+            return text if text in self._keyword_set else None
+        if self._search is None:
+            return None
+        match = self._search(text)
+        return match.group(0) if match else None
+
+    def matches(self, text: str) -> bool:
+        """True if text contains (or, in whole mode, equals) a keyword."""
+        if not text:
+            return False
+        if self.whole:
+            return text.upper() in self._keyword_set
+        return self._search is not None and self._search(text.upper()) is not None
+
+    def matches_any(self, texts: Iterable[str]) -> bool:
+        """True if any of texts matches."""
+        return any(self.matches(text) for text in texts)
+
+    def __repr__(self) -> str:
+        return f"KeywordFilter({len(self.keywords)} keywords, {'whole' if self.whole else 'substring'})"
@@ -8,9 +8,11 @@ Uses structured output with Pydantic models for reliable parsing.
 """
 
 from typing import Dict, Optional, Literal
-from openai import OpenAI
 from pydantic import BaseModel
 
+from includes import instrumentation
+from includes.llm_gateway import LLMGateway, get_gateway
+
 
 class SocialMedia(BaseModel):
     Facebook: Optional[str] = None
@@ -98,18 +100,19 @@ def create_user_prompt(producer: Dict) -> str:
 Classify this business and find their web presence."""
 
 
-def classify_producer(producer: Dict, client: OpenAI) -> Dict:
+def classify_producer(producer: Dict, gateway: Optional[LLMGateway] = None) -> Dict:
     """Classify a single producer and search for web presence.
     
     Args:
         producer: Producer data dict
-        client: OpenAI client instance
+        gateway: LLM gateway (default: the shared process-wide gateway)
         
     Returns:
         Dict with classification, website, social_media fields
     """
     try:
-        response = client.responses.parse(
+        response = (gateway or get_gateway()).parse(
+            "classify",
             model="gpt-4o-2024-08-06",
             tools=[{"type": "web_search"}],
             input=[
@@ -119,6 +122,7 @@ def classify_producer(producer: Dict, client: OpenAI) -> Dict:
             text_format=ProducerClassification,
             temperature=0  # Keep deterministic
         )
+        instrumentation.count("llm.classify_ok")
         
         result = response.output_parsed
         
@@ -130,6 +134,7 @@ def classify_producer(producer: Dict, client: OpenAI) -> Dict:
         }
             
     except Exception as e:
+        instrumentation.count("llm.classify_error")
         print(f"⚠️  Classification error for {producer.get('business_name')}: {e}")
         # Fallback to name-based classification
         return {
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Producer Deduplication Module
+
+Entity resolution for the unified producer list: the same winery can arrive
+once from RACJ, several times from TTB (one permit per premises or owner
+change) and once more from the LLM-researched province lists, each with its
+own permit_id.
+
+Approach:
+1. Blocking - producers are grouped by cheap keys within their state/province:
+   postal prefix (Canadian FSA / US ZIP5), normalized city and the rarer
+   trigrams of the normalized name. Only pairs sharing a block are compared,
+   and blocks above MAX_BLOCK_SIZE are skipped, so the number of candidate
+   pairs grows with the block sizes rather than with n².
+2. Scoring - names and addresses become TF-IDF weighted character trigram
+   vectors (scipy sparse, L2-normalized); cosine similarities of all candidate
+   pairs are computed in one vectorized pass, together with postal/city
+   equality and the haversine distance when both records have coordinates.
+3. Merging - accepted pairs are joined with union-find; each cluster keeps the
+   record of the most authoritative source and fills its gaps from the others.
+   The absorbed permit ids are listed in `merged_permit_ids` so caches keyed
+   by any of them stay usable (see includes.producer_sources.cache_lookup).
+
+Every scored pair above REVIEW_THRESHOLD is reported as a MergeDecision,
+merged or not, with its scores and the rule that decided it.
+"""
+
+import re
+import unicodedata
+from collections import defaultdict
+from dataclasses import dataclass
+from itertools import combinations
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+MAX_BLOCK_SIZE = 60          # larger blocks are too unspecific to compare pairwise
+REVIEW_THRESHOLD = 0.6       # name similarity from which a pair is reported
+NAME_THRESHOLD = 0.92        # same name, same city / area
+NEAR_NAME_THRESHOLD = 0.75   # similar name at the same address / postal code / coordinates
+ADDRESS_THRESHOLD = 0.8
+NEAR_KM = 1.0
+LOCAL_KM = 5.0
+EARTH_RADIUS_KM = 6371.0088
+
+# Lower number wins when choosing the record that represents a cluster
+SOURCE_PRIORITY = {'RACJ': 0, 'TTB': 1, 'Canada_Province_Research': 2}
+
+# Legal forms and articles, dropped before comparing names
+LEGAL_WORDS = {
+    'THE', 'AND', 'OF', 'ET', 'DE', 'DU', 'DES', 'LA', 'LE', 'LES', 'L', 'D',
+    'LLC', 'INC', 'CORP', 'CORPORATION', 'CO', 'COMPANY', 'LTD', 'LTEE', 'LP', 'LLP',
+    'INCORPORATED', 'ENR', 'SENC',
+}
+
+# Words that say what kind of business it is, not which one (dropped for blocking keys)
+GENERIC_WORDS = LEGAL_WORDS | {
+    'WINERY', 'WINERIES', 'WINE', 'WINES', 'VINEYARD', 'VINEYARDS', 'CELLAR', 'CELLARS',
+    'ESTATE', 'ESTATES', 'FARM', 'FARMS', 'VIGNOBLE', 'VIGNOBLES', 'DOMAINE', 'CAVE', 'CAVES',
+    'CHATEAU', 'VIN', 'VINS',
+}
+
+# Street type abbreviations, so "123 Main Street" and "123 MAIN ST" compare equal
+ADDRESS_ABBREVIATIONS = {
+    'STREET': 'ST', 'ROAD': 'RD', 'AVENUE': 'AVE', 'DRIVE': 'DR', 'LANE': 'LN', 'HIGHWAY': 'HWY',
+    'ROUTE': 'RTE', 'BOULEVARD': 'BLVD', 'CHEMIN': 'CH', 'RANG': 'RG', 'NORTH': 'N', 'SOUTH': 'S',
+    'EAST': 'E', 'WEST': 'W', 'COURT': 'CT', 'PLACE': 'PL',
+}
+
+
+@dataclass
+class MergeDecision:
+    """Outcome for one scored candidate pair."""
+    permit_id: str
+    other_permit_id: str
+    business_name: str
+    other_business_name: str
+    decision: str               # merged or separate
+    rule: str                   # which evidence decided it
+    name_similarity: float
+    address_similarity: float
+    same_postal: bool
+    same_city: bool
+    distance_km: Optional[float]
+    blocks: List[str]           # blocking keys the pair shared
+
+    def to_dict(self) -> Dict:
+        return {
+            'permit_id': self.permit_id,
+            'other_permit_id': self.other_permit_id,
+            'business_name': self.business_name,
+            'other_business_name': self.other_business_name,
+            'decision': self.decision,
+            'rule': self.rule,
+            'name_similarity': self.name_similarity,
+            'address_similarity': self.address_similarity,
+            'same_postal': self.same_postal,
+            'same_city': self.same_city,
+            'distance_km': self.distance_km,
+            'blocks': list(self.blocks),
+        }
+
+
+def fold(text: Optional[str]) -> str:
+    """Uppercase, strip accents and punctuation ("L.L.C." -> "LLC"), collapse whitespace."""
+    if not text:
+        return ""
+    text = unicodedata.normalize('NFKD', str(text))
+    text = "".join(char for char in text if not unicodedata.combining(char)).upper()
+    return " ".join(re.sub(r"[^A-Z0-9]+", " ", text.replace(".", "").replace("'", " ")).split())
+
+
+def _strip_words(name: Optional[str], words: set) -> str:
+    folded = fold(name).split()
+    kept = [word for word in folded if word not in words]
+    return " ".join(kept or folded)
+
+
+def normalize_name(name: Optional[str]) -> str:
+    """Business name without legal form or articles ("The Bull and Bee, LLC" -> "BULL BEE")."""
+    return _strip_words(name, LEGAL_WORDS)
+
+
+def name_key(name: Optional[str]) -> str:
+    """Business name reduced to its distinguishing words ("Allison Creek Wines" -> "ALLISON CREEK")."""
+    return _strip_words(name, GENERIC_WORDS)
+
+
+def normalize_address(address: Optional[str]) -> str:
+    return " ".join(ADDRESS_ABBREVIATIONS.get(word, word) for word in fold(address).split())
+
+
+def normalize_postal(postal_code: Optional[str], country: Optional[str]) -> str:
+    """Canadian FSA ("G0A") or US ZIP5 used as blocking key and equality check."""
+    postal = re.sub(r"[^A-Z0-9]", "", str(postal_code or "").upper())
+    if country == 'CA':
+        return postal[:3] if len(postal) >= 3 else ""
+    return postal[:5] if len(postal) >= 5 else ""
+
+
+def trigrams(text: str) -> List[str]:
+    padded = f"  {text} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)] if text else []
+
+
+def trigram_matrix(texts: Sequence[str]) -> sparse.csr_matrix:
+    """TF-IDF weighted, L2-normalized character trigram vectors (one row per text)."""
+    vocabulary: Dict[str, int] = {}
+    rows, cols = [], []
+    for row, text in enumerate(texts):
+        for gram in set(trigrams(text)):
+            rows.append(row)
+            cols.append(vocabulary.setdefault(gram, len(vocabulary)))
+    shape = (len(texts), max(1, len(vocabulary)))
+    matrix = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=shape)
+
+    document_frequency = np.bincount(cols, minlength=shape[1]) if cols else np.zeros(shape[1])
+    idf = np.log((1 + len(texts)) / (1 + document_frequency)) + 1.0
+    matrix = matrix.multiply(idf.reshape(1, -1)).tocsr()
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags(1.0 / norms) @ matrix
+
+
+def pair_cosine(matrix: sparse.csr_matrix, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """Row-wise cosine similarity of matrix[left] and matrix[right]."""
+    if len(left) == 0:
+        return np.zeros(0)
+    return np.asarray(matrix[left].multiply(matrix[right]).sum(axis=1)).ravel()
+
+
+def haversine_km(lat1: np.ndarray, lon1: np.ndarray, lat2: np.ndarray, lon2: np.ndarray) -> np.ndarray:
+    """Vectorized great-circle distance in kilometres (nan where a coordinate is missing)."""
+    phi1, phi2 = np.radians(lat1), np.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = np.radians(lon2 - lon1)
+    a = np.sin(d_phi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class UnionFind:
+    """Disjoint sets over 0..n-1 with path halving."""
+
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, item: int) -> int:
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a: int, b: int):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+
+
+def blocking_keys(producer: Dict, name_key: str) -> List[str]:
+    """Keys a producer is filed under; only producers sharing a key are compared."""
+    region = f"{producer.get('country') or ''}|{fold(producer.get('state_province'))}"
+    keys = []
+    postal = normalize_postal(producer.get('postal_code'), producer.get('country'))
+    if postal:
+        keys.append(f"postal|{region}|{postal}")
+    city = fold(producer.get('city'))
+    if city:
+        keys.append(f"city|{region}|{city}")
+    keys.extend(f"name|{region}|{gram}" for gram in set(trigrams(name_key)))
+    return keys
+
+
+def candidate_pairs(block_keys: List[List[str]], max_block_size: int = MAX_BLOCK_SIZE
+                    ) -> Tuple[np.ndarray, np.ndarray, Dict[Tuple[int, int], List[str]], Dict[str, int]]:
+    """Pairs of indices sharing at least one block of at most max_block_size members.
+
+    Returns left and right index arrays (left < right), the non-name blocks each
+    pair shared (for the report) and blocking statistics.
+    """
+    blocks: Dict[str, List[int]] = defaultdict(list)
+    for index, keys in enumerate(block_keys):
+        for key in keys:
+            blocks[key].append(index)
+
+    shared: Dict[Tuple[int, int], List[str]] = {}
+    stats = {'blocks': 0, 'skipped_blocks': 0}
+    for key, members in blocks.items():
+        if len(members) < 2:
+            continue
+        if len(members) > max_block_size:
+            stats['skipped_blocks'] += 1
+            continue
+        stats['blocks'] += 1
+        label = None if key.startswith("name|") else key.split("|", 1)[0]
+        for pair in combinations(members, 2):
+            labels = shared.setdefault(pair, [])
+            if label and label not in labels:
+                labels.append(label)
+
+    pairs = np.array(sorted(shared), dtype=np.int64).reshape(-1, 2)
+    return pairs[:, 0], pairs[:, 1], shared, stats
+
+
+def _coordinates(producers: Sequence[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+    def value(producer: Dict, field: str) -> float:
+        try:
+            return float(producer.get(field))
+        except (TypeError, ValueError):
+            return np.nan
+    return (np.array([value(p, 'latitude') for p in producers], dtype=float),
+            np.array([value(p, 'longitude') for p in producers], dtype=float))
+
+
+def score_pairs(producers: Sequence[Dict], left: np.ndarray, right: np.ndarray) -> Dict[str, np.ndarray]:
+    """Vectorized similarity features for the candidate pairs."""
+    names = [normalize_name(p.get('business_name')) for p in producers]
+    trade_names = [normalize_name(p.get('trade_name')) or names[i] for i, p in enumerate(producers)]
+    combined = trigram_matrix(names + trade_names)
+    offset = len(producers)
+    # Best of owner/operating name in either direction (TTB lists both)
+    name_similarity = np.maximum.reduce([
+        pair_cosine(combined, left, right),
+        pair_cosine(combined, left + offset, right + offset),
+        pair_cosine(combined, left, right + offset),
+        pair_cosine(combined, left + offset, right),
+    ]) if len(left) else np.zeros(0)
+
+    addresses = [normalize_address(p.get('address')) for p in producers]
+    has_address = np.array([bool(address) for address in addresses])
+    address_similarity = pair_cosine(trigram_matrix(addresses), left, right)
+    address_similarity = np.where(has_address[left] & has_address[right], address_similarity, 0.0)
+
+    postals = np.array([normalize_postal(p.get('postal_code'), p.get('country')) for p in producers], dtype=object)
+    cities = np.array([fold(p.get('city')) for p in producers], dtype=object)
+    same_postal = (postals[left] == postals[right]) & (postals[left] != "")
+    same_city = (cities[left] == cities[right]) & (cities[left] != "")
+
+    latitudes, longitudes = _coordinates(producers)
+    distance_km = haversine_km(latitudes[left], longitudes[left], latitudes[right], longitudes[right])
+
+    return {
+        'name_similarity': np.round(np.clip(name_similarity, 0.0, 1.0), 4),
+        'address_similarity': np.round(np.clip(address_similarity, 0.0, 1.0), 4),
+        'same_postal': same_postal,
+        'same_city': same_city,
+        'distance_km': distance_km,
+    }
+
+
+def decide(scores: Dict[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """Merge flags and the deciding rule for every scored pair."""
+    name = scores['name_similarity']
+    distance = scores['distance_km']
+    with np.errstate(invalid='ignore'):
+        near_geo = distance <= NEAR_KM
+        local_geo = distance <= LOCAL_KM
+    same_address = scores['address_similarity'] >= ADDRESS_THRESHOLD
+
+    # Similar names without supporting location evidence stay separate
+    rules = np.where(name >= NEAR_NAME_THRESHOLD, "different_location", "different_name").astype(object)
+    conditions = [
+        ((name >= NEAR_NAME_THRESHOLD) & same_address, "name+address"),
+        ((name >= NEAR_NAME_THRESHOLD) & near_geo, "name+coordinates"),
+        ((name >= NAME_THRESHOLD) & scores['same_postal'], "name+postal"),
+        ((name >= NAME_THRESHOLD) & scores['same_city'], "name+city"),
+        ((name >= NAME_THRESHOLD) & local_geo, "name+coordinates"),
+    ]
+    merged = np.zeros(len(name), dtype=bool)
+    for condition, rule in conditions:
+        newly = condition & ~merged
+        rules[newly] = rule
+        merged |= condition
+    return merged, rules
+
+
+def _completeness(producer: Dict) -> int:
+    return sum(1 for value in producer.values() if value not in (None, "", [], {}))
+
+
+def canonical_order(producer: Dict) -> Tuple:
+    """Sort key choosing the record that represents a cluster."""
+    return (SOURCE_PRIORITY.get(producer.get('source'), len(SOURCE_PRIORITY)),
+            -_completeness(producer), str(producer.get('permit_id')))
+
+
+def merge_cluster(records: List[Dict]) -> Dict:
+    """Representative record of a cluster with gaps filled from the other records."""
+    ordered = sorted(records, key=canonical_order)
+    merged = dict(ordered[0])
+    for other in ordered[1:]:
+        for key, value in other.items():
+            if merged.get(key) in (None, "", [], {}) and value not in (None, "", [], {}):
+                merged[key] = value
+    if len(ordered) > 1:
+        merged['merged_permit_ids'] = [other['permit_id'] for other in ordered[1:]]
+    return merged
+
+
+def find_duplicates(producers: Sequence[Dict], max_block_size: int = MAX_BLOCK_SIZE
+                    ) -> Tuple[List[List[int]], List[MergeDecision], Dict[str, int]]:
+    """Cluster duplicate producers.
+
+    Returns:
+        clusters: index lists, in input order of their first member (singletons included)
+        decisions: every scored pair with name similarity >= REVIEW_THRESHOLD
+        stats: blocking and scoring counts
+    """
+    name_keys = [name_key(p.get('business_name')) for p in producers]
+    block_keys = [blocking_keys(p, name_keys[i]) for i, p in enumerate(producers)]
+    left, right, shared, stats = candidate_pairs(block_keys, max_block_size)
+    stats['candidate_pairs'] = len(left)
+
+    scores = score_pairs(producers, left, right)
+    merged, rules = decide(scores)
+
+    union_find = UnionFind(len(producers))
+    decisions = []
+    reported = np.flatnonzero(merged | (scores['name_similarity'] >= REVIEW_THRESHOLD))
+    for k in reported:
+        i, j = int(left[k]), int(right[k])
+        if merged[k]:
+            union_find.union(i, j)
+        distance = scores['distance_km'][k]
+        decisions.append(MergeDecision(
+            permit_id=producers[i].get('permit_id'),
+            other_permit_id=producers[j].get('permit_id'),
+            business_name=producers[i].get('business_name'),
+            other_business_name=producers[j].get('business_name'),
+            decision="merged" if merged[k] else "separate",
+            rule=rules[k],
+            name_similarity=float(scores['name_similarity'][k]),
+            address_similarity=float(scores['address_similarity'][k]),
+            same_postal=bool(scores['same_postal'][k]),
+            same_city=bool(scores['same_city'][k]),
+            distance_km=None if np.isnan(distance) else round(float(distance), 3),
+            blocks=shared[(i, j)],
+        ))
+
+    clusters: Dict[int, List[int]] = {}
+    for index in range(len(producers)):
+        clusters.setdefault(union_find.find(index), []).append(index)
+    stats['merged_pairs'] = int(merged.sum())
+    stats['clusters_merged'] = sum(1 for members in clusters.values() if len(members) > 1)
+    return list(clusters.values()), decisions, stats
+
+
+def deduplicate_producers(producers: Sequence[Dict], max_block_size: int = MAX_BLOCK_SIZE
+                          ) -> Tuple[List[Dict], List[MergeDecision], Dict[str, int]]:
+    """Merged producer list (input order kept), merge decisions and stats."""
+    clusters, decisions, stats = find_duplicates(producers, max_block_size)
+    merged = [merge_cluster([producers[i] for i in members]) for members in clusters]
+    stats['input_producers'] = len(producers)
+    stats['output_producers'] = len(merged)
+    return merged, decisions, stats
+
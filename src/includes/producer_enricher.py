@@ -11,7 +11,8 @@ import re
 import threading
 import time
 from typing import Dict, Tuple
-import openai
+from includes import instrumentation
+from includes.llm_gateway import get_gateway
 
 
 def clean_url(url_string):
@@ -114,14 +115,14 @@ Return only valid JSON with no additional text or formatting.
     return prompt
 
 
-def enrich_producer(producer: Dict, api_key: str, request_delay: float = 1.0, 
+def enrich_producer(producer: Dict, api_key: str, request_delay: float = 0.0, 
                    print_lock: threading.Lock = None) -> Tuple[Dict, Dict]:
     """Enrich a single producer with detailed research.
     
     Args:
         producer: Producer data dict
-        api_key: OpenAI API key
-        request_delay: Delay between requests
+        api_key: OpenAI API key (used if the shared LLM gateway has no client yet)
+        request_delay: Extra fixed delay before the request (the shared gateway already paces calls)
         print_lock: Thread lock for printing
         
     Returns:
@@ -140,22 +141,19 @@ def enrich_producer(producer: Dict, api_key: str, request_delay: float = 1.0,
         
         prompt = create_enrichment_prompt(producer)
         
-        # Rate limiting
         if request_delay > 0:
-            time.sleep(request_delay)
+            instrumentation.sleep(request_delay, "llm.enrich_throttle_sleep")
         
-        # Create OpenAI client
-        client = openai.OpenAI(api_key=api_key)
-        
-        response = client.responses.create(
-            model="gpt-5-mini",
-            tools=[{"type": "web_search"}],
-            input=prompt
-        )
-        
-        # Parse JSON response
+        # Parse JSON response; the gateway only caches answers that parse
         try:
-            enrichment_data = json.loads(response.output_text)
+            response = get_gateway(api_key).create(
+                "enrich",
+                model="gpt-5-mini",
+                tools=[{"type": "web_search"}],
+                input=prompt,
+                validate=json.loads
+            )
+            enrichment_data = response.output_parsed
             
             # Clean malformed URLs in the response
             enrichment_data = clean_enrichment_urls(enrichment_data)
@@ -170,6 +168,8 @@ def enrich_producer(producer: Dict, api_key: str, request_delay: float = 1.0,
             # Add metadata
             enrichment_data['permit_id'] = permit_id
             enrichment_data['enriched_at'] = time.strftime('%Y-%m-%d %H:%M:%S')
+            instrumentation.count("llm.enrich_ok")
+            instrumentation.observe("llm.enrich_wines", len(enrichment_data.get('wines') or []))
             
             if print_lock:
                 with print_lock:
@@ -180,6 +180,7 @@ def enrich_producer(producer: Dict, api_key: str, request_delay: float = 1.0,
             return producer, enrichment_data
             
         except json.JSONDecodeError as e:
+            instrumentation.count("llm.enrich_json_error")
             error_msg = f"JSON parsing failed: {str(e)}"
             if print_lock:
                 with print_lock:
@@ -193,6 +194,7 @@ def enrich_producer(producer: Dict, api_key: str, request_delay: float = 1.0,
             }
             
     except Exception as e:
+        instrumentation.count("llm.enrich_error")
         error_msg = f"Enrichment failed: {str(e)}"
         if print_lock:
             with print_lock:
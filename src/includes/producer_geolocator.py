@@ -9,12 +9,13 @@ Provides thread-safe geolocation with caching support.
 import json
 import re
 import time
-import requests
 import os
 import threading
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
+from includes import instrumentation
+
 
 def load_geolocation_cache() -> Dict[str, Dict]:
     """Load existing geolocation cache."""
@@ -60,6 +61,8 @@ def clean_address(address: str) -> str:
 
 def geocode_google(address: str, delay: float = 0.1) -> Optional[Tuple[float, float]]:
     """Geocode using Google Maps Geocoding API."""
+    import requests
+    
     time.sleep(delay)
     
     api_key = os.getenv('GOOGLE_MAPS_API_KEY')
@@ -108,6 +111,8 @@ def geocode_address(permit_id: str, address: str, city: str, state_province: str
     Returns:
         Tuple of (latitude, longitude, is_fallback) or None if geocoding fails
     """
+    import requests
+    
     def thread_safe_print(message):
         if print_lock:
             with print_lock:
@@ -139,6 +144,7 @@ def geocode_address(permit_id: str, address: str, city: str, state_province: str
     
     # Check cache first
     if cache_key in geocode_cache:
+        instrumentation.count("geocode.cache_hit")
         cached_result = geocode_cache[cache_key]
         if cached_result:
             # Handle both old format (lat, lon) and new format (lat, lon, fallback)
@@ -173,8 +179,9 @@ def geocode_address(permit_id: str, address: str, city: str, state_province: str
     
     try:
         thread_safe_print(f"  1. Nominatim: {full_query}")
-        time.sleep(request_delay)
-        response = requests.get(nominatim_base, params=params, headers=headers, timeout=30)
+        instrumentation.sleep(request_delay, "geocode.throttle_sleep")
+        with instrumentation.timer("geocode.nominatim"):
+            response = requests.get(nominatim_base, params=params, headers=headers, timeout=30)
         response.raise_for_status()
         
         data = response.json()
@@ -186,6 +193,7 @@ def geocode_address(permit_id: str, address: str, city: str, state_province: str
             
             coords = (lat, lon, False)  # False = not a fallback
             geocode_cache[cache_key] = coords
+            instrumentation.count("geocode.nominatim_hit")
             thread_safe_print(f"     ✓ {lat:.4f}, {lon:.4f} (Nominatim)")
             return coords
         else:
@@ -197,12 +205,14 @@ def geocode_address(permit_id: str, address: str, city: str, state_province: str
     # Strategy 2: Try Google for failed cases (paid but accurate)
     if cleaned_address.strip():  # Only try Google if we have a street address
         thread_safe_print(f"  2. Google: {full_query}")
-        google_result = geocode_google(full_query)
+        with instrumentation.timer("geocode.google"):
+            google_result = geocode_google(full_query)
         
         if google_result:
             lat, lon = google_result
             coords = (lat, lon, False)
             geocode_cache[cache_key] = coords
+            instrumentation.count("geocode.google_hit")
             thread_safe_print(f"     ✓ {lat:.4f}, {lon:.4f} (Google)")
             return coords
         else:
@@ -219,7 +229,7 @@ def geocode_address(permit_id: str, address: str, city: str, state_province: str
     fallback_query = ", ".join(part for part in fallback_query_parts if part)
     
     try:
-        time.sleep(request_delay)
+        instrumentation.sleep(request_delay, "geocode.throttle_sleep")
         
         fallback_params = {
             'q': fallback_query,
@@ -228,10 +238,11 @@ def geocode_address(permit_id: str, address: str, city: str, state_province: str
             'countrycodes': countrycodes,
         }
         
-        response = requests.get(nominatim_base, 
-                              params=fallback_params, 
-                              headers=headers, 
-                              timeout=30)
+        with instrumentation.timer("geocode.nominatim"):
+            response = requests.get(nominatim_base, 
+                                  params=fallback_params, 
+                                  headers=headers, 
+                                  timeout=30)
         response.raise_for_status()
         data = response.json()
         
@@ -242,6 +253,7 @@ def geocode_address(permit_id: str, address: str, city: str, state_province: str
             
             coords = (lat, lon, True)  # True = fallback to city center
             geocode_cache[cache_key] = coords
+            instrumentation.count("geocode.city_fallback")
             thread_safe_print(f"     ✓ {lat:.4f}, {lon:.4f} (city fallback)")
             return coords
         else:
@@ -252,6 +264,7 @@ def geocode_address(permit_id: str, address: str, city: str, state_province: str
 
     # Complete failure - cache the failure
     geocode_cache[cache_key] = None
+    instrumentation.count("geocode.failed")
     thread_safe_print(f"  ✗ Complete geocoding failure")
     return None
 
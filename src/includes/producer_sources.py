@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Producer Source Files
+
+Which producer list the research and merge stages read, and how they find
+cache entries for producers that absorbed duplicates in stage 01b.
+"""
+
+import json
+import sys
+from pathlib import Path
+from typing import Dict, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from includes.content_hash import file_sha256
+
+UNIFIED_FILE = Path("data/01_unified_producers.jsonl")
+DEDUPLICATED_FILE = Path("data/01b_deduplicated_producers.jsonl")
+
+
+def dedup_metadata_file(dedup_file: Path) -> Path:
+    """Metadata written by stage 01b next to its output (records the source hash)."""
+    return dedup_file.with_name(f"{dedup_file.stem}_metadata.json")
+
+
+def recorded_source_sha256(dedup_file: Path) -> Optional[str]:
+    """SHA-256 of the unified file a deduplicated file was built from, if recorded."""
+    try:
+        with open(dedup_metadata_file(dedup_file), 'r', encoding='utf-8') as f:
+            return json.load(f).get('source_sha256')
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def dedup_is_current(dedup_file: Path = DEDUPLICATED_FILE, unified_file: Path = UNIFIED_FILE) -> bool:
+    """True if the deduplicated file was built from the current unified file.
+
+    Its recorded source hash must match; files from runs that did not record
+    one must at least be as new as the unified file.
+    """
+    if not unified_file.exists():
+        return True
+    recorded = recorded_source_sha256(dedup_file)
+    if recorded is not None:
+        return recorded == file_sha256(unified_file)
+    return dedup_file.stat().st_mtime_ns >= unified_file.stat().st_mtime_ns
+
+
+def producer_input_file() -> Path:
+    """The deduplicated producer list if stage 01b has run on the current unified one, else the unified one."""
+    if not DEDUPLICATED_FILE.exists():
+        return UNIFIED_FILE
+    if dedup_is_current(DEDUPLICATED_FILE, UNIFIED_FILE):
+        return DEDUPLICATED_FILE
+    print(f"⚠️  {DEDUPLICATED_FILE} was built from an older {UNIFIED_FILE}; reading the unified file instead "
+          f"(re-run src/01b_producer_dedup.py)")
+    return UNIFIED_FILE
+
+
+def cache_lookup(cache: Dict[str, Dict], producer: Dict) -> Optional[Dict]:
+    """Cache entry for a producer under its own permit id or any id merged into it."""
+    for permit_id in [producer.get('permit_id'), *(producer.get('merged_permit_ids') or [])]:
+        if permit_id in cache:
+            return cache[permit_id]
+    return None
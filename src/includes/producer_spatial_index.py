@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Producer Spatial Index Module
+
+KD-tree over the producer geolocation cache for "what is near X" questions.
+Points are embedded on the unit sphere so Euclidean chord distances map
+exactly to great-circle distances. Supports radius, k-nearest and bounding
+box queries, optionally filtered by grape variety or wine type using the
+normalized producer dataset.
+
+USAGE:
+uv run src/includes/producer_spatial_index.py radius --lat 45.1 --lon -72.8 --km 50
+uv run src/includes/producer_spatial_index.py radius --near AV003 --km 30 --variety Frontenac
+uv run src/includes/producer_spatial_index.py knn --lat 44.5 --lon -73.2 --k 10 --wine-type Red
+uv run src/includes/producer_spatial_index.py bbox --min-lat 44 --min-lon -74 --max-lat 46 --max-lon -71
+uv run src/includes/producer_spatial_index.py benchmark --queries 500
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from includes.wine_facts import WineFactTable, load_wine_facts
+
+
+EARTH_RADIUS_KM = 6371.0088
+GEO_CACHE_FILE = Path("data/producer_geolocations_cache.jsonl")
+PRODUCER_FILES = [
+    Path("data/05_wine_producers_final_normalized.jsonl"),
+    Path("data/05_wine_producers_final.jsonl"),
+]
+
+
+@dataclass
+class SpatialMatch:
+    """A producer returned by a spatial query."""
+    permit_id: str
+    name: Optional[str]
+    state_province: Optional[str]
+    latitude: float
+    longitude: float
+    distance_km: Optional[float] = None
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def to_unit_vectors(latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    """Convert degrees to 3D points on the unit sphere."""
+    lat = np.radians(latitudes)
+    lon = np.radians(longitudes)
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)))
+
+
+def km_to_chord(distance_km: float) -> float:
+    """Great-circle distance to straight-line chord length on the unit sphere."""
+    angle = min(distance_km / EARTH_RADIUS_KM, math.pi)
+    return 2.0 * math.sin(angle / 2.0)
+
+
+def chord_to_km(chord: np.ndarray) -> np.ndarray:
+    """Chord length on the unit sphere back to great-circle kilometres."""
+    return 2.0 * np.arcsin(np.clip(chord / 2.0, 0.0, 1.0)) * EARTH_RADIUS_KM
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+class ProducerSpatialIndex:
+    """Spatial index over geocoded producers with optional variety/type filters."""
+
+    def __init__(self, permit_ids: List[str], latitudes: np.ndarray, longitudes: np.ndarray,
+                 facts: Optional[WineFactTable] = None):
+        self.permit_ids = permit_ids
+        self.latitudes = np.asarray(latitudes, dtype=np.float64)
+        self.longitudes = np.asarray(longitudes, dtype=np.float64)
+        self.tree = cKDTree(to_unit_vectors(self.latitudes, self.longitudes))
+        self._row_of_permit = {permit_id: row for row, permit_id in enumerate(permit_ids)}
+
+        # Link index rows to producer rows of the fact table for names and filters
+        self.facts = facts
+        self._producer_of_row = np.full(len(permit_ids), -1, dtype=np.int64)
+        if facts is not None:
+            for producer_id, permit_id in enumerate(facts.producer_permit_ids):
+                row = self._row_of_permit.get(permit_id)
+                if row is not None:
+                    self._producer_of_row[row] = producer_id
+        self._filter_masks: Dict[tuple, np.ndarray] = {}
+
+    @classmethod
+    def from_geolocation_cache(cls, cache_file: Path = GEO_CACHE_FILE,
+                               producers_file: Optional[Path] = None) -> 'ProducerSpatialIndex':
+        """Build the index from the geolocation cache (later entries win)."""
+        points = {}
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                permit_id = item.get('permit_id')
+                lat, lon = item.get('latitude'), item.get('longitude')
+                if permit_id and lat is not None and lon is not None:
+                    points[permit_id] = (float(lat), float(lon))
+
+        if producers_file is None:
+            producers_file = next((p for p in PRODUCER_FILES if p.exists()), None)
+        facts = load_wine_facts(producers_file) if producers_file and Path(producers_file).exists() else None
+
+        permit_ids = list(points)
+        coordinates = np.array([points[p] for p in permit_ids], dtype=np.float64).reshape(-1, 2)
+        return cls(permit_ids, coordinates[:, 0], coordinates[:, 1], facts)
+
+    def __len__(self) -> int:
+        return len(self.permit_ids)
+
+    def location_of(self, permit_id: str) -> Optional[tuple]:
+        """(latitude, longitude) of an indexed producer."""
+        row = self._row_of_permit.get(permit_id)
+        if row is None:
+            return None
+        return float(self.latitudes[row]), float(self.longitudes[row])
+
+    # ------------------------------------------------------------------
+    # Filters
+    # ------------------------------------------------------------------
+
+    def _filter_mask(self, variety: Optional[str], wine_type: Optional[str]) -> Optional[np.ndarray]:
+        """Boolean mask over index rows for producers matching every given filter."""
+        if not variety and not wine_type:
+            return None
+        key = (variety, wine_type)
+        if key in self._filter_masks:
+            return self._filter_masks[key]
+
+        facts = self.facts
+        matching = np.ones(facts.producer_count if facts else 0, dtype=bool)
+        if facts is not None and variety:
+            variety_id = facts.variety_id(variety)
+            matching &= np.isin(np.arange(facts.producer_count),
+                                facts.cepage_producer[facts.cepage_variety == variety_id])
+        if facts is not None and wine_type:
+            type_id = facts.wine_type_id(wine_type)
+            matching &= np.isin(np.arange(facts.producer_count),
+                                facts.wine_producer[facts.wine_type == type_id])
+
+        linked = self._producer_of_row >= 0
+        mask = np.zeros(len(self.permit_ids), dtype=bool)
+        mask[linked] = matching[self._producer_of_row[linked]] if facts is not None else False
+        self._filter_masks[key] = mask
+        return mask
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _match(self, row: int, distance_km: Optional[float]) -> SpatialMatch:
+        producer_id = self._producer_of_row[row]
+        name = state_province = None
+        if producer_id >= 0:
+            name = self.facts.producer_names[producer_id]
+            province_id = self.facts.producer_province[producer_id]
+            state_province = self.facts.provinces[province_id] if province_id >= 0 else None
+        return SpatialMatch(
+            permit_id=self.permit_ids[row],
+            name=name,
+            state_province=state_province,
+            latitude=float(self.latitudes[row]),
+            longitude=float(self.longitudes[row]),
+            distance_km=None if distance_km is None else round(float(distance_km), 3)
+        )
+
+    def radius(self, lat: float, lon: float, radius_km: float,
+               variety: Optional[str] = None, wine_type: Optional[str] = None) -> List[SpatialMatch]:
+        """Producers within `radius_km` of a point, nearest first."""
+        center = to_unit_vectors(np.array([lat]), np.array([lon]))[0]
+        rows = np.array(self.tree.query_ball_point(center, km_to_chord(radius_km)), dtype=np.int64)
+
+        mask = self._filter_mask(variety, wine_type)
+        if mask is not None:
+            rows = rows[mask[rows]]
+
+        chords = np.linalg.norm(self.tree.data[rows] - center, axis=1)
+        distances = chord_to_km(chords)
+        order = np.argsort(distances, kind='stable')
+        return [self._match(int(rows[i]), distances[i]) for i in order]
+
+    def nearest(self, lat: float, lon: float, k: int = 10,
+                variety: Optional[str] = None, wine_type: Optional[str] = None) -> List[SpatialMatch]:
+        """The `k` nearest producers to a point, nearest first."""
+        if len(self) == 0 or k <= 0:
+            return []
+        center = to_unit_vectors(np.array([lat]), np.array([lon]))[0]
+        mask = self._filter_mask(variety, wine_type)
+        wanted = min(k, len(self) if mask is None else int(mask.sum()))
+        if wanted == 0:
+            return []
+
+        # Widen the search until enough rows pass the filter
+        query_k = wanted
+        while True:
+            chords, rows = self.tree.query(center, k=min(query_k, len(self)))
+            chords, rows = np.atleast_1d(chords), np.atleast_1d(rows)
+            if mask is not None:
+                keep = mask[rows]
+                chords, rows = chords[keep], rows[keep]
+            if len(rows) >= wanted or query_k >= len(self):
+                break
+            query_k *= 4
+
+        distances = chord_to_km(chords[:wanted])
+        return [self._match(int(row), distance) for row, distance in zip(rows[:wanted], distances)]
+
+    def bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float,
+             variety: Optional[str] = None, wine_type: Optional[str] = None) -> List[SpatialMatch]:
+        """Producers inside a latitude/longitude box, sorted by latitude then longitude."""
+        # Query the circle around the box centre, then trim to the box itself
+        center_lat = (min_lat + max_lat) / 2
+        center_lon = (min_lon + max_lon) / 2
+        corner_km = max(haversine_km(center_lat, center_lon, lat, lon)
+                        for lat in (min_lat, max_lat) for lon in (min_lon, max_lon))
+        center = to_unit_vectors(np.array([center_lat]), np.array([center_lon]))[0]
+        rows = np.array(self.tree.query_ball_point(center, km_to_chord(corner_km * 1.0001)), dtype=np.int64)
+
+        lats, lons = self.latitudes[rows], self.longitudes[rows]
+        inside = (lats >= min_lat) & (lats <= max_lat) & (lons >= min_lon) & (lons <= max_lon)
+        mask = self._filter_mask(variety, wine_type)
+        if mask is not None:
+            inside &= mask[rows]
+        rows = rows[inside]
+
+        order = np.lexsort((self.longitudes[rows], self.latitudes[rows]))
+        return [self._match(int(rows[i]), None) for i in order]
+
+    def linear_radius(self, lat: float, lon: float, radius_km: float) -> List[str]:
+        """Reference implementation: scan every point with haversine."""
+        matches = []
+        for permit_id, p_lat, p_lon in zip(self.permit_ids, self.latitudes.tolist(), self.longitudes.tolist()):
+            if haversine_km(lat, lon, p_lat, p_lon) <= radius_km:
+                matches.append(permit_id)
+        return matches
+
+
+def benchmark_queries(index: ProducerSpatialIndex, queries: int = 200,
+                      radius_km: float = 50.0, seed: int = 42) -> Dict:
+    """Compare KD-tree radius/kNN latency with a linear haversine scan."""
+    rng = np.random.default_rng(seed)
+    rows = rng.integers(0, len(index), size=queries)
+    # Jitter query points around real producers so radius queries hit something
+    centers = list(zip(index.latitudes[rows] + rng.normal(0, 0.2, queries),
+                       index.longitudes[rows] + rng.normal(0, 0.2, queries)))
+
+    def timed(fn) -> float:
+        start = time.perf_counter()
+        for lat, lon in centers:
+            fn(float(lat), float(lon))
+        return (time.perf_counter() - start) / queries * 1e6
+
+    mismatches = sum(
+        set(m.permit_id for m in index.radius(float(lat), float(lon), radius_km))
+        != set(index.linear_radius(float(lat), float(lon), radius_km))
+        for lat, lon in centers[:min(queries, 50)]
+    )
+
+    results = {
+        'points': len(index),
+        'queries': queries,
+        'radius_km': radius_km,
+        'kdtree_radius_us': timed(lambda lat, lon: index.radius(lat, lon, radius_km)),
+        'kdtree_knn10_us': timed(lambda lat, lon: index.nearest(lat, lon, 10)),
+        'linear_radius_us': timed(lambda lat, lon: index.linear_radius(lat, lon, radius_km)),
+        'result_mismatches': mismatches,
+    }
+    results['speedup'] = results['linear_radius_us'] / results['kdtree_radius_us'] if results['kdtree_radius_us'] else None
+    return results
+
+
+def _print_matches(matches: List[SpatialMatch], as_json: bool):
+    if as_json:
+        print(json.dumps([m.to_dict() for m in matches], ensure_ascii=False, indent=2))
+        return
+    print(f"📍 {len(matches)} producers")
+    for match in matches:
+        distance = f"{match.distance_km:8.2f} km  " if match.distance_km is not None else ""
+        print(f"   {distance}{match.permit_id:<14} {match.name or '-'} ({match.state_province or '?'})")
+
+
+def main():
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description="Spatial queries over geocoded producers")
+    parser.add_argument("--cache", type=Path, default=GEO_CACHE_FILE, help="Geolocation cache JSONL")
+    parser.add_argument("--producers", type=Path, help="Producer dataset used for names and filters")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    def add_filters(sub):
+        sub.add_argument("--variety", help="Only producers using this grape variety")
+        sub.add_argument("--wine-type", help="Only producers making this wine type")
+        sub.add_argument("--json", action="store_true", help="Print results as JSON")
+
+    def add_center(sub):
+        sub.add_argument("--lat", type=float)
+        sub.add_argument("--lon", type=float)
+        sub.add_argument("--near", help="Use this producer's permit_id as the centre")
+
+    radius_parser = subparsers.add_parser('radius', help='Producers within a radius')
+    add_center(radius_parser)
+    radius_parser.add_argument("--km", type=float, default=50.0)
+    add_filters(radius_parser)
+
+    knn_parser = subparsers.add_parser('knn', help='Nearest producers')
+    add_center(knn_parser)
+    knn_parser.add_argument("--k", type=int, default=10)
+    add_filters(knn_parser)
+
+    bbox_parser = subparsers.add_parser('bbox', help='Producers inside a bounding box')
+    for name in ('--min-lat', '--min-lon', '--max-lat', '--max-lon'):
+        bbox_parser.add_argument(name, type=float, required=True)
+    add_filters(bbox_parser)
+
+    bench_parser = subparsers.add_parser('benchmark', help='KD-tree vs linear haversine scan')
+    bench_parser.add_argument("--queries", type=int, default=200)
+    bench_parser.add_argument("--km", type=float, default=50.0)
+
+    args = parser.parse_args()
+
+    if not args.cache.exists():
+        print(f"❌ Geolocation cache not found: {args.cache}")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    index = ProducerSpatialIndex.from_geolocation_cache(args.cache, args.producers)
+    print(f"🌐 Indexed {len(index):,} producers in {(time.perf_counter() - start) * 1000:.1f} ms", file=sys.stderr)
+
+    if args.command == 'benchmark':
+        results = benchmark_queries(index, args.queries, args.km)
+        print(json.dumps(results, indent=2))
+        return
+
+    if args.command in ('radius', 'knn'):
+        if args.near:
+            location = index.location_of(args.near)
+            if location is None:
+                print(f"❌ Producer not in geolocation cache: {args.near}")
+                sys.exit(1)
+            lat, lon = location
+        elif args.lat is not None and args.lon is not None:
+            lat, lon = args.lat, args.lon
+        else:
+            parser.error("give --lat/--lon or --near")
+
+        if args.command == 'radius':
+            matches = index.radius(lat, lon, args.km, args.variety, args.wine_type)
+        else:
+            matches = index.nearest(lat, lon, args.k, args.variety, args.wine_type)
+    else:
+        matches = index.bbox(args.min_lat, args.min_lon, args.max_lat, args.max_lon,
+                             args.variety, args.wine_type)
+
+    _print_matches(matches, args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Province Pages Module
+
+Renders the per-province statistics pages of stage 09 from compiled
+templates. The language tables are baked into str.format templates once
+per process, so rendering a page is a handful of bound format calls and a
+single join. Pages are rendered from a compact snapshot of each province's
+statistics (counts and ordered table rows only), which is cheap to pickle
+and lets provinces be rendered in a process pool.
+
+Example:
+    snapshots = {province: province_page_snapshot(stats) for province, stats in province_stats.items()}
+    pages = render_province_pages(snapshots, workers=4)
+    pages["Quebec"]["fr"]
+"""
+
+import urllib.parse
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Tuple
+
+LANGUAGES = ("en", "fr")
+
+TEXTS = {
+    "fr": {
+        'title': "Statistiques vinicoles - {province}",
+        'overview': "Vue d'ensemble",
+        'variety_classification': "Classification des cépages (par apparitions dans les vins)",
+        'popular_varieties': "Cépages populaires",
+        'wine_types': "Types de vins",
+        'total_producers': "Total des vignobles",
+        'producers_with_wines': "Vignobles avec vins catalogués",
+        'total_wines': "Total des vins",
+        'unique_varieties': "Cépages uniques",
+        'vinifera_count': "Cépages vinifera utilisés",
+        'non_vinifera_count': "Cépages non-vinifera utilisés",
+        'unique_wine_types': "Types de vins uniques",
+        'avg_wines_producer': "Vins par vignoble (moyenne)",
+        'avg_varieties_producer': "Cépages par vignoble (moyenne)",
+        'vinifera_percent': "Vinifera (%)",
+        'non_vinifera_percent': "Non-vinifera (%)",
+        'unknown_percent': "Classification inconnue (%)",
+        'variety': "Cépage",
+        'wine_appearances': "Apparitions dans les vins",
+        'percentage': "Pourcentage",
+        'wine_type': "Type de vin",
+        'count': "Nombre",
+    },
+    "en": {
+        'title': "Wine Statistics - {province}",
+        'overview': "Overview",
+        'variety_classification': "Grape Variety Classification (by wine appearances)",
+        'popular_varieties': "Popular Grape Varieties",
+        'wine_types': "Wine Types",
+        'total_producers': "Total Producers",
+        'producers_with_wines': "Producers with catalogued wines",
+        'total_wines': "Total Wines",
+        'unique_varieties': "Unique Grape Varieties",
+        'vinifera_count': "Vinifera varieties used",
+        'non_vinifera_count': "Non-vinifera varieties used",
+        'unique_wine_types': "Unique Wine Types",
+        'avg_wines_producer': "Wines per Producer (avg)",
+        'avg_varieties_producer': "Varieties per Producer (avg)",
+        'vinifera_percent': "Vinifera (%)",
+        'non_vinifera_percent': "Non-vinifera (%)",
+        'unknown_percent': "Unknown classification (%)",
+        'variety': "Grape Variety",
+        'wine_appearances': "Wine Appearances",
+        'percentage': "Percentage",
+        'wine_type': "Wine Type",
+        'count': "Count",
+    },
+}
+
+# Classification column of the popular varieties table, by snapshot class
+CLASSIFICATION_LABELS = {
+    "en": {"vinifera": "Vinifera", "non_vinifera": "Resistant", "unknown_name": "Unknown", "other": "Unknown"},
+    "fr": {"vinifera": "Vinifera", "non_vinifera": "Résistant", "unknown_name": "Inconnu", "other": "Unknown"},
+}
+
+
+def _escape(text: str) -> str:
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+@dataclass(frozen=True)
+class PageTemplate:
+    """One language's page, pre-formatted down to the per-province values."""
+    overview: Callable[..., str]
+    classification: Callable[..., str]
+    varieties_header: str
+    variety_row: Callable[..., str]
+    wine_types_header: str
+    wine_type_row: Callable[..., str]
+    labels: Dict[str, str]
+
+
+def compile_page_template(language: str) -> PageTemplate:
+    """Bake a language's texts into format templates."""
+    t = {key: _escape(value) for key, value in TEXTS[language].items()}
+    t['title'] = TEXTS[language]['title']  # keeps its {province} field
+    overview = "\n".join([
+        f"# {t['title']}",
+        "",
+        "[🗺️ View producers on interactive map](/producer-map/?state={encoded_province})",
+        "",
+        f"## {t['overview']}",
+        "",
+        "| Metric | Value |",
+        "|--------|-------|",
+        f"| {t['total_producers']} | {{producer_count:,}} |",
+        f"| {t['producers_with_wines']} | {{producers_with_wines:,}} |",
+        f"| {t['total_wines']} | {{total_wines:,}} |",
+        f"| {t['unique_varieties']} | {{unique_varieties}} |",
+        f"| {t['vinifera_count']} | {{vinifera_count}} |",
+        f"| {t['non_vinifera_count']} | {{non_vinifera_count}} |",
+        f"| {t['unique_wine_types']} | {{unique_wine_types}} |",
+        f"| {t['avg_wines_producer']} | {{avg_wines:.1f}} |",
+        f"| {t['avg_varieties_producer']} | {{avg_varieties:.1f}} |",
+        "",
+    ])
+    classification = "\n".join([
+        f"## {t['variety_classification']}",
+        "",
+        "| Classification | Percentage |",
+        "|---------------|------------|",
+        f"| {t['vinifera_percent']} | {{vinifera_percent:.1f}}% |",
+        f"| {t['non_vinifera_percent']} | {{non_vinifera_percent:.1f}}% |",
+        f"| {t['unknown_percent']} | {{unknown_percent:.1f}}% |",
+        "",
+    ])
+    texts = TEXTS[language]
+    varieties_header = "\n".join([
+        f"## {texts['popular_varieties']}",
+        "",
+        f"| {texts['variety']} | {texts['wine_appearances']} | {texts['percentage']} | Classification |",
+        "|-------------|----------|------------|------------|",
+    ])
+    wine_types_header = "\n".join([
+        f"## {texts['wine_types']}",
+        "",
+        f"| {texts['wine_type']} | {texts['count']} | {texts['percentage']} |",
+        "|-----------|-------|------------|",
+    ])
+    return PageTemplate(
+        overview=overview.format,
+        classification=classification.format,
+        varieties_header=varieties_header,
+        variety_row="| {} | {} | {:.1f}% | {} |".format,
+        wine_types_header=wine_types_header,
+        wine_type_row="| {} | {} | {:.1f}% |".format,
+        labels=CLASSIFICATION_LABELS[language],
+    )
+
+
+# Compiled once per process (workers compile on import)
+TEMPLATES = {language: compile_page_template(language) for language in LANGUAGES}
+
+
+def variety_class(variety: str, stats: Dict) -> str:
+    if variety in stats['vinifera_varieties']:
+        return "vinifera"
+    if variety in stats['non_vinifera_varieties']:
+        return "non_vinifera"
+    return "unknown_name" if variety == "Unknown" else "other"
+
+
+def province_page_snapshot(stats: Dict) -> Dict:
+    """Everything a province page shows, without producer records or Counters."""
+    return {
+        'producer_count': stats['producer_count'],
+        'producers_with_wines': stats['producers_with_wines'],
+        'total_wines': stats['total_wines'],
+        'unique_varieties': len(stats['grape_varieties']),
+        'vinifera_count': len(stats['vinifera_varieties']),
+        'non_vinifera_count': len(stats['non_vinifera_varieties']),
+        'unique_wine_types': len(stats['wine_types']),
+        'variety_mentions': sum(stats['grape_varieties'].values()),
+        'vinifera_total': sum(stats['vinifera_varieties'].values()),
+        'non_vinifera_total': sum(stats['non_vinifera_varieties'].values()),
+        'unknown_total': sum(stats['unknown_varieties'].values()),
+        'varieties': [(variety, appearances, variety_class(variety, stats))
+                      for variety, appearances in stats['variety_wine_appearances'].most_common()],
+        'wine_types': stats['wine_types'].most_common(),
+    }
+
+
+def render_province_page(province: str, snapshot: Dict, language: str = "en") -> str:
+    """Markdown statistics page of one province."""
+    template = TEMPLATES[language]
+    with_wines = snapshot['producers_with_wines']
+    chunks = [template.overview(
+        province=province,
+        encoded_province=urllib.parse.quote_plus(province),
+        producer_count=snapshot['producer_count'],
+        producers_with_wines=with_wines,
+        total_wines=snapshot['total_wines'],
+        unique_varieties=snapshot['unique_varieties'],
+        vinifera_count=snapshot['vinifera_count'],
+        non_vinifera_count=snapshot['non_vinifera_count'],
+        unique_wine_types=snapshot['unique_wine_types'],
+        avg_wines=snapshot['total_wines'] / with_wines if with_wines > 0 else 0,
+        avg_varieties=snapshot['variety_mentions'] / with_wines if with_wines > 0 else 0,
+    )]
+
+    classified = snapshot['vinifera_total'] + snapshot['non_vinifera_total'] + snapshot['unknown_total']
+    if classified > 0:
+        chunks.append(template.classification(
+            vinifera_percent=snapshot['vinifera_total'] / classified * 100,
+            non_vinifera_percent=snapshot['non_vinifera_total'] / classified * 100,
+            unknown_percent=snapshot['unknown_total'] / classified * 100,
+        ))
+
+    varieties = snapshot['varieties']
+    if varieties:
+        total = sum(appearances for _, appearances, _ in varieties)
+        row, labels = template.variety_row, template.labels
+        chunks.append(template.varieties_header)
+        chunks.extend(row(variety, appearances, appearances / total * 100 if total > 0 else 0, labels[kind])
+                      for variety, appearances, kind in varieties)
+        chunks.append("")
+
+    wine_types = snapshot['wine_types']
+    if wine_types:
+        total = sum(count for _, count in wine_types)
+        row = template.wine_type_row
+        chunks.append(template.wine_types_header)
+        chunks.extend(row(wine_type, count, count / total * 100 if total > 0 else 0)
+                      for wine_type, count in wine_types)
+        chunks.append("")
+
+    return "\n".join(chunks)
+
+
+def _render_chunk(items: List[Tuple[str, Dict]], languages: Iterable[str]) -> Dict[str, Dict[str, str]]:
+    """Process-pool entry point: render a batch of provinces."""
+    return {province: {language: render_province_page(province, snapshot, language) for language in languages}
+            for province, snapshot in items}
+
+
+def render_province_pages(snapshots: Dict[str, Dict], workers: int = 1,
+                          languages: Iterable[str] = LANGUAGES) -> Dict[str, Dict[str, str]]:
+    """Render every province in every language, in worker processes if workers > 1."""
+    languages = tuple(languages)
+    items = list(snapshots.items())
+    if workers <= 1 or len(items) < 2:
+        return _render_chunk(items, languages)
+
+    # Deal provinces out largest first so workers get similar amounts of rows
+    by_size = sorted(items, key=lambda item: len(item[1]['varieties']), reverse=True)
+    chunks = [by_size[i::workers] for i in range(workers)]
+    pages = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for rendered in executor.map(_render_chunk, [chunk for chunk in chunks if chunk],
+                                     [languages] * workers):
+            pages.update(rendered)
+    # Keep the caller's province order
+    return {province: pages[province] for province, _ in items}
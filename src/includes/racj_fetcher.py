@@ -7,10 +7,19 @@ Fetches and processes Quebec wine producers from RACJ permits data.
 """
 
 import json
-import requests
+import sys
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any, TypedDict
+from typing import Any, Dict, Iterator, List, Optional, TypedDict
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from includes.download_manager import DownloadResult, download_with_fallback, recorded_sha256
+from includes.json_stream import JsonStream
+from includes.name_filters import KeywordFilter
+
+# Permit types and product categories that identify wine producers
+WINE_PERMIT_TYPES = KeywordFilter(['Production artisanale de vin'], whole=True)
+WINE_CATEGORIES = KeywordFilter(['VIN'], whole=True)
 
 
 class PermitDetail(TypedDict):
@@ -52,27 +61,46 @@ class WineProducersMetadata(TypedDict):
     wine_permit_types: Dict[str, int]
 
 
-def fetch_quebec_producers(data_dir: str = "data/can/racj") -> Dict[str, Any]:
-    """Fetch Quebec wine producers from RACJ data.
+def stream_quebec_producers(metadata: Dict[str, Any], data_dir: str = "data/can/racj",
+                            download: bool = True) -> Iterator[Dict[str, Any]]:
+    """Stream normalized Quebec wine producers from the RACJ data.
     
     Args:
+        metadata: Dict filled in place with fetch metadata (an 'error' key on failure)
         data_dir: Directory to save RACJ data files
-        
-    Returns:
-        Dict with normalized producer data and metadata
+        download: Refresh the JSON first (conditional request); False uses the file on disk
     """
     fetcher = QuebecWineProducersFetcher(data_dir)
     
-    # Fetch or load data
-    if not fetcher.raw_file.exists():
-        print("📥 Fetching fresh RACJ data...")
-        if not fetcher.fetch_raw_data():
-            return {"producers": [], "metadata": {"error": "Failed to fetch RACJ data"}}
+    if download:
+        result = fetcher.download_raw_data()
     else:
         print(f"📁 Using existing RACJ data: {fetcher.raw_file}")
+        result = DownloadResult(fetcher.raw_file, "skipped", False, recorded_sha256(fetcher.raw_file))
+    if not result.available:
+        metadata['error'] = "Failed to fetch RACJ data"
+        return
     
-    # Process data
-    return fetcher.process_wine_producers()
+    yield from fetcher.iter_wine_producers(metadata)
+    metadata['content_sha256'] = result.sha256
+    print(f"Processed {metadata['wine_record_count']} Quebec wine producers")
+
+
+def fetch_quebec_producers(data_dir: str = "data/can/racj") -> Dict[str, Any]:
+    """Fetch Quebec wine producers from RACJ data.
+    
+    Args:
+        data_dir: Directory to save RACJ data files
+        
+    Returns:
+        Dict with normalized producer data and metadata
+    """
+    metadata = {}
+    producers = list(stream_quebec_producers(metadata, data_dir))
+    return {
+        'producers': producers,
+        'metadata': metadata
+    }
 
 
 class QuebecWineProducersFetcher:
@@ -85,26 +113,21 @@ class QuebecWineProducersFetcher:
         self.source_url = "https://www.donneesquebec.ca/recherche/dataset/racj-alcool-fabricant/resource/6b143028-cb62-4f76-860c-6cf0eab8ea0b/download/racj-alcool-fabricant.json"
         self.raw_file = self.data_dir / "racj-alcool-fabricant.json"
         
+    def download_raw_data(self) -> DownloadResult:
+        """Conditionally download the raw RACJ permits JSON, keeping the existing file on errors."""
+        print(f"Fetching data from: {self.source_url}")
+        return download_with_fallback(self.source_url, self.raw_file, "RACJ data", timeout=(10, 30),
+                                      validate=self._validate_raw_file)
+    
+    def _validate_raw_file(self, path: Path):
+        """Raise ValueError unless path holds a readable RACJ document (streamed, not loaded)."""
+        for _ in self.iter_wine_producers({}, path):
+            pass
+    
     def fetch_raw_data(self) -> bool:
         """Download the raw RACJ permits JSON data."""
-        try:
-            print(f"Fetching data from: {self.source_url}")
-            response = requests.get(self.source_url, timeout=30)
-            response.raise_for_status()
-            
-            # Validate it's JSON
-            json.loads(response.text)
-            
-            # Save raw data
-            with open(self.raw_file, 'w', encoding='utf-8') as f:
-                f.write(response.text)
-                
-            print(f"Raw data saved to: {self.raw_file}")
-            return True
-            
-        except (requests.RequestException, json.JSONDecodeError) as e:
-            print(f"Error fetching/parsing data: {e}")
-            return False
+        result = self.download_raw_data()
+        return result.available and result.status != "failed"
     
     def load_raw_data(self) -> RACJDataStructure:
         """Load the raw JSON data."""
@@ -116,11 +139,11 @@ class QuebecWineProducersFetcher:
     
     def is_wine_related_permit_type(self, type_permis: str) -> bool:
         """Check if a permit type is artisanal wine production."""
-        return type_permis == 'Production artisanale de vin'
+        return WINE_PERMIT_TYPES.matches(type_permis)
     
     def has_wine_categories(self, categories: List[str]) -> bool:
         """Check if permit categories include wine ('VIN')."""
-        return 'VIN' in [cat.upper() for cat in categories]
+        return WINE_CATEGORIES.matches_any(categories)
     
     def normalize_fabricant_to_producer(self, fabricant: FabricantRecord, permit_detail: PermitDetail) -> Dict[str, Any]:
         """Convert a RACJ fabricant record to a normalized producer format."""
@@ -169,23 +192,70 @@ class QuebecWineProducersFetcher:
         
         return wine_producers, wine_permit_types
     
-    def process_wine_producers(self) -> Dict[str, Any]:
-        """Process raw RACJ data and return wine producers with metadata."""
-        raw_data = self.load_raw_data()
-        wine_producers, wine_permit_types = self.filter_wine_producers(raw_data)
+    def iter_wine_producers(self, metadata: Dict[str, Any], raw_file: Optional[Path] = None) -> Iterator[Dict[str, Any]]:
+        """Stream wine producers from the raw JSON, updating metadata counters as fabricants are read.
         
-        # Count raw records
-        raw_count = sum(len(group['Fabricants']) for group in raw_data['AlcoolFabricants'])
-        
-        # Create metadata
-        metadata = {
+        Only one fabricant record is decoded at a time, so memory does not grow with the file.
+        """
+        metadata.update({
             'source_url': self.source_url,
             'fetch_date': datetime.now().isoformat(),
-            'raw_record_count': raw_count,
-            'wine_record_count': len(wine_producers),
+            'raw_record_count': 0,
+            'wine_record_count': 0,
             'filter_criteria': "Production artisanale de vin with 'VIN' category",
-            'wine_permit_types': wine_permit_types
-        }
+            'wine_permit_types': {}
+        })
+        
+        with open(raw_file or self.raw_file, 'r', encoding='utf-8') as f:
+            stream = JsonStream(f)
+            for key in stream.iter_object():
+                if key != 'AlcoolFabricants':
+                    stream.read_value()
+                    continue
+                for _ in stream.iter_array():
+                    yield from self._iter_permit_group(stream, metadata)
+    
+    def _iter_permit_group(self, stream: JsonStream, metadata: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Stream the wine producers of one TypePermisGroup object."""
+        type_permis = None
+        pending = []  # Fabricants seen before the group's TypePermis key
+        
+        for key in stream.iter_object():
+            if key == 'TypePermis':
+                type_permis = stream.read_value()
+            elif key == 'Fabricants':
+                for _ in stream.iter_array():
+                    fabricant = stream.read_value()
+                    metadata['raw_record_count'] += 1
+                    if type_permis is None:
+                        pending.append(fabricant)
+                    else:
+                        yield from self._wine_producers_for(type_permis, fabricant, metadata)
+            else:
+                stream.read_value()
+        
+        for fabricant in pending:
+            yield from self._wine_producers_for(type_permis, fabricant, metadata)
+    
+    def _wine_producers_for(self, type_permis: str, fabricant: FabricantRecord,
+                            metadata: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Normalized producers for the wine permits of one fabricant."""
+        if not self.is_wine_related_permit_type(type_permis):
+            return
+        wine_permit_types = metadata['wine_permit_types']
+        wine_permit_types.setdefault(type_permis, 0)
+        
+        for permit_detail in fabricant.get('Permis', []):
+            # Check if permit has wine categories
+            if self.has_wine_categories(permit_detail['Catgrs']):
+                wine_permit_types[type_permis] += 1
+                metadata['wine_record_count'] += 1
+                yield self.normalize_fabricant_to_producer(fabricant, permit_detail)
+    
+    def process_wine_producers(self) -> Dict[str, Any]:
+        """Process raw RACJ data and return wine producers with metadata."""
+        metadata = {}
+        wine_producers = list(self.iter_wine_producers(metadata))
         
         print(f"Processed {len(wine_producers)} Quebec wine producers")
         
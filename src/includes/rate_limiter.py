@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Adaptive Rate Limiter
+
+Paces OpenAI requests to the account's requests-per-minute and
+tokens-per-minute limits. One limiter state per model is shared by every
+thread of a process and by every process on the machine (stages started
+in parallel by run_pipeline.py, or several researchers started by hand)
+through a small JSON state file guarded by an exclusive file lock.
+
+- Token buckets for requests and tokens, refilled continuously, holding at
+  most BURST_SECONDS worth of capacity
+- Limits are learned from the x-ratelimit-* response headers; the
+  GRAPEGEEK_LLM_RPM / GRAPEGEEK_LLM_TPM defaults only seed them
+- A 429 blocks every caller until its retry-after and halves the rate,
+  which then recovers a step with each successful call (AIMD)
+- Token use is reserved from an estimate once per call (retries only take
+  a request) and corrected with the real usage afterwards, or released
+  when the call fails
+
+Example:
+    limiter = RateLimiter("gpt-5-mini", Path("data/cache/llm/_ratelimit"))
+    limiter.acquire(estimated_tokens)
+    ... call the API ...
+    limiter.update_from_headers(response_headers)
+    limiter.record(estimated_tokens, used_tokens)
+"""
+
+import json
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterator, Mapping, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: threads of one process are still coordinated
+    fcntl = None
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from includes import instrumentation
+
+DEFAULT_RPM = float(os.environ.get("GRAPEGEEK_LLM_RPM", "500"))
+DEFAULT_TPM = float(os.environ.get("GRAPEGEEK_LLM_TPM", "200000"))
+BURST_SECONDS = 10.0
+MIN_RATE_FACTOR = 0.05
+RECOVERY_STEP = 0.05
+DEFAULT_PENALTY_SECONDS = 1.0
+MAX_WAIT_STEP = 5.0  # re-check the shared state at least this often while waiting
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+@dataclass
+class LimiterState:
+    """Shared bucket state, persisted between callers."""
+    rpm: float
+    tpm: float
+    requests: float          # available request capacity
+    tokens: float            # available token capacity (negative when in debt)
+    updated: float           # wall-clock time of the last refill
+    blocked_until: float = 0.0
+    factor: float = 1.0      # adaptive share of the limits currently used
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """Seconds from an OpenAI reset header ("20ms", "1s", "6m0s", "1h2m3.5s") or a plain number."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Server-requested wait from a rate limit error's response headers, if any."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    if headers.get("retry-after-ms") is not None:
+        return float(headers["retry-after-ms"]) / 1000
+    return parse_duration(headers.get("retry-after"))
+
+
+class RateLimiter:
+    """Requests/tokens per minute limiter shared across threads and processes."""
+
+    def __init__(self, name: str, state_dir: Path, rpm: float = DEFAULT_RPM, tpm: float = DEFAULT_TPM,
+                 clock: Callable[[], float] = time.time, sleep: Optional[Callable[[float], None]] = None):
+        """
+        Args:
+            name: Limit group (the model name; OpenAI limits are per model)
+            state_dir: Directory of the shared state and lock files
+            rpm, tpm: Initial limits until response headers report the real ones
+            clock, sleep: Injected in tests
+        """
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", name)
+        self.name = name
+        self.path = Path(state_dir) / f"{safe_name}.json"
+        self.lock_path = Path(state_dir) / f"{safe_name}.lock"
+        self.rpm = rpm
+        self.tpm = tpm
+        self._clock = clock
+        self._sleep = sleep or (lambda seconds: instrumentation.sleep(seconds, "llm.rate_limit_sleep"))
+        self._thread_lock = threading.Lock()
+
+    # Public API
+
+    def acquire(self, tokens: float = 0) -> float:
+        """Block until one request and `tokens` tokens are available; returns the seconds waited."""
+        waited = 0.0
+        while True:
+            with self._state() as state:
+                now = self._clock()
+                self._refill(state, now)
+                wait = state.blocked_until - now
+                if wait <= 0:
+                    rpm, tpm = self._rates(state)
+                    # A request larger than the burst capacity waits for a full bucket instead of forever
+                    needed = min(tokens, self._capacity(tpm))
+                    missing_requests = 1 - state.requests
+                    missing_tokens = needed - state.tokens
+                    if missing_requests <= 0 and missing_tokens <= 0:
+                        state.requests -= 1
+                        state.tokens -= tokens
+                        if waited:
+                            instrumentation.observe("llm.rate_limit_wait", waited)
+                        return waited
+                    wait = max(missing_requests * 60 / rpm, missing_tokens * 60 / tpm)
+            wait = min(wait, MAX_WAIT_STEP)
+            self._sleep(wait)
+            waited += wait
+
+    def record(self, estimated_tokens: float, used_tokens: float):
+        """Correct the token reservation with the real usage and recover some rate after a success."""
+        with self._state() as state:
+            self._refill(state, self._clock())
+            state.tokens = max(state.tokens + estimated_tokens - used_tokens, -self._capacity(state.tpm))
+            state.factor = min(1.0, state.factor + RECOVERY_STEP)
+
+    def release(self, estimated_tokens: float):
+        """Return the token reservation of a call that failed without a usage report."""
+        with self._state() as state:
+            self._refill(state, self._clock())
+            state.tokens = min(self._capacity(self._rates(state)[1]), state.tokens + estimated_tokens)
+
+    def penalize(self, retry_after: Optional[float] = None):
+        """After a 429: every caller waits `retry_after` seconds and the rate is halved."""
+        with self._state() as state:
+            now = self._clock()
+            self._refill(state, now)
+            state.factor = max(MIN_RATE_FACTOR, state.factor / 2)
+            delay = DEFAULT_PENALTY_SECONDS if retry_after is None else retry_after
+            state.blocked_until = max(state.blocked_until, now + delay)
+        instrumentation.count("llm.rate_limited")
+
+    def update_from_headers(self, headers: Optional[Mapping[str, Any]]):
+        """Adopt the limits and remaining capacity reported by x-ratelimit-* headers."""
+        if not headers:
+            return
+        limit_requests = headers.get("x-ratelimit-limit-requests")
+        limit_tokens = headers.get("x-ratelimit-limit-tokens")
+        remaining_requests = headers.get("x-ratelimit-remaining-requests")
+        remaining_tokens = headers.get("x-ratelimit-remaining-tokens")
+        if limit_requests is None and limit_tokens is None and remaining_requests is None \
+                and remaining_tokens is None:
+            return
+        with self._state() as state:
+            now = self._clock()
+            self._refill(state, now)
+            if limit_requests is not None:
+                state.rpm = float(limit_requests)
+            if limit_tokens is not None:
+                state.tpm = float(limit_tokens)
+            for remaining, available, reset_header in (
+                    (remaining_requests, "requests", "x-ratelimit-reset-requests"),
+                    (remaining_tokens, "tokens", "x-ratelimit-reset-tokens")):
+                if remaining is None:
+                    continue
+                setattr(state, available, min(getattr(state, available), float(remaining)))
+                if float(remaining) <= 0:
+                    reset = parse_duration(headers.get(reset_header)) or DEFAULT_PENALTY_SECONDS
+                    state.blocked_until = max(state.blocked_until, now + reset)
+
+    def snapshot(self) -> LimiterState:
+        """Current shared state (after refill)."""
+        with self._state() as state:
+            self._refill(state, self._clock())
+            return LimiterState(**asdict(state))
+
+    # Internals
+
+    @staticmethod
+    def _capacity(per_minute: float) -> float:
+        return max(per_minute * BURST_SECONDS / 60, 1.0)
+
+    @staticmethod
+    def _rates(state: LimiterState):
+        return (max(state.rpm * state.factor, 1e-6), max(state.tpm * state.factor, 1e-6))
+
+    def _refill(self, state: LimiterState, now: float):
+        elapsed = max(0.0, now - state.updated)
+        rpm, tpm = self._rates(state)
+        state.requests = min(self._capacity(rpm), state.requests + elapsed * rpm / 60)
+        state.tokens = min(self._capacity(tpm), state.tokens + elapsed * tpm / 60)
+        state.updated = max(state.updated, now)
+
+    @contextmanager
+    def _state(self) -> Iterator[LimiterState]:
+        """Exclusive read-modify-write of the shared state."""
+        with self._thread_lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.lock_path, "a") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                state = self._load()
+                yield state
+                self._save(state)
+
+    def _load(self) -> LimiterState:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return LimiterState(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            # First caller, or an unreadable file: start with full buckets
+            return LimiterState(rpm=self.rpm, tpm=self.tpm, requests=self._capacity(self.rpm),
+                                tokens=self._capacity(self.tpm), updated=self._clock())
+
+    def _save(self, state: LimiterState):
+        temp_file = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump(asdict(state), f)
+        os.replace(temp_file, self.path)
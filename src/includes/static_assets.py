@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Static Assets Module
+
+Publishes the large generated data files (map GeoJSON, family tree data,
+region card data) as minified, content-hashed copies with gzip and brotli
+variants next to them, and records their URLs in an asset manifest that
+the map script and the React apps read. Hashed names never change content,
+so they can be cached forever; old versions are pruned through the stage's
+generated-files manifest.
+
+Brotli needs the optional `brotli` package; without it only gzip variants
+are written.
+
+Example:
+    output = GeneratedFiles("19_precompress_assets")
+    entry = publish_asset(ASSETS[0], output)
+    write_asset_manifest(output, DEFAULT_MANIFEST_FILE, {ASSETS[0].name: entry})
+    output.finish(prune=True)
+"""
+
+import gzip
+import hashlib
+import json
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from includes.generated_files import GeneratedFiles
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+HASH_LENGTH = 10
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+DEFAULT_MANIFEST_FILE = Path("docs/assets/data/asset-manifest.json")
+
+
+@dataclass(frozen=True)
+class StaticAsset:
+    """A generated JSON file and where its hashed copies are published."""
+    name: str          # manifest key, the file's plain name
+    source: Path       # pretty-printed file written by the pipeline
+    output_dir: Path   # directory the hashed copies are written to
+    url_prefix: str    # URL of output_dir on the deployed site
+
+    def hashed_name(self, digest: str) -> str:
+        stem, _, suffix = self.name.rpartition('.')
+        return f"{stem}.{digest[:HASH_LENGTH]}.{suffix}"
+
+
+ASSETS = [
+    StaticAsset("wine-producers-final.geojson", Path("docs/assets/data/wine-producers-final.geojson"),
+                Path("docs/assets/data"), "/assets/data/"),
+    StaticAsset("quebec-wineries.geojson", Path("docs/assets/data/quebec-wineries.geojson"),
+                Path("docs/assets/data"), "/assets/data/"),
+    StaticAsset("regions_data.json", Path("docs/cards/regions_data.json"),
+                Path("docs/cards"), "/cards/"),
+    # Vite copies public/ into docs/family-trees/ on `npm run build`
+    StaticAsset("tree-data.json", Path("grape-tree-react/src/data/tree-data.json"),
+                Path("grape-tree-react/public"), "/family-trees/"),
+]
+
+
+def minify_json(path: Path) -> bytes:
+    """Compact UTF-8 JSON with the same data (and key order) as the file."""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)  # mtime=0: reproducible bytes
+    return brotli.compress(data, quality=BROTLI_QUALITY)
+
+
+def publish_asset(asset: StaticAsset, output: GeneratedFiles, use_brotli: bool = True) -> Dict:
+    """Write the minified, hashed copy of an asset and its compressed variants.
+
+    Returns the asset's manifest entry (URLs, digest and byte sizes).
+    """
+    minified = minify_json(asset.source)
+    digest = hashlib.sha256(minified).hexdigest()
+    file_name = asset.hashed_name(digest)
+    output.write_bytes(asset.output_dir / file_name, minified)
+
+    entry = {
+        'url': asset.url_prefix + file_name,
+        'sha256': digest,
+        'encodings': {},
+        'bytes': {'source': asset.source.stat().st_size, 'minified': len(minified)},
+    }
+    encodings = ["br", "gzip"] if use_brotli and brotli is not None else ["gzip"]
+    for encoding in encodings:
+        suffix = ".br" if encoding == "br" else ".gz"
+        compressed = compress(minified, encoding)
+        if len(compressed) >= len(minified):
+            continue  # tiny files: serving the minified file is cheaper
+        output.write_bytes(asset.output_dir / (file_name + suffix), compressed)
+        entry['encodings'][encoding] = entry['url'] + suffix
+        entry['bytes'][encoding] = len(compressed)
+    return entry
+
+
+def published_files(asset: StaticAsset, entry: Dict) -> List[Path]:
+    """Files written for an asset's manifest entry (hashed copy and variants)."""
+    urls = [entry['url'], *entry.get('encodings', {}).values()]
+    return [asset.output_dir / url.rsplit('/', 1)[-1] for url in urls]
+
+
+def load_asset_manifest(manifest_file: Path) -> Dict[str, Dict]:
+    try:
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            return json.load(f).get('assets', {})
+    except (OSError, ValueError):
+        return {}
+
+
+def write_asset_manifest(output: GeneratedFiles, manifest_file: Path, entries: Dict[str, Dict]) -> bool:
+    """Merge entries into the asset manifest; returns True if it changed."""
+    assets = {**load_asset_manifest(manifest_file), **entries}
+    content = json.dumps({'assets': dict(sorted(assets.items()))}, indent=2, ensure_ascii=False) + '\n'
+    return output.write_text(manifest_file, content)
+
+
+def savings_line(name: str, sizes: Dict[str, int]) -> str:
+    """One report line: source → minified → compressed sizes with the share saved."""
+    source = sizes['source']
+    smallest = min(size for key, size in sizes.items() if key != 'source')
+    parts = [f"{key} {size:,}" for key, size in sizes.items() if key != 'source']
+    saved = (1 - smallest / source) * 100 if source else 0
+    return f"{name}: {source:,} B → " + ", ".join(parts) + f" B (saved {source - smallest:,} B, {saved:.1f}%)"
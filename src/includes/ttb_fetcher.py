@@ -7,9 +7,15 @@ Fetches and processes US wine producers from TTB permits data.
 """
 
 import csv
-import requests
+import sys
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Any, Dict, Iterator, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from includes.download_manager import DownloadResult, download_with_fallback, recorded_sha256
+from includes.name_filters import KeywordFilter
+
+TTB_URL = "https://www.ttb.gov/media/81096/download"
 
 
 # US northeastern border states configuration
@@ -25,6 +31,21 @@ NORTHEASTERN_STATES = {
     'ME': 'Maine'
 }
 
+# All US state codes, used to name states when the northeastern filter is dropped
+US_STATES = {
+    'AL': 'Alabama', 'AK': 'Alaska', 'AZ': 'Arizona', 'AR': 'Arkansas', 'CA': 'California',
+    'CO': 'Colorado', 'CT': 'Connecticut', 'DE': 'Delaware', 'DC': 'District of Columbia',
+    'FL': 'Florida', 'GA': 'Georgia', 'HI': 'Hawaii', 'ID': 'Idaho', 'IL': 'Illinois',
+    'IN': 'Indiana', 'IA': 'Iowa', 'KS': 'Kansas', 'KY': 'Kentucky', 'LA': 'Louisiana',
+    'ME': 'Maine', 'MD': 'Maryland', 'MA': 'Massachusetts', 'MI': 'Michigan', 'MN': 'Minnesota',
+    'MS': 'Mississippi', 'MO': 'Missouri', 'MT': 'Montana', 'NE': 'Nebraska', 'NV': 'Nevada',
+    'NH': 'New Hampshire', 'NJ': 'New Jersey', 'NM': 'New Mexico', 'NY': 'New York',
+    'NC': 'North Carolina', 'ND': 'North Dakota', 'OH': 'Ohio', 'OK': 'Oklahoma', 'OR': 'Oregon',
+    'PA': 'Pennsylvania', 'RI': 'Rhode Island', 'SC': 'South Carolina', 'SD': 'South Dakota',
+    'TN': 'Tennessee', 'TX': 'Texas', 'UT': 'Utah', 'VT': 'Vermont', 'VA': 'Virginia',
+    'WA': 'Washington', 'WV': 'West Virginia', 'WI': 'Wisconsin', 'WY': 'Wyoming'
+}
+
 # Business exclusion patterns (non-wine businesses with wine permits)
 EXCLUSION_PATTERNS = [
     'BREW', 'BREWING', 'BEER', 'ALE', 'LAGER', 'IPA', 'STOUT', 'PORTER',
@@ -33,6 +54,7 @@ EXCLUSION_PATTERNS = [
     'GROCERY', 'MARKET', 'STORE', 'RETAIL', 'SHOP',
     'DISTRIBUTOR', 'WHOLESALE', 'IMPORT'
 ]
+EXCLUSION_FILTER = KeywordFilter(EXCLUSION_PATTERNS)
 
 
 def extract_state_from_permit(permit_id: str) -> str:
@@ -44,25 +66,20 @@ def extract_state_from_permit(permit_id: str) -> str:
 
 def is_excluded_business(business_name: str) -> bool:
     """Check if business should be excluded based on name patterns."""
-    name_upper = business_name.upper()
-    
-    # Check for exclusion patterns
-    for pattern in EXCLUSION_PATTERNS:
-        if pattern in name_upper:
-            return True
-    
-    return False
+    return EXCLUSION_FILTER.matches(business_name)
 
 
 def normalize_ttb_to_producer(permit_id: str, business_name: str, trade_name: str,
                              address: str, city: str, postal_code: str, 
-                             county: str, state_code: str) -> Dict[str, Any]:
+                             county: str, state_code: str,
+                             states: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
     """Convert TTB permit data to normalized producer format."""
+    states = NORTHEASTERN_STATES if states is None else states
     return {
         'permit_id': permit_id,
         'source': 'TTB',
         'country': 'US',
-        'state_province': NORTHEASTERN_STATES[state_code],
+        'state_province': states.get(state_code, state_code),
         'business_name': business_name,
         'trade_name': trade_name,
         'permit_holder': business_name,  # TTB doesn't have separate permit holder
@@ -79,51 +96,29 @@ def normalize_ttb_to_producer(permit_id: str, business_name: str, trade_name: st
     }
 
 
-def fetch_us_producers(data_dir: str = "data/us") -> Dict[str, Any]:
-    """Fetch US wine producers from TTB data.
+def download_ttb_file(ttb_file: Path, ttb_url: str = TTB_URL) -> DownloadResult:
+    """Conditionally download the TTB CSV, falling back to the existing file on errors."""
+    return download_with_fallback(ttb_url, ttb_file, "TTB data")
+
+
+def iter_ttb_producers(ttb_file: Path, metadata: Dict[str, Any],
+                       states: Optional[Dict[str, str]] = NORTHEASTERN_STATES) -> Iterator[Dict[str, Any]]:
+    """Stream normalized producers from a TTB CSV, updating metadata counters as rows are read.
     
     Args:
-        data_dir: Directory to save TTB data files
-        
-    Returns:
-        Dict with normalized producer data and metadata
+        ttb_file: Downloaded TTB permits CSV
+        metadata: Dict updated in place with record counts and state distribution
+        states: State code -> name filter; None keeps every state
     """
-    us_dir = Path(data_dir)
-    us_dir.mkdir(parents=True, exist_ok=True)
-    
-    ttb_url = "https://www.ttb.gov/media/81096/download"
-    ttb_file = us_dir / "ttb_wine_producers.csv"
-    
-    # Download TTB data
-    print("   Downloading TTB data...")
-    try:
-        response = requests.get(ttb_url, stream=True)
-        response.raise_for_status()
-        
-        with open(ttb_file, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-        print(f"   Downloaded TTB data to {ttb_file}")
-    except Exception as e:
-        print(f"   Error downloading TTB data: {e}")
-        if ttb_file.exists():
-            print(f"   Using existing file: {ttb_file}")
-        else:
-            return {"producers": [], "metadata": {"error": f"Failed to download TTB data: {e}"}}
+    for counter in ('raw_record_count', 'northeastern_producers', 'excluded_non_wine'):
+        metadata.setdefault(counter, 0)
+    state_counts = metadata.setdefault('state_distribution', {})
     
-    # Parse and filter US data
-    producers = []
-    total_count = 0
-    filtered_count = 0
-    excluded_count = 0
-    state_counts = {}
-    
-    print("   Parsing and filtering TTB data...")
     with open(ttb_file, 'r', newline='', encoding='latin1') as f:
         reader = csv.reader(f)
         
         for row in reader:
-            total_count += 1
+            metadata['raw_record_count'] += 1
             
             if len(row) < 8:
                 continue  # Skip malformed rows
@@ -140,43 +135,86 @@ def fetch_us_producers(data_dir: str = "data/us") -> Dict[str, Any]:
             state_code = extract_state_from_permit(permit_id)
             
             # Filter by northeastern states
-            if state_code not in NORTHEASTERN_STATES:
+            if states is not None and state_code not in states:
                 continue
             
             # Filter out non-wine businesses
             combined_name = f"{business_name} {trade_name}".strip()
-            if is_excluded_business(combined_name):
-                excluded_count += 1
+            if EXCLUSION_FILTER.matches(combined_name):
+                metadata['excluded_non_wine'] += 1
                 continue
             
             # Create normalized producer
             producer = normalize_ttb_to_producer(
                 permit_id, business_name, trade_name, address, 
-                city, postal_code, county, state_code
+                city, postal_code, county, state_code, US_STATES if states is None else states
             )
-            
-            producers.append(producer)
-            filtered_count += 1
+            metadata['northeastern_producers'] += 1
             
             # Count by state
-            state_name = NORTHEASTERN_STATES[state_code]
+            state_name = producer['state_province']
             state_counts[state_name] = state_counts.get(state_name, 0) + 1
+            
+            yield producer
+
+
+def ttb_file_path(data_dir: str = "data/us") -> Path:
+    return Path(data_dir) / "ttb_wine_producers.csv"
+
+
+def stream_us_producers(metadata: Dict[str, Any], data_dir: str = "data/us",
+                        states: Optional[Dict[str, str]] = NORTHEASTERN_STATES,
+                        download: bool = True) -> Iterator[Dict[str, Any]]:
+    """Download the TTB data and stream normalized US producers.
     
-    # Create metadata
-    metadata = {
-        'source_url': ttb_url,
-        'raw_record_count': total_count,
-        'northeastern_producers': filtered_count,
-        'excluded_non_wine': excluded_count,
-        'filter_criteria': f"Northeastern US states: {list(NORTHEASTERN_STATES.values())}",
-        'state_distribution': state_counts
-    }
+    Args:
+        metadata: Dict filled in place with fetch metadata (an 'error' key on failure)
+        data_dir: Directory to save TTB data files
+        states: State code -> name filter; None keeps every state
+        download: Refresh the CSV first; False streams the file already on disk
+    """
+    ttb_file = ttb_file_path(data_dir)
+    ttb_file.parent.mkdir(parents=True, exist_ok=True)
+    
+    if download:
+        result = download_ttb_file(ttb_file)
+    else:
+        result = DownloadResult(ttb_file, "skipped", False, recorded_sha256(ttb_file),
+                                error=None if ttb_file.exists() else f"TTB data not found: {ttb_file}")
+    if not result.available:
+        metadata['error'] = result.error
+        return
+    
+    metadata.update({
+        'source_url': TTB_URL,
+        'raw_record_count': 0,
+        'northeastern_producers': 0,
+        'excluded_non_wine': 0,
+        'filter_criteria': f"Northeastern US states: {list(states.values())}" if states is not None else "All US states",
+        'state_distribution': {},
+        'content_sha256': result.sha256
+    })
+    
+    print("   Parsing and filtering TTB data...")
+    yield from iter_ttb_producers(ttb_file, metadata, states)
     
-    print(f"   Processed {total_count:,} total TTB records")
-    print(f"   Filtered to {filtered_count:,} northeastern wine producers")
-    print(f"   Excluded {excluded_count} non-wine businesses")
+    print(f"   Processed {metadata['raw_record_count']:,} total TTB records")
+    print(f"   Filtered to {metadata['northeastern_producers']:,} northeastern wine producers")
+    print(f"   Excluded {metadata['excluded_non_wine']} non-wine businesses")
+
+
+def fetch_us_producers(data_dir: str = "data/us") -> Dict[str, Any]:
+    """Fetch US wine producers from TTB data.
     
+    Args:
+        data_dir: Directory to save TTB data files
+        
+    Returns:
+        Dict with normalized producer data and metadata
+    """
+    metadata = {}
+    producers = list(stream_us_producers(metadata, data_dir))
     return {
         'producers': producers,
         'metadata': metadata
-    }
\ No newline at end of file
+    }
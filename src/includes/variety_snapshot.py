@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Variety Snapshot Module
+
+Compiled binary snapshot of the grape variety mapping, read through mmap.
+Names, aliases and VIVC numbers live in fixed-layout uint32 tables that
+point into a UTF-8 string pool; portfolio dicts are stored as JSON text and
+only parsed when a variety is materialized.
+
+Layout (little-endian):
+  header   magic, format version, source stamp (mtime_ns, size, sha256),
+           table sizes and section offsets
+  rows     ROW_COLUMNS uint32 per variety: (offset, length) pool references for
+           name, vivc number, portfolio JSON, status and notes, the alias range,
+           the grape flag and no_wine (NONE when unset)
+  aliases  (offset, length) per alias, grouped by variety row
+  keys     (offset, length, row) per lowercased alias lookup key
+  pool     UTF-8 string pool
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+MAGIC = b"GGVSNAP\0"
+FORMAT_VERSION = 1
+NONE = 0xFFFFFFFF
+
+HEADER = struct.Struct("<8sIqq32sIIIQQQQ")
+STAMP = struct.Struct("<qq")                   # source mtime_ns and size inside HEADER
+STAMP_OFFSET = struct.calcsize("<8sI")
+
+ROW_COLUMNS = 14
+(COL_NAME, COL_NAME_LEN, COL_VIVC, COL_VIVC_LEN, COL_PORTFOLIO, COL_PORTFOLIO_LEN,
+ COL_STATUS, COL_STATUS_LEN, COL_NOTES, COL_NOTES_LEN, COL_ALIAS_START, COL_ALIAS_COUNT,
+ COL_GRAPE, COL_NO_WINE) = range(ROW_COLUMNS)
+
+# Fields of a variety record, in GrapeVariety order
+RECORD_FIELDS = ("name", "aliases", "grape", "portfolio", "vivc_assignment_status", "notes", "no_wine")
+
+
+@dataclass
+class SourceStamp:
+    """Identity of the JSONL a snapshot was compiled from."""
+    mtime_ns: int
+    size: int
+    sha256: str
+
+
+def snapshot_supported() -> bool:
+    """The uint32 tables are cast in native order, so only little-endian hosts map them."""
+    return sys.byteorder == "little" and array("I").itemsize == 4
+
+
+class _StringPool:
+    """Append-only, deduplicated UTF-8 string pool."""
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self._offsets: Dict[str, Tuple[int, int]] = {}
+
+    def add(self, text: Optional[str]) -> Tuple[int, int]:
+        if text is None:
+            return NONE, 0
+        if text not in self._offsets:
+            data = text.encode("utf-8")
+            self._offsets[text] = (len(self.buffer), len(data))
+            self.buffer.extend(data)
+        return self._offsets[text]
+
+
+def _vivc_number(portfolio) -> Optional[str]:
+    if isinstance(portfolio, dict):
+        grape = portfolio.get("grape")
+        if isinstance(grape, dict) and grape.get("vivc_number"):
+            return str(grape["vivc_number"])
+    return None
+
+
+def write_snapshot(path: Path, records: Iterable[Dict], stamp: SourceStamp):
+    """Compile variety records (dicts with RECORD_FIELDS) into a snapshot file."""
+    pool = _StringPool()
+    rows = array("I")
+    aliases = array("I")
+    keys = array("I")
+
+    for row, record in enumerate(records):
+        alias_start = len(aliases) // 2
+        for alias in record.get("aliases") or []:
+            aliases.extend(pool.add(alias))
+            key = alias.lower().strip()
+            if key:
+                keys.extend(pool.add(key))
+                keys.append(row)
+
+        portfolio = record.get("portfolio")
+        portfolio_json = json.dumps(portfolio, ensure_ascii=False, separators=(",", ":")) \
+            if portfolio is not None else None
+        no_wine = record.get("no_wine")
+        rows.extend((
+            *pool.add(record["name"]),
+            *pool.add(_vivc_number(portfolio)),
+            *pool.add(portfolio_json),
+            *pool.add(record.get("vivc_assignment_status")),
+            *pool.add(record.get("notes")),
+            alias_start, len(aliases) // 2 - alias_start,
+            1 if record.get("grape", True) else 0,
+            NONE if no_wine is None else int(no_wine)
+        ))
+
+    rows_offset = HEADER.size
+    aliases_offset = rows_offset + rows.itemsize * len(rows)
+    keys_offset = aliases_offset + aliases.itemsize * len(aliases)
+    pool_offset = keys_offset + keys.itemsize * len(keys)
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, stamp.mtime_ns, stamp.size, bytes.fromhex(stamp.sha256),
+                         len(rows) // ROW_COLUMNS, len(aliases) // 2, len(keys) // 3,
+                         rows_offset, aliases_offset, keys_offset, pool_offset)
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Unique temp name: concurrent stages may rebuild the same snapshot
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp",
+                                     delete=False) as f:
+        temp_file = Path(f.name)
+        try:
+            f.write(header)
+            f.write(rows.tobytes())
+            f.write(aliases.tobytes())
+            f.write(keys.tobytes())
+            f.write(pool.buffer)
+        except BaseException:
+            f.close()
+            temp_file.unlink(missing_ok=True)
+            raise
+    os.replace(temp_file, path)
+
+
+def restamp_snapshot(path: Path, stamp: SourceStamp):
+    """Rewrite only the mtime/size of a snapshot's source stamp.
+
+    Used when the JSONL was touched (checkout, copy) but its hash still
+    matches, so later loads take the fast stat-only check again.
+    """
+    with open(path, "r+b") as f:
+        f.seek(STAMP_OFFSET)
+        f.write(STAMP.pack(stamp.mtime_ns, stamp.size))
+
+
+class VarietySnapshot:
+    """Read-only, memory-mapped view of a compiled variety snapshot."""
+
+    def __init__(self, path: Path):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < HEADER.size:
+            raise ValueError(f"Truncated variety snapshot: {path}")
+
+        (magic, version, mtime_ns, size, sha256, variety_count, alias_count, key_count,
+         rows_offset, aliases_offset, keys_offset, pool_offset) = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported variety snapshot format: {path}")
+
+        self.stamp = SourceStamp(mtime_ns, size, sha256.hex())
+        view = memoryview(self._mmap)
+        self._rows = view[rows_offset:rows_offset + 4 * ROW_COLUMNS * variety_count].cast("I")
+        self._aliases = view[aliases_offset:aliases_offset + 8 * alias_count].cast("I")
+        self._keys = view[keys_offset:keys_offset + 12 * key_count].cast("I")
+        self._pool_offset = pool_offset
+        self._count = variety_count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _string(self, offset: int, length: int) -> Optional[str]:
+        if offset == NONE:
+            return None
+        start = self._pool_offset + offset
+        return self._mmap[start:start + length].decode("utf-8")
+
+    def _column_string(self, row: int, column: int) -> Optional[str]:
+        base = row * ROW_COLUMNS
+        return self._string(self._rows[base + column], self._rows[base + column + 1])
+
+    def name(self, row: int) -> str:
+        return self._column_string(row, COL_NAME)
+
+    def names(self) -> List[str]:
+        return [self.name(row) for row in range(self._count)]
+
+    def vivc_number(self, row: int) -> Optional[str]:
+        return self._column_string(row, COL_VIVC)
+
+    def aliases(self, row: int) -> List[str]:
+        base = row * ROW_COLUMNS
+        start, count = self._rows[base + COL_ALIAS_START], self._rows[base + COL_ALIAS_COUNT]
+        return [self._string(self._aliases[2 * i], self._aliases[2 * i + 1]) for i in range(start, start + count)]
+
+    def portfolio(self, row: int) -> Optional[Dict]:
+        text = self._column_string(row, COL_PORTFOLIO)
+        return json.loads(text) if text is not None else None
+
+    def record(self, row: int) -> Dict:
+        """All fields of a variety, keyed like GrapeVariety."""
+        base = row * ROW_COLUMNS
+        no_wine = self._rows[base + COL_NO_WINE]
+        return {
+            "name": self.name(row),
+            "aliases": self.aliases(row),
+            "grape": bool(self._rows[base + COL_GRAPE]),
+            "portfolio": self.portfolio(row),
+            "vivc_assignment_status": self._column_string(row, COL_STATUS),
+            "notes": self._column_string(row, COL_NOTES),
+            "no_wine": None if no_wine == NONE else no_wine
+        }
+
+    def alias_keys(self) -> Iterator[Tuple[str, int]]:
+        """(lowercased alias, row) pairs in file order."""
+        keys = self._keys
+        for i in range(0, len(keys), 3):
+            yield self._string(keys[i], keys[i + 1]), keys[i + 2]
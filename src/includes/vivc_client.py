@@ -3,28 +3,48 @@
 VIVC Client Module
 
 Unified client for VIVC search and passport operations with JSONL caching.
+
+Safe to call from worker threads: concurrent requests for the same URL
+share one in-flight fetch (single flight), parsed search results and
+passports are shared the same way, and the one-request-per-second
+throttle applies across all threads.
+
+Passports found in the offline mirror (includes/vivc_mirror.py) are served
+from it; with GRAPEGEEK_VIVC_OFFLINE=1 searches and passports only use the
+mirror and never hit the network.
 """
 
 import argparse
+import asyncio
+import copy
 import sys
-import requests
 import urllib.parse
 import os
 import json
 import hashlib
+import threading
 import time
+from collections import OrderedDict
 from pathlib import Path
-from bs4 import BeautifulSoup
+from concurrent.futures import Future
 from dataclasses import dataclass, asdict
-from typing import Optional, List
+from typing import Callable, Dict, Hashable, Optional, List, TypeVar
 import re
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from includes import instrumentation
+
 
 # Cache file path
 CACHE_FILE = Path("data/vivc_cache.jsonl")
+VIVC_BASE_URL = "https://www.vivc.de/index.php"
+REQUEST_INTERVAL = 1.0  # seconds between HTTP requests, across all threads
+OFFLINE = os.environ.get("GRAPEGEEK_VIVC_OFFLINE", "").lower() in ("1", "true", "yes")
+
+T = TypeVar("T")
 
 
-@dataclass
+@dataclass(slots=True)
 class GrapeId:
     """Grape identifier with name and VIVC number."""
     name: Optional[str] = None
@@ -39,9 +59,18 @@ class GrapeId:
             return f"VIVC {self.vivc_number}"
         else:
             return "Unknown"
+    
+    def to_dict(self) -> dict:
+        """Convert to dictionary format."""
+        return {'name': self.name, 'vivc_number': self.vivc_number}
+    
+    @classmethod
+    def from_dict(cls, data: Optional[dict]) -> Optional["GrapeId"]:
+        """Inverse of to_dict (None stays None)."""
+        return cls(name=data.get('name'), vivc_number=data.get('vivc_number')) if data else None
 
 
-@dataclass
+@dataclass(slots=True)
 class PassportData:
     """Structured passport data for a grape variety."""
     grape: GrapeId
@@ -57,14 +86,41 @@ class PassportData:
     
     def to_dict(self) -> dict:
         """Convert to dictionary format."""
-        return asdict(self)
+        return {
+            'grape': self.grape.to_dict(),
+            'berry_skin_color': self.berry_skin_color,
+            'country_of_origin': self.country_of_origin,
+            'species': self.species,
+            'parent1': self.parent1.to_dict() if self.parent1 else None,
+            'parent2': self.parent2.to_dict() if self.parent2 else None,
+            'sex_of_flower': self.sex_of_flower,
+            'number_of_photos': self.number_of_photos,
+            'year_of_crossing': self.year_of_crossing,
+            'synonyms': list(self.synonyms) if self.synonyms is not None else None
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "PassportData":
+        """Inverse of to_dict."""
+        return cls(
+            grape=GrapeId.from_dict(data.get('grape')) or GrapeId(),
+            berry_skin_color=data.get('berry_skin_color'),
+            country_of_origin=data.get('country_of_origin'),
+            species=data.get('species'),
+            parent1=GrapeId.from_dict(data.get('parent1')),
+            parent2=GrapeId.from_dict(data.get('parent2')),
+            sex_of_flower=data.get('sex_of_flower'),
+            number_of_photos=data.get('number_of_photos'),
+            year_of_crossing=data.get('year_of_crossing'),
+            synonyms=list(data['synonyms']) if data.get('synonyms') is not None else None
+        )
     
     def to_json(self, indent: int = 2) -> str:
         """Convert to JSON format."""
         return json.dumps(self.to_dict(), indent=indent)
 
 
-@dataclass
+@dataclass(slots=True)
 class VarietySearchResult:
     """Search result for a grape variety."""
     cultivar_name: Optional[str] = None
@@ -91,6 +147,7 @@ class VIVCCache:
         self.cache_file = cache_file
         self.cache_file.parent.mkdir(parents=True, exist_ok=True)
         self._cache = self._load_cache()
+        self._lock = threading.Lock()
     
     def _load_cache(self) -> dict:
         """Load cache from JSONL file."""
@@ -124,45 +181,148 @@ class VIVCCache:
     
     def set(self, url: str, content: str):
         """Set content in cache."""
-        if url not in self._cache:
-            self._cache[url] = content
-            self._save_entry(url, content)
+        with self._lock:
+            if url not in self._cache:
+                self._cache[url] = content
+                self._save_entry(url, content)
 
 
-# Global cache instance
-_cache = VIVCCache()
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one call.
 
+    The first caller for a key runs the function; callers arriving while it
+    is in flight wait on the same future and get its result (or exception).
+    """
 
-def fetch_url(url: str) -> str:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+        if not leader:
+            instrumentation.count("vivc.coalesced")
+            return future.result()
+
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+        return future.result()
+
+
+# Global cache instance, loaded on first use so importing this module stays cheap
+_cache: Optional[VIVCCache] = None
+_cache_lock = threading.Lock()
+
+_fetches = SingleFlight()
+_parses = SingleFlight()
+# Parsed pages, keyed by ("search", name) / ("passport", number); shared by all callers,
+# least recently used first. Callers get copies, so nothing they do changes an entry.
+PARSED_CACHE_SIZE = 4096
+_parsed: "OrderedDict[tuple, object]" = OrderedDict()
+_parsed_lock = threading.Lock()
+
+_throttle_lock = threading.Lock()
+_next_request_at = 0.0
+
+_mirror = None
+_mirror_loaded = False
+
+
+def _get_cache() -> VIVCCache:
+    """Return the global cache, loading the cache file on first call."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                with instrumentation.timer("load.vivc_cache"):
+                    _cache = VIVCCache()
+    return _cache
+
+
+def _get_mirror():
+    """Return the offline VIVC mirror, or None when no mirror has been built."""
+    global _mirror, _mirror_loaded
+    if not _mirror_loaded:
+        with _cache_lock:
+            if not _mirror_loaded:
+                from includes.vivc_mirror import MIRROR_FILE, VIVCMirror
+                if MIRROR_FILE.exists():
+                    with instrumentation.timer("load.vivc_mirror"):
+                        _mirror = VIVCMirror(MIRROR_FILE)
+                _mirror_loaded = True
+    return _mirror
+
+
+def _throttle():
+    """Wait for this thread's turn: requests start at least REQUEST_INTERVAL apart."""
+    global _next_request_at
+    with _throttle_lock:
+        now = time.monotonic()
+        wait = max(0.0, _next_request_at - now)
+        _next_request_at = max(now, _next_request_at) + REQUEST_INTERVAL
+    if wait > 0:
+        instrumentation.sleep(wait, "vivc.throttle_sleep")
+
+
+def fetch_url(url: str, cache: bool = True) -> str:
     """Fetch URL with caching and throttling.
     
+    Concurrent calls for the same URL share a single request.
+    
     Args:
         url: URL to fetch
+        cache: Read and write the response cache (the mirror stores parsed pages instead)
         
     Returns:
         Raw HTML content or error message
     """
     # Check cache first
-    cached_content = _cache.get(url)
+    cached_content = _get_cache().get(url) if cache else None
+    if cached_content:
+        instrumentation.count("vivc.cache_hit")
+        return cached_content
+    return _fetches.do((url, cache), lambda: _fetch_uncached(url, cache))
+
+
+def _fetch_uncached(url: str, cache: bool) -> str:
+    import requests
+    
+    # A fetch for this URL may have finished while we were waiting for the lock
+    cached_content = _get_cache().get(url) if cache else None
     if cached_content:
+        instrumentation.count("vivc.cache_hit")
         return cached_content
+    instrumentation.count("vivc.cache_miss")
     
-    # Throttle: wait 1 second before making any HTTP request
-    time.sleep(1)
+    _throttle()
     
     try:
-        response = requests.get(url, timeout=30)
+        with instrumentation.timer("vivc.http_get"):
+            response = requests.get(url, timeout=30)
         
         # Check for HTTP errors
         if response.status_code == 404:
+            instrumentation.count("vivc.http_404")
             return f"❌ Page not found (404): {url}"
         elif response.status_code != 200:
+            instrumentation.count("vivc.http_error")
             return f"❌ HTTP Error {response.status_code}: {url}"
         
         content = response.text
+        instrumentation.observe("vivc.response_bytes", len(content))
         
         # Cache successful responses
-        _cache.set(url, content)
+        if cache:
+            _get_cache().set(url, content)
         
         return content
         
@@ -179,14 +339,17 @@ def fetch_url(url: str) -> str:
 def fetch_search_results(variety_name: str) -> str:
     """Fetch search results from VIVC."""
     encoded_name = urllib.parse.quote_plus(variety_name)
-    search_url = f"https://www.vivc.de/index.php?r=cultivarname%2Findex&CultivarnameSearch%5Bcultivarnames%5D=&CultivarnameSearch%5Bcultivarnames%5D=cultivarn&CultivarnameSearch%5Btext%5D={encoded_name}"
+    search_url = f"{VIVC_BASE_URL}?r=cultivarname%2Findex&CultivarnameSearch%5Bcultivarnames%5D=&CultivarnameSearch%5Bcultivarnames%5D=cultivarn&CultivarnameSearch%5Btext%5D={encoded_name}"
     return fetch_url(search_url)
 
 
-def fetch_passport_page(vivc_number: str) -> str:
+def passport_url(vivc_number: str) -> str:
+    return f"{VIVC_BASE_URL}?r=passport%2Fview&id={vivc_number}"
+
+
+def fetch_passport_page(vivc_number: str, cache: bool = True) -> str:
     """Fetch passport page from VIVC."""
-    passport_url = f"https://www.vivc.de/index.php?r=passport%2Fview&id={vivc_number}"
-    return fetch_url(passport_url)
+    return fetch_url(passport_url(vivc_number), cache)
 
 
 def extract_search_results(html_content: str) -> List[VarietySearchResult]:
@@ -194,6 +357,8 @@ def extract_search_results(html_content: str) -> List[VarietySearchResult]:
     results = []
     seen_vivc = set()
     
+    from bs4 import BeautifulSoup
+    
     try:
         soup = BeautifulSoup(html_content, 'html.parser')
         
@@ -260,6 +425,8 @@ def extract_search_results(html_content: str) -> List[VarietySearchResult]:
 
 def parse_passport_html(html_content: str) -> PassportData:
     """Parse passport HTML directly and return structured data."""
+    from bs4 import BeautifulSoup
+    
     try:
         soup = BeautifulSoup(html_content, 'html.parser')
         
@@ -359,17 +526,28 @@ def search_cultivar(variety_name: str) -> List[VarietySearchResult]:
     Raises:
         ValueError: If search fails or no results found
     """
-    html_content = fetch_search_results(variety_name)
-    
-    if html_content.startswith("❌"):
-        raise ValueError(html_content)
-    
-    results = extract_search_results(html_content)
-    
-    if not results:
-        raise ValueError(f"No results found for '{variety_name}'")
+    def search() -> List[VarietySearchResult]:
+        if OFFLINE:
+            mirror = _get_mirror()
+            results = mirror.search(variety_name) if mirror else []
+            if not results:
+                raise ValueError(f"No results found for '{variety_name}' in the VIVC mirror (offline)")
+            return results
+        
+        html_content = fetch_search_results(variety_name)
+        
+        if html_content.startswith("❌"):
+            raise ValueError(html_content)
+        
+        results = extract_search_results(html_content)
+        
+        if not results:
+            raise ValueError(f"No results found for '{variety_name}'")
+        
+        return results
     
-    return results
+    # The list is shared between callers; hand out copies
+    return list(_shared_parse(("search", variety_name), search))
 
 
 def get_passport_data(vivc_number: str) -> PassportData:
@@ -384,12 +562,68 @@ def get_passport_data(vivc_number: str) -> PassportData:
     Raises:
         ValueError: If unable to fetch or parse data
     """
-    html_content = fetch_passport_page(vivc_number)
-    
-    if html_content.startswith("❌"):
-        raise ValueError(html_content)
+    def passport() -> PassportData:
+        mirror = _get_mirror()
+        mirrored = mirror.get(vivc_number) if mirror else None
+        if mirrored:
+            instrumentation.count("vivc.mirror_hit")
+            return mirrored
+        if OFFLINE:
+            raise ValueError(f"VIVC {vivc_number} is not in the VIVC mirror (offline)")
+        
+        html_content = fetch_passport_page(vivc_number)
+        
+        if html_content.startswith("❌"):
+            raise ValueError(html_content)
+        
+        return parse_passport_html(html_content)
     
-    return parse_passport_html(html_content)
+    # The passport is shared between callers (and with the mirror); hand out copies
+    return copy.deepcopy(_shared_parse(("passport", str(vivc_number)), passport))
+
+
+def _shared_parse(key: tuple, parse: Callable[[], T]) -> T:
+    """Parse a page once: concurrent callers share the parse, later callers reuse its result.
+
+    Failures are shared with concurrent callers only, so a later call retries.
+    Only the PARSED_CACHE_SIZE most recently used results are kept.
+    """
+    cached = _parsed_get(key)
+    if cached is not None:
+        instrumentation.count("vivc.parsed_hit")
+        return cached
+
+    def parse_and_keep() -> T:
+        cached = _parsed_get(key)
+        if cached is not None:  # finished while we were waiting for the lock
+            return cached
+        result = parse()
+        with _parsed_lock:
+            _parsed[key] = result
+            if len(_parsed) > PARSED_CACHE_SIZE:
+                _parsed.popitem(last=False)
+        return result
+
+    return _parses.do(key, parse_and_keep)
+
+
+def _parsed_get(key: tuple):
+    """A kept parse result (marked as recently used), or None."""
+    with _parsed_lock:
+        result = _parsed.get(key)
+        if result is not None:
+            _parsed.move_to_end(key)
+        return result
+
+
+async def search_cultivar_async(variety_name: str) -> List[VarietySearchResult]:
+    """search_cultivar for asyncio callers (runs in the default executor)."""
+    return await asyncio.to_thread(search_cultivar, variety_name)
+
+
+async def get_passport_data_async(vivc_number: str) -> PassportData:
+    """get_passport_data for asyncio callers (runs in the default executor)."""
+    return await asyncio.to_thread(get_passport_data, vivc_number)
 
 
 def main():
@@ -438,7 +672,7 @@ Examples:
                     print(html_content)
                     sys.exit(1)
                 
-                search_url = f"https://www.vivc.de/index.php?r=cultivarname%2Findex&CultivarnameSearch%5Bcultivarnames%5D=&CultivarnameSearch%5Bcultivarnames%5D=cultivarn&CultivarnameSearch%5Btext%5D={urllib.parse.quote_plus(args.variety_name)}"
+                search_url = f"{VIVC_BASE_URL}?r=cultivarname%2Findex&CultivarnameSearch%5Bcultivarnames%5D=&CultivarnameSearch%5Bcultivarnames%5D=cultivarn&CultivarnameSearch%5Btext%5D={urllib.parse.quote_plus(args.variety_name)}"
                 print(f"Search URL: {search_url}")
                 print("\n" + "=" * 80)
                 print("RAW HTML CONTENT:")
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+VIVC Mirror Module
+
+Offline mirror of VIVC passport data, so stages 04 and 16 can run without
+fetching passports one page at a time. Passports are stored parsed, one
+compact JSON line per VIVC number, in data/vivc_mirror.jsonl (a few hundred
+bytes per variety instead of the ~40 KB HTML page). Numbers VIVC has no
+passport for are recorded too, so an interrupted mirror run resumes where
+it stopped and never refetches them.
+
+The mirror is indexed by prime name and by synonym (accents, case and
+punctuation folded); vivc_client serves passports from it, and searches
+too when GRAPEGEEK_VIVC_OFFLINE=1.
+
+USAGE:
+# Mirror VIVC numbers 1-25000 at the client's polite rate (resumable; Ctrl+C is safe)
+uv run src/includes/vivc_mirror.py mirror --range 1-25000
+
+# Mirror the varieties already assigned in the mapping and their parents
+uv run src/includes/vivc_mirror.py mirror --seed-mapping data/grape_variety_mapping.jsonl --parents
+
+# Import a directory of already-downloaded passport pages with 8 processes
+uv run src/includes/vivc_mirror.py import downloads/vivc/ --workers 8
+
+# Look up a name or synonym, show mirror size
+uv run src/includes/vivc_mirror.py lookup "Seyval"
+uv run src/includes/vivc_mirror.py stats
+"""
+
+import argparse
+import json
+import re
+import sys
+import threading
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from includes import instrumentation
+from includes.vivc_client import (
+    PassportData, VarietySearchResult, fetch_passport_page, parse_passport_html, passport_url
+)
+
+MIRROR_FILE = Path("data/vivc_mirror.jsonl")
+IMPORT_CHUNK_SIZE = 64
+
+
+def fold_name(name: Optional[str]) -> str:
+    """Index key of a variety name: uppercase, no accents or punctuation, single spaces."""
+    if not name:
+        return ""
+    text = unicodedata.normalize('NFKD', name)
+    text = "".join(char for char in text if not unicodedata.combining(char)).upper()
+    return " ".join(re.sub(r"[^A-Z0-9]+", " ", text).split())
+
+
+class VIVCMirror:
+    """Parsed VIVC passports by number, indexed by prime name and synonym."""
+
+    def __init__(self, mirror_file: Path = MIRROR_FILE):
+        self.mirror_file = Path(mirror_file)
+        self.passports: Dict[str, dict] = {}
+        self.missing: Set[str] = set()
+        self.by_name: Dict[str, List[str]] = {}
+        self.by_synonym: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+        self._torn_tail = False
+        self._load()
+
+    def _load(self):
+        if not self.mirror_file.exists():
+            return
+        with open(self.mirror_file, 'r', encoding='utf-8') as f:
+            line = ""
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # torn last line of an interrupted run
+                self._apply(entry['vivc'], entry.get('passport'))
+            self._torn_tail = bool(line) and not line.endswith("\n")
+
+    def _apply(self, number: str, passport: Optional[dict]):
+        # A later line replaces the number's earlier passport, names and synonyms included
+        previous = self.passports.pop(number, None)
+        if previous is not None:
+            self._unindex(self.by_name, previous['grape'].get('name'), number)
+            for synonym in previous.get('synonyms') or []:
+                self._unindex(self.by_synonym, synonym, number)
+        if passport is None:
+            self.missing.add(number)
+            return
+        self.missing.discard(number)
+        self.passports[number] = passport
+        self._index(self.by_name, passport['grape'].get('name'), number)
+        for synonym in passport.get('synonyms') or []:
+            self._index(self.by_synonym, synonym, number)
+
+    @staticmethod
+    def _index(index: Dict[str, List[str]], name: Optional[str], number: str):
+        key = fold_name(name)
+        if key:
+            numbers = index.setdefault(key, [])
+            if number not in numbers:
+                numbers.append(number)
+
+    @staticmethod
+    def _unindex(index: Dict[str, List[str]], name: Optional[str], number: str):
+        numbers = index.get(fold_name(name))
+        if numbers and number in numbers:
+            numbers.remove(number)
+            if not numbers:
+                del index[fold_name(name)]
+
+    def __len__(self) -> int:
+        return len(self.passports)
+
+    def __contains__(self, number) -> bool:
+        """True for numbers already mirrored, including those without a passport."""
+        number = str(number)
+        return number in self.passports or number in self.missing
+
+    def get(self, number) -> Optional[PassportData]:
+        passport = self.passports.get(str(number))
+        return PassportData.from_dict(passport) if passport else None
+
+    def add_many(self, entries: Iterable[Tuple[str, Optional[PassportData]]]) -> int:
+        """Append passports (None: no passport for that number); returns the number added."""
+        lines = []
+        with self._lock:
+            for number, passport in entries:
+                data = passport.to_dict() if passport else None
+                self._apply(str(number), data)
+                lines.append(json.dumps({'vivc': str(number), 'passport': data},
+                                        ensure_ascii=False, separators=(',', ':')))
+            if lines:
+                self.mirror_file.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.mirror_file, 'a', encoding='utf-8') as f:
+                    if self._torn_tail:  # start on a fresh line after a torn write
+                        f.write("\n")
+                        self._torn_tail = False
+                    f.write("\n".join(lines) + "\n")
+        return len(lines)
+
+    def add(self, number: str, passport: Optional[PassportData]):
+        self.add_many([(number, passport)])
+
+    def lookup(self, name: str) -> List[PassportData]:
+        """Passports whose prime name matches, then those listing the name as a synonym."""
+        key = fold_name(name)
+        numbers = list(self.by_name.get(key, []))
+        numbers += [number for number in self.by_synonym.get(key, []) if number not in numbers]
+        passports = (self.get(number) for number in numbers)
+        return [passport for passport in passports if passport]
+
+    def search(self, name: str) -> List[VarietySearchResult]:
+        """Offline stand-in for vivc_client.search_cultivar (exact name or synonym matches)."""
+        key = fold_name(name)
+        results = []
+        for passport in self.lookup(name):
+            matched_prime = fold_name(passport.grape.name) == key
+            results.append(VarietySearchResult(
+                cultivar_name=passport.grape.name if matched_prime else name.upper(),
+                prime_name=passport.grape.name,
+                vivc_number=passport.grape.vivc_number,
+                species=passport.species,
+                berry_skin_color=passport.berry_skin_color,
+                country_of_origin=passport.country_of_origin,
+                passport_url=passport_url(passport.grape.vivc_number),
+            ))
+        return results
+
+    def compact(self):
+        """Rewrite the file with one line per number (later lines win)."""
+        with self._lock:
+            temp_file = self.mirror_file.with_suffix('.tmp')
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                for number in sorted(self.passports.keys() | self.missing, key=int):
+                    f.write(json.dumps({'vivc': number, 'passport': self.passports.get(number)},
+                                       ensure_ascii=False, separators=(',', ':')) + "\n")
+            temp_file.replace(self.mirror_file)
+
+
+def mirror_passports(mirror: VIVCMirror, numbers: Iterable[str], limit: Optional[int] = None) -> Dict[str, int]:
+    """Fetch and store the passports of numbers not mirrored yet, one request at a time.
+
+    Requests go through vivc_client's throttle; pages are parsed and stored
+    without going into the HTML response cache. Transient errors are left
+    for the next run.
+    """
+    report = {'fetched': 0, 'missing': 0, 'errors': 0, 'skipped': 0}
+    for number in numbers:
+        if number in mirror:
+            report['skipped'] += 1
+            continue
+        if limit is not None and report['fetched'] + report['missing'] >= limit:
+            break
+
+        html_content = fetch_passport_page(number, cache=False)
+        if html_content.startswith("❌ Page not found"):
+            passport = None
+        elif html_content.startswith("❌"):
+            report['errors'] += 1
+            print(f"   ⚠️  {number}: {html_content}")
+            continue
+        else:
+            passport = parse_passport_html(html_content)
+            if not passport.grape.vivc_number:
+                passport = None  # VIVC answers unknown numbers with an empty passport page
+
+        mirror.add(number, passport)
+        report['fetched' if passport else 'missing'] += 1
+        instrumentation.count("vivc_mirror.fetched" if passport else "vivc_mirror.missing")
+        if passport and report['fetched'] % 50 == 0:
+            print(f"   📥 {report['fetched']} passports mirrored (last: {passport.grape})")
+    return report
+
+
+def parse_passport_file(path: Path) -> Optional[Tuple[str, dict]]:
+    """Process-pool entry point: (VIVC number, passport dict) of a saved passport page, None if it has none."""
+    passport = parse_passport_html(Path(path).read_text(encoding='utf-8', errors='replace'))
+    if not passport.grape.vivc_number:
+        return None
+    return passport.grape.vivc_number, passport.to_dict()
+
+
+def import_directory(mirror: VIVCMirror, directory: Path, workers: int = 4) -> Dict[str, int]:
+    """Parse every saved passport page (*.html, *.htm) under directory in worker processes."""
+    files = sorted(path for path in Path(directory).rglob('*') if path.suffix.lower() in ('.html', '.htm'))
+    report = {'files': len(files), 'imported': 0, 'unparsed': 0}
+
+    def parsed() -> Iterator[Optional[Tuple[str, dict]]]:
+        if workers <= 1:
+            yield from map(parse_passport_file, files)
+            return
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            yield from executor.map(parse_passport_file, files, chunksize=IMPORT_CHUNK_SIZE)
+
+    batch = []
+    for item in parsed():
+        if item is None:
+            report['unparsed'] += 1
+            continue
+        number, passport = item
+        batch.append((number, PassportData.from_dict(passport)))
+        if len(batch) >= 1000:
+            report['imported'] += mirror.add_many(batch)
+            batch = []
+    report['imported'] += mirror.add_many(batch)
+    return report
+
+
+def parse_range(text: str) -> List[str]:
+    """VIVC numbers of a range ("1-25000") or a single number ("13106"), as strings."""
+    first, _, last = text.partition('-')
+    return [str(number) for number in range(int(first), int(last or first) + 1)]
+
+
+def vivc_number(text: str) -> str:
+    """argparse type of a VIVC number: digits, stored without leading zeros ("013106" -> "13106")."""
+    if not text.strip().isdigit():
+        raise argparse.ArgumentTypeError(f"invalid VIVC number: {text!r}")
+    return str(int(text))
+
+
+def mapping_seeds(mapping_file: Path, include_parents: bool) -> List[str]:
+    """VIVC numbers assigned in the grape variety mapping (and their parents)."""
+    numbers = []
+    with open(mapping_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            portfolio = json.loads(line).get('portfolio') or {}
+            keys = ['grape', 'parent1', 'parent2'] if include_parents else ['grape']
+            for key in keys:
+                number = (portfolio.get(key) or {}).get('vivc_number')
+                if number and str(number).isdigit() and str(int(number)) not in numbers:
+                    numbers.append(str(int(number)))
+    return numbers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline VIVC passport mirror")
+    parser.add_argument("--mirror-file", type=Path, default=MIRROR_FILE, help=f"Mirror file (default: {MIRROR_FILE})")
+    subparsers = parser.add_subparsers(dest='command', help='Available commands')
+
+    mirror_parser = subparsers.add_parser('mirror', help='Download passports not mirrored yet')
+    mirror_parser.add_argument('--range', dest='ranges', action='append', default=[],
+                               help='VIVC number range, e.g. 1-25000 (repeatable)')
+    mirror_parser.add_argument('--seed', nargs='+', type=vivc_number, default=[], help='Individual VIVC numbers')
+    mirror_parser.add_argument('--seed-mapping', type=Path, help='Mirror the numbers assigned in a variety mapping')
+    mirror_parser.add_argument('--parents', action='store_true', help='With --seed-mapping, include parent numbers')
+    mirror_parser.add_argument('--limit', type=int, help='Stop after fetching this many pages')
+    mirror_parser.add_argument('--interval', type=float, help='Seconds between requests (default: 1.0)')
+
+    import_parser = subparsers.add_parser('import', help='Import a directory of saved passport HTML pages')
+    import_parser.add_argument('directory', type=Path)
+    import_parser.add_argument('--workers', type=int, default=4, help='Parser processes (default: 4)')
+
+    lookup_parser = subparsers.add_parser('lookup', help='Find passports by prime name or synonym')
+    lookup_parser.add_argument('name')
+
+    subparsers.add_parser('stats', help='Show mirror size')
+    subparsers.add_parser('compact', help='Rewrite the mirror file with one line per number')
+
+    args = parser.parse_args()
+    if not args.command:
+        parser.print_help()
+        sys.exit(1)
+
+    mirror = VIVCMirror(args.mirror_file)
+
+    if args.command == 'mirror':
+        from includes import vivc_client
+        if args.interval is not None:
+            vivc_client.REQUEST_INTERVAL = args.interval
+        numbers = [number for text in args.ranges for number in parse_range(text)] + list(args.seed)
+        if args.seed_mapping:
+            numbers += mapping_seeds(args.seed_mapping, args.parents)
+        if not numbers:
+            print("❌ Nothing to mirror: give --range, --seed or --seed-mapping")
+            sys.exit(1)
+        todo = sum(1 for number in numbers if number not in mirror)
+        print(f"🌐 Mirroring {todo:,} of {len(numbers):,} VIVC numbers "
+              f"(~{todo * vivc_client.REQUEST_INTERVAL / 60:.0f} min at {vivc_client.REQUEST_INTERVAL:g}s/request)")
+        try:
+            report = mirror_passports(mirror, numbers, args.limit)
+        except KeyboardInterrupt:
+            print("\n🛑 Interrupted - rerun the same command to resume")
+            sys.exit(1)
+        print(f"✅ {report['fetched']} passports, {report['missing']} without passport, "
+              f"{report['errors']} errors (retried next run), {report['skipped']} already mirrored")
+
+    elif args.command == 'import':
+        report = import_directory(mirror, args.directory, args.workers)
+        print(f"✅ Imported {report['imported']:,} passports from {report['files']:,} files "
+              f"({report['unparsed']} without passport data)")
+
+    elif args.command == 'lookup':
+        passports = mirror.lookup(args.name)
+        if not passports:
+            print(f"❌ '{args.name}' not found in the mirror")
+            sys.exit(1)
+        print(json.dumps([passport.to_dict() for passport in passports], indent=2, ensure_ascii=False))
+
+    elif args.command == 'compact':
+        mirror.compact()
+        print(f"✅ Compacted {args.mirror_file}")
+
+    if args.command in ('stats', 'mirror', 'import', 'compact'):
+        size = args.mirror_file.stat().st_size if args.mirror_file.exists() else 0
+        print(f"📚 Mirror: {len(mirror):,} passports, {len(mirror.missing):,} numbers without passport, "
+              f"{len(mirror.by_name):,} names, {len(mirror.by_synonym):,} synonyms, {size / 1024 / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
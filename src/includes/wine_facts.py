@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+Wine Facts Module
+
+Flattens the normalized producer dataset into columnar fact tables (producers,
+wines, cépages) backed by NumPy arrays with interned string vocabularies.
+The tables are cached on disk next to the source file so the stats stages
+(06, 07, 09, 18) share one parse and use vectorized group-bys for counts.
+"""
+
+import json
+import math
+import tempfile
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from includes import instrumentation
+from includes.content_hash import file_sha256
+
+
+FACTS_FORMAT_VERSION = 2
+NO_ID = -1
+
+
+class _Interner:
+    """Maps strings to dense integer ids in first-seen order."""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def intern(self, value: str) -> int:
+        value_id = self.ids.get(value)
+        if value_id is None:
+            value_id = len(self.values)
+            self.ids[value] = value_id
+            self.values.append(value)
+        return value_id
+
+
+def _clean_string(value) -> Optional[str]:
+    """Return a stripped non-empty string, or None."""
+    if isinstance(value, str):
+        value = value.strip()
+        if value:
+            return value
+    return None
+
+
+def _coordinate(value) -> float:
+    """Convert a latitude/longitude value to float, NaN when missing."""
+    if value is None:
+        return math.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+class WineFactTable:
+    """Columnar view of producers, their wines and the cépages of each wine.
+
+    Producer rows follow the order of the source dataset. Wine rows point at
+    their producer, cépage rows point at their wine. Strings are stored once
+    in the vocabularies (`provinces`, `varieties`, `wine_types`) and rows
+    hold integer ids, with -1 meaning "not set".
+    """
+
+    ARRAY_FIELDS = (
+        'producer_province', 'producer_wine_count', 'producer_latitude',
+        'producer_longitude', 'producer_open_for_visits',
+        'wine_producer', 'wine_type', 'cepage_wine', 'cepage_variety',
+    )
+    STRING_FIELDS = ('producer_names', 'producer_permit_ids', 'provinces', 'varieties', 'wine_types')
+
+    def __init__(self, producer_names: List[str], producer_permit_ids: List[str], provinces: List[str],
+                 varieties: List[str], wine_types: List[str],
+                 producer_province: np.ndarray, producer_wine_count: np.ndarray,
+                 producer_latitude: np.ndarray, producer_longitude: np.ndarray,
+                 producer_open_for_visits: np.ndarray,
+                 wine_producer: np.ndarray, wine_type: np.ndarray,
+                 cepage_wine: np.ndarray, cepage_variety: np.ndarray):
+        self.producer_names = producer_names
+        self.producer_permit_ids = producer_permit_ids
+        self.provinces = provinces
+        self.varieties = varieties
+        self.wine_types = wine_types
+        self.producer_province = producer_province
+        self.producer_wine_count = producer_wine_count
+        self.producer_latitude = producer_latitude
+        self.producer_longitude = producer_longitude
+        self.producer_open_for_visits = producer_open_for_visits
+        self.wine_producer = wine_producer
+        self.wine_type = wine_type
+        self.cepage_wine = cepage_wine
+        self.cepage_variety = cepage_variety
+        self._province_ids = {name: i for i, name in enumerate(provinces)}
+        self._variety_ids = {name: i for i, name in enumerate(varieties)}
+        self._wine_type_ids = {name: i for i, name in enumerate(wine_types)}
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_producers(cls, producers: Iterable[Dict]) -> 'WineFactTable':
+        """Flatten an iterable of producer records into fact tables."""
+        provinces = _Interner()
+        varieties = _Interner()
+        wine_types = _Interner()
+
+        producer_names = []
+        producer_permit_ids = []
+        producer_province = []
+        producer_wine_count = []
+        producer_latitude = []
+        producer_longitude = []
+        producer_open_for_visits = []
+        wine_producer = []
+        wine_type = []
+        cepage_wine = []
+        cepage_variety = []
+
+        for producer_id, producer in enumerate(producers):
+            producer_names.append(producer.get('business_name') or producer.get('name') or 'Unknown')
+            producer_permit_ids.append(str(producer.get('permit_id') or ''))
+
+            state_province = _clean_string(producer.get('state_province'))
+            producer_province.append(provinces.intern(state_province) if state_province else NO_ID)
+
+            producer_latitude.append(_coordinate(producer.get('latitude')))
+            producer_longitude.append(_coordinate(producer.get('longitude')))
+            producer_open_for_visits.append(bool(producer.get('activities')))
+
+            wines = producer.get('wines', []) or []
+            producer_wine_count.append(len(wines))
+
+            for wine in wines:
+                wine_id = len(wine_producer)
+                wine_producer.append(producer_id)
+
+                if not isinstance(wine, dict):
+                    wine_type.append(NO_ID)
+                    continue
+
+                type_name = _clean_string(wine.get('type'))
+                wine_type.append(wine_types.intern(type_name) if type_name else NO_ID)
+
+                for cepage in wine.get('cepages', []) or []:
+                    variety = _clean_string(cepage)
+                    if variety:
+                        cepage_wine.append(wine_id)
+                        cepage_variety.append(varieties.intern(variety))
+
+        return cls(
+            producer_names=producer_names,
+            producer_permit_ids=producer_permit_ids,
+            provinces=provinces.values,
+            varieties=varieties.values,
+            wine_types=wine_types.values,
+            producer_province=np.array(producer_province, dtype=np.int32),
+            producer_wine_count=np.array(producer_wine_count, dtype=np.int32),
+            producer_latitude=np.array(producer_latitude, dtype=np.float64),
+            producer_longitude=np.array(producer_longitude, dtype=np.float64),
+            producer_open_for_visits=np.array(producer_open_for_visits, dtype=bool),
+            wine_producer=np.array(wine_producer, dtype=np.int32),
+            wine_type=np.array(wine_type, dtype=np.int32),
+            cepage_wine=np.array(cepage_wine, dtype=np.int32),
+            cepage_variety=np.array(cepage_variety, dtype=np.int32),
+        )
+
+    @classmethod
+    def from_jsonl(cls, input_file: Path) -> 'WineFactTable':
+        """Flatten a producers JSONL file, skipping blank and malformed lines."""
+        return cls.from_producers(iter_jsonl_records(input_file))
+
+    def save(self, cache_file: Path, source_hash: str = ''):
+        """Write the fact table to a compressed .npz file."""
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        arrays = {name: getattr(self, name) for name in self.ARRAY_FIELDS}
+        for name in self.STRING_FIELDS:
+            arrays[name] = np.array(getattr(self, name), dtype=str)
+        arrays['format_version'] = np.array(FACTS_FORMAT_VERSION)
+        arrays['source_hash'] = np.array(source_hash)
+
+        # Write through a temp file so a crash never leaves a truncated cache; the name
+        # is unique per writer because parallel stages may build the cache at once
+        with tempfile.NamedTemporaryFile(dir=cache_file.parent, prefix=f".{cache_file.name}.",
+                                         suffix='.tmp', delete=False) as f:
+            tmp_file = Path(f.name)
+            try:
+                np.savez_compressed(f, **arrays)
+            except BaseException:
+                f.close()
+                tmp_file.unlink(missing_ok=True)
+                raise
+        tmp_file.replace(cache_file)
+
+    @classmethod
+    def load(cls, cache_file: Path, source_hash: Optional[str] = None) -> Optional['WineFactTable']:
+        """Load a cached fact table, or None if missing, stale or unreadable."""
+        if not cache_file.exists():
+            return None
+        try:
+            with np.load(cache_file, allow_pickle=False) as data:
+                if int(data['format_version']) != FACTS_FORMAT_VERSION:
+                    return None
+                if source_hash is not None and str(data['source_hash']) != source_hash:
+                    return None
+                kwargs = {name: data[name] for name in cls.ARRAY_FIELDS}
+                for name in cls.STRING_FIELDS:
+                    kwargs[name] = data[name].tolist()
+        except (OSError, KeyError, ValueError):
+            return None
+        return cls(**kwargs)
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    @property
+    def producer_count(self) -> int:
+        return len(self.producer_province)
+
+    @property
+    def wine_count(self) -> int:
+        return len(self.wine_producer)
+
+    @property
+    def cepage_producer(self) -> np.ndarray:
+        """Producer id of each cépage row."""
+        return self.wine_producer[self.cepage_wine]
+
+    @property
+    def producer_has_location(self) -> np.ndarray:
+        return ~(np.isnan(self.producer_latitude) | np.isnan(self.producer_longitude))
+
+    def province_id(self, name: str) -> int:
+        return self._province_ids.get(name, NO_ID)
+
+    def variety_id(self, name: str) -> int:
+        return self._variety_ids.get(name, NO_ID)
+
+    def wine_type_id(self, name: str) -> int:
+        return self._wine_type_ids.get(name, NO_ID)
+
+    # ------------------------------------------------------------------
+    # Vectorized group-bys
+    # ------------------------------------------------------------------
+
+    def producers_per_province(self) -> np.ndarray:
+        """Number of producers in each province."""
+        return _bincount(self.producer_province, len(self.provinces))
+
+    def wines_per_province(self) -> np.ndarray:
+        """Number of wines listed by producers of each province."""
+        return _bincount(self.producer_province, len(self.provinces), weights=self.producer_wine_count)
+
+    def producers_with_wines_per_province(self) -> np.ndarray:
+        """Number of producers with at least one wine in each province."""
+        has_wines = self.producer_wine_count > 0
+        return _bincount(self.producer_province[has_wines], len(self.provinces))
+
+    def variety_occurrences(self, province_id: Optional[int] = None) -> np.ndarray:
+        """Number of cépage mentions per variety, optionally for one province."""
+        varieties = self.cepage_variety
+        if province_id is not None:
+            varieties = varieties[self.producer_province[self.cepage_producer] == province_id]
+        return _bincount(varieties, len(self.varieties))
+
+    def variety_producer_counts(self) -> np.ndarray:
+        """Number of distinct producers using each variety."""
+        _, varieties, _ = count_pairs(self.cepage_producer, self.cepage_variety, len(self.varieties))
+        return _bincount(varieties, len(self.varieties))
+
+    def wine_type_counts(self, province_id: Optional[int] = None) -> np.ndarray:
+        """Number of wines per wine type, optionally for one province."""
+        types = self.wine_type
+        if province_id is not None:
+            types = types[self.producer_province[self.wine_producer] == province_id]
+        return _bincount(types, len(self.wine_types))
+
+    def province_variety_counts(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(province ids, variety ids, mention counts) for every pair that occurs."""
+        provinces = self.producer_province[self.cepage_producer]
+        known = provinces != NO_ID
+        return count_pairs(provinces[known], self.cepage_variety[known], len(self.varieties))
+
+    def province_wine_type_counts(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(province ids, wine type ids, wine counts) for every pair that occurs."""
+        provinces = self.producer_province[self.wine_producer]
+        known = (provinces != NO_ID) & (self.wine_type != NO_ID)
+        return count_pairs(provinces[known], self.wine_type[known], len(self.wine_types))
+
+    def wines_with_cepages(self) -> int:
+        """Number of wines with at least one cépage."""
+        return int(np.unique(self.cepage_wine).size)
+
+    def producers_with_cepages(self) -> int:
+        """Number of producers with at least one cépage."""
+        return int(np.unique(self.cepage_producer).size)
+
+    def producer_ids_by_province(self) -> Dict[int, np.ndarray]:
+        """Producer ids grouped by province id, in dataset order."""
+        return group_indices(self.producer_province, skip=NO_ID)
+
+    def counter(self, vocabulary: List[str], counts: np.ndarray) -> Counter:
+        """Convert a dense count array into a Counter of non-zero entries."""
+        return Counter({vocabulary[i]: int(counts[i]) for i in np.flatnonzero(counts)})
+
+
+def _bincount(ids: np.ndarray, size: int, weights: Optional[np.ndarray] = None) -> np.ndarray:
+    """np.bincount over non-negative ids with a fixed output length."""
+    mask = ids != NO_ID
+    if weights is not None:
+        counts = np.bincount(ids[mask], weights=weights[mask], minlength=size)
+        return counts.astype(np.int64)
+    return np.bincount(ids[mask], minlength=size)
+
+
+def count_pairs(left: np.ndarray, right: np.ndarray, right_size: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Count occurrences of (left, right) id pairs.
+
+    Returns three aligned arrays (left ids, right ids, counts) for the pairs
+    that occur at least once, sorted by left then right id.
+    """
+    keys = left.astype(np.int64) * max(right_size, 1) + right.astype(np.int64)
+    unique_keys, counts = np.unique(keys, return_counts=True)
+    return unique_keys // max(right_size, 1), unique_keys % max(right_size, 1), counts
+
+
+def group_indices(keys: np.ndarray, skip: Optional[int] = None) -> Dict[int, np.ndarray]:
+    """Group row indices by key with one stable sort."""
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    boundaries = np.flatnonzero(np.diff(sorted_keys)) + 1
+    groups = {}
+    for chunk in np.split(order, boundaries):
+        if chunk.size == 0:
+            continue
+        key = int(keys[chunk[0]])
+        if key != skip:
+            groups[key] = chunk
+    return groups
+
+
+def iter_jsonl_records(input_file: Path):
+    """Yield JSON objects from a JSONL file, skipping blank and malformed lines."""
+    with open(input_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"⚠️  Error parsing line: {e}")
+
+
+def default_cache_file(input_file: Path) -> Path:
+    """Location of the cached fact table for a dataset file."""
+    return input_file.parent / "cache" / f"{input_file.stem}.facts.npz"
+
+
+@instrumentation.timed("load.wine_facts")
+def load_wine_facts(input_file: Path, cache_file: Optional[Path] = None,
+                    use_cache: bool = True) -> WineFactTable:
+    """Load the fact table for a producers JSONL file, rebuilding the cache when stale.
+
+    The cache is keyed on the SHA-256 of the source file, so it survives
+    checkouts that touch mtimes but is rebuilt as soon as the content changes.
+    """
+    input_file = Path(input_file)
+    cache_file = Path(cache_file) if cache_file else default_cache_file(input_file)
+
+    if not use_cache:
+        return WineFactTable.from_jsonl(input_file)
+
+    source_hash = file_sha256(input_file)
+    facts = WineFactTable.load(cache_file, source_hash)
+    if facts is None:
+        instrumentation.count("wine_facts.cache_miss")
+        facts = WineFactTable.from_jsonl(input_file)
+        try:
+            facts.save(cache_file, source_hash)
+        except OSError as e:
+            print(f"⚠️  Could not write fact table cache {cache_file}: {e}")
+    else:
+        instrumentation.count("wine_facts.cache_hit")
+    return facts
@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""
+Incremental Pipeline Runner
+
+Runs the numbered pipeline stages in dependency order, skipping any stage
+whose inputs, script and outputs are unchanged since its last successful run,
+and running independent stages in parallel processes.
+
+PURPOSE: Orchestration - Dependency-aware, content-hashed incremental pipeline runs
+
+INPUTS:
+- Stage input files declared in STAGES (content-hashed)
+- data/pipeline_state.json (hashes recorded by previous runs)
+
+OUTPUTS:
+- Stage outputs (written by the stages themselves)
+- data/pipeline_state.json (updated after each successful stage)
+- data/pipeline_logs/{stage}.log (captured stdout/stderr of each stage)
+
+DEPENDENCIES:
+- includes.content_hash for file hashing
+
+USAGE:
+# Run every offline stage that is out of date (01b, 05 → 06/06b/07/08/09/17/18 → 19)
+uv run src/run_pipeline.py
+
+# Show what would run without running anything
+uv run src/run_pipeline.py --dry-run
+
+# Run selected stages only, with 6 parallel processes
+uv run src/run_pipeline.py --stages 06,09,18 --jobs 6
+
+# Include network/LLM stages (01, 02, 03, 04, 16) and force a rebuild
+uv run src/run_pipeline.py --network --force
+
+FUNCTIONALITY:
+- Declares each stage's script, arguments, input files and output files/globs
+- Derives the stage graph from which stage produces which file; stages that
+  rewrite a file in place (03 → 04 → 16 on the variety mapping) form a chain
+  and readers of the file wait for the last stage in it
+- Content-hashes inputs, the stage script and outputs; unchanged stages are skipped
+- Runs ready stages concurrently as subprocesses (bounded by --jobs)
+- Skips stages downstream of a failure
+- Reports status and wall time per stage
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent))
+from includes.content_hash import file_sha256, path_set_hashes
+
+
+PROJECT_ROOT = Path(__file__).parent.parent
+STATE_FILE = Path("data/pipeline_state.json")
+LOG_DIR = Path("data/pipeline_logs")
+
+MAPPING = "data/grape_variety_mapping.jsonl"
+NORMALIZED = "data/05_wine_producers_final_normalized.jsonl"
+UNIFIED = "data/01_unified_producers.jsonl"
+DEDUPLICATED = "data/01b_deduplicated_producers.jsonl"
+
+
+@dataclass
+class Stage:
+    """A pipeline stage and the files it reads and writes."""
+    id: str
+    script: str
+    inputs: List[str]
+    outputs: List[str]
+    args: List[str] = field(default_factory=list)
+    network: bool = False  # calls paid APIs or remote sites; only run with --network
+
+    @property
+    def script_path(self) -> Path:
+        return Path("src") / self.script
+
+
+STAGES = [
+    Stage("01", "01_producer_fetch.py",
+          inputs=["data/can/canada_province_wineries.jsonl"],
+          outputs=[UNIFIED, "data/01_unified_producers_metadata.json"],
+          network=True),
+    Stage("01b", "01b_producer_dedup.py",
+          inputs=[UNIFIED],
+          outputs=[DEDUPLICATED, "data/01b_deduplicated_producers_metadata.json", "data/01b_merge_report.jsonl"]),
+    Stage("02", "02_producer_research.py",
+          inputs=[DEDUPLICATED],
+          outputs=["data/enriched_producers_cache.jsonl", "data/producer_geolocations_cache.jsonl"],
+          args=["--yes"], network=True),
+    Stage("03", "03_variety_normalize.py",
+          inputs=["data/enriched_producers_cache.jsonl", MAPPING],
+          outputs=[MAPPING],
+          network=True),
+    Stage("04", "04_portfolio_assign.py",
+          inputs=[MAPPING, "data/portfolio/*.json"],
+          outputs=[MAPPING],
+          network=True),
+    Stage("16", "16_extract_parents_from_vivc.py",
+          inputs=[MAPPING],
+          outputs=[MAPPING],
+          network=True),
+    Stage("05", "05_data_final_normalized.py",
+          inputs=[DEDUPLICATED, "data/enriched_producers_cache.jsonl", "data/producer_geolocations_cache.jsonl",
+                  MAPPING, "data/wine_type_mapping.yaml"],
+          outputs=[NORMALIZED]),
+    Stage("06", "06_output_geojson.py",
+          inputs=[NORMALIZED],
+          outputs=["docs/assets/data/wine-producers-final.geojson"]),
+    Stage("06b", "06b_output_map_data.py",
+          inputs=[NORMALIZED],
+          outputs=["grape-explorer-react/public/data/map-data.json"]),
+    Stage("07", "07_generate_stats.py",
+          inputs=[NORMALIZED],
+          outputs=["dataset_statistics.txt"]),
+    Stage("08", "08_build_vivc_index.py",
+          inputs=[MAPPING],
+          outputs=["docs/en/varieties/index.md", "docs/fr/varieties/index.md"]),
+    Stage("09", "09_province_stats_generator.py",
+          inputs=[NORMALIZED, MAPPING],
+          outputs=["docs/en/regions/*.md", "docs/fr/regions/*.md", "docs/cards/regions_data.json"]),
+    Stage("17", "17_generate_tree_viewer.py",
+          inputs=[MAPPING],
+          outputs=["docs/grape-tree-viewer.html"]),
+    Stage("18", "18_generate_tree_data.py",
+          inputs=[MAPPING, NORMALIZED],
+          outputs=["grape-tree-react/src/data/tree-data.json"]),
+    Stage("19", "19_precompress_assets.py",
+          inputs=["docs/assets/data/wine-producers-final.geojson", "docs/assets/data/quebec-wineries.geojson",
+                  "docs/cards/regions_data.json", "grape-tree-react/src/data/tree-data.json"],
+          outputs=["docs/assets/data/asset-manifest.json"]),
+]
+
+
+def stage_dependencies(stages: List[Stage]) -> Dict[str, List[str]]:
+    """Map each stage id to the selected stages producing its inputs.
+
+    Stages that rewrite one of their own inputs (03, 04 and 16 update the
+    variety mapping in place) form a chain in pipeline order: each depends
+    on the previous writer of the file. Stages that only read the file
+    depend on the last writer, wherever they appear in the list, so they
+    never see a partially updated version.
+    """
+    writers: Dict[str, List[int]] = {}
+    for index, stage in enumerate(stages):
+        for output_name in stage.outputs:
+            writers.setdefault(output_name, []).append(index)
+
+    deps = {}
+    for index, stage in enumerate(stages):
+        producers = set()
+        for input_name in stage.inputs:
+            indexes = writers.get(input_name, [])
+            if input_name in stage.outputs:
+                indexes = [i for i in indexes if i < index]
+            if indexes:
+                producers.add(stages[indexes[-1]].id)
+        deps[stage.id] = sorted(producers)
+    return deps
+
+
+def earlier_writers(stage: Stage) -> Dict[str, List[str]]:
+    """Map stages listed before `stage` to the in-place inputs of `stage` they also write."""
+    rewritten = [name for name in stage.outputs if name in stage.inputs]
+    earlier = {}
+    for upstream in STAGES[:next(i for i, s in enumerate(STAGES) if s.id == stage.id)]:
+        names = [name for name in rewritten if name in upstream.outputs]
+        if names:
+            earlier[upstream.id] = names
+    return earlier
+
+
+class PipelineState:
+    """Persisted hashes of each stage's last successful run."""
+
+    def __init__(self, state_file: Path):
+        self.state_file = state_file
+        self.lock = threading.Lock()
+        self.stages: Dict[str, Dict] = {}
+        if state_file.exists():
+            with open(state_file, 'r', encoding='utf-8') as f:
+                self.stages = json.load(f).get('stages', {})
+
+    def record(self, stage_id: str, entry: Dict, rewritten_by_later: Optional[Dict[str, List[str]]] = None):
+        """Store a stage's hashes after a successful run.
+
+        `rewritten_by_later` maps earlier stage ids to files this stage has
+        just rewritten; their recorded hashes are moved to the new version so
+        an in-place chain (03 → 04 → 16) settles instead of re-running its
+        first stages on the next run.
+        """
+        with self.lock:
+            self.stages[stage_id] = entry
+            for earlier_id, names in (rewritten_by_later or {}).items():
+                earlier = self.stages.get(earlier_id)
+                if earlier is None:
+                    continue
+                for name in names:
+                    for kind in ('inputs', 'outputs'):
+                        if name in earlier.get(kind, {}):
+                            earlier[kind][name] = entry['outputs'].get(name)
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.state_file.with_suffix('.tmp')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({'stages': self.stages}, f, indent=2, sort_keys=True)
+            tmp_file.replace(self.state_file)
+
+
+def fingerprint(stage: Stage, root: Path) -> Dict:
+    """Current hashes of a stage's script, inputs and outputs."""
+    return {
+        'script': file_sha256(root / stage.script_path),
+        'inputs': path_set_hashes(stage.inputs, root),
+        'outputs': path_set_hashes(stage.outputs, root),
+    }
+
+
+def out_of_date_reason(stage: Stage, current: Dict, recorded: Optional[Dict]) -> Optional[str]:
+    """Explain why a stage must run, or None when it is up to date."""
+    if recorded is None:
+        return "never run"
+    if current['script'] != recorded.get('script'):
+        return "script changed"
+    missing_inputs = [name for name, digest in current['inputs'].items() if digest is None]
+    if missing_inputs:
+        return f"missing input {missing_inputs[0]}"
+    changed = [name for name, digest in current['inputs'].items() if recorded.get('inputs', {}).get(name) != digest]
+    if changed:
+        return f"input changed: {changed[0]}" + (f" (+{len(changed) - 1})" if len(changed) > 1 else "")
+    if not current['outputs'] or any(digest is None for digest in current['outputs'].values()):
+        return "missing output"
+    if current['outputs'] != recorded.get('outputs'):
+        return "output modified"
+    return None
+
+
+def run_stage(stage: Stage, root: Path, log_dir: Path) -> Dict:
+    """Run one stage as a subprocess, capturing its output to a log file."""
+    log_dir.mkdir(parents=True, exist_ok=True)
+    log_file = log_dir / f"{stage.id}.log"
+    start = time.perf_counter()
+    with open(log_file, 'w', encoding='utf-8') as log:
+        result = subprocess.run(
+            [sys.executable, str(stage.script_path), *stage.args],
+            cwd=root, stdout=log, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL
+        )
+    return {
+        'returncode': result.returncode,
+        'duration': time.perf_counter() - start,
+        'log_file': log_file,
+    }
+
+
+def run_pipeline(stage_ids: Optional[List[str]] = None, include_network: bool = False,
+                 force: bool = False, jobs: int = 4, dry_run: bool = False,
+                 root: Path = PROJECT_ROOT) -> List[Dict]:
+    """Run the selected stages incrementally; return one report row per stage."""
+    if stage_ids:
+        selected = [stage for stage in STAGES if stage.id in stage_ids]
+        unknown = set(stage_ids) - {stage.id for stage in selected}
+        if unknown:
+            raise ValueError(f"Unknown stage(s): {', '.join(sorted(unknown))}")
+    else:
+        selected = [stage for stage in STAGES if include_network or not stage.network]
+
+    deps = stage_dependencies(selected)
+    state = PipelineState(root / STATE_FILE)
+    log_dir = root / LOG_DIR
+    reports: Dict[str, Dict] = {}
+    ran = set()  # stages that actually executed this session
+
+    pending = {stage.id: stage for stage in selected}
+    running = {}
+    print_lock = threading.Lock()
+
+    def ready(stage: Stage) -> bool:
+        return all(dep in reports for dep in deps[stage.id])
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        while pending or running:
+            for stage_id in [sid for sid, stage in pending.items() if ready(stage)]:
+                stage = pending.pop(stage_id)
+
+                failed_deps = [dep for dep in deps[stage_id] if reports[dep]['status'] in ('failed', 'blocked')]
+                if failed_deps:
+                    reports[stage_id] = {'stage': stage_id, 'status': 'blocked', 'duration': 0.0,
+                                         'reason': f"upstream {failed_deps[0]} failed"}
+                    continue
+
+                current = fingerprint(stage, root)
+                reason = "forced" if force else out_of_date_reason(stage, current, state.stages.get(stage_id))
+                if reason is None and dry_run:
+                    upstream = [dep for dep in deps[stage_id] if dep in ran]
+                    if upstream:
+                        reason = f"upstream {upstream[0]} would run"
+                if reason is None:
+                    reports[stage_id] = {'stage': stage_id, 'status': 'skipped', 'duration': 0.0,
+                                         'reason': 'up to date'}
+                    with print_lock:
+                        print(f"⏭️  {stage_id} {stage.script}: up to date")
+                    continue
+
+                if dry_run:
+                    # Assume the stage ran so downstream stages report as affected
+                    reports[stage_id] = {'stage': stage_id, 'status': 'would run', 'duration': 0.0,
+                                         'reason': reason}
+                    ran.add(stage_id)
+                    print(f"📝 {stage_id} {stage.script}: would run ({reason})")
+                    continue
+
+                with print_lock:
+                    print(f"▶️  {stage_id} {stage.script}: running ({reason})")
+                running[executor.submit(run_stage, stage, root, log_dir)] = (stage, reason)
+
+            if not running:
+                if pending and not any(ready(stage) for stage in pending.values()):
+                    raise RuntimeError("Stage graph has unsatisfiable dependencies")
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, reason = running.pop(future)
+                result = future.result()
+                status = 'ok' if result['returncode'] == 0 else 'failed'
+                reports[stage.id] = {'stage': stage.id, 'status': status, 'duration': result['duration'],
+                                     'reason': reason}
+                if status == 'ok':
+                    ran.add(stage.id)
+                    # Record hashes after the run, so stages that rewrite their own inputs settle
+                    entry = fingerprint(stage, root)
+                    entry['finished_at'] = datetime.now().isoformat(timespec='seconds')
+                    entry['duration'] = round(result['duration'], 3)
+                    state.record(stage.id, entry, earlier_writers(stage))
+                with print_lock:
+                    icon = "✅" if status == 'ok' else "❌"
+                    print(f"{icon} {stage.id} {stage.script}: {status} in {result['duration']:.1f}s")
+                    if status == 'failed':
+                        print(f"   See log: {result['log_file']}")
+                        tail = result['log_file'].read_text(encoding='utf-8', errors='replace').splitlines()[-10:]
+                        for line in tail:
+                            print(f"   | {line}")
+
+    return [reports[stage.id] for stage in selected]
+
+
+def print_report(reports: List[Dict], wall_time: float):
+    """Print the per-stage timing table."""
+    print(f"\n📊 Pipeline Summary")
+    print("=" * 60)
+    print(f"{'Stage':<7} {'Status':<11} {'Time':>8}  Reason")
+    for report in reports:
+        print(f"{report['stage']:<7} {report['status']:<11} {report['duration']:>7.1f}s  {report['reason']}")
+    print("-" * 60)
+    counts = {}
+    for report in reports:
+        counts[report['status']] = counts.get(report['status'], 0) + 1
+    print(f"Wall time: {wall_time:.1f}s  |  " + ", ".join(f"{status}: {count}" for status, count in sorted(counts.items())))
+
+
+def main():
+    """Main function to run the pipeline."""
+    parser = argparse.ArgumentParser(description="Run pipeline stages incrementally")
+    parser.add_argument("--stages", help="Comma-separated stage ids to consider (default: all offline stages)")
+    parser.add_argument("--network", action="store_true", help="Include network/LLM stages (01, 02, 03, 04, 16)")
+    parser.add_argument("--force", action="store_true", help="Run selected stages even if up to date")
+    parser.add_argument("--jobs", type=int, default=4, help="Maximum stages running in parallel")
+    parser.add_argument("--dry-run", action="store_true", help="Show what would run without running it")
+    parser.add_argument("--list", action="store_true", help="List stages and their dependencies")
+    args = parser.parse_args()
+
+    if args.list:
+        deps = stage_dependencies(STAGES)
+        for stage in STAGES:
+            marker = " (network)" if stage.network else ""
+            after = f" ← {', '.join(deps[stage.id])}" if deps[stage.id] else ""
+            print(f"{stage.id:<4} {stage.script}{marker}{after}")
+        return
+
+    stage_ids = [s.strip() for s in args.stages.split(',')] if args.stages else None
+
+    print("🍇 Grape Pipeline Runner")
+    print("=" * 60)
+    start = time.perf_counter()
+    try:
+        reports = run_pipeline(stage_ids, include_network=args.network, force=args.force,
+                               jobs=args.jobs, dry_run=args.dry_run)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(2)
+
+    print_report(reports, time.perf_counter() - start)
+    if any(report['status'] in ('failed', 'blocked') for report in reports):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
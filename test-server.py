@@ -2,111 +2,358 @@
 """
 Local test server to simulate GitHub Pages deployment structure.
 Serves the family-trees React app at the /family-trees/ sub-path.
+
+Requests are handled on threads, so a large download (tree-data.json, the
+producer GeoJSON) never blocks the rest of the page. Files are served from
+an in-memory cache with ETag / Last-Modified revalidation, precompressed
+.br / .gz sidecars (gzip on the fly for other text assets), and single
+byte-range requests.
+
+USAGE:
+# Serve site/ on http://localhost:8000
+uv run test-server.py
+
+# Other port or directory, logging every request
+uv run test-server.py --port 8080 --directory site --verbose
 """
 
-import os
+import argparse
+import gzip
+import mimetypes
+import posixpath
+import re
 import sys
-from http.server import HTTPServer, SimpleHTTPRequestHandler
-from urllib.parse import unquote
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from email.utils import formatdate, parsedate_to_datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+DEFAULT_PORT = 8000
+CACHE_BYTES = 128 * 1024 * 1024
+MAX_CACHED_FILE = 16 * 1024 * 1024   # larger files are streamed from disk
+MIN_COMPRESS_SIZE = 1024
+SIDECARS = (("br", ".br"), ("gzip", ".gz"))
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "application/geo+json",
+                      "application/manifest+json", "application/xml", "image/svg+xml")
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+mimetypes.add_type("application/javascript", ".js")
+mimetypes.add_type("application/javascript", ".mjs")
+mimetypes.add_type("application/json", ".json")
+mimetypes.add_type("application/geo+json", ".geojson")
+mimetypes.add_type("application/manifest+json", ".webmanifest")
+mimetypes.add_type("image/svg+xml", ".svg")
+
+
+def route_path(path: str) -> str:
+    """Map a URL path to the site file path, with SPA routing under /family-trees."""
+    if path.startswith('/family-trees'):
+        # Remove /family-trees prefix and handle routing
+        subpath = path[len('/family-trees'):].lstrip('/')
+        if not subpath:
+            return '/family-trees/index.html'
+        # tree-data.json and its hashed, precompressed copies (src/19_precompress_assets.py)
+        if subpath.startswith('assets/') or subpath.startswith('tree-data.'):
+            return f'/family-trees/{subpath}'
+        # For any other path under family-trees, serve index.html (SPA routing)
+        return '/family-trees/index.html'
+    return path
+
+
+@dataclass
+class Asset:
+    """A file as served: validators, body (None if too large to cache) and encoded variants."""
+    path: Path
+    size: int
+    mtime_ns: int
+    etag: str
+    content_type: str
+    body: Optional[bytes]
+    encoded: Dict[str, bytes] = field(default_factory=dict)
+
+    @property
+    def last_modified(self) -> str:
+        return formatdate(self.mtime_ns / 1e9, usegmt=True)
+
+    @property
+    def cost(self) -> int:
+        return len(self.body or b"") + sum(len(data) for data in self.encoded.values())
+
+    def variant_etag(self, encoding: Optional[str]) -> str:
+        return self.etag if not encoding else f'{self.etag[:-1]}-{encoding}"'
+
+
+class AssetCache:
+    """LRU cache of served files, revalidated against each file's size and mtime."""
 
-class TestHandler(SimpleHTTPRequestHandler):
+    def __init__(self, max_bytes: int = CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Asset]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: Path) -> Asset:
+        stat = path.stat()
+        key = str(path)
+        with self._lock:
+            asset = self._entries.get(key)
+            if asset and (asset.size, asset.mtime_ns) == (stat.st_size, stat.st_mtime_ns):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return asset
+            self.misses += 1
+
+        asset = self._load(path, stat)
+        if asset.body is not None:
+            with self._lock:
+                previous = self._entries.pop(key, None)
+                if previous:
+                    self.used -= previous.cost
+                self._entries[key] = asset
+                self.used += asset.cost
+                while self.used > self.max_bytes and len(self._entries) > 1:
+                    _, evicted = self._entries.popitem(last=False)
+                    self.used -= evicted.cost
+        return asset
+
+    @staticmethod
+    def _load(path: Path, stat) -> Asset:
+        content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        body = path.read_bytes() if stat.st_size <= MAX_CACHED_FILE else None
+        asset = Asset(path, stat.st_size, stat.st_mtime_ns, f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"',
+                      content_type, body)
+
+        # Precompressed sidecars, unless older than the file they compress
+        for encoding, suffix in SIDECARS:
+            sidecar = path.with_name(path.name + suffix)
+            if sidecar.is_file() and sidecar.stat().st_mtime_ns >= stat.st_mtime_ns:
+                asset.encoded[encoding] = sidecar.read_bytes()
+
+        if (body is not None and "gzip" not in asset.encoded and len(body) >= MIN_COMPRESS_SIZE
+                and content_type.startswith(COMPRESSIBLE_TYPES)):
+            asset.encoded["gzip"] = gzip.compress(body, compresslevel=6, mtime=0)
+        return asset
+
+    def summary(self) -> str:
+        return (f"{len(self._entries)} assets, {self.used / 1024 / 1024:.1f} MB, "
+                f"{self.hits} hits / {self.misses} misses")
+
+
+class TestHandler(BaseHTTPRequestHandler):
     """Handler that simulates GitHub Pages structure with sub-path routing."""
-    
-    def __init__(self, *args, **kwargs):
-        # Set the directory to serve files from (built site folder)
-        super().__init__(*args, directory='site', **kwargs)
-    
+
+    protocol_version = "HTTP/1.1"
+    server_version = "GrapeGeekPreview/1.0"
+
     def do_GET(self):
         """Handle GET requests with sub-path routing."""
-        # Parse the requested path
-        path = unquote(self.path)
-        
-        print(f"🔍 Request: {path}")
-        
-        # Handle family-trees sub-path
-        if path.startswith('/family-trees'):
-            # Remove /family-trees prefix and handle routing
-            subpath = path[len('/family-trees'):].lstrip('/')
-            
-            if not subpath or subpath == '/':
-                # Root of family-trees - serve index.html
-                self.path = '/family-trees/index.html'
-                print(f"   → Serving: {self.path}")
-            elif subpath.startswith('assets/'):
-                # Static assets
-                self.path = f'/family-trees/{subpath}'
-                print(f"   → Serving asset: {self.path}")
-            elif subpath == 'tree-data.json':
-                # Tree data file
-                self.path = '/family-trees/tree-data.json'
-                print(f"   → Serving data: {self.path}")
-            else:
-                # SPA routing - serve index.html for any other path
-                self.path = '/family-trees/index.html'
-                print(f"   → SPA route, serving index: {self.path}")
-        
-        elif False:  # Disable custom landing page - serve MkDocs site instead
-            # Root - show simple page with link to family trees
-            self.send_response(200)
-            self.send_header('Content-type', 'text/html')
+        self.serve(send_body=True)
+
+    def do_HEAD(self):
+        self.serve(send_body=False)
+
+    def serve(self, send_body: bool):
+        url = urlsplit(self.path)
+        path = route_path(unquote(url.path))
+
+        file_path = self.resolve(path)
+        if file_path is None:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return
+        if file_path.is_dir():
+            # Directories are served through their index.html, with a trailing slash like GitHub Pages
+            if not url.path.endswith('/'):
+                self.send_response(HTTPStatus.MOVED_PERMANENTLY)
+                self.send_header("Location", url.path + '/' + (f"?{url.query}" if url.query else ""))
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            file_path = file_path / "index.html"
+            if not file_path.is_file():
+                self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+                return
+
+        asset = self.server.cache.get(file_path)
+        encoding = self.choose_encoding(asset)
+        etag = asset.variant_etag(encoding)
+
+        if self.not_modified(asset, encoding):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_validators(asset, etag)
             self.end_headers()
-            html = '''
-            <!DOCTYPE html>
-            <html>
-            <head><title>Grape Geek - Local Test</title></head>
-            <body style="font-family: Arial; padding: 40px; text-align: center;">
-                <h1>🍇 Grape Geek - Local Test Server</h1>
-                <p>This simulates the production GitHub Pages deployment.</p>
-                <p><a href="/family-trees/" style="color: #007bff; font-size: 18px;">
-                    → Go to Family Trees Viewer
-                </a></p>
-                <p style="color: #666; margin-top: 40px; font-size: 14px;">
-                    The family tree viewer is deployed as an independent React app<br>
-                    at the <code>/family-trees/</code> sub-path.
-                </p>
-            </body>
-            </html>
-            '''
-            self.wfile.write(html.encode())
+            self.log_served(path, HTTPStatus.NOT_MODIFIED, 0, encoding)
             return
-        
-        # Handle the request normally
-        super().do_GET()
-    
+
+        byte_range = None if encoding else self.requested_range(asset, etag)
+        if byte_range == "invalid":
+            self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+            self.send_header("Content-Range", f"bytes */{asset.size}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        if encoding:
+            body, start, length, status = asset.encoded[encoding], 0, len(asset.encoded[encoding]), HTTPStatus.OK
+        elif byte_range:
+            start, end = byte_range
+            body, length, status = asset.body, end - start + 1, HTTPStatus.PARTIAL_CONTENT
+        else:
+            body, start, length, status = asset.body, 0, asset.size, HTTPStatus.OK
+
+        self.send_response(status)
+        self.send_header("Content-Type", asset.content_type)
+        self.send_header("Content-Length", str(length))
+        self.send_header("Accept-Ranges", "bytes")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        if status == HTTPStatus.PARTIAL_CONTENT:
+            self.send_header("Content-Range", f"bytes {start}-{start + length - 1}/{asset.size}")
+        self.send_validators(asset, etag)
+        self.end_headers()
+
+        if send_body:
+            if body is not None:
+                self.wfile.write(memoryview(body)[start:start + length])
+            else:
+                with open(asset.path, 'rb') as f:
+                    f.seek(start)
+                    self.copy_limited(f, length)
+        self.log_served(path, status, length, encoding)
+
+    def resolve(self, path: str) -> Optional[Path]:
+        """File system path under the site directory, or None (missing or outside the site)."""
+        parts = [part for part in posixpath.normpath(path).split('/') if part and part != '.']
+        if '..' in parts:
+            return None
+        file_path = self.server.site_dir.joinpath(*parts)
+        return file_path if file_path.exists() else None
+
+    def choose_encoding(self, asset: Asset) -> Optional[str]:
+        """Best encoding both the client accepts and the asset has (no encoding for range requests)."""
+        if not asset.encoded or self.headers.get("Range"):
+            return None
+        accepted = {token.split(';')[0].strip().lower() for token in self.headers.get("Accept-Encoding", "").split(',')}
+        for encoding, _ in SIDECARS:
+            if encoding in accepted and encoding in asset.encoded:
+                return encoding
+        return None
+
+    def not_modified(self, asset: Asset, encoding: Optional[str]) -> bool:
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match:
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(',')}
+            return "*" in tags or asset.variant_etag(encoding) in tags or asset.etag in tags
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since:
+            try:
+                return asset.mtime_ns // 1_000_000_000 <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def requested_range(self, asset: Asset, etag: str):
+        """(start, end) of a satisfiable single range, "invalid", or None for the whole file."""
+        header = self.headers.get("Range")
+        if not header:
+            return None
+        if_range = self.headers.get("If-Range")
+        if if_range and if_range.strip() not in (etag, asset.last_modified):
+            return None
+        match = RANGE_PATTERN.match(header.strip())
+        if not match or match.groups() == ("", ""):
+            return None  # multiple or malformed ranges: send the whole file
+        first, last = match.groups()
+        if first == "":
+            start, end = max(0, asset.size - int(last)), asset.size - 1
+        else:
+            start = int(first)
+            end = min(int(last), asset.size - 1) if last else asset.size - 1
+        if start >= asset.size or start > end:
+            return "invalid"
+        return start, end
+
+    def send_validators(self, asset: Asset, etag: str):
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", asset.last_modified)
+        # Always revalidate: edits show up on reload while unchanged files cost a 304
+        self.send_header("Cache-Control", "no-cache")
+        if asset.encoded:
+            self.send_header("Vary", "Accept-Encoding")
+
+    def copy_limited(self, source, length: int):
+        while length > 0:
+            chunk = source.read(min(length, 1 << 20))
+            if not chunk:
+                break
+            self.wfile.write(chunk)
+            length -= len(chunk)
+
+    def log_served(self, path: str, status: int, length: int, encoding: Optional[str]):
+        if self.server.verbose:
+            print(f"🔍 {self.command} {path} → {int(status)} ({length:,} bytes{', ' + encoding if encoding else ''})")
+
     def log_message(self, format, *args):
         """Override to provide cleaner logging."""
-        pass  # We're doing custom logging above
+        pass  # Served requests are logged by log_served with --verbose
+
+
+class PreviewServer(ThreadingHTTPServer):
+    """Threaded server holding the site directory and the shared asset cache."""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], site_dir: Path, verbose: bool = False,
+                 cache_bytes: int = CACHE_BYTES):
+        self.site_dir = Path(site_dir).resolve()
+        self.verbose = verbose
+        self.cache = AssetCache(cache_bytes)
+        super().__init__(address, TestHandler)
+
 
 def main():
     """Start the test server."""
-    port = 8000
-    
+    parser = argparse.ArgumentParser(description="Local preview server for the built site")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on (default: 8000)")
+    parser.add_argument("--directory", default="site", help="Built site directory (default: site)")
+    parser.add_argument("--cache-mb", type=int, default=CACHE_BYTES // (1024 * 1024),
+                        help="In-memory asset cache size in MB")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
     # Check if site directory exists
-    site_path = Path('site')
+    site_path = Path(args.directory)
     if not site_path.exists():
-        print("❌ site/ directory not found")
+        print(f"❌ {site_path}/ directory not found")
         print("   Run: mkdocs build")
         sys.exit(1)
-    
+
     # Check if family-trees build exists
     family_trees_path = site_path / 'family-trees'
     if not family_trees_path.exists():
-        print("❌ site/family-trees/ directory not found")
+        print(f"❌ {family_trees_path}/ directory not found")
         print("   Run: cd grape-tree-react && npm run build")
         sys.exit(1)
-    
-    print(f"🌐 Starting test server on http://localhost:{port}")
+
+    print(f"🌐 Starting test server on http://localhost:{args.port}")
     print(f"📁 Serving from: {site_path.absolute()}")
-    print("🍇 Family trees at: http://localhost:8000/family-trees/")
+    print(f"🍇 Family trees at: http://localhost:{args.port}/family-trees/")
     print("\n💡 Press Ctrl+C to stop the server")
     print("-" * 50)
-    
+
+    httpd = PreviewServer(('', args.port), site_path, args.verbose, args.cache_mb * 1024 * 1024)
     try:
-        with HTTPServer(('', port), TestHandler) as httpd:
+        with httpd:
             httpd.serve_forever()
     except KeyboardInterrupt:
-        print("\n\n🛑 Server stopped")
+        print(f"\n\n🛑 Server stopped (cache: {httpd.cache.summary()})")
+
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,50 @@
+import unittest
+import tempfile
+import sys
+from pathlib import Path
+
+# Benchmarks live next to tests; src for the includes package
+sys.path.insert(0, str(Path(__file__).parent.parent / "benchmarks"))
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from synthetic import DatasetSize, generate_variety_mapping, write_dataset
+from run_benchmarks import compare_with_baseline
+
+
+SIZE = DatasetSize(producers=40, wines_per_producer=3, varieties=30, aliases_per_variety=3, pedigree_depth=3)
+
+
+class TestSyntheticDatasets(unittest.TestCase):
+
+    def test_dataset_is_deterministic(self):
+        """Test that the same seed writes byte-identical files."""
+        with tempfile.TemporaryDirectory() as first, tempfile.TemporaryDirectory() as second:
+            write_dataset(Path(first), SIZE, seed=7)
+            write_dataset(Path(second), SIZE, seed=7)
+            for name in ("grape_variety_mapping.jsonl", "05_wine_producers_final_normalized.jsonl"):
+                self.assertEqual((Path(first) / name).read_bytes(), (Path(second) / name).read_bytes())
+
+    def test_pedigree_depth(self):
+        """Test that the longest ancestry chain has exactly pedigree_depth edges."""
+        rows = [row for row in generate_variety_mapping(SIZE) if row["grape"]]
+        by_vivc = {row["portfolio"]["grape"]["vivc_number"]: row for row in rows}
+        self.assertTrue(all(len(row["aliases"]) == SIZE.aliases_per_variety for row in rows))
+
+        def depth(row):
+            parents = [row["portfolio"]["parent1"], row["portfolio"]["parent2"]]
+            return max([1 + depth(by_vivc[p["vivc_number"]]) for p in parents if p] or [0])
+
+        self.assertEqual(max(depth(row) for row in rows), SIZE.pedigree_depth)
+
+    def test_compare_with_baseline(self):
+        """Test regression flagging against a baseline."""
+        baseline = {"benchmarks": {"a": {"median": 1.0}, "b": {"median": 1.0}}}
+        results = {"benchmarks": {"a": {"median": 1.1}, "b": {"median": 1.5}, "c": {"median": 1.0}}}
+        rows = {row["name"]: row for row in compare_with_baseline(results, baseline, threshold=0.25)}
+        self.assertEqual(set(rows), {"a", "b"})
+        self.assertFalse(rows["a"]["regression"])
+        self.assertTrue(rows["b"]["regression"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+import tempfile
+import hashlib
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add src to path so the includes package resolves like in the pipeline scripts
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from includes.download_manager import download, partial_path, read_sidecar
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Serves server.body with an ETag, honouring If-None-Match and Range/If-Range."""
+
+    def do_GET(self):
+        server = self.server
+        body = server.body
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        server.requests.append(dict(self.headers))
+
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        start = 0
+        range_header = self.headers.get("Range")
+        if range_header and self.headers.get("If-Range") == etag:
+            start = int(range_header.split("=")[1].rstrip("-"))
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+        else:
+            self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body) - start))
+        self.end_headers()
+
+        if server.truncate_next:
+            # Simulate a dropped connection half way through the transfer
+            server.truncate_next = False
+            self.wfile.write(body[start:start + (len(body) - start) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body[start:])
+
+    def log_message(self, *args):
+        pass
+
+
+class TestDownloadManager(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        self.server.body = b"permit,name\n" * 50000
+        self.server.requests = []
+        self.server.truncate_next = False
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/ttb.csv"
+
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.dest = Path(self.temp_dir.name) / "ttb_wine_producers.csv"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.temp_dir.cleanup()
+
+    def test_conditional_download(self):
+        """Test that an unchanged file answers 304 and a changed one is fetched again."""
+        first = download(self.url, self.dest)
+        self.assertEqual((first.status, first.changed), ("downloaded", True))
+        self.assertEqual(self.dest.read_bytes(), self.server.body)
+        self.assertEqual(read_sidecar(self.dest)["sha256"], hashlib.sha256(self.server.body).hexdigest())
+
+        second = download(self.url, self.dest)
+        self.assertEqual((second.status, second.changed), ("not_modified", False))
+        self.assertEqual(second.sha256, first.sha256)
+        self.assertIn("If-None-Match", self.server.requests[-1])
+
+        self.server.body += b"new,producer\n"
+        third = download(self.url, self.dest)
+        self.assertEqual((third.status, third.changed), ("downloaded", True))
+        self.assertEqual(self.dest.read_bytes(), self.server.body)
+
+    def test_resume_partial_download(self):
+        """Test that an interrupted download resumes from the .part file with Range/If-Range."""
+        self.server.truncate_next = True
+        with self.assertRaises(Exception):
+            download(self.url, self.dest)
+        self.assertFalse(self.dest.exists())
+        part_size = partial_path(self.dest).stat().st_size
+        self.assertGreater(part_size, 0)
+
+        result = download(self.url, self.dest)
+        self.assertEqual(result.status, "resumed")
+        self.assertEqual(self.server.requests[-1]["Range"], f"bytes={part_size}-")
+        self.assertEqual(self.dest.read_bytes(), self.server.body)
+        self.assertEqual(result.sha256, hashlib.sha256(self.server.body).hexdigest())
+        self.assertFalse(partial_path(self.dest).exists())
+        self.assertNotIn("partial", read_sidecar(self.dest))
+
+    def test_validation_failure_keeps_previous_file(self):
+        """Test that a download rejected by validate() leaves the existing file in place."""
+        download(self.url, self.dest)
+        original = self.dest.read_bytes()
+        self.server.body = b"not,the,expected,format\n"
+
+        def reject(path):
+            raise ValueError("bad file")
+
+        with self.assertRaises(ValueError):
+            download(self.url, self.dest, validate=reject)
+        self.assertEqual(self.dest.read_bytes(), original)
+        self.assertFalse(partial_path(self.dest).exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
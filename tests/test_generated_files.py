@@ -0,0 +1,68 @@
+import unittest
+import tempfile
+import os
+import sys
+from pathlib import Path
+
+# Add src to path so the includes package resolves like in the pipeline scripts
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from includes.generated_files import GeneratedFiles
+
+
+class TestGeneratedFiles(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.cwd = os.getcwd()
+        os.chdir(self.root)
+        self.manifest_dir = self.root / "manifests"
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.temp_dir.cleanup()
+
+    def run_stage(self, pages, **finish_kwargs):
+        output = GeneratedFiles("09_test", self.manifest_dir)
+        for name, content in pages.items():
+            output.write_text(Path(name), content)
+        return output.finish(**finish_kwargs)
+
+    def test_unchanged_pages_are_not_rewritten(self):
+        """Test that identical content leaves the file (and its mtime) alone."""
+        self.run_stage({"docs/en/regions/quebec.md": "# Quebec\n", "docs/fr/regions/quebec.md": "# Québec\n"})
+        page = Path("docs/fr/regions/quebec.md")
+        os.utime(page, (1_000_000, 1_000_000))
+
+        report = self.run_stage({"docs/en/regions/quebec.md": "# Quebec\n\n142 producers\n",
+                                 "docs/fr/regions/quebec.md": "# Québec\n"})
+        self.assertEqual((report['written'], report['unchanged']), (1, 1))
+        self.assertEqual(page.stat().st_mtime, 1_000_000)
+        self.assertEqual(Path("docs/en/regions/quebec.md").read_text(encoding="utf-8"), "# Quebec\n\n142 producers\n")
+
+    def test_stale_pages_are_reported_then_pruned(self):
+        """Test that pages missing from a complete run are listed, kept, and deleted with prune."""
+        self.run_stage({"docs/en/regions/quebec.md": "Q", "docs/en/regions/maine.md": "M"})
+
+        report = self.run_stage({"docs/en/regions/quebec.md": "Q"})
+        self.assertEqual(report['stale'], ["docs/en/regions/maine.md"])
+        self.assertTrue(Path("docs/en/regions/maine.md").exists())
+
+        report = self.run_stage({"docs/en/regions/quebec.md": "Q"}, prune=True)
+        self.assertEqual(report['pruned'], ["docs/en/regions/maine.md"])
+        self.assertFalse(Path("docs/en/regions/maine.md").exists())
+
+    def test_partial_run_keeps_other_pages(self):
+        """Test that a subset run neither reports nor prunes pages it did not regenerate."""
+        self.run_stage({"docs/en/regions/quebec.md": "Q", "docs/en/regions/maine.md": "M"})
+        report = self.run_stage({"docs/en/regions/quebec.md": "Q2"}, prune=True, complete=False)
+
+        self.assertEqual((report['stale'], report['pruned']), ([], []))
+        self.assertTrue(Path("docs/en/regions/maine.md").exists())
+        report = self.run_stage({"docs/en/regions/quebec.md": "Q2"})
+        self.assertEqual(report['stale'], ["docs/en/regions/maine.md"])
+
+
+if __name__ == '__main__':
+    unittest.main()
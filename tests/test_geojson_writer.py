@@ -0,0 +1,77 @@
+import unittest
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path so the includes package resolves like in the pipeline scripts
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from includes.geojson_writer import GeoJSONStreamWriter, PartitionedGeoJSONWriter, province_partitioner
+
+
+def feature(province: str, lon: float, lat: float) -> dict:
+    return {"type": "Feature", "geometry": {"type": "Point", "coordinates": [lon, lat]},
+            "properties": {"state_province": province}}
+
+
+class TestPartitionedGeoJSONWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.shards_dir = self.root / "provinces"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_shards_and_index(self):
+        """Test that a clean close renames every shard into place and writes the index."""
+        with PartitionedGeoJSONWriter(self.shards_dir, province_partitioner, {"scheme": "province"}) as shards:
+            shards.write_feature(feature("Québec", -71.2, 46.8))
+            shards.write_feature(feature("Vermont", -72.6, 44.3))
+            shards.write_feature(feature("Québec", -73.6, 45.5))
+
+        index = json.loads((self.shards_dir / "index.json").read_text(encoding="utf-8"))
+        self.assertEqual(index["scheme"], "province")
+        self.assertEqual({key: p["count"] for key, p in index["partitions"].items()}, {"québec": 2, "vermont": 1})
+        self.assertEqual(index["partitions"]["québec"]["bbox"], [-73.6, 45.5, -71.2, 46.8])
+        shard = json.loads((self.shards_dir / "québec.geojson").read_text(encoding="utf-8"))
+        self.assertEqual(len(shard["features"]), 2)
+        self.assertEqual(sorted(p.name for p in self.shards_dir.iterdir()),
+                         ["index.json", "québec.geojson", "vermont.geojson"])
+
+    def test_failure_mid_stream_leaves_previous_output(self):
+        """Test that an exception while streaming removes temp files and keeps the last good shards."""
+        with PartitionedGeoJSONWriter(self.shards_dir, province_partitioner) as shards:
+            shards.write_feature(feature("Vermont", -72.6, 44.3))
+        previous = sorted((p.name, p.read_bytes()) for p in self.shards_dir.iterdir())
+
+        with self.assertRaises(RuntimeError):
+            with GeoJSONStreamWriter(self.root / "all.geojson") as writer, \
+                    PartitionedGeoJSONWriter(self.shards_dir, province_partitioner) as shards:
+                for item in (feature("Québec", -71.2, 46.8), feature("Vermont", -72.9, 44.5)):
+                    writer.write_feature(item)
+                    shards.write_feature(item)
+                raise RuntimeError("input ended early")
+
+        self.assertEqual(sorted((p.name, p.read_bytes()) for p in self.shards_dir.iterdir()), previous)
+        self.assertEqual(list(self.root.glob("*.geojson")), [])
+
+    def test_failed_close_commits_nothing(self):
+        """Test that a partition failing to finish leaves no shard from the same run behind."""
+        shards = PartitionedGeoJSONWriter(self.shards_dir, province_partitioner)
+        shards.write_feature(feature("Québec", -71.2, 46.8))
+        shards.write_feature(feature("Vermont", -72.6, 44.3))
+
+        def fail(metadata=None):
+            raise OSError("disk full")
+        shards.writers["vermont"].finish = fail
+
+        with self.assertRaises(OSError):
+            shards.close()
+        self.assertEqual(list(self.shards_dir.iterdir()), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+import json
+import sys
+from dataclasses import asdict
+from pathlib import Path
+
+# Add src to path so the includes package resolves like in the pipeline scripts
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from includes.grape_varieties import GrapeId, GrapeVariety, PassportData
+
+
+PASSPORT = PassportData(
+    grape=GrapeId("FRONTENAC", "20148"),
+    berry_skin_color="NOIR",
+    parent1=GrapeId("LANDOT 4511", "6654"),
+    synonyms=["MN 1047"]
+)
+
+
+class TestGrapeVarietiesSerialization(unittest.TestCase):
+
+    def test_to_dict_matches_asdict(self):
+        """Test that the hand-written serializers keep the dataclasses.asdict shape."""
+        variety = GrapeVariety("Frontenac", ["frontenac"], portfolio=PASSPORT.to_dict(), notes="cold hardy")
+        self.assertEqual(PASSPORT.to_dict(), asdict(PASSPORT))
+        self.assertEqual(variety.to_dict(), asdict(variety))
+
+    def test_to_dict_copies_nested_data(self):
+        """Test that to_dict results can be mutated without touching the variety."""
+        variety = GrapeVariety("Frontenac", ["frontenac"], portfolio=PASSPORT.to_dict())
+        data = variety.to_dict()
+        data["aliases"].append("frontenac noir")
+        data["portfolio"]["grape"]["name"] = "CHANGED"
+        self.assertEqual(variety.aliases, ["frontenac"])
+        self.assertEqual(variety.portfolio["grape"]["name"], "FRONTENAC")
+
+    def test_jsonl_entry_omits_empty_optional_fields(self):
+        """Test that notes and no_wine are only written when set."""
+        entry = json.loads(GrapeVariety("Vidal", ["vidal blanc"]).to_jsonl_entry())
+        self.assertNotIn("notes", entry)
+        self.assertNotIn("no_wine", entry)
+        self.assertEqual(json.loads(GrapeVariety("Vidal", [], no_wine=1).to_jsonl_entry())["no_wine"], 1)
+
+    def test_models_are_slotted(self):
+        """Test that the hot model objects carry no per-instance __dict__."""
+        for obj in (PASSPORT, PASSPORT.grape, GrapeVariety("Vidal", [])):
+            self.assertFalse(hasattr(obj, "__dict__"))
+
+
+if __name__ == '__main__':
+    unittest.main()
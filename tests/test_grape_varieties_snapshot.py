@@ -0,0 +1,107 @@
+import unittest
+import tempfile
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import mock
+
+# Add src to path so the includes package resolves like in the pipeline scripts
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from includes import grape_varieties, instrumentation
+from includes.grape_varieties import GrapeVarietiesModel
+from includes.variety_snapshot import write_snapshot
+
+
+VARIETIES = [
+    {"name": "Frontenac", "aliases": ["frontenac", "frontenac noir"], "grape": True,
+     "portfolio": {"grape": {"name": "FRONTENAC", "vivc_number": "20148"}}},
+    {"name": "Vidal", "aliases": ["vidal blanc"], "grape": True, "portfolio": None},
+]
+
+
+class TestGrapeVarietiesSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.data_dir = Path(self.temp_dir.name)
+        self.jsonl_file = self.data_dir / "grape_variety_mapping.jsonl"
+        self.write_varieties(VARIETIES)
+        instrumentation.metrics.reset()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_varieties(self, rows):
+        self.jsonl_file.write_text("\n".join(json.dumps(row) for row in rows) + "\n", encoding="utf-8")
+
+    def counters(self):
+        return instrumentation.metrics.snapshot()["counters"]
+
+    def test_snapshot_matches_parsed_model(self):
+        """Test that a snapshot load yields the same varieties and aliases as parsing."""
+        parsed = GrapeVarietiesModel(self.data_dir)
+        self.assertTrue(parsed.snapshot_file.exists())
+        loaded = GrapeVarietiesModel(self.data_dir)
+        self.assertEqual(self.counters(), {"grape_model.snapshot_miss": 1, "grape_model.snapshot_hit": 1})
+        self.assertEqual(loaded.varieties, parsed.varieties)
+        self.assertEqual(loaded.normalize_variety_name("Vidal Blanc"), "Vidal")
+
+    def test_snapshot_is_lazy(self):
+        """Test that a snapshot load only builds varieties when they are accessed."""
+        GrapeVarietiesModel(self.data_dir)
+        loaded = GrapeVarietiesModel(self.data_dir)
+        self.assertEqual(loaded.snapshot_file.suffix, ".bin")
+        self.assertEqual(list(loaded.varieties), ["Frontenac", "Vidal"])
+        self.assertEqual(loaded.find_variety_by_vivc_number("20148"), "Frontenac")
+        self.assertFalse(loaded.varieties.is_materialized("Frontenac"))
+        self.assertEqual(loaded.get_variety("Frontenac").portfolio["grape"]["name"], "FRONTENAC")
+        self.assertTrue(loaded.varieties.is_materialized("Frontenac"))
+        self.assertFalse(loaded.varieties.is_materialized("Vidal"))
+    
+    def test_snapshot_invalidation(self):
+        """Test that content changes invalidate the snapshot but a bare touch does not."""
+        GrapeVarietiesModel(self.data_dir)
+
+        stat = self.jsonl_file.stat()
+        os.utime(self.jsonl_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+        GrapeVarietiesModel(self.data_dir)
+        self.assertEqual(self.counters().get("grape_model.snapshot_hit"), 1)
+
+        # The hash match refreshed the stamp: the next load trusts mtime and size again
+        with mock.patch.object(grape_varieties, "file_sha256", side_effect=AssertionError("hashed")):
+            GrapeVarietiesModel(self.data_dir)
+        self.assertEqual(self.counters().get("grape_model.snapshot_hit"), 2)
+
+        self.write_varieties(VARIETIES + [{"name": "Marquette", "aliases": ["marquette"], "grape": True}])
+        model = GrapeVarietiesModel(self.data_dir)
+        self.assertEqual(self.counters().get("grape_model.snapshot_miss"), 2)
+        self.assertEqual(model.normalize_variety_name("MARQUETTE"), "Marquette")
+
+    def test_save_refreshes_snapshot(self):
+        """Test that saving the model keeps the snapshot current."""
+        model = GrapeVarietiesModel(self.data_dir)
+        model.add_variety("Seyval Blanc", ["seyval"])
+        model.save_jsonl()
+
+        reloaded = GrapeVarietiesModel(self.data_dir)
+        self.assertEqual(self.counters().get("grape_model.snapshot_hit"), 1)
+        self.assertEqual(reloaded.normalize_variety_name("seyval"), "Seyval Blanc")
+
+    def test_concurrent_snapshot_writers(self):
+        """Test that concurrent snapshot writes use separate temp files and leave one valid snapshot."""
+        model = GrapeVarietiesModel(self.data_dir)
+        records = [variety.to_record() for variety in model.varieties.values()]
+        stamp = model._source_stamp()
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda _: write_snapshot(model.snapshot_file, records, stamp), range(16)))
+
+        self.assertEqual(list(model.snapshot_file.parent.iterdir()), [model.snapshot_file])
+        GrapeVarietiesModel(self.data_dir)
+        self.assertEqual(self.counters().get("grape_model.snapshot_hit"), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
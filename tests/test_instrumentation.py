@@ -0,0 +1,63 @@
+import unittest
+import tempfile
+import json
+import sys
+from pathlib import Path
+
+# Add src to path so the includes package resolves like in the pipeline scripts
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from includes import instrumentation
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        instrumentation.metrics.reset()
+
+    def test_timers_counters_histograms(self):
+        """Test context manager, decorator, counter and histogram recording."""
+        @instrumentation.timed("double")
+        def double(value):
+            return value * 2
+
+        self.assertEqual(double(2), 4)
+        double(3)
+        with instrumentation.timer("block"):
+            pass
+        instrumentation.count("rows", 5)
+        instrumentation.count("rows")
+        for value in range(1, 101):
+            instrumentation.observe("sizes", value)
+
+        snapshot = instrumentation.metrics.snapshot()
+        self.assertEqual(snapshot["timers"]["double"]["count"], 2)
+        self.assertEqual(snapshot["timers"]["block"]["count"], 1)
+        self.assertEqual(snapshot["counters"], {"rows": 6})
+        sizes = snapshot["histograms"]["sizes"]
+        self.assertEqual((sizes["count"], sizes["min"], sizes["max"]), (100, 1, 100))
+        self.assertEqual(sizes["p50"], 51)
+
+    def test_profiled_stage_writes_report(self):
+        """Test that a profiled stage writes its report even when it fails."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            @instrumentation.profiled_stage("demo", profile_dir=Path(temp_dir))
+            def stage(fail=False):
+                instrumentation.count("items", 3)
+                if fail:
+                    raise ValueError("boom")
+
+            stage()
+            report = json.loads((Path(temp_dir) / "demo.json").read_text())
+            self.assertEqual(report["status"], "ok")
+            self.assertEqual(report["counters"], {"items": 3})
+
+            with self.assertRaises(ValueError):
+                stage(fail=True)
+            report = json.loads((Path(temp_dir) / "demo.json").read_text())
+            self.assertEqual(report["status"], "failed")
+            self.assertEqual(report["counters"], {"items": 3})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,184 @@
+import unittest
+import tempfile
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+# Add src to path so the includes package resolves like in the pipeline scripts
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from pydantic import BaseModel, ValidationError
+
+from includes import llm_gateway
+from includes.llm_gateway import LLMCacheMiss, LLMGateway, request_key
+
+
+class Classification(BaseModel):
+    classification: str
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.output_text = text
+
+    def model_dump(self, **kwargs):
+        return {"model": "gpt-5-mini", "output_text": self.output_text,
+                "output": [{"type": "web_search_call"}, {"type": "message"}],
+                "usage": {"input_tokens": 1_000_000, "output_tokens": 500_000}}
+
+
+class FakeClient:
+    """Stands in for openai.OpenAI; fails with a 429 for the first `failures` calls."""
+
+    def __init__(self, failures=0, answers=()):
+        self.calls = []
+        self.failures = failures
+        self.answers = list(answers)  # output texts returned by parse(), in order
+        self.responses = SimpleNamespace(create=self.create, parse=self.parse)
+
+    def create(self, **request):
+        self.calls.append(request)
+        if self.failures:
+            self.failures -= 1
+            raise RateLimitError("rate limited")
+        return FakeResponse(f"answer to {request['input']}")
+
+    def parse(self, text_format, **request):
+        self.calls.append(request)
+        return FakeResponse(self.answers.pop(0))
+
+
+class TestLLMGateway(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = Path(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_identical_request_is_served_from_cache(self):
+        """Test that a repeated request (even from a new gateway) does not reach the API."""
+        client = FakeClient()
+        gateway = LLMGateway(client, cache_dir=self.cache_dir)
+        first = gateway.create("enrich", model="gpt-5-mini", input="Domaine du Ridge", timeout=60)
+        second = LLMGateway(client, cache_dir=self.cache_dir).create("enrich", model="gpt-5-mini",
+                                                                     input="Domaine du Ridge")
+
+        self.assertEqual(len(client.calls), 1)
+        self.assertFalse(first.cached)
+        self.assertTrue(second.cached)
+        self.assertEqual(second.output_text, "answer to Domaine du Ridge")
+        self.assertNotEqual(request_key("responses.create", {"model": "gpt-5-mini", "input": "a"}),
+                            request_key("responses.create", {"model": "gpt-5", "input": "a"}))
+
+    def test_replay_mode_raises_on_miss(self):
+        """Test that replay mode never calls the API."""
+        client = FakeClient()
+        gateway = LLMGateway(client, cache_dir=self.cache_dir, mode="replay")
+        with self.assertRaises(LLMCacheMiss):
+            gateway.create("enrich", model="gpt-5-mini", input="Unknown Winery")
+        self.assertEqual(client.calls, [])
+
+    def test_retries_rate_limit_and_accounts_cost(self):
+        """Test that 429s are retried and tokens, web searches and cost are summed per label."""
+        client = FakeClient(failures=2)
+        gateway = LLMGateway(client, cache_dir=self.cache_dir, mode="off")
+        with mock.patch.object(llm_gateway, "backoff_delay", return_value=0):
+            result = gateway.create("classify", model="gpt-5-mini", input="Vignoble X")
+
+        self.assertEqual(len(client.calls), 3)
+        self.assertAlmostEqual(result.cost_usd, 0.25 + 1.00 + 0.01)
+        stats = gateway.summary()["classify"]
+        self.assertEqual(stats["retries"], 2)
+        self.assertEqual(stats["web_searches"], 1)
+        self.assertEqual(gateway.summary()["total"]["calls"], 1)
+
+        with self.assertRaises(RateLimitError):
+            LLMGateway(FakeClient(failures=1), cache_dir=self.cache_dir / "other", max_retries=0).create(
+                "classify", model="gpt-5-mini", input="Vignoble Y")
+
+    def test_invalid_structured_answer_is_not_cached(self):
+        """Test that an answer failing validation raises without being cached, and the retry is stored."""
+        client = FakeClient(answers=['{"classification": ', '{"classification": "winemaker"}'])
+        gateway = LLMGateway(client, cache_dir=self.cache_dir, rate_limit=False)
+        with self.assertRaises(ValidationError):
+            gateway.parse("classify", Classification, model="gpt-5-mini", input="Vignoble X")
+        self.assertEqual(list(self.cache_dir.glob("responses.parse/**/*.json")), [])
+        self.assertEqual(gateway.summary()["classify"]["errors"], 1)
+
+        result = gateway.parse("classify", Classification, model="gpt-5-mini", input="Vignoble X")
+        cached = LLMGateway(client, cache_dir=self.cache_dir).parse("classify", Classification,
+                                                                   model="gpt-5-mini", input="Vignoble X")
+        self.assertEqual((result.output_parsed.classification, cached.cached), ("winemaker", True))
+        self.assertEqual(cached.output_parsed, result.output_parsed)
+        self.assertEqual(len(client.calls), 2)
+
+    def test_create_caches_only_validated_answers(self):
+        """Test that create(validate=...) raises on a bad free-text answer without caching it."""
+        client = FakeClient()
+        gateway = LLMGateway(client, cache_dir=self.cache_dir, rate_limit=False)
+        with self.assertRaises(json.JSONDecodeError):
+            gateway.create("enrich", model="gpt-5-mini", input="Vignoble X", validate=json.loads)
+        self.assertEqual(list(self.cache_dir.glob("responses.create/**/*.json")), [])
+        self.assertEqual(gateway.summary()["enrich"]["errors"], 1)
+
+        result = gateway.create("enrich", model="gpt-5-mini", input="Vignoble X", validate=str.upper)
+        cached = gateway.create("enrich", model="gpt-5-mini", input="Vignoble X", validate=str.upper)
+        self.assertEqual((result.output_parsed, cached.cached), ("ANSWER TO VIGNOBLE X", True))
+        self.assertEqual(cached.output_parsed, result.output_parsed)
+        self.assertEqual(len(client.calls), 2)
+
+    def test_invalid_cache_entry_is_refetched(self):
+        """Test that a cached answer that no longer validates is deleted and requested again."""
+        client = FakeClient(answers=['{"classification": "grower"}'])
+        gateway = LLMGateway(client, cache_dir=self.cache_dir, rate_limit=False)
+
+        # Store an entry as an earlier version of the gateway would have, without validation
+        key = request_key("responses.parse", {"model": "gpt-5-mini", "input": "Vignoble Y",
+                                              "text_format": Classification})
+        path = gateway._cache_path("responses.parse", {"model": "gpt-5-mini"}, key)
+        gateway._write_entry(path, {"key": key, "output_text": '{"label": "old schema"}', "response": {}})
+
+        result = gateway.parse("classify", Classification, model="gpt-5-mini", input="Vignoble Y")
+        self.assertFalse(result.cached)
+        self.assertEqual(result.output_parsed.classification, "grower")
+        self.assertEqual(gateway._read_entry(path)["output_text"], '{"classification": "grower"}')
+
+        with self.assertRaises(LLMCacheMiss):
+            path.write_text('{"output_text": "not json"}', encoding="utf-8")
+            LLMGateway(client, cache_dir=self.cache_dir, mode="replay").parse(
+                "classify", Classification, model="gpt-5-mini", input="Vignoble Y")
+        self.assertFalse(path.exists())
+
+    def test_tokens_are_reserved_once_per_call(self):
+        """Test that retries do not reserve tokens again, and a failed call releases its reservation."""
+        limiter = mock.Mock()
+        gateway = LLMGateway(FakeClient(failures=2), cache_dir=self.cache_dir, mode="off")
+        with mock.patch.object(gateway, "limiter", return_value=limiter), \
+                mock.patch.object(llm_gateway, "backoff_delay", return_value=0):
+            gateway.create("classify", model="gpt-5-mini", input="Vignoble X")
+        reserved = llm_gateway.estimate_tokens({"input": "Vignoble X"})
+        self.assertEqual(limiter.acquire.call_args_list, [mock.call(reserved), mock.call(0), mock.call(0)])
+        limiter.record.assert_called_once_with(reserved, 1_500_000)
+        limiter.release.assert_not_called()
+
+        limiter.reset_mock()
+        gateway = LLMGateway(FakeClient(failures=3), cache_dir=self.cache_dir, mode="off", max_retries=1)
+        with mock.patch.object(gateway, "limiter", return_value=limiter), \
+                mock.patch.object(llm_gateway, "backoff_delay", return_value=0):
+            with self.assertRaises(RateLimitError):
+                gateway.create("classify", model="gpt-5-mini", input="Vignoble X")
+        self.assertEqual(limiter.acquire.call_args_list, [mock.call(reserved), mock.call(0)])
+        limiter.release.assert_called_once_with(reserved)
+        limiter.record.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
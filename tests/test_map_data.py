@@ -0,0 +1,103 @@
+import unittest
+import importlib.util
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path so the includes package resolves like in the pipeline scripts
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+spec = importlib.util.spec_from_file_location(
+    "output_map_data", Path(__file__).parent.parent / "src" / "06b_output_map_data.py")
+output_map_data = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(output_map_data)
+
+
+PRODUCERS = [
+    {
+        "business_name": "Vignoble A",
+        "state_province": "Quebec",
+        "latitude": 45.1,
+        "longitude": -72.5,
+        "activities": ["Tours"],
+        "wines": [
+            {"type": "Red", "cepages": ["Frontenac", "Marquette"]},
+            {"type": "White", "cepages": ["Vidal"]},
+        ],
+    },
+    {
+        # Not geocoded: must not appear in the producers list or any index
+        "business_name": "Vignoble B",
+        "state_province": "Quebec",
+        "wines": [{"type": "Red", "cepages": ["Frontenac", "Seyval Blanc"]}],
+    },
+    {
+        "business_name": "Vineyard C",
+        "state_province": "Vermont",
+        "latitude": 44.0,
+        "longitude": -73.0,
+        "wines": [],
+    },
+    {
+        "business_name": "Vignoble D",
+        "state_province": "Quebec",
+        "latitude": 46.8,
+        "longitude": -71.2,
+        "wines": [{"type": "Rosé", "cepages": ["Frontenac", "Frontenac"]}],
+    },
+]
+
+
+class TestMapData(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        root = Path(self.temp_dir.name)
+        self.input_file = root / "producers.jsonl"
+        self.input_file.write_text("\n".join(json.dumps(p, ensure_ascii=False) for p in PRODUCERS) + "\n",
+                                   encoding="utf-8")
+        self.output_file = root / "public" / "map-data.json"
+        output_map_data.create_map_data(self.input_file, self.output_file)
+        self.map_data = json.loads(self.output_file.read_text(encoding="utf-8"))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_map_data_shape(self):
+        """Test that only geocoded producers are exported, with ids matching their list position."""
+        full_map = self.map_data["full_map"]
+        producers = full_map["producers"]
+        self.assertEqual([p["name"] for p in producers], ["Vignoble A", "Vineyard C", "Vignoble D"])
+        self.assertEqual([p["id"] for p in producers], [0, 1, 2])
+        self.assertEqual(producers[0]["coordinates"], [-72.5, 45.1])
+        self.assertEqual(producers[0]["grape_varieties"], ["Frontenac", "Marquette", "Vidal"])
+        self.assertTrue(producers[0]["open_for_visits"])
+        self.assertFalse(producers[1]["open_for_visits"])
+
+        self.assertEqual(full_map["filter_options"], {
+            "grape_varieties": ["Frontenac", "Marquette", "Vidal"],
+            "wine_types": ["Red", "Rosé", "White"],
+            "states_provinces": ["Quebec", "Vermont"],
+        })
+        self.assertEqual(self.map_data["metadata"], {
+            "total_producers": 4, "mapped_producers": 3,
+            "varieties": 3, "wine_types": 3, "states_provinces": 2,
+        })
+        self.assertNotIn('": ', self.output_file.read_text(encoding="utf-8"))  # compact separators
+
+    def test_inverted_indexes(self):
+        """Test that each index maps a key to the sorted, distinct ids of producers that have it."""
+        indexes = self.map_data["indexes"]
+        self.assertEqual(indexes["variety"], {"Frontenac": [0, 2], "Marquette": [0], "Vidal": [0]})
+        self.assertEqual(indexes["wine_type"], {"Red": [0], "Rosé": [2], "White": [0]})
+        self.assertEqual(indexes["state_province"], {"Quebec": [0, 2], "Vermont": [1]})
+        self.assertEqual(indexes["open_for_visits"], [0])
+
+        producers = self.map_data["full_map"]["producers"]
+        for variety, ids in indexes["variety"].items():
+            self.assertEqual(ids, [p["id"] for p in producers if variety in p["grape_varieties"]])
+
+
+if __name__ == '__main__':
+    unittest.main()
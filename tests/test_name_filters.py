@@ -0,0 +1,48 @@
+import unittest
+import random
+import sys
+from pathlib import Path
+
+# Add src to path so the includes package resolves like in the pipeline scripts
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from includes.name_filters import KeywordFilter
+from includes.ttb_fetcher import EXCLUSION_PATTERNS, is_excluded_business
+from includes.racj_fetcher import QuebecWineProducersFetcher
+
+
+class TestKeywordFilter(unittest.TestCase):
+
+    def test_matches_like_substring_loop(self):
+        """Test that the compiled matcher agrees with checking every pattern in turn."""
+        rng = random.Random(0)
+        fragments = EXCLUSION_PATTERNS + ["VINEYARD", "Cellars", "estate", "BRE", "distil", " ", "é"]
+        names = ["".join(rng.choice(fragments).lower() if rng.random() < 0.5 else rng.choice(fragments)
+                         for _ in range(rng.randint(0, 4)))
+                 for _ in range(2000)]
+        for name in names:
+            expected = any(pattern in name.upper() for pattern in EXCLUSION_PATTERNS)
+            self.assertEqual(is_excluded_business(name), expected, name)
+
+    def test_find_and_redundant_keywords(self):
+        """Test that keywords containing a shorter keyword still match and find() reports the hit."""
+        keywords = KeywordFilter(["BREWING", "BREW", "MEADERY"])
+        self.assertEqual(keywords.find("Lakeside Brewing Co"), "BREW")
+        self.assertEqual(keywords.find("Hive Meadery"), "MEADERY")
+        self.assertIsNone(keywords.find("Hive Mead"))
+        self.assertFalse(KeywordFilter([]).matches("anything"))
+
+    def test_whole_mode(self):
+        """Test that whole mode compares complete values case-insensitively."""
+        categories = KeywordFilter(["VIN"], whole=True)
+        self.assertTrue(categories.matches_any(["CIDRE", "vin"]))
+        self.assertFalse(categories.matches_any(["VINAIGRE", "BIER"]))
+
+        fetcher = QuebecWineProducersFetcher.__new__(QuebecWineProducersFetcher)
+        self.assertTrue(fetcher.is_wine_related_permit_type("Production artisanale de vin"))
+        self.assertFalse(fetcher.is_wine_related_permit_type("Production artisanale de vin et de cidre"))
+        self.assertTrue(fetcher.has_wine_categories(["Vin"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
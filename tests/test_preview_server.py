@@ -0,0 +1,122 @@
+import unittest
+import gzip
+import importlib.util
+import os
+import tempfile
+import threading
+import time
+import urllib.request
+from http.client import HTTPConnection
+from pathlib import Path
+
+# test-server.py is a script, not a module: load it from the repository root
+spec = importlib.util.spec_from_file_location("test_server", Path(__file__).parent.parent / "test-server.py")
+test_server = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(test_server)
+
+
+class TestPreviewServer(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.site = Path(self.temp_dir.name)
+        (self.site / "family-trees" / "assets").mkdir(parents=True)
+        (self.site / "family-trees" / "index.html").write_text("<div id=root></div>", encoding="utf-8")
+        (self.site / "family-trees" / "tree-data.json").write_text('{"nodes": []}', encoding="utf-8")
+        (self.site / "family-trees" / "assets" / "app.js").write_text("console.log(1);\n" * 200, encoding="utf-8")
+        (self.site / "varieties" / "vidal").mkdir(parents=True)
+        (self.site / "varieties" / "vidal" / "index.html").write_text("<h1>Vidal</h1>", encoding="utf-8")
+
+        self.server = test_server.PreviewServer(('127.0.0.1', 0), self.site)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.temp_dir.cleanup()
+
+    def request(self, path, method="GET", **headers):
+        connection = HTTPConnection('127.0.0.1', self.server.server_address[1], timeout=5)
+        connection.request(method, path, headers=headers)
+        response = connection.getresponse()
+        body = response.read()
+        connection.close()
+        return response, body
+
+    def test_family_trees_spa_routing(self):
+        """Test that client-side routes get index.html while assets and data are served as files."""
+        for path in ("/family-trees", "/family-trees/", "/family-trees/variety/Vidal"):
+            response, body = self.request(path)
+            self.assertEqual((response.status, body), (200, b"<div id=root></div>"), path)
+
+        response, body = self.request("/family-trees/tree-data.json")
+        self.assertEqual(response.getheader("Content-Type"), "application/json")
+        self.assertEqual(body, b'{"nodes": []}')
+        self.assertEqual(self.request("/family-trees/assets/missing.js")[0].status, 404)
+        self.assertEqual(self.request("/family-trees/tree-data.0123456789.json")[0].status, 404)
+        self.assertEqual(self.request("/../etc/passwd")[0].status, 404)
+
+    def test_directory_index_and_redirect(self):
+        """Test that directories serve index.html and get a trailing slash redirect."""
+        response, _ = self.request("/varieties/vidal?lang=fr")
+        self.assertEqual((response.status, response.getheader("Location")), (301, "/varieties/vidal/?lang=fr"))
+        self.assertEqual(self.request("/varieties/vidal/")[1], b"<h1>Vidal</h1>")
+
+    def test_conditional_requests(self):
+        """Test ETag and Last-Modified revalidation, and that edits are picked up."""
+        response, _ = self.request("/varieties/vidal/")
+        etag, last_modified = response.getheader("ETag"), response.getheader("Last-Modified")
+        self.assertEqual(self.request("/varieties/vidal/", **{"If-None-Match": etag})[0].status, 304)
+        self.assertEqual(self.request("/varieties/vidal/", **{"If-Modified-Since": last_modified})[0].status, 304)
+
+        page = self.site / "varieties" / "vidal" / "index.html"
+        page.write_text("<h1>Vidal blanc</h1>", encoding="utf-8")
+        os.utime(page, (time.time() + 10, time.time() + 10))
+        response, body = self.request("/varieties/vidal/", **{"If-None-Match": etag})
+        self.assertEqual((response.status, body), (200, b"<h1>Vidal blanc</h1>"))
+
+    def test_precompressed_sidecars(self):
+        """Test that .br/.gz sidecars are chosen by Accept-Encoding, with gzip on the fly otherwise."""
+        app = self.site / "family-trees" / "assets" / "app.js"
+        response, body = self.request("/family-trees/assets/app.js", **{"Accept-Encoding": "gzip"})
+        self.assertEqual(response.getheader("Content-Encoding"), "gzip")
+        self.assertEqual(gzip.decompress(body), app.read_bytes())
+
+        app.with_name("app.js.br").write_bytes(b"brotli bytes")
+        app.with_name("app.js.gz").write_bytes(gzip.compress(app.read_bytes()))
+        os.utime(app, (time.time() - 10, time.time() - 10))
+        response, body = self.request("/family-trees/assets/app.js", **{"Accept-Encoding": "gzip, deflate, br"})
+        self.assertEqual((response.getheader("Content-Encoding"), body), ("br", b"brotli bytes"))
+        self.assertEqual(response.getheader("Vary"), "Accept-Encoding")
+
+        response, body = self.request("/family-trees/assets/app.js")
+        self.assertIsNone(response.getheader("Content-Encoding"))
+        self.assertEqual(body, app.read_bytes())
+
+    def test_range_requests(self):
+        """Test single byte ranges, suffix ranges and unsatisfiable ranges."""
+        data = (self.site / "family-trees" / "assets" / "app.js").read_bytes()
+        response, body = self.request("/family-trees/assets/app.js", Range="bytes=16-31", **{"Accept-Encoding": "gzip"})
+        self.assertEqual((response.status, body), (206, data[16:32]))
+        self.assertEqual(response.getheader("Content-Range"), f"bytes 16-31/{len(data)}")
+
+        response, body = self.request("/family-trees/assets/app.js", Range="bytes=-5")
+        self.assertEqual((response.status, body), (206, data[-5:]))
+        self.assertEqual(self.request("/family-trees/assets/app.js", Range=f"bytes={len(data)}-")[0].status, 416)
+
+    def test_requests_are_served_concurrently(self):
+        """Test that a stalled connection does not block other requests."""
+        stalled = HTTPConnection('127.0.0.1', self.server.server_address[1], timeout=5)
+        stalled.connect()
+        stalled.send(b"GET /family-trees/ HTTP/1.1\r\n")  # headers never finished
+        try:
+            url = f"http://127.0.0.1:{self.server.server_address[1]}/family-trees/tree-data.json"
+            with urllib.request.urlopen(url, timeout=2) as response:
+                self.assertEqual(response.read(), b'{"nodes": []}')
+        finally:
+            stalled.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
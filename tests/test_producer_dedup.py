@@ -0,0 +1,100 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path so the includes package resolves like in the pipeline scripts
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from includes.producer_dedup import candidate_pairs, deduplicate_producers, name_key
+from includes.content_hash import file_sha256
+from includes.producer_sources import cache_lookup, dedup_is_current, dedup_metadata_file
+
+
+def producer(permit_id, name, city, postal=None, address=None, source="TTB", state="New York", country="US",
+             **extra):
+    return {"permit_id": permit_id, "source": source, "country": country, "state_province": state,
+            "business_name": name, "city": city, "postal_code": postal, "address": address, **extra}
+
+
+class TestProducerDedup(unittest.TestCase):
+
+    def test_merges_same_winery_across_sources(self):
+        """Test that RACJ and research entries of one winery merge onto the RACJ record."""
+        producers = [
+            producer("NSDOMAINEDURIDGE", "Domaine du Ridge", "Saint-Armand", "J0J 1T0", "205 Chemin Ridge",
+                     source="Canada_Province_Research", country="CA", state="Quebec", website="https://ridge.example"),
+            producer("AV037", "DOMAINE DU RIDGE INC.", "SAINT-ARMAND", "J0J1T0", "205 CH. RIDGE",
+                     source="RACJ", country="CA", state="Quebec"),
+            producer("AV099", "VIGNOBLE DE LA RIVIERE", "SAINT-ARMAND", "J0J1T0", "1 RANG DES ERABLES",
+                     source="RACJ", country="CA", state="Quebec"),
+        ]
+        merged, decisions, stats = deduplicate_producers(producers)
+
+        self.assertEqual(len(merged), 2)
+        ridge = next(p for p in merged if p["permit_id"] == "AV037")
+        self.assertEqual(ridge["merged_permit_ids"], ["NSDOMAINEDURIDGE"])
+        self.assertEqual(ridge["website"], "https://ridge.example")
+        merged_decisions = [d for d in decisions if d.decision == "merged"]
+        self.assertEqual(len(merged_decisions), 1)
+        self.assertIn(merged_decisions[0].rule, ("name+address", "name+postal"))
+
+    def test_same_name_elsewhere_stays_separate(self):
+        """Test that one owner's permits in different towns are reported but not merged."""
+        producers = [
+            producer("MI-W-1", "WARNER VINEYARDS, INC.", "PAW PAW", "49079", "706 S KALAMAZOO ST", state="Michigan"),
+            producer("MI-W-2", "WARNER VINEYARDS, INC.", "SOUTH HAVEN", "49090", "515 PHOENIX ST", state="Michigan"),
+            producer("NY-W-3", "WARNER VINEYARDS, INC.", "PAW PAW", "49079", "706 S KALAMAZOO ST"),
+        ]
+        merged, decisions, _ = deduplicate_producers(producers)
+
+        self.assertEqual(len(merged), 3)
+        self.assertEqual([(d.permit_id, d.other_permit_id, d.decision, d.rule) for d in decisions],
+                         [("MI-W-1", "MI-W-2", "separate", "different_location")])
+
+    def test_blocking_is_subquadratic(self):
+        """Test that only producers sharing a small block become candidate pairs."""
+        keys = [[f"city|US|NY|TOWN {i % 50}", f"name|US|NY|{i:05d}"] for i in range(1000)]
+        left, right, shared, stats = candidate_pairs(keys, max_block_size=30)
+        self.assertEqual(len(left), 50 * (20 * 19 // 2))
+        self.assertTrue((left < right).all())
+        self.assertEqual(shared[(0, 50)], ["city"])
+
+        _, _, _, stats = candidate_pairs([["city|US|NY|BIG"]] * 40, max_block_size=30)
+        self.assertEqual(stats["skipped_blocks"], 1)
+
+    def test_name_key_and_cache_lookup(self):
+        """Test the distinctive name key and cache lookup under merged permit ids."""
+        self.assertEqual(name_key("Allison Creek Wines"), name_key("ALLISON CREEK VINEYARD, L.L.C."))
+        self.assertEqual(name_key("The Winery"), "THE WINERY")
+
+        cache = {"NSALLISON": {"classification": "winemaker"}}
+        record = {"permit_id": "NB-1", "merged_permit_ids": ["NSALLISON"]}
+        self.assertEqual(cache_lookup(cache, record), {"classification": "winemaker"})
+        self.assertIsNone(cache_lookup(cache, {"permit_id": "NB-2"}))
+
+    def test_stale_dedup_file_is_not_preferred(self):
+        """Test that the deduplicated file is used only while it matches the current unified file."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            unified = Path(temp_dir) / "unified.jsonl"
+            dedup = Path(temp_dir) / "dedup.jsonl"
+            unified.write_text('{"permit_id": "A"}\n', encoding="utf-8")
+            dedup.write_text('{"permit_id": "A"}\n', encoding="utf-8")
+
+            # No recorded hash: falls back to modification times
+            os.utime(unified, ns=(0, dedup.stat().st_mtime_ns + 1_000_000_000))
+            self.assertFalse(dedup_is_current(dedup, unified))
+
+            # A recorded hash wins over times; unified gets rewritten by a new stage 01 run
+            dedup_metadata_file(dedup).write_text(json.dumps({"source_sha256": file_sha256(unified)}),
+                                                  encoding="utf-8")
+            self.assertTrue(dedup_is_current(dedup, unified))
+            unified.write_text('{"permit_id": "A"}\n{"permit_id": "B"}\n', encoding="utf-8")
+            os.utime(unified, ns=(0, dedup.stat().st_mtime_ns - 1_000_000_000))
+            self.assertFalse(dedup_is_current(dedup, unified))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import tempfile
+import json
+import sys
+from pathlib import Path
+
+# Add src to path so the includes package resolves like in the pipeline scripts
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from includes.producer_spatial_index import ProducerSpatialIndex, haversine_km
+
+
+GEO_CACHE = [
+    {"permit_id": "A", "latitude": 45.00, "longitude": -73.00},
+    {"permit_id": "B", "latitude": 45.10, "longitude": -73.00},
+    {"permit_id": "C", "latitude": 45.50, "longitude": -73.50},
+    {"permit_id": "D", "latitude": 47.00, "longitude": -71.00},
+    {"permit_id": "E", "latitude": None, "longitude": None},
+]
+
+PRODUCERS = [
+    {"permit_id": "A", "business_name": "Alpha", "state_province": "Quebec",
+     "wines": [{"type": "Red", "cepages": ["Frontenac"]}]},
+    {"permit_id": "B", "business_name": "Beta", "state_province": "Quebec",
+     "wines": [{"type": "White", "cepages": ["Vidal"]}]},
+    {"permit_id": "C", "business_name": "Gamma", "state_province": "Quebec",
+     "wines": [{"type": "Red", "cepages": ["Frontenac", "Marquette"]}]},
+    {"permit_id": "D", "business_name": "Delta", "state_province": "Quebec",
+     "wines": [{"type": "Red", "cepages": ["Frontenac"]}]},
+]
+
+
+class TestProducerSpatialIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        base = Path(self.temp_dir.name)
+        cache_file = base / "geo.jsonl"
+        producers_file = base / "producers.jsonl"
+        cache_file.write_text("\n".join(json.dumps(item) for item in GEO_CACHE) + "\n")
+        producers_file.write_text("\n".join(json.dumps(item) for item in PRODUCERS) + "\n")
+        self.index = ProducerSpatialIndex.from_geolocation_cache(cache_file, producers_file)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_radius_matches_linear_scan(self):
+        """Test radius queries against the haversine reference and ordering."""
+        matches = self.index.radius(45.0, -73.0, 80)
+        self.assertEqual([m.permit_id for m in matches], ["A", "B", "C"])
+        self.assertEqual(set(self.index.linear_radius(45.0, -73.0, 80)), {"A", "B", "C"})
+        self.assertAlmostEqual(matches[1].distance_km, haversine_km(45.0, -73.0, 45.1, -73.0), places=2)
+        self.assertEqual(matches[0].name, "Alpha")
+
+    def test_filters(self):
+        """Test variety and wine type filters on radius and kNN queries."""
+        frontenac = self.index.radius(45.0, -73.0, 80, variety="Frontenac")
+        self.assertEqual([m.permit_id for m in frontenac], ["A", "C"])
+
+        nearest_white = self.index.nearest(47.0, -71.0, k=3, wine_type="White")
+        self.assertEqual([m.permit_id for m in nearest_white], ["B"])
+
+        nearest = self.index.nearest(47.0, -71.0, k=2, variety="Frontenac")
+        self.assertEqual([m.permit_id for m in nearest], ["D", "C"])
+
+    def test_bbox(self):
+        """Test bounding box queries."""
+        matches = self.index.bbox(44.9, -73.2, 45.2, -72.9)
+        self.assertEqual([m.permit_id for m in matches], ["A", "B"])
+        self.assertEqual(self.index.bbox(44.9, -73.2, 45.2, -72.9, variety="Marquette"), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
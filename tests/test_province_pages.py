@@ -0,0 +1,66 @@
+import unittest
+import sys
+from collections import Counter
+from pathlib import Path
+
+# Add src and benchmarks to path so includes and the synthetic generators resolve
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent.parent / "benchmarks"))
+
+from includes.province_pages import province_page_snapshot, render_province_page, render_province_pages
+from synthetic import generate_province_stats
+
+
+def quebec_stats():
+    return {
+        'producer_count': 1420, 'total_wines': 30, 'producers_with_wines': 10,
+        'grape_varieties': Counter({'Frontenac': 12, 'Chardonnay': 6, 'Unknown': 2}),
+        'variety_wine_appearances': Counter({'Frontenac': 12, 'Chardonnay': 6, 'Unknown': 2}),
+        'vinifera_varieties': Counter({'Chardonnay': 6}),
+        'non_vinifera_varieties': Counter({'Frontenac': 12}),
+        'unknown_varieties': Counter({'Unknown': 2}),
+        'wine_types': Counter({'Rouge': 20, 'Blanc': 10}),
+        'modern_grapes': {}, 'producers': [], 'producer_data': [],
+    }
+
+
+class TestProvincePages(unittest.TestCase):
+
+    def test_page_content(self):
+        """Test the rendered tables, localized labels and map link."""
+        en = render_province_page("Québec", province_page_snapshot(quebec_stats()), "en")
+        fr = render_province_page("Québec", province_page_snapshot(quebec_stats()), "fr")
+
+        self.assertTrue(en.startswith("# Wine Statistics - Québec\n\n"
+                                      "[🗺️ View producers on interactive map](/producer-map/?state=Qu%C3%A9bec)"))
+        self.assertIn("| Total Producers | 1,420 |", en)
+        self.assertIn("| Varieties per Producer (avg) | 2.0 |", en)
+        self.assertIn("| Vinifera (%) | 30.0% |", en)
+        self.assertIn("| Frontenac | 12 | 60.0% | Resistant |", en)
+        self.assertIn("| Unknown | 2 | 10.0% | Unknown |", en)
+        self.assertTrue(en.endswith("| Blanc | 10 | 33.3% |\n"))
+        self.assertIn("| Frontenac | 12 | 60.0% | Résistant |", fr)
+        self.assertIn("| Unknown | 2 | 10.0% | Inconnu |", fr)
+        self.assertIn("| Type de vin | Nombre | Pourcentage |", fr)
+
+    def test_empty_province_skips_tables(self):
+        """Test that provinces without wines only get the overview."""
+        stats = {**quebec_stats(), 'producers_with_wines': 0, 'grape_varieties': Counter(),
+                 'variety_wine_appearances': Counter(), 'vinifera_varieties': Counter(),
+                 'non_vinifera_varieties': Counter(), 'unknown_varieties': Counter(), 'wine_types': Counter()}
+        page = render_province_page("Maine", province_page_snapshot(stats), "en")
+        self.assertIn("| Wines per Producer (avg) | 0.0 |", page)
+        self.assertNotIn("## Popular Grape Varieties", page)
+
+    def test_process_pool_matches_serial_rendering(self):
+        """Test that worker processes render the same pages in the same order."""
+        snapshots = {province: province_page_snapshot(stats)
+                     for province, stats in generate_province_stats(12).items()}
+        serial = render_province_pages(snapshots)
+        parallel = render_province_pages(snapshots, workers=3)
+        self.assertEqual(list(parallel), list(snapshots))
+        self.assertEqual(parallel, serial)
+
+
+if __name__ == '__main__':
+    unittest.main()
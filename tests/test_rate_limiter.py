@@ -0,0 +1,90 @@
+import unittest
+import tempfile
+import sys
+from pathlib import Path
+
+# Add src to path so the includes package resolves like in the pipeline scripts
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from includes.rate_limiter import RateLimiter, parse_duration
+
+
+class FakeClock:
+    """Shared time source; sleeping advances it instead of blocking."""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.state_dir = Path(self.temp_dir.name)
+        self.clock = FakeClock()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def limiter(self, rpm=60, tpm=60_000):
+        return RateLimiter("gpt-5-mini", self.state_dir, rpm=rpm, tpm=tpm, clock=self.clock,
+                           sleep=self.clock.sleep)
+
+    def test_limiters_share_one_budget(self):
+        """Test that two limiters on the same state file (threads or processes) draw from one bucket."""
+        first, second = self.limiter(), self.limiter()
+        # 60 rpm holds a 10 second burst: 10 requests, split across both callers
+        for i in range(10):
+            self.assertEqual((first if i % 2 else second).acquire(100), 0.0)
+        waited = first.acquire(100)
+        self.assertAlmostEqual(waited, 1.0)
+        self.assertAlmostEqual(second.snapshot().requests, 0.0)
+
+    def test_tokens_are_reserved_and_corrected(self):
+        """Test that token debt from a larger-than-estimated call delays the next one."""
+        limiter = self.limiter(rpm=600, tpm=6_000)  # 1000-token burst, 100 tokens/second
+        limiter.acquire(500)
+        limiter.record(500, 700)
+        self.assertEqual(limiter.acquire(200), 0.0)
+        self.assertAlmostEqual(limiter.acquire(300), 2.0)
+
+    def test_failed_call_releases_its_reservation(self):
+        """Test that released tokens are available again, capped at the burst capacity."""
+        limiter = self.limiter(rpm=600, tpm=6_000)
+        limiter.acquire(800)
+        limiter.release(800)
+        self.assertAlmostEqual(limiter.snapshot().tokens, 1000)
+        self.assertEqual(limiter.acquire(1000), 0.0)
+
+    def test_rate_limit_response_blocks_and_slows_down(self):
+        """Test that a 429 blocks all callers for retry-after, halves the rate and recovers on success."""
+        limiter, other = self.limiter(), self.limiter()
+        limiter.penalize(retry_after=4.0)
+        self.assertAlmostEqual(other.acquire(), 4.0)
+        self.assertEqual(other.snapshot().factor, 0.5)
+        other.record(0, 0)
+        self.assertAlmostEqual(limiter.snapshot().factor, 0.55)
+
+    def test_headers_set_limits_and_reset(self):
+        """Test that x-ratelimit-* headers replace the seeded limits and exhausted windows wait for reset."""
+        limiter = self.limiter()
+        limiter.update_from_headers({"x-ratelimit-limit-requests": "5000", "x-ratelimit-limit-tokens": "4000000",
+                                     "x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "1.5s"})
+        state = limiter.snapshot()
+        self.assertEqual((state.rpm, state.tpm), (5000.0, 4_000_000.0))
+        self.assertAlmostEqual(limiter.acquire(), 1.5)
+        self.assertEqual(parse_duration("6m0s"), 360.0)
+        self.assertEqual(parse_duration("20ms"), 0.02)
+        self.assertIsNone(parse_duration("soon"))
+
+
+if __name__ == '__main__':
+    unittest.main()
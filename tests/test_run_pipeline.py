@@ -0,0 +1,84 @@
+import unittest
+import io
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest import mock
+
+# Add src to path so the includes package resolves like in the pipeline scripts
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import run_pipeline
+from run_pipeline import MAPPING, STAGES, Stage, stage_dependencies
+
+SCRIPTS = {
+    "make.py": "from pathlib import Path\nPath('data/a.txt').write_text('v1')\n",
+    # Rewrites its own input slowly, so a consumer started alongside it would read the old version
+    "rewrite.py": ("import time\nfrom pathlib import Path\ntext = Path('data/a.txt').read_text()\n"
+                   "time.sleep(0.3)\nPath('data/a.txt').write_text(text + '+final')\n"),
+    "read_b.py": "from pathlib import Path\nPath('data/b.txt').write_text(Path('data/a.txt').read_text())\n",
+    "read_c.py": "from pathlib import Path\nPath('data/c.txt').write_text(Path('data/a.txt').read_text())\n",
+}
+
+# Consumers are listed before the stage that rewrites their input
+TEST_STAGES = [
+    Stage("make", "make.py", inputs=[], outputs=["data/a.txt"]),
+    Stage("b", "read_b.py", inputs=["data/a.txt"], outputs=["data/b.txt"]),
+    Stage("rewrite", "rewrite.py", inputs=["data/a.txt"], outputs=["data/a.txt"]),
+    Stage("c", "read_c.py", inputs=["data/a.txt"], outputs=["data/c.txt"]),
+]
+
+
+class TestStageDependencies(unittest.TestCase):
+
+    def test_rewriter_chain(self):
+        """Test that a stage rewriting its input depends on the previous writer, and readers on the last one."""
+        deps = stage_dependencies(TEST_STAGES)
+        self.assertEqual(deps, {"make": [], "b": ["rewrite"], "rewrite": ["make"], "c": ["rewrite"]})
+
+    def test_mapping_readers_wait_for_parent_extraction(self):
+        """Test that every reader of the variety mapping depends on stage 16, the last stage rewriting it."""
+        deps = stage_dependencies(STAGES)
+        self.assertEqual((deps["03"], deps["04"], deps["16"]), (["02"], ["03"], ["04"]))
+        for stage in STAGES:
+            if MAPPING in stage.inputs and MAPPING not in stage.outputs:
+                self.assertIn("16", deps[stage.id], stage.id)
+
+    def test_llm_stages_need_network(self):
+        """Test that the stages calling the LLM or VIVC are only run with --network."""
+        network = {stage.id for stage in STAGES if stage.network}
+        self.assertEqual(network, {"01", "02", "03", "04", "16"})
+
+
+class TestRunPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        (self.root / "src").mkdir()
+        (self.root / "data").mkdir()
+        for name, code in SCRIPTS.items():
+            (self.root / "src" / name).write_text(code, encoding="utf-8")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def run_stages(self):
+        with mock.patch.object(run_pipeline, "STAGES", TEST_STAGES), redirect_stdout(io.StringIO()):
+            return run_pipeline.run_pipeline(jobs=4, root=self.root)
+
+    def test_readers_see_the_rewritten_file(self):
+        """Test that readers run after the in-place rewrite, and an unchanged re-run skips every stage."""
+        reports = self.run_stages()
+        self.assertEqual({r['stage']: r['status'] for r in reports},
+                         {"make": "ok", "b": "ok", "rewrite": "ok", "c": "ok"})
+        self.assertEqual((self.root / "data" / "b.txt").read_text(), "v1+final")
+        self.assertEqual((self.root / "data" / "c.txt").read_text(), "v1+final")
+
+        reports = self.run_stages()
+        self.assertEqual({r['status'] for r in reports}, {"skipped"})
+
+
+if __name__ == '__main__':
+    unittest.main()
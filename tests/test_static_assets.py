@@ -0,0 +1,85 @@
+import unittest
+import gzip
+import json
+import os
+import tempfile
+import sys
+from pathlib import Path
+
+# Add src to path so the includes package resolves like in the pipeline scripts
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from includes.generated_files import GeneratedFiles
+from includes.static_assets import (
+    StaticAsset, load_asset_manifest, publish_asset, published_files, write_asset_manifest
+)
+
+
+class TestStaticAssets(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.temp_dir.name)
+        self.source = Path("docs/assets/data/producers.geojson")
+        self.source.parent.mkdir(parents=True)
+        self.asset = StaticAsset("producers.geojson", self.source, Path("docs/assets/data"), "/assets/data/")
+        self.manifest = Path("docs/assets/data/asset-manifest.json")
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.temp_dir.cleanup()
+
+    def write_source(self, features):
+        data = {"type": "FeatureCollection", "features": features}
+        self.source.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+        return data
+
+    def publish(self):
+        output = GeneratedFiles("19_test", Path("manifests"))
+        entry = publish_asset(self.asset, output, use_brotli=False)
+        write_asset_manifest(output, self.manifest, {self.asset.name: entry})
+        return entry, output.finish(prune=True)
+
+    def test_minified_hashed_and_compressed(self):
+        """Test that the published copy holds the same data, minified, under its content hash."""
+        data = self.write_source([{"type": "Feature", "properties": {"name": f"Vignoble {i}", "région": "Québec"}}
+                                  for i in range(50)])
+        entry, _ = self.publish()
+
+        published = Path("docs") / entry['url'].lstrip('/')
+        self.assertRegex(published.name, r"^producers\.[0-9a-f]{10}\.geojson$")
+        self.assertEqual(json.loads(published.read_text(encoding="utf-8")), data)
+        self.assertIn("Québec", published.read_text(encoding="utf-8"))
+        self.assertEqual(gzip.decompress(Path(str(published) + ".gz").read_bytes()), published.read_bytes())
+        self.assertEqual(entry['encodings'], {"gzip": entry['url'] + ".gz"})
+        self.assertLess(entry['bytes']['gzip'], entry['bytes']['minified'])
+        self.assertLess(entry['bytes']['minified'], entry['bytes']['source'])
+        self.assertEqual(load_asset_manifest(self.manifest)["producers.geojson"], entry)
+
+    def test_new_version_prunes_the_old_one(self):
+        """Test that republishing changed data renames the file and deletes the previous version."""
+        self.write_source([{"type": "Feature", "properties": {"name": "Vignoble A"}}] * 30)
+        first, _ = self.publish()
+        self.write_source([{"type": "Feature", "properties": {"name": "Vignoble B"}}] * 30)
+        second, report = self.publish()
+
+        self.assertNotEqual(first['url'], second['url'])
+        self.assertTrue(all(path.exists() for path in published_files(self.asset, second)))
+        self.assertFalse(any(path.exists() for path in published_files(self.asset, first)))
+        self.assertEqual(len(report['pruned']), 2)
+        self.assertTrue(self.manifest.exists())
+
+        _, report = self.publish()
+        self.assertEqual((report['written'], report['unchanged']), (0, 3))
+
+    def test_tiny_files_have_no_compressed_variant(self):
+        """Test that variants larger than the minified file are not written."""
+        self.write_source([])
+        entry, _ = self.publish()
+        self.assertEqual(entry['encodings'], {})
+        self.assertNotIn('gzip', entry['bytes'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import unittest
+import tempfile
+import importlib.util
+import io
+import json
+import sys
+from pathlib import Path
+from unittest import mock
+
+# Add src to path so the includes package resolves like in the pipeline scripts
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from includes.external_sort import external_sort
+from includes.json_stream import JsonStream
+from includes.racj_fetcher import QuebecWineProducersFetcher
+from includes.ttb_fetcher import iter_ttb_producers
+
+spec = importlib.util.spec_from_file_location(
+    "producer_fetch", Path(__file__).parent.parent / "src" / "01_producer_fetch.py")
+producer_fetch = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(producer_fetch)
+
+
+def fabricant(name, permits):
+    return {"Nom": name, "Titlr": name, "Neq": 1170000000,
+            "Permis": [{"No": number, "Catgrs": categories, "Adrs": "1 RUE", "CdVl": "1",
+                        "Ville": "QUÉBEC", "CP": "G1G1G1"} for number, categories in permits]}
+
+
+RACJ_DATA = {
+    "Version": 3.5,
+    "AlcoolFabricants": [
+        {"TypePermis": "Brasseur", "Fabricants": [fabricant("BRASSERIE", [("BR1", ["BIER"])])]},
+        # Key order is not guaranteed: Fabricants before TypePermis must still be classified
+        {"Fabricants": [fabricant("VIGNOBLE B", [("AV2", ["VIN", "CIDRE"]), ("AV3", ["CIDRE"])])],
+         "TypePermis": "Production artisanale de vin"},
+        {"TypePermis": "Production artisanale de vin",
+         "Fabricants": [fabricant("VIGNOBLE A", [("AV1", ["vin"])]), {"Nom": "SANS PERMIS"}]}
+    ]
+}
+
+
+class TestStreamingFetch(unittest.TestCase):
+
+    def test_json_stream_small_chunks(self):
+        """Test that values split across read chunks are decoded intact."""
+        text = json.dumps({"a": [1, 23456, {"b": "é" * 20}], "c": 7.25})
+        stream = JsonStream(io.StringIO(text), chunk_size=3)
+        seen = {}
+        for key in stream.iter_object():
+            if key == "a":
+                seen[key] = [stream.read_value() for _ in stream.iter_array()]
+            else:
+                seen[key] = stream.read_value()
+        self.assertEqual(seen, json.loads(text))
+
+    def test_racj_stream_matches_full_load(self):
+        """Test that streaming the RACJ file yields the same producers as json.load."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            fetcher = QuebecWineProducersFetcher(temp_dir)
+            fetcher.raw_file.write_text(json.dumps(RACJ_DATA, ensure_ascii=False), encoding="utf-8")
+
+            metadata = {}
+            streamed = list(fetcher.iter_wine_producers(metadata))
+            expected, permit_types = fetcher.filter_wine_producers(fetcher.load_raw_data())
+
+        self.assertEqual(sorted(p["permit_id"] for p in streamed), sorted(p["permit_id"] for p in expected))
+        self.assertEqual(metadata["raw_record_count"], 4)
+        self.assertEqual(metadata["wine_record_count"], 2)
+        self.assertEqual(metadata["wine_permit_types"], permit_types)
+
+    def test_ttb_stream_without_state_filter(self):
+        """Test that dropping the state filter keeps producers from every state."""
+        rows = [
+            ["NY-W-1", "FINGER LAKES CELLARS", "", "1 MAIN", "GENEVA", "14456", "ONTARIO", "x"],
+            ["CA-W-2", "NAPA ESTATE", "", "2 VINE", "NAPA", "94558", "NAPA", "x"],
+            ["CA-W-3", "NAPA BREWING", "", "3 HOPS", "NAPA", "94558", "NAPA", "x"],
+        ]
+        with tempfile.TemporaryDirectory() as temp_dir:
+            ttb_file = Path(temp_dir) / "ttb.csv"
+            ttb_file.write_text("\n".join(",".join(row) for row in rows) + "\n", encoding="latin1")
+
+            filtered = list(iter_ttb_producers(ttb_file, {}))
+            metadata = {}
+            everything = list(iter_ttb_producers(ttb_file, metadata, states=None))
+
+        self.assertEqual([p["state_province"] for p in filtered], ["New York"])
+        self.assertEqual([p["state_province"] for p in everything], ["New York", "California"])
+        self.assertEqual(metadata["excluded_non_wine"], 1)
+        self.assertEqual(metadata["state_distribution"], {"New York": 1, "California": 1})
+
+    def test_external_sort_is_stable(self):
+        """Test that spilled runs merge back into the same order as list.sort."""
+        records = [{"source": "TTB" if i % 3 else "RACJ", "business_name": f"N{i % 7}", "i": i}
+                   for i in range(50)]
+        key = lambda r: (r["source"], r["business_name"].lower())
+        self.assertEqual(list(external_sort(iter(records), key=key, chunk_size=4)), sorted(records, key=key))
+
+    def test_unchanged_check_covers_code_and_filters(self):
+        """Test that the unified file is rebuilt when the state filter changes, not only the sources."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_file = Path(temp_dir) / "unified.jsonl"
+            metadata_file = Path(temp_dir) / "unified_metadata.json"
+            output_file.write_text("{}\n", encoding="utf-8")
+            hashes = {"quebec": "a", "us": "b", "canada_provinces": "c", **producer_fetch.build_config_hashes()}
+            metadata_file.write_text(json.dumps({"source_hashes": hashes}), encoding="utf-8")
+
+            with mock.patch.object(producer_fetch, "OUTPUT_FILE", output_file), \
+                    mock.patch.object(producer_fetch, "METADATA_FILE", metadata_file):
+                self.assertTrue(producer_fetch.sources_unchanged(dict(hashes)))
+                with mock.patch.object(producer_fetch, "NORTHEASTERN_STATES", {"VT": "Vermont"}):
+                    current = {"quebec": "a", "us": "b", "canada_provinces": "c",
+                               **producer_fetch.build_config_hashes()}
+                self.assertEqual(current["code"], hashes["code"])
+                self.assertFalse(producer_fetch.sources_unchanged(current))
+
+    def test_code_hash_covers_shared_modules(self):
+        """Test that the name filters, JSON streaming and external sort modules are part of the code hash."""
+        hashed = []
+        with mock.patch.object(producer_fetch, "file_sha256", side_effect=lambda path: hashed.append(path.name) or ""):
+            producer_fetch.build_config_hashes()
+        for name in ("name_filters.py", "json_stream.py", "external_sort.py"):
+            self.assertIn(name, hashed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+import unittest
+import tempfile
+import os
+import re
+import sys
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add project root (utils) and src (includes) to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from includes.llm_gateway import set_gateway
+from utils.sync_french import FrenchSyncer, TranslationMemory, block_shape, split_blocks
+
+BLOCK = re.compile(r"^\[\[BLOCK (\d+)\]\]\n(.*?)(?=\n\n\[\[BLOCK |\n$)", re.MULTILINE | re.DOTALL)
+
+
+class FakeGateway:
+    """Answers block translation prompts with 'FR ' + each English block."""
+
+    def __init__(self):
+        self.prompts = []
+        self.lock = threading.Lock()
+        self.drop_last_block = False
+
+    def create(self, label, validate=None, **request):
+        with self.lock:
+            self.prompts.append(request["input"])
+        blocks = BLOCK.findall(request["input"])
+        if self.drop_last_block:
+            blocks = blocks[:-1]
+        output_text = "\n\n".join(f"[[BLOCK {i}]]\nFR {text}" for i, text in blocks)
+        return SimpleNamespace(output_text=output_text, output_parsed=validate(output_text) if validate else None)
+
+
+ARTICLE = """---
+title: Frontenac
+---
+
+# Frontenac
+
+Frontenac is a cold hardy red hybrid.
+
+```
+code stays as is
+```
+
+It was released by the University of Minnesota in 1996.
+"""
+
+
+class TestSyncFrench(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.temp_dir.name)
+        self.english_dir = Path("docs/en/varieties")
+        self.english_dir.mkdir(parents=True)
+        self.gateway = FakeGateway()
+        set_gateway(self.gateway)
+
+    def tearDown(self):
+        set_gateway(None)
+        os.chdir(self.cwd)
+        self.temp_dir.cleanup()
+
+    def syncer(self):
+        return FrenchSyncer(workers=3, memory_file=Path("data/translation_memory.jsonl"))
+
+    def test_split_blocks_keeps_code_fences_whole(self):
+        """Test that blank lines inside a fenced code block do not split it."""
+        blocks = split_blocks("Intro\n\n```\na\n\nb\n```\n\n\nEnd")
+        self.assertEqual(blocks, ["Intro", "```\na\n\nb\n```", "End"])
+
+    def test_only_changed_paragraphs_are_retranslated(self):
+        """Test that an edit to one paragraph sends only that paragraph to the model."""
+        english = self.english_dir / "frontenac.md"
+        english.write_text(ARTICLE, encoding="utf-8")
+        (self.english_dir / "marquette.md").write_text("# Marquette\n\nA red hybrid.\n", encoding="utf-8")
+
+        self.syncer().sync_all()
+        self.assertEqual(len(self.gateway.prompts), 2)
+        french = Path("docs/fr/varieties/frontenac.md").read_text(encoding="utf-8")
+        self.assertIn("FR Frontenac is a cold hardy red hybrid.", french)
+        self.assertIn("```\ncode stays as is\n```", french)
+
+        english.write_text(ARTICLE.replace("in 1996", "in 1996 (MN 1047)"), encoding="utf-8")
+        self.gateway.prompts.clear()
+        syncer = self.syncer()
+        action = syncer.sync_file_to_french(english, Path("docs/fr/varieties/frontenac.md"), is_variety=True)
+
+        self.assertEqual(action, "UPDATE - 1 paragraphs translated, 2 reused from memory")
+        self.assertEqual(len(self.gateway.prompts), 1)
+        self.assertIn("(MN 1047)", self.gateway.prompts[0])
+        self.assertNotIn("cold hardy", self.gateway.prompts[0])
+
+    def test_misaligned_answer_raises(self):
+        """Test that an answer missing a block is rejected by the validator passed to the gateway."""
+        self.gateway.drop_last_block = True
+        with self.assertRaisesRegex(ValueError, "expected 2 translated blocks, got 1"):
+            self.syncer().translate_blocks(["First.", "Second."], "variety", "Frontenac")
+
+    def test_memory_is_seeded_from_in_sync_translations(self):
+        """Test that an up-to-date French file teaches the memory its paragraphs."""
+        syncer = self.syncer()
+        english = self.english_dir / "frontenac.md"
+        english.write_text(ARTICLE, encoding="utf-8")
+        french = Path("docs/fr/varieties/frontenac.md")
+        _, english_content = syncer.extract_frontmatter_and_content(english)
+        syncer.create_french_file({"english_hash": syncer.compute_content_hash(english)},
+                                  english_content.replace("Frontenac is", "Le Frontenac est"), french)
+
+        self.assertEqual(syncer.sync_file_to_french(english, french, is_variety=True), "SKIP - No changes detected")
+        memory = TranslationMemory(Path("data/translation_memory.jsonl"))
+        self.assertEqual(memory.get("variety", "Frontenac is a cold hardy red hybrid."),
+                         "Le Frontenac est a cold hardy red hybrid.")
+        self.assertEqual(self.gateway.prompts, [])
+
+    def test_misaligned_translations_are_not_learned(self):
+        """Test that pairs with the same block count but different block kinds or code are not seeded."""
+        syncer = self.syncer()
+        english = ARTICLE.split("---\n", 2)[2].strip()
+        # Heading merged into the first paragraph, last paragraph split in two: same count, shifted blocks
+        shifted = english.replace("# Frontenac\n\nFrontenac is", "Le Frontenac est").replace(
+            "University of Minnesota in 1996.", "University of Minnesota.\n\nEn 1996.")
+        edited_code = english.replace("code stays as is", "le code change")
+
+        self.assertEqual(len(split_blocks(shifted)), len(split_blocks(english)))
+        self.assertEqual(syncer.remember_alignment(english, shifted, "variety"), 0)
+        self.assertEqual(syncer.remember_alignment(english, edited_code, "variety"), 0)
+        self.assertEqual(len(syncer.memory), 0)
+        self.assertEqual(syncer.remember_alignment(english, english.replace("is a", "est un"), "variety"), 3)
+
+        self.assertEqual(block_shape("## Histoire"), ("heading", 2))
+        self.assertEqual(block_shape("- un\n- deux"), ("list", 2))
+        self.assertEqual(block_shape("| a | b |\n|---|---|"), ("table", 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
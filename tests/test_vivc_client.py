@@ -0,0 +1,165 @@
+import unittest
+import asyncio
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+
+# Add src to path so the includes package resolves like in the pipeline scripts
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from includes import vivc_client
+from includes.vivc_client import VIVCCache, fetch_url, get_passport_data, search_cultivar, search_cultivar_async
+
+SEARCH_PAGE = """<table>
+<tr><th>Cultivar name</th><th>Prime name</th><th>VIVC</th><th>Species</th><th>Color</th><th>Country</th></tr>
+<tr><td>{name}</td><td>{name}</td><td><a href="index.php?r=passport%2Fview&id={number}">{number}</a></td>
+<td>Vitis interspecific crossing</td><td>BLANC</td><td>FRANCE</td></tr>
+</table>"""
+
+PASSPORT_PAGE = """<table>
+<tr><th>Prime name</th><td>VARIETY {number}</td></tr>
+<tr><th>Variety number VIVC</th><td>{number}</td></tr>
+</table>"""
+
+
+class StubVIVCHandler(BaseHTTPRequestHandler):
+    """Slow VIVC stand-in: search and passport pages, 500 for the "broken" cultivar."""
+
+    def do_GET(self):
+        query = parse_qs(urlsplit(self.path).query)
+        with self.server.lock:
+            self.server.requests[self.path] += 1
+        time.sleep(self.server.delay)  # keep requests in flight while other threads arrive
+
+        if query.get("r") == ["passport/view"]:
+            body = PASSPORT_PAGE.format(number=query["id"][0])
+        else:
+            name = query.get("CultivarnameSearch[text]", [""])[0]
+            if name == "broken":
+                self.send_response(500)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            body = SEARCH_PAGE.format(name=name, number=sum(map(ord, name)))
+
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestVIVCClientSingleFlight(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubVIVCHandler)
+        self.server.requests = Counter()
+        self.server.lock = threading.Lock()
+        self.server.delay = 0.2
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.saved = (vivc_client.VIVC_BASE_URL, vivc_client.REQUEST_INTERVAL, vivc_client._cache,
+                      vivc_client._mirror, vivc_client._mirror_loaded)
+        vivc_client.VIVC_BASE_URL = f"http://127.0.0.1:{self.server.server_address[1]}/index.php"
+        vivc_client.REQUEST_INTERVAL = 0
+        vivc_client._cache = VIVCCache(Path(self.temp_dir.name) / "vivc_cache.jsonl")
+        vivc_client._mirror, vivc_client._mirror_loaded = None, True  # no offline mirror
+        vivc_client._parsed.clear()
+
+    def tearDown(self):
+        (vivc_client.VIVC_BASE_URL, vivc_client.REQUEST_INTERVAL, vivc_client._cache,
+         vivc_client._mirror, vivc_client._mirror_loaded) = self.saved
+        vivc_client._parsed.clear()
+        self.server.shutdown()
+        self.server.server_close()
+        self.temp_dir.cleanup()
+
+    def test_concurrent_fetches_share_one_request(self):
+        """Test that threads fetching the same uncached URL trigger a single HTTP request."""
+        url = f"{vivc_client.VIVC_BASE_URL}?r=passport%2Fview&id=13106"
+        with ThreadPoolExecutor(max_workers=32) as executor:
+            pages = list(executor.map(lambda _: fetch_url(url), range(32)))
+
+        self.assertEqual(sum(self.server.requests.values()), 1)
+        self.assertEqual(len(set(pages)), 1)
+        self.assertIn("VARIETY 13106", pages[0])
+        self.assertEqual(vivc_client._cache.get(url), pages[0])
+
+    def test_thread_pool_stress(self):
+        """Test many workers searching and fetching passports for a few keys: one request and one parse per key."""
+        varieties = ["Vidal", "Frontenac", "Marquette", "Seyval blanc", "L'Acadie blanc"]
+        numbers = ["13106", "17013", "22102"]
+        calls = [("search", varieties[i % len(varieties)]) if i % 2 else ("passport", numbers[i % len(numbers)])
+                 for i in range(400)]
+
+        def call(item):
+            kind, key = item
+            return search_cultivar(key) if kind == "search" else get_passport_data(key)
+
+        with ThreadPoolExecutor(max_workers=24) as executor, \
+                mock.patch.object(vivc_client, "parse_passport_html", wraps=vivc_client.parse_passport_html) as parse:
+            results = list(executor.map(call, calls))
+
+        self.assertEqual(len(self.server.requests), len(varieties) + len(numbers))
+        self.assertEqual(set(self.server.requests.values()), {1})
+        self.assertEqual(parse.call_count, len(numbers))
+        passports = {}
+        for (kind, key), result in zip(calls, results):
+            if kind == "search":
+                self.assertEqual(result[0].cultivar_name, key)
+            else:
+                self.assertEqual(result.grape.vivc_number, key)
+                # Parsed once, but every caller gets its own copy
+                first = passports.setdefault(key, result)
+                self.assertEqual(first, result)
+                if first is not result:
+                    self.assertIsNot(first.grape, result.grape)
+
+    def test_parsed_pages_are_bounded(self):
+        """Test that only the most recently used parse results are kept, and callers cannot change them."""
+        with mock.patch.object(vivc_client, "PARSED_CACHE_SIZE", 2):
+            passport = get_passport_data("13106")
+            passport.grape.name = "changed by a caller"
+            get_passport_data("17013")
+            self.assertNotEqual(get_passport_data("13106").grape.name, "changed by a caller")
+            get_passport_data("22102")
+
+        self.assertEqual(list(vivc_client._parsed), [("passport", "13106"), ("passport", "22102")])
+
+    def test_failures_are_shared_then_retried(self):
+        """Test that concurrent callers share one failed request and a later call tries again."""
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = [executor.submit(search_cultivar, "broken") for _ in range(8)]
+        for future in futures:
+            with self.assertRaisesRegex(ValueError, "HTTP Error 500"):
+                future.result()
+        self.assertEqual(sum(self.server.requests.values()), 1)
+
+        with self.assertRaises(ValueError):
+            search_cultivar("broken")
+        self.assertEqual(sum(self.server.requests.values()), 2)
+
+    def test_async_callers_are_coalesced(self):
+        """Test that asyncio tasks searching the same cultivar share one request."""
+        async def search_all():
+            return await asyncio.gather(*(search_cultivar_async("Vidal") for _ in range(10)))
+
+        results = asyncio.run(search_all())
+        self.assertEqual(sum(self.server.requests.values()), 1)
+        self.assertTrue(all(result[0].vivc_number == results[0][0].vivc_number for result in results))
+
+
+if __name__ == '__main__':
+    unittest.main()
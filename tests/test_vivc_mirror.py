@@ -0,0 +1,163 @@
+import unittest
+import argparse
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+
+# Add src to path so the includes package resolves like in the pipeline scripts
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from includes import vivc_client
+from includes.vivc_client import GrapeId, PassportData, VIVCCache, get_passport_data, search_cultivar
+from includes.vivc_mirror import VIVCMirror, import_directory, mirror_passports, vivc_number
+
+PASSPORTS = {
+    "11558": ("SEYVAL BLANC", ["SEYVAL", "SEYVE-VILLARD 5276"]),
+    "13106": ("VIDAL BLANC", ["VIDAL 256"]),
+    "17013": ("FRONTENAC", []),
+}
+
+
+def passport_page(number: str) -> str:
+    name, synonyms = PASSPORTS[number]
+    links = " ".join(f'<a href="index.php?r=synonym&sname={synonym}">{synonym}</a>' for synonym in synonyms)
+    return (f"<table><tr><th>Prime name</th><td>{name}</td></tr>"
+            f"<tr><th>Variety number VIVC</th><td>{number}</td></tr>"
+            f"<tr><th>Species</th><td>VITIS INTERSPECIFIC CROSSING</td></tr></table>"
+            f"<table><tr><td>Synonyms: {links}</td></tr></table>")
+
+
+class StubPassportHandler(BaseHTTPRequestHandler):
+    """Passport pages for PASSPORTS, 404 for other numbers."""
+
+    def do_GET(self):
+        number = parse_qs(urlsplit(self.path).query)["id"][0]
+        self.server.requests.append(number)
+        data = passport_page(number).encode("utf-8") if number in PASSPORTS else b""
+        self.send_response(200 if data else 404)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestVIVCMirror(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.mirror_file = self.root / "vivc_mirror.jsonl"
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubPassportHandler)
+        self.server.requests = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        self.saved = (vivc_client.VIVC_BASE_URL, vivc_client.REQUEST_INTERVAL, vivc_client._cache,
+                      vivc_client._mirror, vivc_client._mirror_loaded)
+        vivc_client.VIVC_BASE_URL = f"http://127.0.0.1:{self.server.server_address[1]}/index.php"
+        vivc_client.REQUEST_INTERVAL = 0
+        vivc_client._cache = VIVCCache(self.root / "vivc_cache.jsonl")
+        vivc_client._parsed.clear()
+
+    def tearDown(self):
+        (vivc_client.VIVC_BASE_URL, vivc_client.REQUEST_INTERVAL, vivc_client._cache,
+         vivc_client._mirror, vivc_client._mirror_loaded) = self.saved
+        vivc_client._parsed.clear()
+        self.server.shutdown()
+        self.server.server_close()
+        self.temp_dir.cleanup()
+
+    def test_mirror_is_resumable(self):
+        """Test that a mirror run stops at its limit, records missing numbers and resumes without refetching."""
+        numbers = ["11558", "404", "13106", "17013"]
+        report = mirror_passports(VIVCMirror(self.mirror_file), numbers, limit=2)
+        self.assertEqual((report['fetched'], report['missing']), (1, 1))
+
+        mirror = VIVCMirror(self.mirror_file)
+        report = mirror_passports(mirror, numbers)
+        self.assertEqual((report['fetched'], report['skipped']), (2, 2))
+        self.assertEqual(self.server.requests, numbers)
+        self.assertEqual((len(mirror), mirror.missing), (3, {"404"}))
+        self.assertFalse(vivc_client._cache.cache_file.exists())  # pages are not kept as HTML
+
+    def test_name_and_synonym_index(self):
+        """Test lookups by prime name and synonym with case, accents and punctuation folded."""
+        mirror_passports(VIVCMirror(self.mirror_file), list(PASSPORTS))
+        mirror = VIVCMirror(self.mirror_file)
+
+        self.assertEqual([p.grape.vivc_number for p in mirror.lookup("Vidal Blanc")], ["13106"])
+        self.assertEqual([p.grape.vivc_number for p in mirror.lookup("seyve villard 5276")], ["11558"])
+        self.assertEqual([p.grape.vivc_number for p in mirror.lookup("Séyval")], ["11558"])
+        self.assertEqual(mirror.lookup("Marquette"), [])
+        self.assertEqual(mirror.get("11558").synonyms, ["SEYVAL", "SEYVE-VILLARD 5276"])
+
+    def test_readded_number_replaces_its_index_entries(self):
+        """Test that a later line for a number drops the names and synonyms of its earlier passport."""
+        mirror_passports(VIVCMirror(self.mirror_file), ["11558", "13106"])
+        mirror = VIVCMirror(self.mirror_file)
+        mirror.add("11558", PassportData(grape=GrapeId(name="SEYVAL BLANC", vivc_number="11558"),
+                                         synonyms=["SV 5276"]))
+        mirror.add("13106", None)
+
+        for mirror in (mirror, VIVCMirror(self.mirror_file)):
+            self.assertEqual(mirror.lookup("Seyval"), [])
+            self.assertEqual([p.grape.vivc_number for p in mirror.lookup("SV 5276")], ["11558"])
+            self.assertEqual(mirror.lookup("Vidal 256"), [])
+            self.assertEqual(mirror.search("Vidal Blanc"), [])
+            self.assertNotIn("VIDAL BLANC", mirror.by_name)
+
+    def test_seed_numbers_are_normalized(self):
+        """Test that --seed values lose leading zeros and non-numeric values are rejected."""
+        self.assertEqual(vivc_number("013106"), "13106")
+        with self.assertRaises(argparse.ArgumentTypeError):
+            vivc_number("abc")
+
+    def test_torn_line_is_skipped(self):
+        """Test that a half-written last line from an interrupted run is ignored and appended after."""
+        mirror_passports(VIVCMirror(self.mirror_file), ["11558"])
+        with open(self.mirror_file, "a", encoding="utf-8") as f:
+            f.write('{"vivc":"13106","passport":{"gra')
+
+        mirror = VIVCMirror(self.mirror_file)
+        self.assertNotIn("13106", mirror)
+        mirror_passports(mirror, ["13106"])
+        self.assertEqual(len(VIVCMirror(self.mirror_file)), 2)
+
+    def test_bulk_import_in_processes(self):
+        """Test importing a directory of saved pages with worker processes."""
+        pages = self.root / "pages" / "nested"
+        pages.mkdir(parents=True)
+        for number in PASSPORTS:
+            (pages / f"passport_{number}.html").write_text(passport_page(number), encoding="utf-8")
+        (pages / "error.html").write_text("<p>Not found</p>", encoding="utf-8")
+
+        mirror = VIVCMirror(self.mirror_file)
+        report = import_directory(mirror, self.root / "pages", workers=2)
+        self.assertEqual((report['files'], report['imported'], report['unparsed']), (4, 3, 1))
+        self.assertEqual(sorted(VIVCMirror(self.mirror_file).passports), sorted(PASSPORTS))
+
+    def test_client_reads_passports_from_the_mirror(self):
+        """Test that get_passport_data uses the mirror, and offline searches resolve synonyms."""
+        mirror = VIVCMirror(self.mirror_file)
+        mirror.add("99999", PassportData(grape=GrapeId("PETITE PEARL", "99999"), synonyms=["MN 1220"]))
+        vivc_client._mirror, vivc_client._mirror_loaded = mirror, True
+
+        self.assertEqual(get_passport_data("99999").grape.name, "PETITE PEARL")
+        self.assertEqual(self.server.requests, [])
+
+        with mock.patch.object(vivc_client, "OFFLINE", True):
+            results = search_cultivar("MN-1220")
+            self.assertEqual((results[0].prime_name, results[0].vivc_number), ("PETITE PEARL", "99999"))
+            with self.assertRaisesRegex(ValueError, "not in the VIVC mirror"):
+                get_passport_data("13106")
+        self.assertEqual(self.server.requests, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+import tempfile
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add src to path so the includes package resolves like in the pipeline scripts
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from includes.wine_facts import WineFactTable, load_wine_facts, default_cache_file
+
+
+PRODUCERS = [
+    {
+        "business_name": "Vignoble A",
+        "state_province": "Quebec",
+        "latitude": 45.1,
+        "longitude": -72.5,
+        "activities": ["Tours"],
+        "wines": [
+            {"type": "Red", "cepages": ["Frontenac", "Marquette"]},
+            {"type": "White", "cepages": ["Vidal"]},
+        ],
+    },
+    {
+        "business_name": "Vignoble B",
+        "state_province": "Quebec",
+        "wines": [
+            {"type": "Red", "cepages": ["Frontenac", ""]},
+            {"type": None, "cepages": []},
+        ],
+    },
+    {
+        "business_name": "Vineyard C",
+        "state_province": "Vermont",
+        "latitude": 44.0,
+        "longitude": -73.0,
+        "wines": [],
+    },
+]
+
+
+class TestWineFactTable(unittest.TestCase):
+
+    def setUp(self):
+        self.facts = WineFactTable.from_producers(PRODUCERS)
+
+    def test_producer_level_counts(self):
+        """Test per-province producer and wine counts."""
+        quebec = self.facts.province_id("Quebec")
+        vermont = self.facts.province_id("Vermont")
+
+        self.assertEqual(self.facts.producers_per_province()[quebec], 2)
+        self.assertEqual(self.facts.producers_per_province()[vermont], 1)
+        self.assertEqual(self.facts.wines_per_province()[quebec], 4)
+        self.assertEqual(self.facts.producers_with_wines_per_province()[vermont], 0)
+        self.assertEqual(int(self.facts.producer_has_location.sum()), 2)
+        self.assertEqual(int(self.facts.producer_open_for_visits.sum()), 1)
+
+    def test_variety_and_type_counts(self):
+        """Test variety mentions, distinct producers per variety and wine types."""
+        frontenac = self.facts.variety_id("Frontenac")
+
+        self.assertEqual(self.facts.variety_occurrences()[frontenac], 2)
+        self.assertEqual(self.facts.variety_producer_counts()[frontenac], 2)
+        self.assertEqual(self.facts.counter(self.facts.wine_types, self.facts.wine_type_counts()),
+                         {"Red": 2, "White": 1})
+        self.assertEqual(self.facts.wines_with_cepages(), 3)
+        self.assertEqual(self.facts.producers_with_cepages(), 2)
+
+        pairs = {
+            (self.facts.provinces[p], self.facts.varieties[v]): int(c)
+            for p, v, c in zip(*self.facts.province_variety_counts())
+        }
+        self.assertEqual(pairs[("Quebec", "Frontenac")], 2)
+        self.assertNotIn(("Vermont", "Frontenac"), pairs)
+
+    def test_disk_cache_round_trip(self):
+        """Test that the cache is reused and rebuilt when the source changes."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_file = Path(temp_dir) / "producers.jsonl"
+            input_file.write_text("\n".join(json.dumps(p) for p in PRODUCERS) + "\n")
+
+            facts = load_wine_facts(input_file)
+            self.assertTrue(default_cache_file(input_file).exists())
+            self.assertEqual(facts.varieties, self.facts.varieties)
+
+            cached = load_wine_facts(input_file)
+            self.assertEqual(cached.provinces, ["Quebec", "Vermont"])
+            self.assertTrue((cached.cepage_variety == self.facts.cepage_variety).all())
+
+            with open(input_file, "a") as f:
+                f.write(json.dumps({"business_name": "New", "state_province": "Ontario"}) + "\n")
+            rebuilt = load_wine_facts(input_file)
+            self.assertEqual(rebuilt.provinces, ["Quebec", "Vermont", "Ontario"])
+
+    def test_concurrent_cache_writers(self):
+        """Test that parallel writers of the same cache never clobber each other's temp file."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_file = Path(temp_dir) / "facts.npz"
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                list(executor.map(lambda _: self.facts.save(cache_file, "abc"), range(16)))
+
+            self.assertEqual([path.name for path in Path(temp_dir).iterdir()], ["facts.npz"])
+            self.assertEqual(WineFactTable.load(cache_file, "abc").provinces, self.facts.provinces)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,26 +1,148 @@
 #!/usr/bin/env python3
 
 import os
+import re
+import sys
+import json
 import hashlib
+import threading
 import yaml
 import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
-from openai import OpenAI
+from typing import Dict, List, Optional
 from dotenv import load_dotenv
 
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+from includes.llm_gateway import get_gateway
+
 load_dotenv()
 
+DEFAULT_WORKERS = 4
+TRANSLATION_MEMORY_FILE = Path("data/translation_memory.jsonl")
+
+VARIETY_GUIDELINES = """- Maintain all technical terms accuracy (grape variety names, disease names, climate zones)
+- Keep citations and references exactly as they are
+- Preserve the casual, approachable tone
+- Use Quebec French where appropriate (this is for Quebec wine growers)
+- Keep the markdown formatting intact
+- Don't translate proper names of people, places, wineries, or publications"""
+
+SITE_GUIDELINES = """- Maintain the same markdown structure 
+- Use Quebec French where appropriate 
+- Keep a friendly, approachable tone
+- Preserve any technical terms related to viticulture
+- Keep all external URLs and social media links exactly as they are
+- Translate section names (like "Grape Varieties" → "Cépages")
+- Keep all internal links identical to English (same filenames and paths)
+- Translate section names and display text but keep URLs the same"""
+
+BLOCK_MARKER = re.compile(r"^\[\[BLOCK (\d+)\]\][ \t]*$", re.MULTILINE)
+_FENCE = ("```", "~~~")
+_HEADING = re.compile(r"^(#{1,6})\s")
+_LIST_ITEM = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s")
+
+
+def split_blocks(markdown: str) -> List[str]:
+    """Markdown blocks separated by blank lines; fenced code blocks stay whole."""
+    blocks, current, in_fence = [], [], False
+    for line in markdown.split("\n"):
+        if line.lstrip().startswith(_FENCE):
+            in_fence = not in_fence
+        if not line.strip() and not in_fence:
+            if current:
+                blocks.append("\n".join(current))
+                current = []
+            continue
+        current.append(line)
+    if current:
+        blocks.append("\n".join(current))
+    return blocks
+
+
+def block_shape(block: str) -> tuple:
+    """Markdown kind of a block, which a faithful translation keeps: heading level,
+    code fence, table rows, list items, quote or paragraph."""
+    first = block.lstrip()
+    if first.startswith(_FENCE):
+        return ("code",)
+    heading = _HEADING.match(first)
+    if heading:
+        return ("heading", len(heading.group(1)))
+    lines = block.split("\n")
+    if all(line.lstrip().startswith("|") for line in lines):
+        return ("table", len(lines))
+    items = sum(1 for line in lines if _LIST_ITEM.match(line))
+    if items:
+        return ("list", items)
+    if first.startswith(">"):
+        return ("quote",)
+    return ("paragraph",)
+
+
+def needs_translation(block: str) -> bool:
+    """Code fences and blocks without words (rules, table separators) are copied as is."""
+    return not block.lstrip().startswith(_FENCE) and any(c.isalpha() for c in block)
+
+
+class TranslationMemory:
+    """Paragraph-level English → French store keyed by the hash of each source block.
+    
+    Append-only JSONL; later lines win, so an edited translation is simply appended.
+    """
+    
+    def __init__(self, path: Path = TRANSLATION_MEMORY_FILE):
+        self.path = Path(path)
+        self.entries: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.entries[entry["key"]] = entry["french"]
+    
+    @staticmethod
+    def key(kind: str, source: str) -> str:
+        return hashlib.sha256(f"{kind}\n{source.strip()}".encode('utf-8')).hexdigest()
+    
+    def get(self, kind: str, source: str) -> Optional[str]:
+        return self.entries.get(self.key(kind, source))
+    
+    def put(self, kind: str, source: str, french: str):
+        key = self.key(kind, source)
+        with self._lock:
+            if self.entries.get(key) == french:
+                return
+            self.entries[key] = french
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                json.dump({"key": key, "kind": kind, "source": source.strip(), "french": french,
+                           "updated_at": datetime.now().isoformat()}, f, ensure_ascii=False)
+                f.write('\n')
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
 class FrenchSyncer:
-    """Sync English articles to French with hash-based change detection."""
+    """Sync English articles to French with hash-based change detection.
+    
+    Only paragraphs missing from the translation memory are sent to the model;
+    files are translated concurrently by a bounded worker pool.
+    """
     
-    def __init__(self, dry_run: bool = False):
+    def __init__(self, dry_run: bool = False, workers: int = DEFAULT_WORKERS,
+                 memory_file: Path = TRANSLATION_MEMORY_FILE):
         self.dry_run = dry_run
+        self.workers = max(1, workers)
         if not dry_run:
-            self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+            self.client = get_gateway(os.getenv("OPENAI_API_KEY"))
         else:
             self.client = None
         
+        self.memory = TranslationMemory(memory_file)
         self.base_path = Path.cwd()
         self.english_dir = self.base_path / "docs" / "en" / "varieties"
         self.french_dir = self.base_path / "docs" / "fr" / "varieties"
@@ -74,12 +196,7 @@ class FrenchSyncer:
 Translate the following English grape variety article to French.
 
 Important guidelines:
-- Maintain all technical terms accuracy (grape variety names, disease names, climate zones)
-- Keep citations and references exactly as they are
-- Preserve the casual, approachable tone
-- Use Quebec French where appropriate (this is for Quebec wine growers)
-- Keep the markdown formatting intact
-- Don't translate proper names of people, places, wineries, or publications
+{VARIETY_GUIDELINES}
 - This is about the grape variety: {variety_name}
 
 English content:
@@ -91,7 +208,8 @@ Provide the French translation:
 """
         
         try:
-            response = self.client.responses.create(
+            response = self.client.create(
+                "translate",
                 model="gpt-5",
                 tools=[{"type": "web_search"}],
                 input=prompt
@@ -109,21 +227,15 @@ Provide the French translation:
 Translate the following English content to French for a Quebec wine growing website.
 
 Important guidelines:
-- Maintain the same markdown structure 
-- Use Quebec French where appropriate 
-- Keep a friendly, approachable tone
-- Preserve any technical terms related to viticulture
-- Keep all external URLs and social media links exactly as they are
-- Translate section names (like "Grape Varieties" → "Cépages")
-- Keep all internal links identical to English (same filenames and paths)
-- Translate section names and display text but keep URLs the same
+{SITE_GUIDELINES}
 
 English content:
 {english_content}
 """
 
         try:
-            response = self.client.responses.create(
+            response = self.client.create(
+                "translate",
                 model="gpt-5",
                 tools=[{"type": "web_search"}],
                 input=prompt
@@ -133,6 +245,66 @@ English content:
             return f"Error translating content: {str(e)}"
     
     
+    def translate_blocks(self, blocks: List[str], kind: str, name: str) -> List[str]:
+        """Translate a batch of markdown blocks in one request; raises ValueError if the answer is misaligned."""
+        if kind == "variety":
+            intro = f"Translate the numbered blocks of this English grape variety article ({name}) to French."
+            guidelines = VARIETY_GUIDELINES
+        else:
+            intro = f"Translate the numbered blocks of this English page ({name}) of a Quebec wine growing website to French."
+            guidelines = SITE_GUIDELINES
+        numbered = "\n\n".join(f"[[BLOCK {i}]]\n{block}" for i, block in enumerate(blocks))
+        prompt = f"""
+{intro}
+The blocks are the changed paragraphs of the page, in page order.
+
+Important guidelines:
+{guidelines}
+- Return every block, each preceded by its marker line exactly as given (e.g. [[BLOCK 0]]), and nothing else
+
+{numbered}
+"""
+
+        def aligned(output_text: str) -> List[str]:
+            parts = BLOCK_MARKER.split(output_text)
+            translations = {int(index): text.strip() for index, text in zip(parts[1::2], parts[2::2])}
+            if sorted(translations) != list(range(len(blocks))) or not all(translations.values()):
+                raise ValueError(f"expected {len(blocks)} translated blocks, got {len(translations)}")
+            return [translations[i] for i in range(len(blocks))]
+
+        # Misaligned answers raise here and are not cached, so a re-run asks again
+        response = self.client.create(
+            "translate",
+            model="gpt-5",
+            tools=[{"type": "web_search"}],
+            input=prompt,
+            validate=aligned
+        )
+        return response.output_parsed
+    
+    def remember_alignment(self, english_content: str, french_content: str, kind: str) -> int:
+        """Seed the memory from an in-sync English/French pair whose blocks line up one to one.
+        
+        Equal block counts are not enough (a split paragraph and a merged one
+        cancel out): every pair must have the same markdown kind, and blocks
+        that are not translated must be identical. Otherwise nothing is seeded.
+        """
+        english_blocks = split_blocks(english_content)
+        french_blocks = split_blocks(french_content)
+        if len(english_blocks) != len(french_blocks):
+            return 0
+        for english, french in zip(english_blocks, french_blocks):
+            if block_shape(english) != block_shape(french):
+                return 0
+            if not needs_translation(english) and english.strip() != french.strip():
+                return 0
+        added = 0
+        for english, french in zip(english_blocks, french_blocks):
+            if needs_translation(english) and self.memory.get(kind, english) is None:
+                self.memory.put(kind, english, french)
+                added += 1
+        return added
+    
     def update_french_index(self):
         """Update French varieties index using the centralized script."""
         if self.dry_run:
@@ -154,6 +326,8 @@ English content:
     
     def sync_file_to_french(self, english_file: Path, french_file: Path, is_variety: bool = False) -> str:
         """Sync any English file to French with identical structure."""
+        kind = "variety" if is_variety else "site"
+        
         # Compute current English content hash
         english_hash = self.compute_content_hash(english_file)
         
@@ -163,20 +337,45 @@ English content:
             stored_hash = french_frontmatter.get("english_hash")
             
             if stored_hash == english_hash:
+                if not self.dry_run:
+                    # Up-to-date pairs teach the memory the current translation of every paragraph
+                    _, english_content = self.extract_frontmatter_and_content(english_file)
+                    _, french_content = self.extract_frontmatter_and_content(french_file)
+                    self.remember_alignment(english_content, french_content, kind)
                 return "SKIP - No changes detected"
         
         # Extract English frontmatter and content
         english_frontmatter, english_content = self.extract_frontmatter_and_content(english_file)
         
+        # Only paragraphs the memory has never seen go to the model
+        blocks = split_blocks(english_content)
+        missing = list(dict.fromkeys(
+            block for block in blocks if needs_translation(block) and self.memory.get(kind, block) is None
+        ))
+        reused = sum(1 for block in blocks if needs_translation(block)) - len(missing)
+        
         if self.dry_run:
-            return f"[DRY RUN] French translation would be generated"
+            return f"[DRY RUN] {len(missing)} paragraphs would be translated, {reused} reused from memory"
         
         # Translate content
-        if is_variety:
-            variety_name = english_file.stem
-            french_content = self.translate_to_french(english_content, variety_name)
-        else:
-            french_content = self.translate_site_content(english_content, english_file.name)
+        try:
+            if missing:
+                for block, french in zip(missing, self.translate_blocks(missing, kind, english_file.stem)):
+                    self.memory.put(kind, block, french)
+            french_content = "\n\n".join(
+                self.memory.get(kind, block) if needs_translation(block) else block for block in blocks
+            )
+        except ValueError:
+            # Misaligned batch answer: translate the whole page and learn its paragraphs
+            if is_variety:
+                french_content = self.translate_to_french(english_content, english_file.stem)
+            else:
+                french_content = self.translate_site_content(english_content, english_file.name)
+            if french_content.startswith("Error translating content"):
+                return f"ERROR - {french_content}"
+            self.remember_alignment(english_content, french_content, kind)
+        except Exception as e:
+            return f"ERROR - Error translating content: {e}"
         
         # Create French frontmatter by merging with existing English frontmatter
         french_frontmatter = english_frontmatter.copy() if english_frontmatter else {}
@@ -195,10 +394,10 @@ English content:
             })
         
         # Save French file
-        self.create_french_file(french_frontmatter, french_content, french_file)
-            
         action = "CREATE" if not french_file.exists() else "UPDATE"
-        return f"{action} - Content translated"
+        self.create_french_file(french_frontmatter, french_content, french_file)
+        
+        return f"{action} - {len(missing)} paragraphs translated, {reused} reused from memory"
 
     def sync_all(self):
         """Sync all English variety files and main site content to French."""
@@ -207,29 +406,31 @@ English content:
         print(f"📂 French target: docs/fr/")
         print(f"📂 Varieties: en/varieties/ → fr/varieties/")
         print(f"📂 Main site: en/*.md → fr/*.md")
+        print(f"🧠 Translation memory: {len(self.memory)} paragraphs, {self.workers} workers")
         print("-" * 60)
         
-        # Sync all main site markdown files (identical structure)
+        # Main site markdown files and variety files (identical structure)
         main_site_files = [f for f in self.docs_dir.glob("*.md") if f.name != "README.md"]
-        
-        for english_file in main_site_files:
-            french_file = self.french_docs_dir / english_file.name
-            print(f"📄 {english_file.name}")
-            action = self.sync_file_to_french(english_file, french_file, is_variety=False)
-            print(f"   {action}")
-        
-        print()
-        
-        # Sync all variety files (identical structure)
         variety_files = [f for f in self.english_dir.glob("*.md") if f.name != "index.md"]
+        jobs = [("📄", english_file, self.french_docs_dir / english_file.name, False) for english_file in main_site_files]
+        jobs += [("🍇", english_file, self.french_dir / english_file.name, True) for english_file in variety_files]
         
         if not variety_files:
             print("⚠️  No English variety files found")
-        else:
-            for english_file in variety_files:
-                french_file = self.french_dir / english_file.name
-                print(f"🍇 {english_file.name}")
-                action = self.sync_file_to_french(english_file, french_file, is_variety=True)
+        
+        # Translate files concurrently; the LLM gateway bounds and paces the API calls
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            future_to_job = {
+                executor.submit(self.sync_file_to_french, english_file, french_file, is_variety): (icon, english_file)
+                for icon, english_file, french_file, is_variety in jobs
+            }
+            for future in as_completed(future_to_job):
+                icon, english_file = future_to_job[future]
+                try:
+                    action = future.result()
+                except Exception as e:
+                    action = f"ERROR - {e}"
+                print(f"{icon} {english_file.name}")
                 print(f"   {action}")
         
         print()
@@ -247,10 +448,13 @@ English content:
 def main():
     parser = argparse.ArgumentParser(description="Sync English grape variety articles to French")
     parser.add_argument("--dry-run", action="store_true", help="Show what would be done without making changes")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Files translated concurrently")
+    parser.add_argument("--memory", type=Path, default=TRANSLATION_MEMORY_FILE,
+                        help="Paragraph translation memory (JSONL)")
     
     args = parser.parse_args()
     
-    syncer = FrenchSyncer(dry_run=args.dry_run)
+    syncer = FrenchSyncer(dry_run=args.dry_run, workers=args.workers, memory_file=args.memory)
     syncer.sync_all()
 
 if __name__ == "__main__":
@@ -1,16 +1,19 @@
 #!/usr/bin/env python3
 
 import os
+import sys
 import argparse
 from pathlib import Path
-from openai import OpenAI
 from dotenv import load_dotenv
 
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+from includes.llm_gateway import get_gateway
+
 load_dotenv()
 
 def translate_to_french(english_content: str, content_type: str = "article") -> str:
     """Translate English content to French using OpenAI."""
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    gateway = get_gateway(os.getenv("OPENAI_API_KEY"))
     
     prompt = f"""
 Translate the following English grape variety {content_type} to French. 
@@ -32,7 +35,8 @@ Provide the French translation:
 """
     
     try:
-        response = client.responses.create(
+        response = gateway.create(
+            "translate",
             model="gpt-5",
             tools=[{"type": "web_search"}],
             input=prompt